@@ -0,0 +1,88 @@
+-- CreateTable: 申请日汇总
+CREATE TABLE "daily_application_stats" (
+    "date" DATE NOT NULL,
+    "department" TEXT NOT NULL,
+    "priority" "Priority" NOT NULL,
+    "status" "ApplicationStatus" NOT NULL,
+    "count" INTEGER NOT NULL DEFAULT 0,
+    "completed_count" INTEGER NOT NULL DEFAULT 0,
+    "completion_seconds" DOUBLE PRECISION NOT NULL DEFAULT 0,
+    "updated_at" TIMESTAMP(3) NOT NULL,
+
+    CONSTRAINT "daily_application_stats_pkey" PRIMARY KEY ("date","department","priority","status")
+);
+
+-- CreateTable: 考勤日汇总（按部门）
+CREATE TABLE "daily_attendance_stats" (
+    "date" DATE NOT NULL,
+    "department_id" TEXT NOT NULL,
+    "record_count" INTEGER NOT NULL DEFAULT 0,
+    "normal_count" INTEGER NOT NULL DEFAULT 0,
+    "late_count" INTEGER NOT NULL DEFAULT 0,
+    "early_leave_count" INTEGER NOT NULL DEFAULT 0,
+    "absent_count" INTEGER NOT NULL DEFAULT 0,
+    "work_hours" DOUBLE PRECISION NOT NULL DEFAULT 0,
+    "worked_count" INTEGER NOT NULL DEFAULT 0,
+    "under6_count" INTEGER NOT NULL DEFAULT 0,
+    "from6_to8_count" INTEGER NOT NULL DEFAULT 0,
+    "from8_to10_count" INTEGER NOT NULL DEFAULT 0,
+    "over10_count" INTEGER NOT NULL DEFAULT 0,
+    "updated_at" TIMESTAMP(3) NOT NULL,
+
+    CONSTRAINT "daily_attendance_stats_pkey" PRIMARY KEY ("date","department_id")
+);
+
+-- CreateTable: 设备维护日汇总
+CREATE TABLE "daily_maintenance_stats" (
+    "date" DATE NOT NULL,
+    "equipment_id" TEXT NOT NULL,
+    "type" "MaintenanceType" NOT NULL,
+    "count" INTEGER NOT NULL DEFAULT 0,
+    "total_cost" DECIMAL(15,2) NOT NULL DEFAULT 0,
+    "updated_at" TIMESTAMP(3) NOT NULL,
+
+    CONSTRAINT "daily_maintenance_stats_pkey" PRIMARY KEY ("date","equipment_id","type")
+);
+
+-- CreateTable: 用户活动日汇总
+CREATE TABLE "daily_user_stats" (
+    "date" DATE NOT NULL,
+    "user_id" TEXT NOT NULL,
+    "tasks_assigned" INTEGER NOT NULL DEFAULT 0,
+    "tasks_completed" INTEGER NOT NULL DEFAULT 0,
+    "task_completion_seconds" DOUBLE PRECISION NOT NULL DEFAULT 0,
+    "task_completion_timed" INTEGER NOT NULL DEFAULT 0,
+    "applications_submitted" INTEGER NOT NULL DEFAULT 0,
+    "applications_approved" INTEGER NOT NULL DEFAULT 0,
+    "applications_rejected" INTEGER NOT NULL DEFAULT 0,
+    "approvals_processed" INTEGER NOT NULL DEFAULT 0,
+    "updated_at" TIMESTAMP(3) NOT NULL,
+
+    CONSTRAINT "daily_user_stats_pkey" PRIMARY KEY ("date","user_id")
+);
+
+-- CreateTable: 汇总水位线
+CREATE TABLE "rollup_watermarks" (
+    "name" TEXT NOT NULL,
+    "watermark" TIMESTAMP(3) NOT NULL,
+    "days_recomputed" INTEGER NOT NULL DEFAULT 0,
+    "last_run_at" TIMESTAMP(3) NOT NULL,
+
+    CONSTRAINT "rollup_watermarks_pkey" PRIMARY KEY ("name")
+);
+
+-- CreateIndex
+CREATE INDEX "daily_application_stats_department_date_idx" ON "daily_application_stats"("department", "date");
+CREATE INDEX "daily_attendance_stats_department_id_date_idx" ON "daily_attendance_stats"("department_id", "date");
+CREATE INDEX "daily_maintenance_stats_equipment_id_idx" ON "daily_maintenance_stats"("equipment_id");
+CREATE INDEX "daily_user_stats_user_id_date_idx" ON "daily_user_stats"("user_id", "date");
+
+-- CreateIndex: 增量汇总按 updatedAt 扫描变更行
+CREATE INDEX "Application_updatedAt_idx" ON "Application"("updatedAt");
+CREATE INDEX "attendance_records_updatedAt_idx" ON "attendance_records"("updatedAt");
+CREATE INDEX "MaintenanceRecord_updatedAt_idx" ON "MaintenanceRecord"("updatedAt");
+CREATE INDEX "tasks_updatedAt_idx" ON "tasks"("updatedAt");
+CREATE INDEX "FactoryApproval_updatedAt_idx" ON "FactoryApproval"("updatedAt");
+CREATE INDEX "DirectorApproval_updatedAt_idx" ON "DirectorApproval"("updatedAt");
+CREATE INDEX "ManagerApproval_updatedAt_idx" ON "ManagerApproval"("updatedAt");
+CREATE INDEX "CeoApproval_updatedAt_idx" ON "CeoApproval"("updatedAt");
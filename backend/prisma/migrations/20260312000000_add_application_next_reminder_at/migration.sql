@@ -0,0 +1,7 @@
+-- AlterTable: 申请下次催办提醒时间
+ALTER TABLE "Application" ADD COLUMN "nextReminderAt" TIMESTAMP(3);
+
+-- CreateIndex: 提醒调度只扫描待审批且已到期的申请
+CREATE INDEX "Application_status_nextReminderAt_idx" ON "Application"("status", "nextReminderAt");
+
+-- 存量待审批申请的 nextReminderAt 由提醒调度器启动时按当前提醒设置回填
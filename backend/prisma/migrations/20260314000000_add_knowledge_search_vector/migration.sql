@@ -0,0 +1,7 @@
+-- AlterTable: 知识库文章全文检索向量
+ALTER TABLE "knowledge_articles" ADD COLUMN "search_vector" tsvector;
+
+-- CreateIndex
+CREATE INDEX "knowledge_articles_search_vector_idx" ON "knowledge_articles" USING GIN ("search_vector");
+
+-- 存量文章的 search_vector 由服务启动时补建（中文切词在应用层完成）
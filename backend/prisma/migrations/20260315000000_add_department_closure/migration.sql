@@ -0,0 +1,36 @@
+-- CreateTable: 部门层级闭包表
+CREATE TABLE "department_closure" (
+    "ancestor_id" TEXT NOT NULL,
+    "descendant_id" TEXT NOT NULL,
+    "depth" INTEGER NOT NULL,
+
+    CONSTRAINT "department_closure_pkey" PRIMARY KEY ("ancestor_id","descendant_id")
+);
+
+-- CreateIndex
+CREATE INDEX "department_closure_descendant_id_idx" ON "department_closure"("descendant_id");
+
+-- AddForeignKey
+ALTER TABLE "department_closure" ADD CONSTRAINT "department_closure_ancestor_id_fkey" FOREIGN KEY ("ancestor_id") REFERENCES "departments"("id") ON DELETE CASCADE ON UPDATE CASCADE;
+ALTER TABLE "department_closure" ADD CONSTRAINT "department_closure_descendant_id_fkey" FOREIGN KEY ("descendant_id") REFERENCES "departments"("id") ON DELETE CASCADE ON UPDATE CASCADE;
+
+-- 回填存量部门：沿 parentId 展开所有（祖先, 后代）对
+INSERT INTO "department_closure" ("ancestor_id", "descendant_id", "depth")
+WITH RECURSIVE tree AS (
+    SELECT "id" AS ancestor_id, "id" AS descendant_id, 0 AS depth FROM "departments"
+    UNION ALL
+    SELECT t.ancestor_id, d."id", t.depth + 1
+    FROM tree t
+    JOIN "departments" d ON d."parentId" = t.descendant_id
+)
+SELECT ancestor_id, descendant_id, depth FROM tree;
+
+-- 按闭包表修正层级（根部门为 1）
+UPDATE "departments" d
+SET "level" = c.max_depth + 1
+FROM (
+    SELECT "descendant_id", MAX("depth") AS max_depth
+    FROM "department_closure"
+    GROUP BY "descendant_id"
+) c
+WHERE d."id" = c."descendant_id";
@@ -0,0 +1,25 @@
+-- CreateTable: 全厂健康度批量重算运行记录
+CREATE TABLE "health_recalc_runs" (
+    "id" TEXT NOT NULL,
+    "status" TEXT NOT NULL DEFAULT 'RUNNING',
+    "trigger" TEXT NOT NULL,
+    "assessor" TEXT NOT NULL,
+    "factory_id" TEXT,
+    "cursor" TEXT,
+    "total" INTEGER NOT NULL DEFAULT 0,
+    "processed" INTEGER NOT NULL DEFAULT 0,
+    "failed" INTEGER NOT NULL DEFAULT 0,
+    "last_error" TEXT,
+    "started_at" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    "heartbeat_at" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    "finished_at" TIMESTAMP(3),
+
+    CONSTRAINT "health_recalc_runs_pkey" PRIMARY KEY ("id")
+);
+
+-- CreateIndex
+CREATE INDEX "health_recalc_runs_started_at_idx" ON "health_recalc_runs"("started_at");
+CREATE INDEX "health_recalc_runs_trigger_started_at_idx" ON "health_recalc_runs"("trigger", "started_at");
+
+-- CreateIndex: 按设备、类型、时间聚合维修记录
+CREATE INDEX "MaintenanceRecord_equipmentId_type_createdAt_idx" ON "MaintenanceRecord"("equipmentId", "type", "createdAt");
@@ -0,0 +1,22 @@
+-- CreateTable: 设备健康度滚动状态（存量数据由服务启动时或 npm run health:rebuild-state 按历史记录重放生成）
+CREATE TABLE "equipment_health_state" (
+    "equipment_id" TEXT NOT NULL,
+    "latest_score" DOUBLE PRECISION NOT NULL,
+    "health_level" TEXT NOT NULL,
+    "failure_probability" DOUBLE PRECISION,
+    "assessed_at" TIMESTAMP(3) NOT NULL,
+    "sample_count" INTEGER NOT NULL,
+    "ewma" DOUBLE PRECISION NOT NULL,
+    "slope" DOUBLE PRECISION NOT NULL,
+    "consecutive_declines" INTEGER NOT NULL,
+    "recent_scores" DOUBLE PRECISION[],
+    "updated_at" TIMESTAMP(3) NOT NULL,
+
+    CONSTRAINT "equipment_health_state_pkey" PRIMARY KEY ("equipment_id")
+);
+
+-- CreateIndex
+CREATE INDEX "equipment_health_state_health_level_idx" ON "equipment_health_state"("health_level");
+
+-- AddForeignKey
+ALTER TABLE "equipment_health_state" ADD CONSTRAINT "equipment_health_state_equipment_id_fkey" FOREIGN KEY ("equipment_id") REFERENCES "Equipment"("id") ON DELETE CASCADE ON UPDATE CASCADE;
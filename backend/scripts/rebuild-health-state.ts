@@ -0,0 +1,19 @@
+import { prisma } from '../src/lib/prisma';
+import { rebuildHealthState } from '../src/services/healthStateService';
+
+/**
+ * 按健康度评估历史重建设备健康度滚动状态（equipment_health_state）
+ * 运行: npm run health:rebuild-state
+ */
+if (require.main === module) {
+  rebuildHealthState()
+    .finally(() => prisma.$disconnect())
+    .then((result) => {
+      console.log(`\n完成: 重建了 ${result.equipment} 台设备的状态，重放 ${result.samples} 条评估记录`);
+      process.exit(0);
+    })
+    .catch((error) => {
+      console.error('重建健康度状态失败:', error);
+      process.exit(1);
+    });
+}
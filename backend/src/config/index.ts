@@ -1,3 +1,4 @@
+import os from 'os';
 import dotenv from 'dotenv';
 
 dotenv.config();
@@ -34,8 +35,18 @@ export const config = {
       },
     },
     from: process.env.EMAIL_FROM || 'OA System <oa@example.com>',
+    // 首次重试延迟（之后指数退避）与最大尝试次数
     retryDelay: int(process.env.EMAIL_RETRY_DELAY, '3000'),
     maxRetries: int(process.env.EMAIL_MAX_RETRIES, '3'),
+    // SMTP 连接池（每秒最多发送 rateLimit 封）
+    pool: {
+      maxConnections: int(process.env.SMTP_MAX_CONNECTIONS, '3'),
+      rateLimit: int(process.env.SMTP_RATE_LIMIT, '5'),
+    },
+    queue: {
+      pollIntervalMs: int(process.env.MAIL_QUEUE_POLL_MS, '5000'),
+      batchSize: int(process.env.MAIL_QUEUE_BATCH_SIZE, '50'),
+    },
   },
 
   server: {
@@ -65,6 +76,61 @@ export const config = {
   bcrypt: {
     saltRounds: int(process.env.BCRYPT_SALT_ROUNDS, '10'),
   },
+
+  authCache: {
+    maxSize: int(process.env.AUTH_USER_CACHE_SIZE, '5000'),
+    ttlMs: int(process.env.AUTH_USER_CACHE_TTL_MS, '30000'),
+  },
+
+  dashboardCache: {
+    ttlMs: int(process.env.DASHBOARD_SUMMARY_CACHE_TTL_MS, '15000'),
+  },
+
+  // 部门树快照缓存（部门变更时立即失效，人数变化在有效期后刷新）
+  departmentTreeCache: {
+    ttlMs: int(process.env.DEPARTMENT_TREE_CACHE_TTL_MS, '60000'),
+  },
+
+  // 审计日志批量写入；响应体超过 maxCaptureBytes 时不记录新值
+  audit: {
+    batchSize: int(process.env.AUDIT_BATCH_SIZE, '100'),
+    flushIntervalMs: int(process.env.AUDIT_FLUSH_INTERVAL_MS, '1000'),
+    maxQueueSize: int(process.env.AUDIT_MAX_QUEUE_SIZE, '10000'),
+    maxCaptureBytes: int(process.env.AUDIT_MAX_CAPTURE_BYTES, '65536'),
+  },
+
+  // 浏览量缓冲写回间隔
+  viewCounter: {
+    flushIntervalMs: int(process.env.VIEW_COUNT_FLUSH_INTERVAL_MS, '10000'),
+  },
+
+  // 批量导入：单次最多行数、每个写入事务的行数、用户初始密码哈希线程数（0 或 1 时在主线程计算）
+  bulkImport: {
+    maxRows: int(process.env.IMPORT_MAX_ROWS, '20000'),
+    chunkSize: int(process.env.IMPORT_CHUNK_SIZE, '1000'),
+    hashWorkers: int(process.env.IMPORT_HASH_WORKERS, String(Math.max(1, Math.min(4, os.cpus().length - 1)))),
+  },
+
+  // 工作流批量模拟：超过 inlineThreshold 组变量时分片交给 worker 线程（workers 为 0 时不启用线程池）
+  workflowSimulation: {
+    workers: int(process.env.WORKFLOW_SIM_WORKERS, String(Math.max(1, Math.min(4, os.cpus().length - 1)))),
+    inlineThreshold: int(process.env.WORKFLOW_SIM_INLINE_THRESHOLD, '2000'),
+    maxVariableSets: int(process.env.WORKFLOW_SIM_MAX_SETS, '50000'),
+  },
+
+  // 全厂设备健康度定时重算：间隔、每批设备数
+  healthRecalc: {
+    enabled: process.env.ENABLE_HEALTH_RECALC !== 'false',
+    intervalMs: int(process.env.HEALTH_RECALC_INTERVAL_MS, '86400000'),
+    batchSize: int(process.env.HEALTH_RECALC_BATCH_SIZE, '500'),
+  },
+
+  // 多实例部署时通过 Redis 共享 Socket.io 推送与在线状态，留空则仅在本进程内
+  socketCluster: {
+    redisUrl: process.env.SOCKET_REDIS_URL || '',
+    instanceId: process.env.INSTANCE_ID || `${os.hostname()}-${process.pid}`,
+    heartbeatMs: int(process.env.SOCKET_PRESENCE_HEARTBEAT_MS, '10000'),
+  },
 } as const;
 
 export type Config = typeof config;
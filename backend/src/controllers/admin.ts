@@ -6,6 +6,9 @@ import { sendEmailNotification, generateEmailTemplate } from '../services/email'
 import { config } from '../config';
 import { prisma } from '../lib/prisma';
 import * as logger from '../lib/logger';
+import { userCache } from '../services/userCache';
+import { getRollupStatus, reconcileReportRollups, runReportRollups } from '../services/rollupService';
+import { getMailQueueStats } from '../services/mailQueue';
 
 // 归档目录
 const ARCHIVE_DIR = path.join(process.cwd(), 'archive');
@@ -257,6 +260,71 @@ export async function getArchiveStats(req: Request, res: Response): Promise<void
   }
 }
 
+/**
+ * 获取认证用户缓存命中统计
+ * GET /api/admin/auth-cache-stats
+ */
+export async function getAuthCacheStats(req: Request, res: Response): Promise<void> {
+  const user = requireAuth(req, res);
+  if (!user || !requireAdmin(user, res)) return;
+
+  res.json({ success: true, data: userCache.stats() });
+}
+
+/**
+ * 邮件队列状态
+ * GET /api/admin/mail-queue
+ */
+export async function getMailQueueStatus(req: Request, res: Response): Promise<void> {
+  try {
+    const user = requireAuth(req, res);
+    if (!user || !requireAdmin(user, res)) return;
+
+    res.json({ success: true, data: await getMailQueueStats() });
+  } catch (error) {
+    logger.error('获取邮件队列状态失败', { error });
+    errorResponse(res, 'MAIL_QUEUE_STATUS_ERROR', '获取邮件队列状态失败');
+  }
+}
+
+/**
+ * 报表汇总状态
+ * GET /api/admin/report-rollups
+ */
+export async function getReportRollupStatus(req: Request, res: Response): Promise<void> {
+  try {
+    const user = requireAuth(req, res);
+    if (!user || !requireAdmin(user, res)) return;
+
+    res.json({ success: true, data: await getRollupStatus() });
+  } catch (error) {
+    logger.error('获取报表汇总状态失败', { error });
+    errorResponse(res, 'ROLLUP_STATUS_ERROR', '获取报表汇总状态失败');
+  }
+}
+
+/**
+ * 立即执行报表汇总（可选 reconcileDays 重算最近N天）
+ * POST /api/admin/report-rollups/run
+ */
+export async function triggerReportRollups(req: Request, res: Response): Promise<void> {
+  try {
+    const user = requireAuth(req, res);
+    if (!user || !requireAdmin(user, res)) return;
+
+    const reconcileDays = parseInt(req.body?.reconcileDays, 10);
+    if (reconcileDays > 0) {
+      await reconcileReportRollups(Math.min(reconcileDays, 3660));
+    }
+    const result = await runReportRollups();
+
+    successResponse(res, '报表汇总已执行', result);
+  } catch (error) {
+    logger.error('执行报表汇总失败', { error });
+    errorResponse(res, 'ROLLUP_RUN_ERROR', '执行报表汇总失败');
+  }
+}
+
 /**
  * 恢复申请
  * POST /api/admin/recover
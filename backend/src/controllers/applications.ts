@@ -10,6 +10,8 @@ import {
 import { prisma } from '../lib/prisma';
 import logger from '../lib/logger';
 import { createNotifications, sendApprovalTaskEmails } from '../services/notificationService';
+import { dashboardSummaryCache } from '../services/summaryCache';
+import { computeNextReminderAt } from '../services/reminder';
 import { fail } from '../utils/response';
 import { parsePaginationParams } from '../utils/validation';
 
@@ -571,6 +573,10 @@ export async function submitApplication(req: Request, res: Response): Promise<vo
       return;
     }
 
+    // 提交时间与首次催办提醒时间
+    const submittedAt = new Date();
+    const nextReminderAt = computeNextReminderAt(existingApp.priority, 0, submittedAt);
+
     // 根据申请类型确定提交流程
     const result = await prisma.$transaction(async (tx) => {
       // 解析flowConfig
@@ -589,7 +595,8 @@ export async function submitApplication(req: Request, res: Response): Promise<vo
           where: { id },
           data: {
             status: nextStatus,
-            submittedAt: new Date(),
+            submittedAt,
+            nextReminderAt,
           },
         });
 
@@ -624,7 +631,8 @@ export async function submitApplication(req: Request, res: Response): Promise<vo
           where: { id },
           data: {
             status: ApplicationStatus.PENDING_FACTORY,
-            submittedAt: new Date(),
+            submittedAt,
+            nextReminderAt,
           },
         });
 
@@ -683,6 +691,8 @@ export async function submitApplication(req: Request, res: Response): Promise<vo
       logger.error('提交申请通知发送失败', { error: notifyError });
     }
 
+    dashboardSummaryCache.invalidate();
+
     res.json({ success: true, message: '申请提交成功' });
   } catch (error) {
     logger.error('提交申请失败', { error: error instanceof Error ? error.message : '未知错误' });
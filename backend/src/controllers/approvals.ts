@@ -8,6 +8,7 @@ import {
   checkAllManagersApproved,
 } from '../utils/application';
 import { archiveApplication } from '../services/archive';
+import { dashboardSummaryCache } from '../services/summaryCache';
 import { prisma } from '../lib/prisma';
 import logger from '../lib/logger';
 import { ok, fail } from '../utils/response';
@@ -481,6 +482,8 @@ async function processApproval(
       }
     }
 
+    dashboardSummaryCache.invalidate();
+
     res.json(ok({
       message: action === 'APPROVE' ? '审批通过' : '审批已拒绝',
       status: newStatus,
@@ -609,6 +612,8 @@ export async function directorApprove(req: Request, res: Response): Promise<void
         '其他申请总监审批结果'
       );
 
+      dashboardSummaryCache.invalidate();
+
       res.json(ok({
         message: action === 'APPROVE' ? '审批通过' : '审批已拒绝',
         status: updatedApp?.status,
@@ -695,6 +700,8 @@ export async function directorApprove(req: Request, res: Response): Promise<void
         );
       }
 
+      dashboardSummaryCache.invalidate();
+
       res.json(ok({
         message: action === 'APPROVE' ? '审批通过' : '审批已拒绝',
         status: updatedApp?.status,
@@ -862,6 +869,8 @@ export async function directorApprove(req: Request, res: Response): Promise<void
       }
     }
 
+    dashboardSummaryCache.invalidate();
+
     res.json(ok({
       message: action === 'APPROVE' ? '审批通过' : '审批已拒绝',
       status: updatedApp?.status,
@@ -1128,6 +1137,8 @@ export async function withdrawApproval(req: Request, res: Response): Promise<voi
       });
     });
 
+    dashboardSummaryCache.invalidate();
+
     res.json(ok({
       message: '审批已撤回',
       status: config.pendingStatus,
@@ -110,6 +110,42 @@ const createScheduleSchema = z.object({
   isRestDay: z.boolean().optional(),
 })
 
+const dateKey = z.string().regex(/^\d{4}-\d{2}-\d{2}$/, '日期格式应为 YYYY-MM-DD')
+const monthKey = z.string().regex(/^\d{4}-\d{2}$/, '月份格式应为 YYYY-MM')
+
+const shiftPatternSchema = z.object({
+  cycle: z.array(z.string().nullable()).min(1, '轮班序列不能为空').max(366),
+  anchorDate: dateKey.optional(),
+  staggerDays: z.number().int().optional(),
+  userOffsets: z.record(z.number().int()).optional(),
+  restWeekdays: z.array(z.number().int().min(0).max(6)).optional(),
+  restDates: z.array(dateKey).optional(),
+  maxConsecutiveWorkDays: z.number().int().min(1).optional(),
+  restShiftId: z.string().optional(),
+})
+
+const generateRosterSchema = z.object({
+  userIds: z.array(z.string()).min(1, '请选择排班人员'),
+  startDate: dateKey,
+  endDate: dateKey,
+  pattern: shiftPatternSchema,
+  overwrite: z.boolean().optional(),
+})
+
+const batchScheduleSchema = z.object({
+  userIds: z.array(z.string()).min(1, '请选择排班人员'),
+  dates: z.array(dateKey).min(1, '请选择排班日期'),
+  shiftId: z.string(),
+  overwrite: z.boolean().optional(),
+})
+
+const copySchedulesSchema = z.object({
+  sourceMonth: monthKey,
+  targetMonth: monthKey,
+  userIds: z.array(z.string()).optional(),
+  overwrite: z.boolean().optional(),
+})
+
 // ============ Attendance Controllers ============
 
 // 上班打卡
@@ -373,6 +409,52 @@ export async function deleteSchedule(req: AuthRequest, res: Response): Promise<v
   }
 }
 
+// 按轮班规则生成排班
+export async function generateRoster(req: AuthRequest, res: Response): Promise<void> {
+  try {
+    const data = generateRosterSchema.parse(req.body)
+    const summary = await scheduleService.generateRoster(data)
+    successResponse(res, summary)
+  } catch (error) {
+    if (error instanceof z.ZodError) return handleZodError(res, error)
+    errorResponse(res, 'CREATE_FAILED', (error as Error).message, 400)
+  }
+}
+
+// 批量排班（人员 × 日期使用同一班次）
+export async function batchCreateSchedules(req: AuthRequest, res: Response): Promise<void> {
+  try {
+    const data = batchScheduleSchema.parse(req.body)
+    const summary = await scheduleService.batchCreateSchedules({
+      userIds: data.userIds,
+      dates: data.dates.map(date => new Date(`${date}T00:00:00.000Z`)),
+      shiftId: data.shiftId,
+      overwrite: data.overwrite,
+    })
+    successResponse(res, summary)
+  } catch (error) {
+    if (error instanceof z.ZodError) return handleZodError(res, error)
+    errorResponse(res, 'CREATE_FAILED', (error as Error).message, 400)
+  }
+}
+
+// 复制排班到其他月份
+export async function copySchedules(req: AuthRequest, res: Response): Promise<void> {
+  try {
+    const data = copySchedulesSchema.parse(req.body)
+    const summary = await scheduleService.copySchedules(
+      new Date(`${data.sourceMonth}-01T00:00:00.000Z`),
+      new Date(`${data.targetMonth}-01T00:00:00.000Z`),
+      data.userIds,
+      data.overwrite
+    )
+    successResponse(res, summary)
+  } catch (error) {
+    if (error instanceof z.ZodError) return handleZodError(res, error)
+    errorResponse(res, 'CREATE_FAILED', (error as Error).message, 400)
+  }
+}
+
 // 设置休息日
 export async function setRestDay(req: AuthRequest, res: Response): Promise<void> {
   try {
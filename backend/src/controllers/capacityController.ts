@@ -201,6 +201,30 @@ export const capacityController = {
     }
   },
 
+  /** POST /capacity/plan - 有限产能排产 */
+  async planProduction(req: Request, res: Response): Promise<void> {
+    try {
+      const { requirements } = req.body
+      if (!Array.isArray(requirements) || requirements.length === 0) {
+        res.status(400).json({ success: false, error: '请提供需求列表 requirements[]' })
+        return
+      }
+      const invalidIndex = requirements.findIndex((item) =>
+        !item || typeof item.productName !== 'string' || !item.productName ||
+        typeof item.quantity !== 'number' || !(item.quantity > 0) ||
+        typeof item.deadline !== 'string' || Number.isNaN(new Date(item.deadline).getTime())
+      )
+      if (invalidIndex >= 0) {
+        res.status(400).json({ success: false, error: `第${invalidIndex + 1}条需求格式错误: 需要 productName、quantity(>0)、deadline` })
+        return
+      }
+      const data = await capacityService.planProduction(requirements)
+      res.json({ success: true, data })
+    } catch (error) {
+      res.status(500).json({ success: false, error: (error as Error).message })
+    }
+  },
+
   /** GET /capacity/equipment-utilization - 设备利用率统计 */
   async getEquipmentUtilization(_req: Request, res: Response): Promise<void> {
     try {
@@ -234,13 +258,21 @@ export const capacityController = {
   /** POST /capacity/equipment/batch-import - 批量导入 */
   async batchImport(req: Request, res: Response): Promise<void> {
     try {
+      const userId = ((req as { user?: { id?: string } }).user?.id) ?? 'system'
+
+      // 上传 CSV/XLSX 文件或提交 JSON 数据
+      if (req.file?.buffer) {
+        const result = await capacityService.importCapabilitiesFromFile(req.file.buffer, req.file.originalname, userId)
+        res.json({ success: true, data: result })
+        return
+      }
+
       const { items } = req.body
       if (!Array.isArray(items) || items.length === 0) {
-        res.status(400).json({ success: false, error: '请提供导入数据 items[]' })
+        res.status(400).json({ success: false, error: '请提供导入数据 items[] 或上传文件' })
         return
       }
 
-      const userId = ((req as { user?: { id?: string } }).user?.id) ?? 'system'
       const result = await capacityService.batchImportCapabilities(items, userId)
       res.json({ success: true, data: result })
     } catch (error) {
@@ -1,7 +1,7 @@
 import { Request, Response } from 'express';
 import logger from '../lib/logger';
 import {
-  getDepartmentTree,
+  getDepartmentTreeSnapshot,
   getDepartmentById,
   createDepartment,
   updateDepartment,
@@ -19,7 +19,9 @@ import { success, fail } from '../utils/response';
  */
 export async function getTree(_req: Request, res: Response): Promise<void> {
   try {
-    const tree = await getDepartmentTree();
+    const { tree, version } = await getDepartmentTreeSnapshot();
+    // 由树内容计算，客户端可据此判断部门结构是否变化
+    res.setHeader('X-Department-Tree-Version', version);
     res.json(success(tree));
   } catch (error) {
     logger.error('获取部门树失败', {
@@ -232,13 +234,13 @@ export async function remove(req: Request, res: Response): Promise<void> {
 }
 
 /**
- * 获取部门成员列表
+ * 获取部门成员列表（?recursive=true 包含下级部门）
  * GET /api/departments/:id/users
  */
 export async function getUsers(req: Request, res: Response): Promise<void> {
   try {
     const { id } = req.params;
-    const users = await getDepartmentUsers(id);
+    const users = await getDepartmentUsers(id, req.query.recursive === 'true');
     res.json(success(users));
   } catch (error) {
     if (error instanceof Error && error.message === '部门不存在') {
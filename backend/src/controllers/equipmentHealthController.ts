@@ -1,5 +1,6 @@
 import type { Request, Response } from 'express'
 import { equipmentHealthService } from '../services/equipmentHealthService'
+import { startFleetHealthRecalc, getFleetHealthRecalcStatus } from '../services/fleetHealthService'
 
 export const equipmentHealthController = {
   async calculate(req: Request, res: Response): Promise<void> {
@@ -71,6 +72,32 @@ export const equipmentHealthController = {
     }
   },
 
+  // 启动全厂健康度重算（后台执行，通过状态接口查询进度）
+  async startRecalc(req: Request, res: Response): Promise<void> {
+    try {
+      const assessor = (req as { user?: { username?: string } }).user?.username || 'system'
+      const factoryId = typeof req.body?.factoryId === 'string' && req.body.factoryId ? req.body.factoryId : undefined
+      const { run, started } = await startFleetHealthRecalc({ trigger: 'manual', assessor, factoryId })
+      res.status(started ? 202 : 200).json({
+        success: true,
+        data: run,
+        message: started ? '健康度重算已开始' : '已有重算任务正在运行',
+      })
+    } catch (error) {
+      res.status(500).json({ success: false, error: (error as Error).message })
+    }
+  },
+
+  // 全厂健康度重算进度
+  async getRecalcStatus(_req: Request, res: Response): Promise<void> {
+    try {
+      const data = await getFleetHealthRecalcStatus()
+      res.json({ success: true, data })
+    } catch (error) {
+      res.status(500).json({ success: false, error: (error as Error).message })
+    }
+  },
+
   // 健康度统计（真实数据）
   async getStatistics(_req: Request, res: Response): Promise<void> {
     try {
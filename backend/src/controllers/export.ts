@@ -39,18 +39,60 @@ function errorResponse(res: Response, code: string, message: string, status = 50
   res.status(status).json({ success: false, error: { code, message } });
 }
 
-// 创建Excel工作簿并设置表头
+// 导出列定义
 interface ColumnDef {
   header: string;
   key: string;
   width?: number;
 }
 
-function createExcelWorksheet(
-  workbook: ExcelJS.Workbook,
-  sheetName: string,
-  columns: ColumnDef[]
-): ExcelJS.Worksheet {
+type ExportFormat = 'xlsx' | 'csv';
+type ExportRow = Record<string, string | number>;
+
+// 每批从数据库读取的行数，内存占用只与批大小有关，与总行数无关
+const EXPORT_BATCH_SIZE = 1000;
+
+// 流式导出的写入目标
+interface ExportSink {
+  addRows(rows: ExportRow[]): Promise<void>;
+  finish(): Promise<void>;
+}
+
+function parseExportFormat(value: unknown): ExportFormat {
+  return value === 'csv' ? 'csv' : 'xlsx';
+}
+
+// 设置导出响应头
+function setExportResponseHeaders(res: Response, filename: string, format: ExportFormat): void {
+  res.setHeader(
+    'Content-Type',
+    format === 'csv'
+      ? 'text/csv; charset=utf-8'
+      : 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+  );
+  res.setHeader('Content-Disposition', `attachment; filename="${filename}_${new Date().toISOString().split('T')[0]}.${format}"`);
+}
+
+// 等待写缓冲区排空（客户端断开时也返回，避免永久挂起）
+function waitForDrain(res: Response): Promise<void> {
+  return new Promise((resolve) => {
+    const done = () => {
+      res.off('drain', done);
+      res.off('close', done);
+      resolve();
+    };
+    res.on('drain', done);
+    res.on('close', done);
+  });
+}
+
+// 流式 Excel：每行写入后立即 commit，不在内存中保留整个工作簿
+function createXlsxSink(res: Response, sheetName: string, columns: ColumnDef[]): ExportSink {
+  const workbook = new ExcelJS.stream.xlsx.WorkbookWriter({
+    stream: res,
+    useStyles: true,
+    useSharedStrings: false,
+  });
   const worksheet = workbook.addWorksheet(sheetName);
   worksheet.columns = columns;
 
@@ -65,18 +107,91 @@ function createExcelWorksheet(
       fgColor: { argb: 'FFE0E0E0' },
     };
   });
+  headerRow.commit();
+
+  return {
+    async addRows(rows) {
+      rows.forEach((row) => worksheet.addRow(row).commit());
+      if (res.writableNeedDrain) await waitForDrain(res);
+    },
+    async finish() {
+      worksheet.commit();
+      await workbook.commit();
+    },
+  };
+}
+
+function escapeCsv(value: string | number | undefined): string {
+  const text = value === undefined || value === null ? '' : String(value);
+  return /[",\r\n]/.test(text) ? `"${text.replace(/"/g, '""')}"` : text;
+}
+
+// 流式 CSV：带 BOM 以便 Excel 正确识别中文
+function createCsvSink(res: Response, columns: ColumnDef[]): ExportSink {
+  const keys = columns.map((c) => c.key);
+  res.write('\ufeff' + columns.map((c) => escapeCsv(c.header)).join(',') + '\r\n');
+
+  return {
+    async addRows(rows) {
+      const chunk = rows.map((row) => keys.map((key) => escapeCsv(row[key])).join(',') + '\r\n').join('');
+      if (!res.write(chunk)) await waitForDrain(res);
+    },
+    async finish() {
+      res.end();
+    },
+  };
+}
+
+/**
+ * 按 id 游标分批读取并流式写出，返回导出行数
+ * 响应头和表头立即发出，客户端断开后停止读取
+ */
+async function streamExport<T extends { id: string }>(
+  res: Response,
+  options: {
+    filename: string;
+    sheetName: string;
+    format: ExportFormat;
+    columns: ColumnDef[];
+    fetchBatch: (cursor: string | undefined, take: number) => Promise<T[]>;
+    toRow: (item: T) => ExportRow;
+  }
+): Promise<number> {
+  const { filename, sheetName, format, columns, fetchBatch, toRow } = options;
 
-  return worksheet;
+  setExportResponseHeaders(res, filename, format);
+  const sink = format === 'csv' ? createCsvSink(res, columns) : createXlsxSink(res, sheetName, columns);
+
+  let cursor: string | undefined;
+  let total = 0;
+  while (!res.destroyed) {
+    const batch = await fetchBatch(cursor, EXPORT_BATCH_SIZE);
+    if (batch.length === 0) break;
+
+    await sink.addRows(batch.map(toRow));
+    total += batch.length;
+
+    if (batch.length < EXPORT_BATCH_SIZE) break;
+    cursor = batch[batch.length - 1].id;
+  }
+
+  if (!res.destroyed) {
+    await sink.finish();
+  }
+  return total;
 }
 
-// 设置Excel导出响应头
-function setExcelResponseHeaders(res: Response, filename: string): void {
-  res.setHeader('Content-Type', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet');
-  res.setHeader('Content-Disposition', `attachment; filename="${filename}_${new Date().toISOString().split('T')[0]}.xlsx"`);
+// 导出中途出错时响应头已发出，只能中断连接让客户端感知失败
+function handleExportError(res: Response, message: string): void {
+  if (res.headersSent) {
+    res.destroy();
+    return;
+  }
+  errorResponse(res, 'INTERNAL_ERROR', message);
 }
 
 /**
- * 导出申请到Excel
+ * 导出申请到Excel（?format=csv 导出CSV）
  * GET /api/export/applications
  */
 export async function exportApplications(req: Request, res: Response): Promise<void> {
@@ -87,7 +202,7 @@ export async function exportApplications(req: Request, res: Response): Promise<v
       return;
     }
 
-    const { timeRange, startDate, endDate } = req.query;
+    const { timeRange, startDate, endDate, format } = req.query;
     const where = buildDateFilter(timeRange as string | undefined, startDate as string | undefined, endDate as string | undefined);
 
     // 非管理员只能导出自己的申请
@@ -95,34 +210,42 @@ export async function exportApplications(req: Request, res: Response): Promise<v
       where.applicantId = user.id;
     }
 
-    // 查询申请数据
-    const applications = await prisma.application.findMany({
-      where,
-      orderBy: { createdAt: 'desc' },
-      include: {
-        applicant: { select: { name: true, department: true, email: true } },
-        _count: { select: { attachments: true } },
-      },
-    });
-
-    // 创建Excel
-    const workbook = new ExcelJS.Workbook();
-    const worksheet = createExcelWorksheet(workbook, '申请记录', [
-      { header: '申请编号', key: 'applicationNo', width: 18 },
-      { header: '标题', key: 'title', width: 30 },
-      { header: '申请人', key: 'applicant', width: 12 },
-      { header: '部门', key: 'department', width: 15 },
-      { header: '申请日期', key: 'date', width: 15 },
-      { header: '紧急程度', key: 'priority', width: 10 },
-      { header: '申请金额', key: 'amount', width: 12 },
-      { header: '币种', key: 'currency', width: 8 },
-      { header: '状态', key: 'status', width: 12 },
-      { header: '附件数', key: 'attachments', width: 10 },
-    ]);
-
-    // 添加数据
-    applications.forEach((app) => {
-      worksheet.addRow({
+    const start = Date.now();
+    const rows = await streamExport(res, {
+      filename: 'applications',
+      sheetName: '申请记录',
+      format: parseExportFormat(format),
+      columns: [
+        { header: '申请编号', key: 'applicationNo', width: 18 },
+        { header: '标题', key: 'title', width: 30 },
+        { header: '申请人', key: 'applicant', width: 12 },
+        { header: '部门', key: 'department', width: 15 },
+        { header: '申请日期', key: 'date', width: 15 },
+        { header: '紧急程度', key: 'priority', width: 10 },
+        { header: '申请金额', key: 'amount', width: 12 },
+        { header: '币种', key: 'currency', width: 8 },
+        { header: '状态', key: 'status', width: 12 },
+        { header: '附件数', key: 'attachments', width: 10 },
+      ],
+      fetchBatch: (cursor, take) => prisma.application.findMany({
+        where,
+        orderBy: [{ createdAt: 'desc' }, { id: 'desc' }],
+        take,
+        ...(cursor && { cursor: { id: cursor }, skip: 1 }),
+        select: {
+          id: true,
+          applicationNo: true,
+          title: true,
+          applicantName: true,
+          applicantDept: true,
+          createdAt: true,
+          priority: true,
+          amount: true,
+          status: true,
+          _count: { select: { attachments: true } },
+        },
+      }),
+      toRow: (app) => ({
         applicationNo: app.applicationNo,
         title: app.title,
         applicant: app.applicantName,
@@ -133,20 +256,18 @@ export async function exportApplications(req: Request, res: Response): Promise<v
         currency: 'CNY',
         status: statusMap[app.status] || app.status,
         attachments: app._count.attachments,
-      });
+      }),
     });
 
-    setExcelResponseHeaders(res, 'applications');
-    await workbook.xlsx.write(res);
-    res.end();
+    logger.info('导出申请完成', { userId: user.id, rows, format: parseExportFormat(format), durationMs: Date.now() - start });
   } catch (error) {
     logger.error('导出申请失败', { error });
-    errorResponse(res, 'INTERNAL_ERROR', '导出申请失败');
+    handleExportError(res, '导出申请失败');
   }
 }
 
 /**
- * 导出用户到Excel
+ * 导出用户到Excel（?format=csv 导出CSV）
  * GET /api/export/users
  */
 export async function exportUsers(req: Request, res: Response): Promise<void> {
@@ -157,45 +278,43 @@ export async function exportUsers(req: Request, res: Response): Promise<void> {
       return;
     }
 
-    // 查询用户数据
-    const users = await prisma.user.findMany({
-      orderBy: { createdAt: 'desc' },
-      select: {
-        username: true, name: true, employeeId: true, email: true,
-        department: { select: { name: true } }, role: true, isActive: true, createdAt: true,
-      },
-    });
-
-    // 创建Excel
-    const workbook = new ExcelJS.Workbook();
-    const worksheet = createExcelWorksheet(workbook, '用户列表', [
-      { header: '用户名', key: 'username', width: 15 },
-      { header: '姓名', key: 'name', width: 12 },
-      { header: '工号', key: 'employeeId', width: 12 },
-      { header: '邮箱', key: 'email', width: 25 },
-      { header: '部门', key: 'department', width: 15 },
-      { header: '角色', key: 'role', width: 12 },
-      { header: '状态', key: 'status', width: 10 },
-      { header: '创建日期', key: 'createdAt', width: 15 },
-    ]);
-
-    // 添加数据
-    users.forEach((u) => {
-      worksheet.addRow({
+    const start = Date.now();
+    const rows = await streamExport(res, {
+      filename: 'users',
+      sheetName: '用户列表',
+      format: parseExportFormat(req.query.format),
+      columns: [
+        { header: '用户名', key: 'username', width: 15 },
+        { header: '姓名', key: 'name', width: 12 },
+        { header: '工号', key: 'employeeId', width: 12 },
+        { header: '邮箱', key: 'email', width: 25 },
+        { header: '部门', key: 'department', width: 15 },
+        { header: '角色', key: 'role', width: 12 },
+        { header: '状态', key: 'status', width: 10 },
+        { header: '创建日期', key: 'createdAt', width: 15 },
+      ],
+      fetchBatch: (cursor, take) => prisma.user.findMany({
+        orderBy: [{ createdAt: 'desc' }, { id: 'desc' }],
+        take,
+        ...(cursor && { cursor: { id: cursor }, skip: 1 }),
+        select: {
+          id: true, username: true, name: true, employeeId: true, email: true,
+          department: { select: { name: true } }, role: true, isActive: true, createdAt: true,
+        },
+      }),
+      toRow: (u) => ({
         username: u.username, name: u.name, employeeId: u.employeeId,
-        email: u.email, department: u.department?.name || '',
+        email: u.email || '', department: u.department?.name || '',
         role: roleMap[u.role] || u.role,
         status: u.isActive ? '启用' : '禁用',
         createdAt: u.createdAt.toLocaleDateString('zh-CN'),
-      });
+      }),
     });
 
-    setExcelResponseHeaders(res, 'users');
-    await workbook.xlsx.write(res);
-    res.end();
+    logger.info('导出用户完成', { userId: user.id, rows, durationMs: Date.now() - start });
   } catch (error) {
     logger.error('导出用户失败', { error });
-    errorResponse(res, 'INTERNAL_ERROR', '导出用户失败');
+    handleExportError(res, '导出用户失败');
   }
 }
 
@@ -333,15 +333,16 @@ export async function submitFeedback(req: Request, res: Response): Promise<void>
  */
 export async function searchArticles(req: Request, res: Response): Promise<void> {
   try {
-    const { q, limit = '20' } = req.query
+    const { q } = req.query
+    const { page, limit } = parsePagination(req.query as Record<string, unknown>)
 
-    if (!q || typeof q !== 'string') {
+    if (!q || typeof q !== 'string' || !q.trim()) {
       errorResponse(res, '请输入搜索关键词', 400)
       return
     }
 
-    const articles = await knowledgeService.searchArticles(q, parseInt(limit as string, 10))
-    successResponse(res, articles)
+    const result = await knowledgeService.searchArticles(q.trim(), page, Math.min(limit, 100))
+    successResponse(res, result)
   } catch (error) {
     logger.error('搜索文章失败', { error: getErrorMessage(error) })
     errorResponse(res, getErrorMessage(error) || '搜索文章失败')
@@ -3,6 +3,7 @@ import {
   getReminderSettings,
   saveReminderSettings,
   checkAndSendReminders,
+  rescheduleReminders,
   ReminderSettings,
 } from '../services/reminder';
 import * as logger from '../lib/logger';
@@ -75,10 +76,15 @@ export async function saveSettings(req: Request, res: Response): Promise<void> {
     if (saveReminderSettings(settings)) {
       logger.info(`管理员 ${user.username} 更新了提醒策略`);
 
-      // 立即触发一次提醒检查
-      setTimeout(() => {
+      // 按新策略重新计算提醒排期后立即触发一次提醒检查
+      setTimeout(async () => {
         logger.info('立即应用新的提醒策略，触发提醒检查...');
-        checkAndSendReminders();
+        try {
+          await rescheduleReminders();
+        } catch (error) {
+          logger.error('重新计算提醒排期失败', { error });
+        }
+        await checkAndSendReminders();
       }, 100);
 
       res.json({
@@ -5,6 +5,9 @@ import { UserRole, Prisma } from '@prisma/client';
 import logger from '../lib/logger';
 import { success, fail } from '../utils/response';
 import { config } from '../config';
+import { userCache } from '../services/userCache';
+import { invalidateDepartmentTree } from '../services/departmentService';
+import { importUsers as importUserRows, importUsersFromFile } from '../services/userImport';
 
 // 查询参数类型
 interface UserQueryParams {
@@ -293,6 +296,9 @@ export async function createUser(req: Request, res: Response): Promise<void> {
       },
     });
 
+    // 部门树缓存了各部门人数
+    invalidateDepartmentTree();
+
     // 格式化返回数据
     const formattedUser = {
       ...user,
@@ -362,6 +368,10 @@ export async function updateUser(req: Request, res: Response): Promise<void> {
       },
     });
 
+    // 认证中间件缓存了用户状态，更新后立即失效
+    userCache.invalidate(id);
+    invalidateDepartmentTree();
+
     // 格式化返回数据
     const formattedUser = {
       ...user,
@@ -400,12 +410,15 @@ export async function deleteUser(req: Request, res: Response): Promise<void> {
         where: { id },
         data: { isActive: false },
       });
+      userCache.invalidate(id);
       res.json(success({ message: '用户已禁用（存在关联申请记录）' }));
       return;
     }
 
     // 物理删除
     await prisma.user.delete({ where: { id } });
+    userCache.invalidate(id);
+    invalidateDepartmentTree();
     res.json(success({ message: '用户已删除' }));
   } catch (error) {
     logger.error('删除用户失败', { error: error instanceof Error ? error.message : '未知错误' });
@@ -449,179 +462,37 @@ export async function resetPassword(req: Request, res: Response): Promise<void>
   }
 }
 
-// 导入结果类型
-interface ImportResult {
-  success: number;
-  failed: number;
-  errors: Array<{ index: number; field: string; message: string }>;
-}
-
-// 单个导入用户类型
-interface ImportUserData {
-  username: string;
-  password: string;
-  name: string;
-  email?: string;
-  role: UserRole;
-  departmentId?: string;
-  employeeId: string;
-}
-
-/**
- * 验证用户数据格式
- */
-function validateUserData(userData: ImportUserData, index: number): { valid: boolean; error?: { index: number; field: string; message: string } } {
-  // 验证必填字段（邮箱可选）
-  if (!userData.username || !userData.password || !userData.name ||
-      !userData.role || !userData.employeeId) {
-    return { valid: false, error: { index, field: 'multiple', message: '缺少必填字段' } };
-  }
-
-  // 验证用户名格式
-  if (!/^[a-zA-Z0-9_]{3,20}$/.test(userData.username)) {
-    return { valid: false, error: { index, field: 'username', message: '用户名格式不正确' } };
-  }
-
-  // 验证密码强度
-  if (userData.password.length < 6) {
-    return { valid: false, error: { index, field: 'password', message: '密码长度不足' } };
-  }
-
-  // 验证邮箱格式（如果提供了邮箱）
-  if (userData.email && !/^[^\s@]+@[^\s@]+\.[^\s@]+$/.test(userData.email)) {
-    return { valid: false, error: { index, field: 'email', message: '邮箱格式不正确' } };
-  }
-
-  return { valid: true };
-}
-
-/**
- * 检查用户是否已存在
- */
-async function checkUserExists(userData: ImportUserData): Promise<{ exists: boolean; field?: string }> {
-  const existingUsername = await prisma.user.findUnique({ where: { username: userData.username } });
-  if (existingUsername) return { exists: true, field: 'username' };
-
-  // 只在提供了邮箱时检查邮箱是否已存在
-  if (userData.email) {
-    const existingEmail = await prisma.user.findUnique({ where: { email: userData.email } });
-    if (existingEmail) return { exists: true, field: 'email' };
-  }
-
-  const existingEmployeeId = await prisma.user.findUnique({ where: { employeeId: userData.employeeId } });
-  if (existingEmployeeId) return { exists: true, field: 'employeeId' };
-
-  return { exists: false };
-}
-
-/**
- * 创建单个用户
- */
-async function createSingleUser(userData: ImportUserData) {
-  const hashedPassword = await bcrypt.hash(userData.password, 10);
-
-  return prisma.user.create({
-    data: {
-      username: userData.username,
-      password: hashedPassword,
-      name: userData.name,
-      email: userData.email || null,
-      role: userData.role,
-      departmentId: userData.departmentId || null,
-      employeeId: userData.employeeId,
-      isActive: true,
-    },
-    select: {
-      id: true,
-      username: true,
-      name: true,
-      email: true,
-      role: true,
-      departmentId: true,
-      department: {
-        select: {
-          name: true,
-        }
-      },
-      employeeId: true,
-      isActive: true,
-      createdAt: true,
-      updatedAt: true,
-    },
-  });
-}
-
 /**
- * 批量导入用户
+ * 批量导入用户（上传 CSV/XLSX 文件，或提交 JSON 数组）
  */
 export async function importUsers(req: Request, res: Response): Promise<void> {
   try {
+    if (req.file?.buffer) {
+      const result = await importUsersFromFile(req.file.buffer, req.file.originalname);
+      res.status(201).json(success(result));
+      return;
+    }
+
     const { users } = req.body as ImportUserRequest;
 
     if (!Array.isArray(users) || users.length === 0) {
-      res.status(400).json(fail('INVALID_DATA', '请提供有效的用户数据数组'));
+      res.status(400).json(fail('INVALID_DATA', '请提供有效的用户数据数组或上传文件'));
       return;
     }
 
-    if (users.length > 100) {
-      res.status(400).json(fail('TOO_MANY_USERS', '单次导入用户数量不能超过100'));
+    if (users.length > config.bulkImport.maxRows) {
+      res.status(400).json(fail('TOO_MANY_USERS', `单次导入用户数量不能超过${config.bulkImport.maxRows}`));
       return;
     }
 
-    const results: ImportResult = { success: 0, failed: 0, errors: [] };
-    const createdUsers = [];
-
-    for (let i = 0; i < users.length; i++) {
-      const userData = users[i];
-
-      // 验证数据格式
-      const validation = validateUserData(userData, i);
-      if (!validation.valid) {
-        results.failed++;
-        if (validation.error) results.errors.push(validation.error);
-        continue;
-      }
-
-      try {
-        // 检查用户是否已存在
-        const existsCheck = await checkUserExists(userData);
-        if (existsCheck.exists) {
-          results.failed++;
-          results.errors.push({
-            index: i,
-            field: existsCheck.field || 'unknown',
-            message: `${existsCheck.field === 'username' ? '用户名' : existsCheck.field === 'email' ? '邮箱' : '工号'}已存在`,
-          });
-          continue;
-        }
-
-        // 创建用户
-        const user = await createSingleUser(userData);
-        createdUsers.push(user);
-        results.success++;
-      } catch (error) {
-        results.failed++;
-        results.errors.push({
-          index: i,
-          field: 'unknown',
-          message: error instanceof Error ? error.message : '未知错误',
-        });
-      }
-    }
-
-    // 格式化返回数据
-    const formattedUsers = createdUsers.map(user => ({
-      ...user,
-      department: user.department?.name || '',
-    }));
-
-    res.status(201).json(success({
-      imported: formattedUsers,
-      summary: { total: users.length, success: results.success, failed: results.failed },
-      errors: results.errors,
-    }));
+    const result = await importUserRows(users);
+    res.status(201).json(success(result));
   } catch (error) {
     logger.error('导入用户失败', { error: error instanceof Error ? error.message : '未知错误' });
+    if (error instanceof Error && /仅支持|单次最多/.test(error.message)) {
+      res.status(400).json(fail('INVALID_FILE', error.message));
+      return;
+    }
     res.status(500).json(fail('INTERNAL_ERROR', '导入用户时发生错误'));
   }
 }
@@ -178,6 +178,34 @@ export async function simulateWorkflow(req: Request, res: Response): Promise<voi
   }
 }
 
+/**
+ * 批量模拟工作流 (变量组或历史申请筛选条件)
+ */
+export async function simulateWorkflowBatch(req: Request, res: Response): Promise<void> {
+  try {
+    const { id } = req.params
+    const { variableSets, applicationFilter } = req.body
+
+    if (variableSets === undefined && applicationFilter === undefined) {
+      errorResponse(res, '请提供模拟数据或历史申请筛选条件', 400)
+      return
+    }
+    if (variableSets !== undefined && (
+      !Array.isArray(variableSets) ||
+      variableSets.some((v: unknown) => !v || typeof v !== 'object' || Array.isArray(v))
+    )) {
+      errorResponse(res, '模拟数据格式错误', 400)
+      return
+    }
+
+    const result = await workflowService.simulateWorkflowBatch(id, { variableSets, applicationFilter })
+    successResponse(res, result)
+  } catch (error) {
+    logger.error('批量模拟工作流失败', { error })
+    errorResponse(res, getErrorMessage(error, '批量模拟工作流失败'), 400)
+  }
+}
+
 // ==================== 工作流实例相关控制器 ====================
 
 /**
@@ -30,9 +30,17 @@ import taskRoutes from './routes/tasks';
 import meetingRoutes from './routes/meetings';
 import { startReminderScheduler } from './services/reminder';
 import { errorHandler, notFoundHandler } from './middleware/errorHandler';
-import { initializeSocket } from './services/socketService';
+import { initializeSocket, closeSocketCluster } from './services/socketService';
 import { initializeEmailService } from './services/email';
+import { startMailQueueWorker, stopMailQueueWorker } from './services/mailQueue';
+import { flushAuditQueue } from './services/auditQueue';
+import { rebuildKnowledgeSearchIndex } from './services/knowledgeSearch';
+import { startViewCounterFlush, stopViewCounterFlush } from './services/viewCounter';
+import { repairDepartmentClosure } from './services/departmentService';
 import { startNotificationCleanupScheduler } from './services/notificationCleanup';
+import { startReportRollupScheduler } from './services/rollupService';
+import { startFleetHealthScheduler } from './services/fleetHealthService';
+import { ensureHealthState } from './services/healthStateService';
 import notificationRoutes from './routes/notifications';
 import workflowRoutes from './routes/workflows';
 import reportRoutes from './routes/reports';
@@ -211,20 +219,64 @@ server.listen(config.port, () => {
   // 验证邮件配置
   initializeEmailService();
 
+  // 启动邮件发送队列
+  startMailQueueWorker();
+
   // 启动提醒定时任务
   startReminderScheduler();
 
   // 启动通知清理定时任务
   startNotificationCleanupScheduler();
+
+  // 启动报表日汇总定时任务
+  startReportRollupScheduler();
+
+  // 启动全厂设备健康度定时重算（续跑中断的任务）
+  startFleetHealthScheduler();
+
+  // 启动浏览量定时写回
+  startViewCounterFlush();
+
+  // 补齐脚本直接创建的部门的层级关系
+  repairDepartmentClosure()
+    .then((count) => {
+      if (count > 0) logger.info('部门层级闭包表已补齐', { count });
+    })
+    .catch((error) => {
+      logger.error('部门层级闭包表补齐失败', { error: error instanceof Error ? error.message : String(error) });
+    });
+
+  // 首次上线时按评估历史生成设备健康度滚动状态
+  ensureHealthState()
+    .then((count) => {
+      if (count > 0) logger.info('设备健康度滚动状态已重建', { count });
+    })
+    .catch((error) => {
+      logger.error('设备健康度滚动状态重建失败', { error: error instanceof Error ? error.message : String(error) });
+    });
+
+  // 补建尚未索引的知识库文章
+  rebuildKnowledgeSearchIndex(true).catch((error) => {
+    logger.error('知识库检索索引补建失败', { error: error instanceof Error ? error.message : String(error) });
+  });
 });
 
 // 优雅关闭处理
 const gracefulShutdown = (signal: string) => {
   logger.info(`${signal} 信号接收到，开始优雅关闭...`);
 
+  // 停止领取新的邮件任务，未发送的保留在队列中
+  stopMailQueueWorker();
+
+  // 清除本实例登记的在线状态，其他实例不再把用户视为在线
+  closeSocketCluster().catch((error) => {
+    logger.error('关闭 Socket 集群连接失败', { error: error instanceof Error ? error.message : String(error) });
+  });
+
   server.close(() => {
     logger.info('HTTP服务器已关闭');
-    process.exit(0);
+    // 写入队列中剩余的审计日志和浏览量后退出
+    Promise.allSettled([flushAuditQueue(), stopViewCounterFlush()]).finally(() => process.exit(0));
   });
 
   // 超时强制退出
@@ -1,5 +1,7 @@
 import { Request, Response, NextFunction } from 'express';
-import { createAuditLog, CreateAuditLogData } from '../services/auditService';
+import { CreateAuditLogData } from '../services/auditService';
+import { enqueueAuditLog } from '../services/auditQueue';
+import { config } from '../config';
 import { prisma } from '../lib/prisma';
 import logger from '../lib/logger';
 
@@ -269,6 +271,32 @@ async function fetchOldValues(
   }
 }
 
+/**
+ * 内容长度是否在审计记录上限内（未声明长度时视为未超限）
+ */
+function withinCaptureLimit(contentLength: string | number | undefined): boolean {
+  if (contentLength === undefined) return true;
+  const bytes = Number(contentLength);
+  return Number.isFinite(bytes) && bytes <= config.audit.maxCaptureBytes;
+}
+
+/**
+ * 提取新值：优先取 res.json 的 data（无需重新解析响应体），其次取请求体；超过大小上限时不记录
+ */
+function extractNewValues(req: Request, res: Response, responseBody: unknown): Record<string, unknown> | undefined {
+  const body = responseBody as { success?: boolean; data?: unknown } | undefined;
+  if (body?.success && body.data && typeof body.data === 'object') {
+    return withinCaptureLimit(res.getHeader('content-length') as string | number | undefined)
+      ? body.data as Record<string, unknown>
+      : undefined;
+  }
+
+  if (req.body && typeof req.body === 'object' && Object.keys(req.body).length > 0) {
+    return withinCaptureLimit(req.headers['content-length']) ? req.body : undefined;
+  }
+  return undefined;
+}
+
 /**
  * 审计中间件 - 自动记录操作日志
  * 使用示例:
@@ -289,69 +317,35 @@ export function auditMiddleware(options: AuditMiddlewareOptions) {
       oldValues = await fetchOldValues(entityType, entityId);
     }
 
-    // 监听响应完成
-    const originalEnd = res.end.bind(res);
-    let responseBody = '';
-
-    // 重写res.end以捕获响应内容 - 处理多种调用签名
-    res.end = function(
-      chunk?: unknown,
-      encoding?: BufferEncoding | (() => void),
-      callback?: () => void
-    ): Response {
-      if (chunk) {
-        responseBody = chunk.toString();
-      }
-      // 处理不同参数组合：res.end(), res.end(chunk), res.end(chunk, encoding), res.end(chunk, encoding, callback)
-      if (typeof encoding === 'function') {
-        return originalEnd(chunk, undefined as unknown as BufferEncoding, encoding);
-      }
-      return originalEnd(chunk, encoding as BufferEncoding, callback);
-    };
+    // 拦截 res.json 取得响应对象，避免缓冲并重新解析响应体
+    let responseBody: unknown;
+    if (captureNewValues) {
+      const originalJson = res.json.bind(res);
+      res.json = function(body?: unknown): Response {
+        responseBody = body;
+        return originalJson(body);
+      };
+    }
 
-    res.on('finish', async () => {
+    // 响应完成后入队，由审计队列批量写入
+    res.on('finish', () => {
       try {
         const user = req.user;
         if (!user) return;
 
-        const entityId = entityIdExtractor ? entityIdExtractor(req) : undefined;
-        const description = descriptionExtractor ? descriptionExtractor(req, res) : undefined;
-
-        let finalOldValues = oldValues;
-        let newValues: Record<string, unknown> | undefined;
-
-        // 尝试解析响应体获取新值
-        if (captureNewValues && responseBody) {
-          try {
-            const parsed = JSON.parse(responseBody);
-            if (parsed.success && parsed.data) {
-              newValues = parsed.data;
-            }
-          } catch {
-            // 解析失败不处理
-          }
-        }
-
-        // 从请求体获取值
-        if (req.body && Object.keys(req.body).length > 0) {
-          if (!newValues && captureNewValues) {
-            newValues = req.body;
-          }
-        }
-
         const auditData: CreateAuditLogData = {
           userId: user.id,
           action,
           entityType,
-          entityId,
-          oldValues: finalOldValues,
-          newValues,
+          entityId: entityIdExtractor ? entityIdExtractor(req) : undefined,
+          oldValues,
+          newValues: captureNewValues ? extractNewValues(req, res, responseBody) : undefined,
           ipAddress: getClientIp(req),
           userAgent: req.headers['user-agent'],
-          description,
+          description: descriptionExtractor ? descriptionExtractor(req, res) : undefined,
         };
 
-        await createAuditLog(auditData);
+        enqueueAuditLog(auditData);
       } catch (error) {
         logger.error('审计中间件执行失败', {
           error: error instanceof Error ? error.message : '未知错误',
@@ -379,7 +373,7 @@ export async function auditLogin(
       ? `用户登录成功: ${extraInfo?.username || ''}`
       : `用户登录失败: ${extraInfo?.username || ''}${extraInfo?.reason ? `, 原因: ${extraInfo.reason}` : ''}`;
 
-    await createAuditLog({
+    enqueueAuditLog({
       userId,
       action: success ? 'LOGIN_SUCCESS' : 'LOGIN_FAILED',
       entityType: 'User',
@@ -402,7 +396,7 @@ export async function auditLogin(
  */
 export async function auditLogout(req: Request, userId: string): Promise<void> {
   try {
-    await createAuditLog({
+    enqueueAuditLog({
       userId,
       action: 'LOGOUT',
       entityType: 'User',
@@ -428,7 +422,7 @@ export async function manualAudit(
   data: Omit<CreateAuditLogData, 'ipAddress' | 'userAgent'>
 ): Promise<void> {
   try {
-    await createAuditLog({
+    enqueueAuditLog({
       ...data,
       ipAddress: getClientIp(req),
       userAgent: req.headers['user-agent'],
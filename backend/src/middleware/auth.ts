@@ -3,6 +3,7 @@ import { UserRole } from '@prisma/client';
 import { verifyAccessToken, extractTokenFromHeader, JwtPayload } from '../utils/jwt';
 import { prisma } from '../lib/prisma';
 import logger from '../lib/logger';
+import { userCache, AuthUserProjection } from '../services/userCache';
 
 // 文件类型定义
 interface UploadedFile {
@@ -86,6 +87,38 @@ class AuthError extends Error {
   }
 }
 
+/**
+ * 加载认证所需的用户投影，优先读进程内缓存，未命中再查库
+ */
+export async function loadAuthUser(userId: string): Promise<AuthUserProjection | null> {
+  const cached = userCache.get(userId);
+  if (cached) return cached;
+
+  const user = await prisma.user.findUnique({
+    where: { id: userId },
+    select: {
+      id: true,
+      isActive: true,
+      employeeId: true,
+      name: true,
+      departmentId: true,
+      department: { select: { name: true } }
+    },
+  });
+  if (!user) return null;
+
+  const projection: AuthUserProjection = {
+    id: user.id,
+    isActive: user.isActive,
+    employeeId: user.employeeId,
+    name: user.name,
+    departmentId: user.departmentId,
+    department: user.department?.name || null,
+  };
+  userCache.set(userId, projection);
+  return projection;
+}
+
 /**
  * 认证中间件 - 验证JWT令牌
  */
@@ -106,17 +139,7 @@ export async function authMiddleware(
     const payload = verifyAccessToken(token);
 
     // 检查用户是否存在且激活
-    const user = await prisma.user.findUnique({
-      where: { id: payload.userId },
-      select: {
-        id: true,
-        isActive: true,
-        employeeId: true,
-        name: true,
-        departmentId: true,
-        department: { select: { name: true } }
-      },
-    });
+    const user = await loadAuthUser(payload.userId);
 
     if (!user) {
       throw new AuthError(401, 'USER_NOT_FOUND', '用户不存在');
@@ -127,15 +150,7 @@ export async function authMiddleware(
     }
 
     // 将用户信息附加到请求对象
-    req.user = {
-      ...payload,
-      id: user.id,
-      isActive: user.isActive,
-      employeeId: user.employeeId,
-      name: user.name,
-      departmentId: user.departmentId,
-      department: user.department?.name || null,
-    };
+    req.user = { ...payload, ...user };
 
     next();
   } catch (error) {
@@ -277,28 +292,10 @@ export async function optionalAuthMiddleware(
 
     if (token) {
       const payload = verifyAccessToken(token);
-      const user = await prisma.user.findUnique({
-        where: { id: payload.userId },
-        select: {
-          id: true,
-          isActive: true,
-          employeeId: true,
-          name: true,
-          departmentId: true,
-          department: { select: { name: true } }
-        },
-      });
+      const user = await loadAuthUser(payload.userId);
 
       if (user && user.isActive) {
-        req.user = {
-          ...payload,
-          id: user.id,
-          isActive: user.isActive,
-          employeeId: user.employeeId,
-          name: user.name,
-          departmentId: user.departmentId,
-          department: user.department?.name || null,
-        };
+        req.user = { ...payload, ...user };
       }
     }
 
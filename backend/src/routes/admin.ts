@@ -4,6 +4,10 @@ import {
   getArchiveStats,
   recoverApplications,
   checkDataIntegrity,
+  getAuthCacheStats,
+  getReportRollupStatus,
+  getMailQueueStatus,
+  triggerReportRollups,
 } from '../controllers/admin';
 import { authMiddleware, requireRole } from '../middleware/auth';
 import { UserRole } from '@prisma/client';
@@ -41,4 +45,32 @@ router.post('/recover', recoverApplications);
  */
 router.get('/data-integrity', checkDataIntegrity);
 
+/**
+ * @route   GET /api/admin/auth-cache-stats
+ * @desc    认证用户缓存命中统计
+ * @access  Private (Admin only)
+ */
+router.get('/auth-cache-stats', getAuthCacheStats);
+
+/**
+ * @route   GET /api/admin/mail-queue
+ * @desc    邮件发送队列状态（各状态任务数、最早待发时间）
+ * @access  Private (Admin only)
+ */
+router.get('/mail-queue', getMailQueueStatus);
+
+/**
+ * @route   GET /api/admin/report-rollups
+ * @desc    报表日汇总状态（水位线、最近运行时间）
+ * @access  Private (Admin only)
+ */
+router.get('/report-rollups', getReportRollupStatus);
+
+/**
+ * @route   POST /api/admin/report-rollups/run
+ * @desc    立即执行报表汇总
+ * @access  Private (Admin only)
+ */
+router.post('/report-rollups/run', triggerReportRollups);
+
 export default router;
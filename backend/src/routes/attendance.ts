@@ -1,4 +1,5 @@
 import { Router } from 'express'
+import { UserRole } from '@prisma/client'
 import {
   clockIn,
   clockOut,
@@ -17,8 +18,11 @@ import {
   getSchedules,
   deleteSchedule,
   setRestDay,
+  generateRoster,
+  batchCreateSchedules,
+  copySchedules,
 } from '../controllers/attendanceController'
-import { authenticate } from '../middleware/auth'
+import { authenticate, requireMinRole } from '../middleware/auth'
 
 const router = Router()
 
@@ -53,5 +57,8 @@ router.get('/schedules', getSchedules)
 router.post('/schedules', createSchedule)
 router.delete('/schedules/:id', deleteSchedule)
 router.post('/schedules/rest-day', setRestDay)
+router.post('/schedules/generate', requireMinRole(UserRole.MANAGER), generateRoster)
+router.post('/schedules/batch', requireMinRole(UserRole.MANAGER), batchCreateSchedules)
+router.post('/schedules/copy', requireMinRole(UserRole.MANAGER), copySchedules)
 
 export default router
@@ -33,7 +33,7 @@ router.get('/list', getList);
 
 /**
  * @route   GET /api/departments/:id/users
- * @desc    获取部门成员列表
+ * @desc    获取部门成员列表（?recursive=true 包含下级部门）
  * @access  Private
  */
 router.get('/:id/users', getUsers);
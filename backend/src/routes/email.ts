@@ -8,15 +8,15 @@ const router = Router();
 
 /**
  * @route   POST /api/email/test
- * @desc    测试邮件发送功能（仅管理员）
+ * @desc    测试邮件发送功能（不经过队列，直接验证SMTP配置，仅管理员）
  * @access  Private (Admin only)
  */
 router.post('/test', authMiddleware, requireRole(UserRole.ADMIN), async (req, res) => {
   try {
     const { to, subject, content } = req.body;
 
-    const { sendEmailNotification } = await import('../services/email');
-    const success = await sendEmailNotification(
+    const { sendEmailNow } = await import('../services/email');
+    const success = await sendEmailNow(
       to,
       subject || '测试邮件',
       content || '<h1>这是一封测试邮件</h1><p>如果您收到此邮件，说明邮件服务配置正确。</p>'
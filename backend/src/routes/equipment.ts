@@ -62,6 +62,8 @@ router.get('/:id/health/history', asyncHandler(equipmentHealthController.getHist
 router.get('/:id/health/prediction', asyncHandler(equipmentHealthController.getPrediction))
 router.get('/:id/health/trend-alerts', asyncHandler(equipmentHealthController.getTrendAlerts))
 router.post('/health/batch-calculate', requireManager(), asyncHandler(equipmentHealthController.batchCalculate))
+router.post('/health/recalc', requireManager(), asyncHandler(equipmentHealthController.startRecalc))
+router.get('/health/recalc', asyncHandler(equipmentHealthController.getRecalcStatus))
 router.get('/health/statistics', asyncHandler(equipmentHealthController.getStatistics))
 router.get('/health/cache-stats', asyncHandler(equipmentHealthController.getCacheStats))
 router.post('/health/clear-cache', requireManager(), asyncHandler(equipmentHealthController.clearCache))
@@ -192,10 +194,11 @@ router.delete('/capacity/operators/:id', requireManager(), asyncHandler(capacity
 // 产能查询与分析
 router.get('/capacity/products/:productName/available-equipment', asyncHandler(capacityController.getAvailableEquipment))
 router.post('/capacity/calculate-requirements', asyncHandler(capacityController.calculateRequirements))
+router.post('/capacity/plan', asyncHandler(capacityController.planProduction))
 router.get('/capacity/equipment-utilization', asyncHandler(capacityController.getEquipmentUtilization))
 router.get('/capacity/operator-efficiency', asyncHandler(capacityController.getOperatorEfficiency))
 router.get('/capacity/analysis-report', asyncHandler(capacityController.getAnalysisReport))
-router.post('/capacity/equipment/batch-import', requireManager(), asyncHandler(capacityController.batchImport))
+router.post('/capacity/equipment/batch-import', requireManager(), upload.single('file'), asyncHandler(capacityController.batchImport))
 router.get('/capacity/export', asyncHandler(capacityController.exportData))
 
 // ============================================
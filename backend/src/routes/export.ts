@@ -15,14 +15,14 @@ router.use(authMiddleware);
 
 /**
  * @route   GET /api/export/applications
- * @desc    导出申请到Excel
+ * @desc    流式导出申请到Excel（?format=csv 导出CSV）
  * @access  Private
  */
 router.get('/applications', exportApplications);
 
 /**
  * @route   GET /api/export/users
- * @desc    导出用户到Excel
+ * @desc    流式导出用户到Excel（?format=csv 导出CSV）
  * @access  Private (Admin only)
  */
 router.get('/users', requireRole(UserRole.ADMIN), exportUsers);
@@ -1,4 +1,5 @@
 import { Router } from 'express';
+import multer from 'multer';
 import {
   getUsers,
   getUser,
@@ -19,9 +20,13 @@ import {
 import { authMiddleware, requireRole, requireMinRole } from '../middleware/auth';
 import { UserRole } from '@prisma/client';
 import { auditMiddleware } from '../middleware/auditMiddleware';
+import { config } from '../config';
 
 const router = Router();
 
+// 导入文件只在内存中解析，不落盘
+const importUpload = multer({ storage: multer.memoryStorage(), limits: { fileSize: config.upload.maxFileSize } });
+
 // 所有用户路由都需要认证
 router.use(authMiddleware);
 
@@ -59,10 +64,10 @@ router.post('/', requireRole(UserRole.ADMIN), auditMiddleware({
 
 /**
  * @route   POST /api/users/import
- * @desc    批量导入用户
+ * @desc    批量导入用户（multipart 上传 CSV/XLSX 文件 file，或 JSON { users: [] }）
  * @access  Private (Admin only)
  */
-router.post('/import', requireRole(UserRole.ADMIN), importUsers);
+router.post('/import', requireRole(UserRole.ADMIN), importUpload.single('file'), importUsers);
 
 /**
  * @route   GET /api/users/contacts
@@ -17,6 +17,7 @@ router.delete('/:id', requireAdmin, workflowController.deleteWorkflow)
 router.post('/:id/publish', requireAdmin, workflowController.publishWorkflow)
 router.post('/:id/default', requireAdmin, workflowController.setDefaultWorkflow)
 router.post('/:id/simulate', requireAdmin, workflowController.simulateWorkflow)
+router.post('/:id/simulate/batch', requireAdmin, workflowController.simulateWorkflowBatch)
 
 // 工作流实例路由
 router.post('/instances/start', workflowController.startWorkflow)
@@ -1,6 +1,7 @@
 import { Announcement, AnnouncementType, Prisma } from '@prisma/client';
 import { prisma } from '../lib/prisma';
 import * as logger from '../lib/logger';
+import { announcementViewCounter } from './viewCounter';
 
 // 附件类型
 export interface Attachment {
@@ -164,7 +165,7 @@ export async function getAnnouncements(
 
   // 处理返回数据，添加已读状态
   const processedItems = items.map((item) => ({
-    ...item,
+    ...announcementViewCounter.overlay(item),
     isRead: item.reads.length > 0,
     authorName: item.author.name,
   }));
@@ -219,7 +220,7 @@ export async function getAnnouncementById(
   }
 
   return {
-    ...announcement,
+    ...announcementViewCounter.overlay(announcement),
     isRead: userId ? isRead : undefined,
     authorName: announcement.author.name,
   };
@@ -233,35 +234,17 @@ export async function recordRead(
   userId: string
 ): Promise<void> {
   try {
-    // 使用upsert避免重复记录
-    await prisma.announcementRead.upsert({
-      where: {
-        announcementId_userId: {
-          announcementId,
-          userId,
-        },
-      },
-      update: {}, // 已存在则不更新
-      create: {
-        announcementId,
-        userId,
-        readAt: new Date(),
-      },
-    });
-
-    // 增加浏览次数
-    await prisma.announcement.update({
-      where: { id: announcementId },
-      data: {
-        viewCount: {
-          increment: 1,
-        },
-      },
+    // 已存在则忽略，避免重复记录
+    await prisma.announcementRead.createMany({
+      data: [{ announcementId, userId, readAt: new Date() }],
+      skipDuplicates: true,
     });
   } catch (error) {
-    // 忽略重复阅读记录的错误
-    logger.info(`记录阅读状态: ${announcementId}, 用户: ${userId}`);
+    logger.info(`记录阅读状态失败: ${announcementId}, 用户: ${userId}`);
   }
+
+  // 增加浏览次数（缓冲后定时批量写回）
+  announcementViewCounter.increment(announcementId);
 }
 
 /**
@@ -0,0 +1,102 @@
+/**
+ * AuditQueue 单元测试
+ */
+
+import { AuditQueue } from './auditQueue';
+import { CreateAuditLogData } from './auditService';
+
+jest.mock('../config', () => ({
+  config: { audit: { batchSize: 100, flushIntervalMs: 1000, maxQueueSize: 10000, maxCaptureBytes: 65536 } },
+}));
+jest.mock('./auditService', () => ({ createAuditLogs: jest.fn() }));
+jest.mock('../lib/logger', () => ({ __esModule: true, default: { warn: jest.fn(), error: jest.fn() } }));
+
+const event = (n: number): CreateAuditLogData => ({
+  userId: 'u1',
+  action: 'UPDATE',
+  entityType: 'Task',
+  entityId: `t${n}`,
+});
+
+describe('AuditQueue', () => {
+  afterEach(() => {
+    jest.useRealTimers();
+  });
+
+  it('达到批量大小立即写入', async () => {
+    const write = jest.fn(async (batch: CreateAuditLogData[]) => batch.length);
+    const queue = new AuditQueue(write, { batchSize: 3, flushIntervalMs: 60000, maxQueueSize: 100 });
+
+    [1, 2, 3].forEach((n) => queue.enqueue(event(n)));
+    await queue.flush();
+
+    expect(write).toHaveBeenCalledTimes(1);
+    expect(write.mock.calls[0][0]).toHaveLength(3);
+    expect(queue.stats()).toMatchObject({ queued: 0, written: 3 });
+  });
+
+  it('未达到批量大小时定时写入', async () => {
+    jest.useFakeTimers();
+    const write = jest.fn(async (batch: CreateAuditLogData[]) => batch.length);
+    const queue = new AuditQueue(write, { batchSize: 10, flushIntervalMs: 500, maxQueueSize: 100 });
+
+    queue.enqueue(event(1));
+    queue.enqueue(event(2));
+    expect(write).not.toHaveBeenCalled();
+
+    jest.advanceTimersByTime(500);
+    await Promise.resolve();
+
+    expect(write).toHaveBeenCalledWith([event(1), event(2)]);
+  });
+
+  it('超过队列上限时丢弃最旧的事件', async () => {
+    const write = jest.fn(async (batch: CreateAuditLogData[]) => batch.length);
+    const queue = new AuditQueue(write, { batchSize: 100, flushIntervalMs: 60000, maxQueueSize: 2 });
+
+    [1, 2, 3].forEach((n) => queue.enqueue(event(n)));
+    expect(queue.stats()).toMatchObject({ queued: 2, dropped: 1 });
+
+    await queue.flush();
+    expect(write).toHaveBeenCalledWith([event(2), event(3)]);
+  });
+
+  it('写入失败不影响后续批次', async () => {
+    const write = jest.fn().mockRejectedValueOnce(new Error('db down')).mockRejectedValueOnce(new Error('db down'))
+      .mockImplementation(async (batch: CreateAuditLogData[]) => batch.length);
+    const queue = new AuditQueue(write, { batchSize: 1, flushIntervalMs: 60000, maxQueueSize: 100 });
+
+    queue.enqueue(event(1));
+    queue.enqueue(event(2));
+    await queue.flush();
+
+    // 第一批及其逐条重试都失败，第二批正常写入
+    expect(write).toHaveBeenCalledTimes(3);
+    expect(queue.stats()).toMatchObject({ queued: 0, written: 1, failed: 1 });
+  });
+
+  it('批量写入失败时逐条重试，只丢弃坏数据', async () => {
+    const write = jest.fn(async (batch: CreateAuditLogData[]) => {
+      if (batch.some((e) => e.entityId === 't2')) throw new Error('invalid row');
+      return batch.length;
+    });
+    const queue = new AuditQueue(write, { batchSize: 3, flushIntervalMs: 60000, maxQueueSize: 100 });
+
+    [1, 2, 3].forEach((n) => queue.enqueue(event(n)));
+    await queue.flush();
+
+    expect(write).toHaveBeenCalledTimes(4);
+    expect(write.mock.calls.slice(1).map(([batch]) => batch)).toEqual([[event(1)], [event(2)], [event(3)]]);
+    expect(queue.stats()).toMatchObject({ queued: 0, written: 2, failed: 1 });
+  });
+
+  it('按写入函数返回的条数统计', async () => {
+    const write = jest.fn().mockResolvedValue(0);
+    const queue = new AuditQueue(write, { batchSize: 10, flushIntervalMs: 60000, maxQueueSize: 100 });
+
+    queue.enqueue(event(1));
+    await queue.flush();
+
+    expect(queue.stats()).toMatchObject({ written: 0, failed: 0 });
+  });
+});
@@ -0,0 +1,143 @@
+/**
+ * 审计日志写入队列 - 请求路径只把审计事件放入内存队列，
+ * 达到批量大小或定时器到期时通过 createAuditLogs 批量写入；
+ * 批量写入失败时逐条重试，个别坏数据不会拖累同批的其他事件
+ */
+
+import { config } from '../config';
+import logger from '../lib/logger';
+import { createAuditLogs, CreateAuditLogData } from './auditService';
+
+export interface AuditQueueOptions {
+  // 达到该数量立即写入
+  batchSize: number;
+  // 队列非空时最长等待时间（毫秒）
+  flushIntervalMs: number;
+  // 队列上限，写库持续失败或积压时丢弃最旧的事件
+  maxQueueSize: number;
+}
+
+export interface AuditQueueStats {
+  queued: number;
+  written: number;
+  // 逐条重试后仍写入失败的事件数
+  failed: number;
+  dropped: number;
+  flushes: number;
+}
+
+export class AuditQueue {
+  private queue: CreateAuditLogData[] = [];
+  private timer: NodeJS.Timeout | null = null;
+  private flushing: Promise<void> | null = null;
+  private written = 0;
+  private failed = 0;
+  private dropped = 0;
+  private flushes = 0;
+
+  constructor(
+    // 返回实际写入的条数，失败时抛出
+    private write: (batch: CreateAuditLogData[]) => Promise<number>,
+    private options: AuditQueueOptions
+  ) {}
+
+  /**
+   * 加入队列（不等待写库）
+   */
+  enqueue(data: CreateAuditLogData): void {
+    this.queue.push(data);
+
+    if (this.queue.length > this.options.maxQueueSize) {
+      const overflow = this.queue.length - this.options.maxQueueSize;
+      this.queue.splice(0, overflow);
+      this.dropped += overflow;
+      logger.warn('审计队列已满，丢弃最旧的事件', { dropped: overflow });
+    }
+
+    if (this.queue.length >= this.options.batchSize) {
+      void this.flush();
+    } else if (!this.timer) {
+      this.timer = setTimeout(() => {
+        this.timer = null;
+        void this.flush();
+      }, this.options.flushIntervalMs);
+    }
+  }
+
+  /**
+   * 写入队列中的全部事件（同一时刻只有一个写入在进行）
+   */
+  async flush(): Promise<void> {
+    if (this.flushing) {
+      await this.flushing;
+      if (this.queue.length === 0) return;
+    }
+
+    if (this.timer) {
+      clearTimeout(this.timer);
+      this.timer = null;
+    }
+
+    this.flushing = this.drain().finally(() => {
+      this.flushing = null;
+    });
+    await this.flushing;
+  }
+
+  private async drain(): Promise<void> {
+    while (this.queue.length > 0) {
+      const batch = this.queue.splice(0, this.options.batchSize);
+      try {
+        this.written += await this.write(batch);
+      } catch (error) {
+        logger.error('审计日志批量写入失败，逐条重试', {
+          error: error instanceof Error ? error.message : '未知错误',
+          count: batch.length,
+        });
+        await this.writeOneByOne(batch);
+      }
+      this.flushes++;
+    }
+  }
+
+  private async writeOneByOne(batch: CreateAuditLogData[]): Promise<void> {
+    for (const data of batch) {
+      try {
+        this.written += await this.write([data]);
+      } catch (error) {
+        this.failed++;
+        logger.error('审计日志写入失败，已丢弃', {
+          error: error instanceof Error ? error.message : '未知错误',
+          // 不记录完整的oldValues/newValues避免敏感信息泄露
+          data: { userId: data.userId, action: data.action, entityType: data.entityType, entityId: data.entityId },
+        });
+      }
+    }
+  }
+
+  stats(): AuditQueueStats {
+    return {
+      queued: this.queue.length,
+      written: this.written,
+      failed: this.failed,
+      dropped: this.dropped,
+      flushes: this.flushes,
+    };
+  }
+}
+
+export const auditQueue = new AuditQueue(createAuditLogs, config.audit);
+
+/**
+ * 记录审计日志（异步批量写入，不阻塞请求）
+ */
+export function enqueueAuditLog(data: CreateAuditLogData): void {
+  auditQueue.enqueue(data);
+}
+
+/**
+ * 写入剩余的审计事件（进程退出前调用）
+ */
+export function flushAuditQueue(): Promise<void> {
+  return auditQueue.flush();
+}
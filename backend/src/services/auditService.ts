@@ -130,29 +130,24 @@ export async function createAuditLog(data: CreateAuditLogData): Promise<void> {
 }
 
 /**
- * 批量创建审计日志
+ * 批量创建审计日志，返回写入条数
+ * 失败时抛出，由调用方（审计队列）决定重试或丢弃
  */
-export async function createAuditLogs(dataList: CreateAuditLogData[]): Promise<void> {
-  try {
-    await prisma.auditLog.createMany({
-      data: dataList.map((data) => ({
-        userId: data.userId,
-        action: data.action,
-        entityType: data.entityType,
-        entityId: data.entityId,
-        oldValues: filterSensitiveData(data.oldValues) as Prisma.InputJsonValue | undefined,
-        newValues: filterSensitiveData(data.newValues) as Prisma.InputJsonValue | undefined,
-        ipAddress: data.ipAddress,
-        userAgent: data.userAgent,
-        description: data.description,
-      })),
-    });
-  } catch (error) {
-    logger.error('批量创建审计日志失败', {
-      error: error instanceof Error ? error.message : '未知错误',
-      count: dataList.length,
-    });
-  }
+export async function createAuditLogs(dataList: CreateAuditLogData[]): Promise<number> {
+  const result = await prisma.auditLog.createMany({
+    data: dataList.map((data) => ({
+      userId: data.userId,
+      action: data.action,
+      entityType: data.entityType,
+      entityId: data.entityId,
+      oldValues: filterSensitiveData(data.oldValues) as Prisma.InputJsonValue | undefined,
+      newValues: filterSensitiveData(data.newValues) as Prisma.InputJsonValue | undefined,
+      ipAddress: data.ipAddress,
+      userAgent: data.userAgent,
+      description: data.description,
+    })),
+  });
+  return result.count;
 }
 
 /**
@@ -0,0 +1,48 @@
+/**
+ * 批量导入工具单元测试
+ */
+
+import { parseCsv, readImportFile, pickField, chunk } from './bulkImport';
+
+jest.mock('../config', () => ({ config: { bulkImport: { maxRows: 3, chunkSize: 2 } } }));
+
+describe('parseCsv', () => {
+  it('处理引号、转义和字段内换行', () => {
+    expect(parseCsv('a,"b,c","say ""hi"""\r\n1,"line1\nline2",3')).toEqual([
+      ['a', 'b,c', 'say "hi"'],
+      ['1', 'line1\nline2', '3'],
+    ]);
+  });
+
+  it('末尾换行不产生空行', () => {
+    expect(parseCsv('a,b\n1,2\n')).toEqual([['a', 'b'], ['1', '2']]);
+  });
+});
+
+describe('readImportFile', () => {
+  it('CSV 按表头映射字段，跳过空行并保留行号', async () => {
+    const csv = '\uFEFFusername,name\nzhangsan, 张三 \n,\nlisi,李四\n';
+    const rows = await readImportFile(Buffer.from(csv), 'users.csv');
+
+    expect(rows).toEqual([
+      { rowNumber: 2, values: { username: 'zhangsan', name: '张三' } },
+      { rowNumber: 4, values: { username: 'lisi', name: '李四' } },
+    ]);
+  });
+
+  it('超过行数上限或格式不支持时报错', async () => {
+    await expect(readImportFile(Buffer.from('a\n1\n2\n3\n4'), 'x.csv')).rejects.toThrow('单次最多导入 3 行');
+    await expect(readImportFile(Buffer.from(''), 'x.txt')).rejects.toThrow('仅支持 CSV 或 XLSX 文件');
+  });
+});
+
+describe('pickField / chunk', () => {
+  it('按别名取第一个非空值', () => {
+    expect(pickField({ username: '', 用户名: 'zs' }, ['username', '用户名'])).toBe('zs');
+    expect(pickField({}, ['username'])).toBeUndefined();
+  });
+
+  it('按配置的块大小切分', () => {
+    expect(chunk([1, 2, 3, 4, 5])).toEqual([[1, 2], [3, 4], [5]]);
+  });
+});
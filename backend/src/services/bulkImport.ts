@@ -0,0 +1,163 @@
+/**
+ * 批量导入公共工具
+ * 读取上传的 CSV/XLSX（XLSX 按行流式读取，不在内存中构建整个工作簿），
+ * 表头映射为字段，写入时按块切分
+ */
+
+import { Readable } from 'stream';
+import path from 'path';
+import ExcelJS from 'exceljs';
+import { config } from '../config';
+
+export interface ImportRow {
+  // 文件中的行号（表头为第 1 行）
+  rowNumber: number;
+  values: Record<string, string>;
+}
+
+export interface ImportRowError {
+  row: number;
+  field: string;
+  message: string;
+}
+
+/**
+ * 解析 CSV 文本（RFC 4180：双引号转义、字段内换行）
+ */
+export function parseCsv(text: string): string[][] {
+  const rows: string[][] = [];
+  let row: string[] = [];
+  let field = '';
+  let quoted = false;
+
+  for (let i = 0; i < text.length; i++) {
+    const ch = text[i];
+
+    if (quoted) {
+      if (ch === '"' && text[i + 1] === '"') {
+        field += '"';
+        i++;
+      } else if (ch === '"') {
+        quoted = false;
+      } else {
+        field += ch;
+      }
+      continue;
+    }
+
+    if (ch === '"' && field === '') {
+      quoted = true;
+    } else if (ch === ',') {
+      row.push(field);
+      field = '';
+    } else if (ch === '\n' || ch === '\r') {
+      if (ch === '\r' && text[i + 1] === '\n') i++;
+      row.push(field);
+      rows.push(row);
+      row = [];
+      field = '';
+    } else {
+      field += ch;
+    }
+  }
+
+  if (field !== '' || row.length > 0) {
+    row.push(field);
+    rows.push(row);
+  }
+  return rows;
+}
+
+/**
+ * 单元格值转文本（富文本、超链接、公式结果、日期）
+ */
+function cellText(value: ExcelJS.CellValue): string {
+  if (value === null || value === undefined) return '';
+  if (value instanceof Date) return value.toISOString();
+  if (typeof value === 'object') {
+    if ('richText' in value) return value.richText.map((part) => part.text).join('');
+    if ('text' in value) return String(value.text);
+    if ('result' in value) return cellText(value.result as ExcelJS.CellValue);
+    return '';
+  }
+  return String(value);
+}
+
+/**
+ * 流式读取第一个工作表
+ */
+async function readXlsxRows(buffer: Buffer): Promise<Array<{ rowNumber: number; cells: string[] }>> {
+  const reader = new ExcelJS.stream.xlsx.WorkbookReader(Readable.from(buffer), {
+    worksheets: 'emit',
+    sharedStrings: 'cache',
+    hyperlinks: 'ignore',
+    styles: 'ignore',
+  });
+
+  const rows: Array<{ rowNumber: number; cells: string[] }> = [];
+  for await (const worksheet of reader) {
+    for await (const row of worksheet) {
+      // row.values 从下标 1 开始
+      const values = (row.values as ExcelJS.CellValue[]).slice(1);
+      rows.push({ rowNumber: row.number, cells: Array.from(values, cellText) });
+    }
+    break;
+  }
+  return rows;
+}
+
+/**
+ * 读取导入文件，返回以表头为键的数据行（跳过空行）
+ */
+export async function readImportFile(buffer: Buffer, filename: string): Promise<ImportRow[]> {
+  const ext = path.extname(filename).toLowerCase();
+
+  let rows: Array<{ rowNumber: number; cells: string[] }>;
+  if (ext === '.csv') {
+    const text = buffer.toString('utf8').replace(/^\uFEFF/, '');
+    rows = parseCsv(text).map((cells, index) => ({ rowNumber: index + 1, cells }));
+  } else if (ext === '.xlsx') {
+    rows = await readXlsxRows(buffer);
+  } else {
+    throw new Error('仅支持 CSV 或 XLSX 文件');
+  }
+
+  const isBlank = (cells: string[]) => cells.every((cell) => cell.trim() === '');
+  const headerIndex = rows.findIndex((row) => !isBlank(row.cells));
+  if (headerIndex < 0) return [];
+
+  const headers = rows[headerIndex].cells.map((h) => h.trim());
+  const dataRows = rows.slice(headerIndex + 1).filter((row) => !isBlank(row.cells));
+  if (dataRows.length > config.bulkImport.maxRows) {
+    throw new Error(`单次最多导入 ${config.bulkImport.maxRows} 行`);
+  }
+
+  return dataRows.map(({ rowNumber, cells }) => {
+    const values: Record<string, string> = {};
+    headers.forEach((header, i) => {
+      if (header) values[header] = (cells[i] ?? '').trim();
+    });
+    return { rowNumber, values };
+  });
+}
+
+/**
+ * 按别名取字段（如 ['username', '用户名']），取第一个非空值
+ */
+export function pickField(values: Record<string, string>, aliases: string[]): string | undefined {
+  for (const alias of aliases) {
+    if (values[alias]) return values[alias];
+  }
+  return undefined;
+}
+
+/**
+ * 按块切分
+ */
+export function chunk<T>(items: T[], size: number = config.bulkImport.chunkSize): T[][] {
+  const chunks: T[][] = [];
+  for (let i = 0; i < items.length; i += size) {
+    chunks.push(items.slice(i, i + size));
+  }
+  return chunks;
+}
@@ -0,0 +1,65 @@
+/**
+ * 有限产能排产单元测试
+ */
+
+import { planProduction, PlanningCapability } from './capacityPlanner'
+
+const now = new Date('2026-01-01T00:00:00.000Z')
+const at = (hours: number) => new Date(now.getTime() + hours * 3600000).toISOString()
+
+const capabilities: PlanningCapability[] = [
+  { equipmentId: 'm1', equipmentName: '注塑机1', equipmentCode: 'M1', productName: 'P', capacityPerHour: 10, efficiencyFactor: 1, setupTime: 60 },
+  { equipmentId: 'm2', equipmentName: '注塑机2', equipmentCode: 'M2', productName: 'P', capacityPerHour: 10, efficiencyFactor: 0.5, setupTime: 0 },
+]
+
+describe('planProduction', () => {
+  it('按交期先后排产，连续生产同一产品不重复准备', () => {
+    const plan = planProduction(
+      [
+        { productName: 'P', quantity: 40, deadline: at(10) },
+        { productName: 'P', quantity: 30, deadline: at(4) },
+      ],
+      capabilities,
+      now
+    )
+
+    expect(plan.orders[1].allocations).toEqual([
+      expect.objectContaining({ equipmentId: 'm1', quantity: 30, setupMinutes: 60, start: at(0), end: at(4) }),
+    ])
+    expect(plan.orders[0].allocations).toEqual([
+      expect.objectContaining({ equipmentId: 'm1', quantity: 40, setupMinutes: 0, start: at(4), end: at(8) }),
+    ])
+    expect(plan.summary).toMatchObject({ feasibleOrders: 2, infeasibleOrders: 0 })
+
+    const m1 = plan.machines.find(m => m.equipmentId === 'm1')
+    expect(m1).toMatchObject({ busyHours: 8, setupHours: 1, utilization: 0.8 })
+    expect(m1?.segments.map(s => s.orderIndex)).toEqual([1, 0])
+  })
+
+  it('单台设备赶不上交期时拆分到多台，仍不足的记为缺口', () => {
+    const plan = planProduction([{ productName: 'P', quantity: 100, deadline: at(6) }], capabilities, now)
+    const order = plan.orders[0]
+
+    expect(order.allocations.map(a => [a.equipmentId, a.quantity])).toEqual([['m1', 50], ['m2', 30]])
+    expect(order).toMatchObject({ allocatedQuantity: 80, shortfall: 20, feasible: false, reason: '交期前产能不足' })
+    expect(order.completionTime).toBe(at(6))
+  })
+
+  it('没有可生产设备的需求不占用产能', () => {
+    const plan = planProduction([{ productName: 'Q', quantity: 5, deadline: at(8) }], capabilities, now)
+
+    expect(plan.orders[0]).toMatchObject({ shortfall: 5, feasible: false, reason: '没有可生产该产品的设备' })
+    expect(plan.machines.every(m => m.segments.length === 0)).toBe(true)
+  })
+
+  it('数百条需求在短时间内完成', () => {
+    const orders = Array.from({ length: 500 }, (_, i) => ({ productName: i % 2 ? 'P' : 'Q', quantity: 10, deadline: at(24 + i) }))
+    const caps = [...capabilities, { ...capabilities[0], productName: 'Q' }]
+
+    const started = Date.now()
+    const plan = planProduction(orders, caps, now)
+
+    expect(Date.now() - started).toBeLessThan(1000)
+    expect(plan.orders).toHaveLength(500)
+  })
+})
@@ -0,0 +1,277 @@
+/**
+ * 有限产能排产 - 多个订单竞争同一批设备时的分配
+ * 按交期从早到晚（EDF）依次排产：优先放到完工最早的单台设备上，
+ * 单台赶不上交期时拆分到多台设备在交期前完成，仍不足的数量记为缺口。
+ * 同一设备连续生产同一产品时不重复计算准备时间，有效产能 = 每小时产能 × 效率系数
+ */
+
+const HOUR_MS = 60 * 60 * 1000
+
+// 剩余数量小于该值视为已排完（浮点误差）
+const QUANTITY_EPSILON = 1e-6
+
+export interface PlanningOrder {
+  productName: string
+  quantity: number
+  deadline: string // ISO 日期字符串
+}
+
+export interface PlanningCapability {
+  equipmentId: string
+  equipmentName: string
+  equipmentCode: string
+  productName: string
+  capacityPerHour: number
+  efficiencyFactor: number
+  setupTime: number // 分钟
+}
+
+export interface PlanAllocation {
+  equipmentId: string
+  equipmentName: string
+  equipmentCode: string
+  quantity: number
+  setupMinutes: number
+  start: string
+  end: string
+}
+
+export interface PlannedOrder {
+  orderIndex: number
+  productName: string
+  requiredQuantity: number
+  deadline: string
+  allocatedQuantity: number
+  shortfall: number
+  feasible: boolean
+  completionTime: string | null
+  allocations: PlanAllocation[]
+  reason?: string
+}
+
+export interface PlanSegment {
+  orderIndex: number
+  productName: string
+  quantity: number
+  setupMinutes: number
+  start: string
+  end: string
+}
+
+export interface MachineTimeline {
+  equipmentId: string
+  equipmentName: string
+  equipmentCode: string
+  busyHours: number
+  setupHours: number
+  utilization: number // 排产时间 / 计划周期
+  availableFrom: string
+  segments: PlanSegment[]
+}
+
+export interface ProductionPlan {
+  generatedAt: string
+  horizonHours: number
+  summary: {
+    totalOrders: number
+    feasibleOrders: number
+    infeasibleOrders: number
+    totalShortfall: number
+  }
+  orders: PlannedOrder[]
+  machines: MachineTimeline[]
+}
+
+interface MachineState {
+  equipmentId: string
+  equipmentName: string
+  equipmentCode: string
+  availableAt: number // 距计划起点的小时数
+  lastProduct: string | null
+  busyHours: number
+  setupHours: number
+  segments: Array<Omit<PlanSegment, 'start' | 'end'> & { start: number; end: number }>
+}
+
+interface Candidate {
+  machine: MachineState
+  effectiveCapacity: number
+  setupHours: number
+  start: number
+  finish: number
+}
+
+const round2 = (value: number) => Math.round(value * 100) / 100
+
+/**
+ * 按设备去重：同一设备对同一产品有多条配置时取有效产能最高的一条
+ */
+function indexCapabilities(capabilities: PlanningCapability[]): Map<string, PlanningCapability[]> {
+  const best = new Map<string, PlanningCapability>()
+  for (const cap of capabilities) {
+    if (cap.capacityPerHour * cap.efficiencyFactor <= 0) continue
+    const key = `${cap.productName}\u0000${cap.equipmentId}`
+    const current = best.get(key)
+    if (!current || cap.capacityPerHour * cap.efficiencyFactor > current.capacityPerHour * current.efficiencyFactor) {
+      best.set(key, cap)
+    }
+  }
+
+  const byProduct = new Map<string, PlanningCapability[]>()
+  best.forEach(cap => {
+    const list = byProduct.get(cap.productName) || []
+    list.push(cap)
+    byProduct.set(cap.productName, list)
+  })
+  return byProduct
+}
+
+/**
+ * 生成排产计划
+ */
+export function planProduction(
+  orders: PlanningOrder[],
+  capabilities: PlanningCapability[],
+  now: Date = new Date()
+): ProductionPlan {
+  const origin = now.getTime()
+  const toIso = (hours: number) => new Date(origin + hours * HOUR_MS).toISOString()
+
+  const capabilitiesByProduct = indexCapabilities(capabilities)
+  const machines = new Map<string, MachineState>()
+  capabilities.forEach(cap => {
+    if (!machines.has(cap.equipmentId)) {
+      machines.set(cap.equipmentId, {
+        equipmentId: cap.equipmentId,
+        equipmentName: cap.equipmentName,
+        equipmentCode: cap.equipmentCode,
+        availableAt: 0,
+        lastProduct: null,
+        busyHours: 0,
+        setupHours: 0,
+        segments: [],
+      })
+    }
+  })
+
+  const deadlines = orders.map(order => (new Date(order.deadline).getTime() - origin) / HOUR_MS)
+
+  // 交期早的先排，同一交期数量大的先排
+  const sequence = orders
+    .map((_, index) => index)
+    .sort((a, b) => (deadlines[a] - deadlines[b]) || (orders[b].quantity - orders[a].quantity) || (a - b))
+
+  const planned: PlannedOrder[] = new Array(orders.length)
+
+  const assign = (orderIndex: number, candidate: Candidate, quantity: number): PlanAllocation => {
+    const { machine, setupHours, start, effectiveCapacity } = candidate
+    const end = start + setupHours + quantity / effectiveCapacity
+    machine.availableAt = end
+    machine.lastProduct = orders[orderIndex].productName
+    machine.busyHours += end - start
+    machine.setupHours += setupHours
+    machine.segments.push({
+      orderIndex,
+      productName: orders[orderIndex].productName,
+      quantity,
+      setupMinutes: Math.round(setupHours * 60),
+      start,
+      end,
+    })
+    return {
+      equipmentId: machine.equipmentId,
+      equipmentName: machine.equipmentName,
+      equipmentCode: machine.equipmentCode,
+      quantity,
+      setupMinutes: Math.round(setupHours * 60),
+      start: toIso(start),
+      end: toIso(end),
+    }
+  }
+
+  for (const orderIndex of sequence) {
+    const order = orders[orderIndex]
+    const deadline = deadlines[orderIndex]
+    const allocations: PlanAllocation[] = []
+    let remaining = order.quantity
+    let reason: string | undefined
+
+    const options = capabilitiesByProduct.get(order.productName) || []
+    if (Number.isNaN(deadline)) {
+      reason = '交期格式错误'
+    } else if (options.length === 0) {
+      reason = '没有可生产该产品的设备'
+    } else {
+      const candidates: Candidate[] = options.map(cap => {
+        const machine = machines.get(cap.equipmentId) as MachineState
+        const effectiveCapacity = cap.capacityPerHour * cap.efficiencyFactor
+        const setupHours = machine.lastProduct === order.productName ? 0 : cap.setupTime / 60
+        const start = machine.availableAt
+        return { machine, effectiveCapacity, setupHours, start, finish: start + setupHours + remaining / effectiveCapacity }
+      }).sort((a, b) => a.finish - b.finish)
+
+      if (candidates[0].finish <= deadline) {
+        // 单台设备即可按期完成
+        allocations.push(assign(orderIndex, candidates[0], remaining))
+        remaining = 0
+      } else {
+        // 拆分到多台设备，每台只排到交期为止
+        for (const candidate of candidates) {
+          const room = deadline - candidate.start - candidate.setupHours
+          const quantity = Math.min(remaining, Math.floor(room * candidate.effectiveCapacity))
+          if (quantity <= 0) continue
+          allocations.push(assign(orderIndex, candidate, quantity))
+          remaining -= quantity
+          if (remaining <= QUANTITY_EPSILON) break
+        }
+        if (remaining > QUANTITY_EPSILON) {
+          reason = '交期前产能不足'
+        }
+      }
+    }
+
+    const shortfall = remaining > QUANTITY_EPSILON ? remaining : 0
+    planned[orderIndex] = {
+      orderIndex,
+      productName: order.productName,
+      requiredQuantity: order.quantity,
+      deadline: order.deadline,
+      allocatedQuantity: order.quantity - shortfall,
+      shortfall,
+      feasible: shortfall === 0,
+      completionTime: allocations.length > 0
+        ? allocations.reduce((latest, a) => (a.end > latest ? a.end : latest), allocations[0].end)
+        : null,
+      allocations,
+      ...(reason && { reason }),
+    }
+  }
+
+  const validDeadlines = deadlines.filter(d => !Number.isNaN(d))
+  const horizonHours = Math.max(0, ...validDeadlines, ...Array.from(machines.values()).map(m => m.availableAt))
+
+  const timelines: MachineTimeline[] = Array.from(machines.values()).map(machine => ({
+    equipmentId: machine.equipmentId,
+    equipmentName: machine.equipmentName,
+    equipmentCode: machine.equipmentCode,
+    busyHours: round2(machine.busyHours),
+    setupHours: round2(machine.setupHours),
+    utilization: horizonHours > 0 ? round2(machine.busyHours / horizonHours) : 0,
+    availableFrom: toIso(machine.availableAt),
+    segments: machine.segments.map(segment => ({ ...segment, start: toIso(segment.start), end: toIso(segment.end) })),
+  }))
+
+  const feasibleOrders = planned.filter(o => o.feasible).length
+  return {
+    generatedAt: now.toISOString(),
+    horizonHours: round2(horizonHours),
+    summary: {
+      totalOrders: orders.length,
+      feasibleOrders,
+      infeasibleOrders: orders.length - feasibleOrders,
+      totalShortfall: planned.reduce((sum, o) => sum + o.shortfall, 0),
+    },
+    orders: planned,
+    machines: timelines,
+  }
+}
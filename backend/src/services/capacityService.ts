@@ -1,5 +1,8 @@
+import { Prisma } from '@prisma/client'
 import { prisma } from '../lib/prisma'
 import logger from '../lib/logger'
+import { planProduction as buildProductionPlan, PlanningCapability, ProductionPlan } from './capacityPlanner'
+import { readImportFile, pickField, chunk } from './bulkImport'
 
 // ============================================
 // 类型定义
@@ -78,13 +81,15 @@ interface PaginatedResult<T> {
 }
 
 interface BatchImportItem {
-  equipmentId: string
+  equipmentId?: string
+  equipmentCode?: string // 文件导入时可按设备编号匹配
   productName: string
   processName?: string
   capacityPerHour: number
   efficiencyFactor?: number
   setupTime?: number
   unit?: string
+  row?: number // 文件中的行号，用于错误提示
 }
 
 // 产能数据接口
@@ -623,11 +628,21 @@ async function calculateRequirements(
   try {
     const results: RequirementResult[] = []
 
+    // 一次查出所有需求产品的产能配置
+    const productNames = Array.from(new Set(requirements.map((req) => req.productName)))
+    const allCapabilities = await prisma.equipmentCapability.findMany({
+      where: { productName: { in: productNames }, status: 'active' },
+      include: { equipment: { select: { id: true, name: true, code: true, status: true } } },
+    })
+    const capabilitiesByProduct = new Map<string, typeof allCapabilities>()
+    allCapabilities.forEach((cap) => {
+      const list = capabilitiesByProduct.get(cap.productName) || []
+      list.push(cap)
+      capabilitiesByProduct.set(cap.productName, list)
+    })
+
     for (const req of requirements) {
-      const capabilities = await prisma.equipmentCapability.findMany({
-        where: { productName: req.productName, status: 'active' },
-        include: { equipment: { select: { id: true, name: true, code: true, status: true } } },
-      })
+      const capabilities = capabilitiesByProduct.get(req.productName) || []
 
       const now = new Date()
       const deadline = new Date(req.deadline)
@@ -670,6 +685,49 @@ async function calculateRequirements(
   }
 }
 
+/** 有限产能排产：多个需求竞争同一批设备，返回分配方案和设备时间线 */
+async function planProduction(requirements: RequirementItem[]): Promise<ProductionPlan> {
+  try {
+    const productNames = Array.from(new Set(requirements.map((req) => req.productName)))
+    const capabilities = await prisma.equipmentCapability.findMany({
+      where: {
+        productName: { in: productNames },
+        status: 'active',
+        // 停机、维修、报废的设备不参与排产
+        equipment: { deletedAt: null, status: { in: ['RUNNING', 'WARNING'] } },
+      },
+      select: {
+        productName: true,
+        capacityPerHour: true,
+        efficiencyFactor: true,
+        setupTime: true,
+        equipment: { select: { id: true, name: true, code: true } },
+      },
+    })
+
+    const planningCapabilities: PlanningCapability[] = capabilities.map((cap) => ({
+      equipmentId: cap.equipment.id,
+      equipmentName: cap.equipment.name,
+      equipmentCode: cap.equipment.code,
+      productName: cap.productName,
+      capacityPerHour: cap.capacityPerHour,
+      efficiencyFactor: cap.efficiencyFactor,
+      setupTime: cap.setupTime,
+    }))
+
+    const plan = buildProductionPlan(requirements, planningCapabilities)
+    logger.info('生成排产计划', {
+      orders: plan.summary.totalOrders,
+      infeasible: plan.summary.infeasibleOrders,
+      machines: plan.machines.length,
+    })
+    return plan
+  } catch (err) {
+    logger.error('生成排产计划失败', { error: (err as Error).message })
+    throw err
+  }
+}
+
 /** 设备利用率统计 */
 async function getEquipmentUtilization(): Promise<EquipmentUtilization[]> {
   try {
@@ -823,50 +881,104 @@ async function getAnalysisReport(): Promise<AnalysisReport> {
 // 批量操作与导出
 // ============================================
 
-/** 批量导入产能配置 */
+/** 校验导入行，返回错误信息 */
+function validateImportItem(item: BatchImportItem): string | null {
+  if (!item.equipmentId && !item.equipmentCode) return '缺少设备ID或设备编号'
+  if (!item.productName) return '缺少产品名称'
+  if (!(Number(item.capacityPerHour) > 0)) return '每小时产能必须大于0'
+  if (item.efficiencyFactor !== undefined && !(Number(item.efficiencyFactor) > 0)) return '效率系数必须大于0'
+  if (item.setupTime !== undefined && !(Number(item.setupTime) >= 0)) return '准备时间不能为负数'
+  return null
+}
+
+/** 批量导入产能配置：整体校验后按 IN 查询解析设备和已有配置，分块 createMany 写入 */
 async function batchImportCapabilities(
   items: BatchImportItem[],
   userId: string
 ): Promise<{ success: number; failed: number; errors: string[] }> {
   let successCount = 0
   const errors: string[] = []
+  const rowOf = (item: BatchImportItem, index: number) => item.row ?? index + 1
 
-  for (let i = 0; i < items.length; i++) {
-    const item = items[i]
-    try {
-      // 校验设备是否存在
-      const equipment = await prisma.equipment.findUnique({
-        where: { id: item.equipmentId },
-        select: { id: true },
-      })
-      if (!equipment) {
-        errors.push(`第${i + 1}行: 设备ID "${item.equipmentId}" 不存在`)
-        continue
-      }
-
-      // 检查重复
-      const existing = await prisma.equipmentCapability.findFirst({
-        where: { equipmentId: item.equipmentId, productName: item.productName, status: 'active' },
-      })
-      if (existing) {
-        errors.push(`第${i + 1}行: 设备 "${item.equipmentId}" 的产品 "${item.productName}" 配置已存在`)
-        continue
-      }
-
-      await prisma.equipmentCapability.create({
-        data: {
-          equipmentId: item.equipmentId,
-          productName: item.productName,
-          processName: item.processName ?? null,
-          capacityPerHour: item.capacityPerHour,
-          efficiencyFactor: item.efficiencyFactor ?? 1.0,
-          setupTime: item.setupTime ?? 0,
-          unit: item.unit ?? '件',
+  const valid: Array<{ item: BatchImportItem; row: number }> = []
+  items.forEach((item, i) => {
+    const error = validateImportItem(item)
+    if (error) errors.push(`第${rowOf(item, i)}行: ${error}`)
+    else valid.push({ item, row: rowOf(item, i) })
+  })
+
+  // 设备按 ID 和编号各查一次
+  const ids = Array.from(new Set(valid.map((v) => v.item.equipmentId).filter((id): id is string => !!id)))
+  const codes = Array.from(new Set(
+    valid.filter((v) => !v.item.equipmentId).map((v) => v.item.equipmentCode).filter((code): code is string => !!code)
+  ))
+  const [equipmentById, equipmentByCode] = await Promise.all([
+    ids.length > 0
+      ? prisma.equipment.findMany({ where: { id: { in: ids }, deletedAt: null }, select: { id: true } })
+      : Promise.resolve([]),
+    codes.length > 0
+      ? prisma.equipment.findMany({ where: { code: { in: codes }, deletedAt: null }, select: { id: true, code: true } })
+      : Promise.resolve([]),
+  ])
+  const knownIds = new Set(equipmentById.map((e) => e.id))
+  const idByCode = new Map(equipmentByCode.map((e) => [e.code, e.id]))
+
+  const resolved: Array<{ item: BatchImportItem; row: number; equipmentId: string }> = []
+  for (const { item, row } of valid) {
+    const equipmentId = item.equipmentId
+      ? (knownIds.has(item.equipmentId) ? item.equipmentId : undefined)
+      : idByCode.get(item.equipmentCode as string)
+    if (!equipmentId) {
+      errors.push(item.equipmentId
+        ? `第${row}行: 设备ID "${item.equipmentId}" 不存在`
+        : `第${row}行: 设备编号 "${item.equipmentCode}" 不存在`)
+      continue
+    }
+    resolved.push({ item, row, equipmentId })
+  }
+
+  // 已有的有效配置一次查出，文件内重复的行只保留第一行
+  const existing = resolved.length > 0
+    ? await prisma.equipmentCapability.findMany({
+        where: {
+          equipmentId: { in: Array.from(new Set(resolved.map((r) => r.equipmentId))) },
+          productName: { in: Array.from(new Set(resolved.map((r) => r.item.productName))) },
+          status: 'active',
         },
+        select: { equipmentId: true, productName: true },
       })
-      successCount++
+    : []
+  const pairKey = (equipmentId: string, productName: string) => `${equipmentId}\u0000${productName}`
+  const taken = new Set(existing.map((c) => pairKey(c.equipmentId, c.productName)))
+
+  const rows: Array<{ row: number; data: Prisma.EquipmentCapabilityCreateManyInput }> = []
+  for (const { item, row, equipmentId } of resolved) {
+    const key = pairKey(equipmentId, item.productName)
+    if (taken.has(key)) {
+      errors.push(`第${row}行: 设备 "${item.equipmentId || item.equipmentCode}" 的产品 "${item.productName}" 配置已存在`)
+      continue
+    }
+    taken.add(key)
+    rows.push({
+      row,
+      data: {
+        equipmentId,
+        productName: item.productName,
+        processName: item.processName || null,
+        capacityPerHour: Number(item.capacityPerHour),
+        efficiencyFactor: item.efficiencyFactor !== undefined ? Number(item.efficiencyFactor) : 1.0,
+        setupTime: item.setupTime !== undefined ? Math.round(Number(item.setupTime)) : 0,
+        unit: item.unit || '件',
+      },
+    })
+  }
+
+  for (const batch of chunk(rows)) {
+    try {
+      const { count } = await prisma.equipmentCapability.createMany({ data: batch.map((r) => r.data) })
+      successCount += count
     } catch (err) {
-      errors.push(`第${i + 1}行: ${(err as Error).message}`)
+      batch.forEach((r) => errors.push(`第${r.row}行: ${(err as Error).message}`))
     }
   }
 
@@ -874,6 +986,30 @@ async function batchImportCapabilities(
   return { success: successCount, failed: errors.length, errors }
 }
 
+/** 从 CSV/XLSX 文件导入产能配置 */
+async function importCapabilitiesFromFile(
+  buffer: Buffer,
+  filename: string,
+  userId: string
+): Promise<{ success: number; failed: number; errors: string[] }> {
+  const rows = await readImportFile(buffer, filename)
+  const optionalNumber = (value: string | undefined) => (value === undefined ? undefined : Number(value))
+
+  const items: BatchImportItem[] = rows.map(({ rowNumber, values }) => ({
+    row: rowNumber,
+    equipmentId: pickField(values, ['equipmentId', '设备ID']),
+    equipmentCode: pickField(values, ['equipmentCode', '设备编号']),
+    productName: pickField(values, ['productName', '产品名称']) || '',
+    processName: pickField(values, ['processName', '工序']),
+    capacityPerHour: Number(pickField(values, ['capacityPerHour', '每小时产能'])),
+    efficiencyFactor: optionalNumber(pickField(values, ['efficiencyFactor', '效率系数'])),
+    setupTime: optionalNumber(pickField(values, ['setupTime', '准备时间'])),
+    unit: pickField(values, ['unit', '单位']),
+  }))
+
+  return batchImportCapabilities(items, userId)
+}
+
 /** 导出数据 */
 async function exportData(format: string): Promise<ExportDataResult> {
   try {
@@ -943,9 +1079,11 @@ export const capacityService = {
   getOperatorSkills,
   getAvailableEquipment,
   calculateRequirements,
+  planProduction,
   getEquipmentUtilization,
   getOperatorEfficiency,
   getAnalysisReport,
   batchImportCapabilities,
+  importCapabilitiesFromFile,
   exportData,
 }
@@ -1,5 +1,8 @@
+import crypto from 'crypto';
 import { prisma } from '../lib/prisma';
 import { Prisma } from '@prisma/client';
+import { config } from '../config';
+import { SummaryCache } from './summaryCache';
 
 // 部门数据类型
 export interface DepartmentData {
@@ -32,6 +35,24 @@ export interface DepartmentTreeNode {
     email: string | null;
   } | null;
   userCount: number;
+  // 含所有下级部门的人数
+  totalUserCount: number;
+}
+
+export interface DepartmentTreeSnapshot {
+  tree: DepartmentTreeNode[];
+  // 树内容的哈希，内容相同则各实例、重启前后都一致
+  version: string;
+}
+
+// 部门树快照缓存，部门变更时失效
+const departmentTreeCache = new SummaryCache<DepartmentTreeSnapshot>(config.departmentTreeCache.ttlMs);
+
+/**
+ * 使部门树缓存失效（部门或人员归属变化时调用）
+ */
+export function invalidateDepartmentTree(): void {
+  departmentTreeCache.invalidate();
 }
 
 // 构建部门树形结构
@@ -50,7 +71,8 @@ function buildDepartmentTree(
     updatedAt: Date;
     manager: { id: string; name: string; email: string | null } | null;
     _count: { users: number };
-  }>
+  }>,
+  totalUserCounts: Map<string, number>
 ): DepartmentTreeNode[] {
   const nodeMap = new Map<string, DepartmentTreeNode>();
   const roots: DepartmentTreeNode[] = [];
@@ -61,6 +83,7 @@ function buildDepartmentTree(
       ...dept,
       children: [],
       userCount: dept._count.users,
+      totalUserCount: totalUserCounts.get(dept.id) || 0,
     });
   });
 
@@ -94,31 +117,158 @@ function buildDepartmentTree(
   return roots;
 }
 
+/**
+ * 各部门含下级部门的人数（经闭包表一次聚合）
+ */
+async function getSubtreeUserCounts(): Promise<Map<string, number>> {
+  const rows = await prisma.$queryRaw<Array<{ id: string; count: bigint }>>`
+    SELECT c.ancestor_id AS id, COUNT(u.id) AS count
+    FROM department_closure c
+    JOIN "User" u ON u."departmentId" = c.descendant_id
+    GROUP BY c.ancestor_id
+  `;
+  return new Map(rows.map((row) => [row.id, Number(row.count)]));
+}
+
 /**
  * 获取部门树形结构
  */
 export async function getDepartmentTree(): Promise<DepartmentTreeNode[]> {
-  const departments = await prisma.department.findMany({
-    include: {
-      manager: {
-        select: {
-          id: true,
-          name: true,
-          email: true,
+  return (await getDepartmentTreeSnapshot()).tree;
+}
+
+/**
+ * 获取部门树快照及其版本（缓存）
+ */
+export async function getDepartmentTreeSnapshot(): Promise<DepartmentTreeSnapshot> {
+  return departmentTreeCache.get(async () => {
+    const [departments, totalUserCounts] = await Promise.all([
+      prisma.department.findMany({
+        include: {
+          manager: {
+            select: {
+              id: true,
+              name: true,
+              email: true,
+            },
+          },
+          _count: {
+            select: {
+              users: true,
+            },
+          },
         },
-      },
-      _count: {
-        select: {
-          users: true,
+        orderBy: {
+          sortOrder: 'asc',
         },
-      },
-    },
-    orderBy: {
-      sortOrder: 'asc',
+      }),
+      getSubtreeUserCounts(),
+    ]);
+
+    const tree = buildDepartmentTree(departments, totalUserCounts);
+    const version = crypto.createHash('sha1').update(JSON.stringify(tree)).digest('hex').slice(0, 16);
+    return { tree, version };
+  });
+}
+
+/**
+ * 获取部门及其所有下级部门的ID
+ */
+export async function getDescendantIds(id: string, includeSelf: boolean = true): Promise<string[]> {
+  const links = await prisma.departmentClosure.findMany({
+    where: {
+      ancestorId: id,
+      ...(!includeSelf && { depth: { gt: 0 } }),
     },
+    select: { descendantId: true },
   });
+  return links.map((link) => link.descendantId);
+}
+
+/**
+ * 检查 departmentId 是否是 ancestorId 本身或其下级部门
+ */
+export async function isDescendant(ancestorId: string, departmentId: string): Promise<boolean> {
+  const link = await prisma.departmentClosure.findUnique({
+    where: { ancestorId_descendantId: { ancestorId, descendantId: departmentId } },
+    select: { depth: true },
+  });
+  return link !== null;
+}
+
+/**
+ * 为新部门写入闭包关系（继承父部门的全部祖先）
+ */
+async function insertClosure(
+  tx: Prisma.TransactionClient,
+  id: string,
+  parentId: string | null
+): Promise<void> {
+  await tx.$executeRaw`
+    INSERT INTO department_closure (ancestor_id, descendant_id, depth)
+    SELECT ${id}, ${id}, 0
+    ${parentId ? Prisma.sql`
+      UNION ALL
+      SELECT ancestor_id, ${id}, depth + 1 FROM department_closure WHERE descendant_id = ${parentId}
+    ` : Prisma.empty}
+  `;
+}
+
+/**
+ * 补齐闭包表中缺失的关系（脚本等绕过本服务直接创建的部门），返回补写的行数
+ */
+export async function repairDepartmentClosure(): Promise<number> {
+  return prisma.$executeRaw`
+    INSERT INTO department_closure (ancestor_id, descendant_id, depth)
+    WITH RECURSIVE tree AS (
+      SELECT id AS ancestor_id, id AS descendant_id, 0 AS depth FROM departments
+      UNION ALL
+      SELECT t.ancestor_id, d.id, t.depth + 1
+      FROM tree t
+      JOIN departments d ON d."parentId" = t.descendant_id
+    )
+    SELECT ancestor_id, descendant_id, depth FROM tree
+    WHERE EXISTS (
+      SELECT 1 FROM departments d
+      WHERE NOT EXISTS (SELECT 1 FROM department_closure c WHERE c.ancestor_id = d.id AND c.descendant_id = d.id)
+    )
+    ON CONFLICT DO NOTHING
+  `;
+}
+
+/**
+ * 将以 id 为根的子树挂到新父部门下，并按新层级更新子树所有部门
+ */
+async function relocateSubtree(
+  tx: Prisma.TransactionClient,
+  id: string,
+  newParentId: string | null,
+  newLevel: number
+): Promise<void> {
+  // 断开子树与原祖先的关联（子树内部关系保留）
+  await tx.$executeRaw`
+    DELETE FROM department_closure
+    WHERE descendant_id IN (SELECT descendant_id FROM department_closure WHERE ancestor_id = ${id})
+      AND ancestor_id NOT IN (SELECT descendant_id FROM department_closure WHERE ancestor_id = ${id})
+  `;
+
+  // 新父部门的每个祖先 x 子树的每个节点
+  if (newParentId) {
+    await tx.$executeRaw`
+      INSERT INTO department_closure (ancestor_id, descendant_id, depth)
+      SELECT p.ancestor_id, s.descendant_id, p.depth + s.depth + 1
+      FROM department_closure p
+      CROSS JOIN department_closure s
+      WHERE p.descendant_id = ${newParentId} AND s.ancestor_id = ${id}
+    `;
+  }
 
-  return buildDepartmentTree(departments);
+  await tx.$executeRaw`
+    UPDATE departments AS d
+    SET level = ${newLevel}::int + c.depth, "updatedAt" = NOW()
+    FROM department_closure c
+    WHERE c.ancestor_id = ${id} AND d.id = c.descendant_id
+  `;
 }
 
 /**
@@ -219,35 +369,41 @@ export async function createDepartment(data: DepartmentData) {
   // 计算部门层级
   const level = await calculateLevel(data.parentId);
 
-  const department = await prisma.department.create({
-    data: {
-      name: data.name,
-      code: data.code,
-      parentId: data.parentId || null,
-      level,
-      sortOrder: data.sortOrder ?? 0,
-      managerId: data.managerId || null,
-      description: data.description || null,
-      isActive: data.isActive ?? true,
-    },
-    include: {
-      manager: {
-        select: {
-          id: true,
-          name: true,
-          email: true,
-        },
+  const department = await prisma.$transaction(async (tx) => {
+    const created = await tx.department.create({
+      data: {
+        name: data.name,
+        code: data.code,
+        parentId: data.parentId || null,
+        level,
+        sortOrder: data.sortOrder ?? 0,
+        managerId: data.managerId || null,
+        description: data.description || null,
+        isActive: data.isActive ?? true,
       },
-      parent: {
-        select: {
-          id: true,
-          name: true,
-          code: true,
+      include: {
+        manager: {
+          select: {
+            id: true,
+            name: true,
+            email: true,
+          },
+        },
+        parent: {
+          select: {
+            id: true,
+            name: true,
+            code: true,
+          },
         },
       },
-    },
+    });
+
+    await insertClosure(tx, created.id, created.parentId);
+    return created;
   });
 
+  invalidateDepartmentTree();
   return department;
 }
 
@@ -295,8 +451,7 @@ export async function updateDepartment(id: string, data: Partial<DepartmentData>
       }
 
       // 检查新父部门是否当前部门的子部门（防止循环依赖）
-      const isDescendant = await checkIsDescendant(id, data.parentId);
-      if (isDescendant) {
+      if (await isDescendant(id, data.parentId)) {
         throw new Error('不能将部门设置为其子部门的子部门');
       }
     }
@@ -315,12 +470,10 @@ export async function updateDepartment(id: string, data: Partial<DepartmentData>
   }
 
   // 计算新的层级
-  let newLevel = existingDept.level;
-  if (data.parentId !== undefined && data.parentId !== existingDept.parentId) {
-    newLevel = await calculateLevel(data.parentId);
-  }
+  const parentChanged = data.parentId !== undefined && data.parentId !== existingDept.parentId;
+  const newLevel = parentChanged ? await calculateLevel(data.parentId) : existingDept.level;
 
-  // 使用事务更新部门及其子部门的层级
+  // 使用事务更新部门，父部门变化时同步闭包表和子树层级
   const updatedDept = await prisma.$transaction(async (tx) => {
     // 更新当前部门
     const dept = await tx.department.update({
@@ -353,68 +506,17 @@ export async function updateDepartment(id: string, data: Partial<DepartmentData>
       },
     });
 
-    // 如果层级发生变化，更新所有子部门的层级
-    if (newLevel !== existingDept.level) {
-      await updateChildrenLevel(tx, id, newLevel);
+    if (parentChanged) {
+      await relocateSubtree(tx, id, data.parentId || null, newLevel);
     }
 
     return dept;
   });
 
+  invalidateDepartmentTree();
   return updatedDept;
 }
 
-/**
- * 递归更新子部门层级
- */
-async function updateChildrenLevel(
-  tx: Prisma.TransactionClient,
-  parentId: string,
-  parentLevel: number
-): Promise<void> {
-  const children = await tx.department.findMany({
-    where: { parentId },
-    select: { id: true },
-  });
-
-  for (const child of children) {
-    const newLevel = parentLevel + 1;
-    await tx.department.update({
-      where: { id: child.id },
-      data: { level: newLevel },
-    });
-    await updateChildrenLevel(tx, child.id, newLevel);
-  }
-}
-
-/**
- * 检查 targetId 是否是 sourceId 的后代部门
- */
-async function checkIsDescendant(sourceId: string, targetId: string): Promise<boolean> {
-  let currentId: string | null = targetId;
-  const visited = new Set<string>();
-
-  while (currentId) {
-    if (currentId === sourceId) {
-      return true;
-    }
-
-    if (visited.has(currentId)) {
-      break; // 防止无限循环
-    }
-    visited.add(currentId);
-
-    const parent: { parentId: string | null } | null = await prisma.department.findUnique({
-      where: { id: currentId },
-      select: { parentId: true },
-    });
-
-    currentId = parent?.parentId || null;
-  }
-
-  return false;
-}
-
 /**
  * 删除部门
  */
@@ -448,17 +550,19 @@ export async function deleteDepartment(id: string): Promise<{ success: boolean;
     throw new Error('该部门下存在员工，无法删除');
   }
 
+  // 闭包表中的关系随部门级联删除
   await prisma.department.delete({
     where: { id },
   });
 
+  invalidateDepartmentTree();
   return { success: true, message: '部门已删除' };
 }
 
 /**
- * 获取部门成员列表
+ * 获取部门成员列表（includeDescendants 时包含所有下级部门成员）
  */
-export async function getDepartmentUsers(departmentId: string) {
+export async function getDepartmentUsers(departmentId: string, includeDescendants: boolean = false) {
   // 检查部门是否存在
   const department = await prisma.department.findUnique({
     where: { id: departmentId },
@@ -469,7 +573,9 @@ export async function getDepartmentUsers(departmentId: string) {
   }
 
   const users = await prisma.user.findMany({
-    where: { departmentId },
+    where: includeDescendants
+      ? { department: { ancestorLinks: { some: { ancestorId: departmentId } } } }
+      : { departmentId },
     select: {
       id: true,
       username: true,
@@ -510,8 +616,7 @@ export async function moveDepartment(id: string, newParentId: string | null) {
 
   // 如果要移动到的父部门是当前部门的子部门（防止循环依赖）
   if (newParentId) {
-    const isDescendant = await checkIsDescendant(id, newParentId);
-    if (isDescendant) {
+    if (await isDescendant(id, newParentId)) {
       throw new Error('不能将部门移动到其子部门下');
     }
 
@@ -525,9 +630,9 @@ export async function moveDepartment(id: string, newParentId: string | null) {
   }
 
   // 计算新的层级
-  const newLevel = newParentId ? await calculateLevel(newParentId) + 1 : 1;
+  const newLevel = await calculateLevel(newParentId);
 
-  // 使用事务更新
+  // 使用事务更新部门、闭包表和子树层级
   const updatedDept = await prisma.$transaction(async (tx) => {
     const dept = await tx.department.update({
       where: { id },
@@ -553,12 +658,12 @@ export async function moveDepartment(id: string, newParentId: string | null) {
       },
     });
 
-    // 更新所有子部门的层级
-    await updateChildrenLevel(tx, id, newLevel);
+    await relocateSubtree(tx, id, newParentId, newLevel);
 
     return dept;
   });
 
+  invalidateDepartmentTree();
   return updatedDept;
 }
 
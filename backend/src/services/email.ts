@@ -1,6 +1,6 @@
-import nodemailer from 'nodemailer';
 import { config } from '../config';
 import logger from '../lib/logger';
+import { deliverEmail, enqueueEmail } from './mailQueue';
 
 // ============================================
 // 邮件配置验证
@@ -34,17 +34,6 @@ export function initializeEmailService(): void {
   }
 }
 
-// 邮件传输器配置
-const transporter = nodemailer.createTransport({
-  host: config.email.smtp.host,
-  port: config.email.smtp.port,
-  secure: config.email.smtp.secure,
-  auth: {
-    user: config.email.smtp.auth.user,
-    pass: config.email.smtp.auth.pass,
-  },
-});
-
 // 服务器配置
 const SERVER_URL = config.server?.url || 'http://localhost:3001';
 
@@ -141,12 +130,12 @@ export function generateEmailTemplate(data: EmailTemplateData): string {
 }
 
 /**
- * 发送邮件通知
+ * 发送邮件通知（写入邮件队列后立即返回，由队列 worker 异步发送并负责重试）
  * @param recipients 收件人邮箱（单个或多个）
  * @param subject 邮件主题
  * @param htmlContent 邮件HTML内容
  * @param applicationCode 申请编号（用于日志）
- * @returns 是否发送成功
+ * @returns 是否已入队
  */
 export async function sendEmailNotification(
   recipients: string | string[],
@@ -154,48 +143,37 @@ export async function sendEmailNotification(
   htmlContent: string,
   applicationCode: string | null = null
 ): Promise<boolean> {
-  // 如果没有收件人，直接返回失败
-  if (!recipients || (Array.isArray(recipients) && recipients.length === 0) || recipients === '') {
-    const logPrefix = applicationCode ? `申请 ${applicationCode}: ` : '';
-    logger.info(`【${new Date().toLocaleString('zh-CN')}】${logPrefix}邮件发送失败: 没有有效的收件人`);
-    return false;
-  }
-
-  let retryCount = 0;
-  let hasLoggedFailure = false;
+  const logPrefix = applicationCode ? `申请 ${applicationCode}: ` : '';
 
-  const sendMail = async (): Promise<boolean> => {
-    try {
-      const to = Array.isArray(recipients) ? recipients.join(',') : recipients;
-
-      const mailOptions = {
-        from: config.email.from,
-        to,
-        subject,
-        html: htmlContent,
-      };
-
-      const info = await transporter.sendMail(mailOptions);
-      const logPrefix = applicationCode ? `申请 ${applicationCode}: ` : '';
-      logger.info(`【${new Date().toLocaleString('zh-CN')}】${logPrefix}邮件发送成功: ${info.messageId}`);
-      return true;
-    } catch (error) {
-      if (!hasLoggedFailure) {
-        const logPrefix = applicationCode ? `申请 ${applicationCode}: ` : '';
-        logger.error(`【${new Date().toLocaleString('zh-CN')}】${logPrefix}邮件发送失败，开始无限重试中...`, { error: (error as Error).message });
-        hasLoggedFailure = true;
-      }
-
-      retryCount++;
-      // 无限重试直到成功 - 符合业务要求
-      const logPrefix = applicationCode ? `申请 ${applicationCode}: ` : '';
-      logger.info(`【${new Date().toLocaleString('zh-CN')}】${logPrefix}第 ${retryCount} 次重试，${config.email.retryDelay}ms 后重试...`);
-      await new Promise(resolve => setTimeout(resolve, config.email.retryDelay));
-      return await sendMail();
+  try {
+    const queued = await enqueueEmail(recipients, subject, htmlContent, applicationCode);
+    if (queued === 0) {
+      logger.info(`【${new Date().toLocaleString('zh-CN')}】${logPrefix}邮件发送失败: 没有有效的收件人`);
+      return false;
     }
-  };
+    return true;
+  } catch (error) {
+    logger.error(`${logPrefix}邮件入队失败`, { error: (error as Error).message });
+    return false;
+  }
+}
 
-  return await sendMail();
+/**
+ * 立即发送邮件（不经过队列，用于测试 SMTP 配置）
+ */
+export async function sendEmailNow(
+  recipients: string | string[],
+  subject: string,
+  htmlContent: string
+): Promise<boolean> {
+  try {
+    const messageId = await deliverEmail(recipients, subject, htmlContent);
+    logger.info(`测试邮件发送成功: ${messageId}`);
+    return true;
+  } catch (error) {
+    logger.error('测试邮件发送失败', { error: (error as Error).message });
+    return false;
+  }
 }
 
 /**
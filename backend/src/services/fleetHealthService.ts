@@ -0,0 +1,353 @@
+import { Prisma, HealthRecalcRun } from '@prisma/client';
+import { subDays, subYears } from 'date-fns';
+import { prisma } from '../lib/prisma';
+import * as logger from '../lib/logger';
+import { config } from '../config';
+import { scoreFleet, severityWeight, FleetHealthScore } from './healthScoring';
+import { applyHealthAssessments } from './healthStateService';
+
+/**
+ * 全厂设备健康度批量重算
+ * 按设备ID游标分批：每批一次查询设备、两次聚合查询维修记录，内存中按列评分，
+ * 历史记录 createMany、设备当前健康度一条 UPDATE 写回。
+ * 运行进度记录在 health_recalc_runs，进程退出或出错后从游标处续跑
+ */
+
+// 运行中的任务心跳超过该时长视为中断，可由任一实例接管续跑
+const STALE_RUN_MS = 10 * 60 * 1000;
+
+// 调度器检查间隔（同时决定中断任务多久后被接管）
+const SCHEDULER_CHECK_MS = STALE_RUN_MS;
+
+export type RecalcTrigger = 'manual' | 'schedule';
+
+export interface StartRecalcOptions {
+  trigger: RecalcTrigger;
+  assessor: string;
+  factoryId?: string;
+}
+
+export interface RecalcStatus extends HealthRecalcRun {
+  progress: number; // 0~1
+  stale: boolean;
+}
+
+export const fleetEquipmentSelect = {
+  id: true,
+  purchaseDate: true,
+  lastMaintenanceAt: true,
+  healthScore: true,
+} satisfies Prisma.EquipmentSelect;
+
+export type FleetEquipment = Prisma.EquipmentGetPayload<{ select: typeof fleetEquipmentSelect }>;
+
+interface RepairStats {
+  repairCount: number;
+  severityWeightSum: number;
+  recentRepairCount: number;
+}
+
+/**
+ * 按设备聚合近一年的维修记录：次数、严重度权重之和、近30天次数
+ */
+async function loadRepairStats(equipmentIds: string[], now: Date): Promise<Map<string, RepairStats>> {
+  const where = { equipmentId: { in: equipmentIds }, type: 'REPAIR' as const };
+  const [bySeverity, recent] = await Promise.all([
+    prisma.maintenanceRecord.groupBy({
+      by: ['equipmentId', 'severity'],
+      where: { ...where, createdAt: { gte: subYears(now, 1) } },
+      _count: { _all: true },
+    }),
+    prisma.maintenanceRecord.groupBy({
+      by: ['equipmentId'],
+      where: { ...where, createdAt: { gt: subDays(now, 30) } },
+      _count: { _all: true },
+    }),
+  ]);
+
+  const stats = new Map<string, RepairStats>();
+  const get = (id: string) => {
+    let s = stats.get(id);
+    if (!s) {
+      s = { repairCount: 0, severityWeightSum: 0, recentRepairCount: 0 };
+      stats.set(id, s);
+    }
+    return s;
+  };
+  for (const row of bySeverity) {
+    const s = get(row.equipmentId);
+    s.repairCount += row._count._all;
+    s.severityWeightSum += row._count._all * severityWeight(row.severity);
+  }
+  for (const row of recent) {
+    get(row.equipmentId).recentRepairCount = row._count._all;
+  }
+  return stats;
+}
+
+/**
+ * 写入评分结果：历史记录 createMany，设备当前健康度 UPDATE ... FROM (VALUES ...)，并推进滚动状态，同一事务
+ */
+async function writeHealthScores(scores: FleetHealthScore[], assessor: string, now: Date): Promise<void> {
+  const values = scores.map(s => Prisma.sql`(${s.equipmentId}, ${s.totalScore}::smallint, ${JSON.stringify({
+    ageScore: s.ageScore,
+    repairFrequencyScore: s.repairFrequencyScore,
+    faultSeverityScore: s.faultSeverityScore,
+    maintenanceScore: s.maintenanceScore,
+  })}::jsonb)`);
+
+  await prisma.$transaction(async (tx) => {
+    await tx.equipmentHealthHistory.createMany({
+      data: scores.map(s => ({
+        equipmentId: s.equipmentId,
+        totalScore: s.totalScore,
+        healthLevel: s.healthLevel,
+        ageScore: s.ageScore,
+        repairFrequencyScore: s.repairFrequencyScore,
+        faultSeverityScore: s.faultSeverityScore,
+        maintenanceScore: s.maintenanceScore,
+        assessor,
+        failureProbability: s.failureProbability,
+        nextMaintenanceDate: s.nextMaintenanceDate,
+        assessmentDate: now,
+        recommendations: s.recommendations,
+      })),
+    });
+    await tx.$executeRaw`
+      UPDATE "Equipment" AS e
+      SET "healthScore" = v.score, "healthMetrics" = v.metrics, "updatedAt" = ${now}
+      FROM (VALUES ${Prisma.join(values)}) AS v(id, score, metrics)
+      WHERE e.id = v.id
+    `;
+    await applyHealthAssessments(tx, scores.map(s => ({
+      equipmentId: s.equipmentId,
+      score: s.totalScore,
+      healthLevel: s.healthLevel,
+      failureProbability: s.failureProbability,
+      assessedAt: now,
+    })));
+  });
+}
+
+/**
+ * 对一批设备评分并写回
+ */
+export async function recalculateBatch(equipment: FleetEquipment[], assessor: string, now: Date = new Date()): Promise<FleetHealthScore[]> {
+  if (equipment.length === 0) return [];
+
+  const stats = await loadRepairStats(equipment.map(e => e.id), now);
+  const scores = scoreFleet(equipment.map(e => {
+    const s = stats.get(e.id);
+    return {
+      equipmentId: e.id,
+      purchaseDate: e.purchaseDate,
+      lastMaintenanceAt: e.lastMaintenanceAt,
+      healthScore: e.healthScore,
+      repairCount: s?.repairCount ?? 0,
+      severityWeightSum: s?.severityWeightSum ?? 0,
+      recentRepairCount: s?.recentRepairCount ?? 0,
+    };
+  }), now);
+
+  await writeHealthScores(scores, assessor, now);
+  return scores;
+}
+
+/**
+ * 重算指定设备（同步返回结果，供批量计算接口使用）
+ */
+export async function recalculateEquipmentHealth(
+  equipmentIds: string[],
+  assessor: string
+): Promise<{ success: number; failed: number; errors: string[] }> {
+  const ids = Array.from(new Set(equipmentIds));
+  const equipment = await prisma.equipment.findMany({
+    where: { id: { in: ids } },
+    select: fleetEquipmentSelect,
+  });
+
+  const errors: string[] = [];
+  let success = 0;
+  let failed = 0;
+
+  const found = new Set(equipment.map(e => e.id));
+  for (const id of ids) {
+    if (!found.has(id)) {
+      failed++;
+      errors.push(`设备 ${id}: 设备不存在`);
+    }
+  }
+
+  const { batchSize } = config.healthRecalc;
+  for (let i = 0; i < equipment.length; i += batchSize) {
+    const batch = equipment.slice(i, i + batchSize);
+    try {
+      await recalculateBatch(batch, assessor);
+      success += batch.length;
+    } catch (error) {
+      failed += batch.length;
+      errors.push(`设备 ${batch[0].id} 起 ${batch.length} 台: ${(error as Error).message}`);
+    }
+  }
+
+  return { success, failed, errors };
+}
+
+const isStale = (run: HealthRecalcRun) =>
+  run.status === 'RUNNING' && Date.now() - run.heartbeatAt.getTime() > STALE_RUN_MS;
+
+// 最近一次运行失败或中断时可续跑
+const isResumable = (run: HealthRecalcRun) => run.status === 'FAILED' || isStale(run);
+
+const scopeWhere = (factoryId: string | null): Prisma.EquipmentWhereInput => ({
+  deletedAt: null,
+  status: { not: 'SCRAPPED' },
+  ...(factoryId && { factoryId }),
+});
+
+/**
+ * 从游标处逐批处理，每批结束写入进度和心跳
+ */
+async function processRun(run: HealthRecalcRun): Promise<void> {
+  let { cursor, processed, failed, lastError } = run;
+
+  try {
+    for (;;) {
+      const batch = await prisma.equipment.findMany({
+        where: { ...scopeWhere(run.factoryId), ...(cursor && { id: { gt: cursor } }) },
+        select: fleetEquipmentSelect,
+        orderBy: { id: 'asc' },
+        take: config.healthRecalc.batchSize,
+      });
+      if (batch.length === 0) break;
+
+      try {
+        await recalculateBatch(batch, run.assessor);
+        processed += batch.length;
+      } catch (error) {
+        // 单批写入失败跳过该批，继续后续设备
+        failed += batch.length;
+        lastError = (error as Error).message;
+        logger.error('设备健康度批量重算：批次失败', { runId: run.id, fromId: batch[0].id, error: lastError });
+      }
+
+      cursor = batch[batch.length - 1].id;
+      await prisma.healthRecalcRun.update({
+        where: { id: run.id },
+        data: { cursor, processed, failed, lastError, heartbeatAt: new Date() },
+      });
+    }
+
+    await prisma.healthRecalcRun.update({
+      where: { id: run.id },
+      data: { status: 'COMPLETED', finishedAt: new Date(), heartbeatAt: new Date() },
+    });
+    logger.info('设备健康度批量重算完成', { runId: run.id, processed, failed });
+  } catch (error) {
+    // 查询或进度写入失败：保留游标，下次启动时续跑
+    const message = error instanceof Error ? error.message : String(error);
+    logger.error('设备健康度批量重算中断', { runId: run.id, cursor, error: message });
+    await prisma.healthRecalcRun.update({
+      where: { id: run.id },
+      data: { status: 'FAILED', lastError: message },
+    }).catch(() => undefined);
+  }
+}
+
+/**
+ * 接管中断/失败的运行（按心跳做乐观锁，多实例只有一个能接管）
+ */
+async function claimRun(run: HealthRecalcRun): Promise<HealthRecalcRun | null> {
+  const { count } = await prisma.healthRecalcRun.updateMany({
+    where: { id: run.id, status: run.status, heartbeatAt: run.heartbeatAt },
+    data: { status: 'RUNNING', heartbeatAt: new Date() },
+  });
+  return count === 1 ? prisma.healthRecalcRun.findUnique({ where: { id: run.id } }) : null;
+}
+
+/**
+ * 启动全厂重算（后台执行）
+ * 已有运行中的任务时直接返回该任务；最近一次失败或中断时从其游标处续跑（沿用原任务的范围）
+ */
+export async function startFleetHealthRecalc(options: StartRecalcOptions): Promise<{ run: HealthRecalcRun; started: boolean }> {
+  const latest = await prisma.healthRecalcRun.findFirst({ orderBy: { startedAt: 'desc' } });
+
+  if (latest && latest.status === 'RUNNING' && !isStale(latest)) {
+    return { run: latest, started: false };
+  }
+
+  let run: HealthRecalcRun | null = null;
+  if (latest && isResumable(latest)) {
+    run = await claimRun(latest);
+    if (!run) {
+      // 被其他实例抢先接管
+      const current = await prisma.healthRecalcRun.findUnique({ where: { id: latest.id } });
+      return { run: current ?? latest, started: false };
+    }
+    logger.info('设备健康度批量重算续跑', { runId: run.id, cursor: run.cursor, processed: run.processed });
+  } else {
+    const factoryId = options.factoryId ?? null;
+    run = await prisma.healthRecalcRun.create({
+      data: {
+        trigger: options.trigger,
+        assessor: options.assessor,
+        factoryId,
+        total: await prisma.equipment.count({ where: scopeWhere(factoryId) }),
+      },
+    });
+    logger.info('设备健康度批量重算开始', { runId: run.id, total: run.total, trigger: run.trigger });
+  }
+
+  void processRun(run);
+  return { run, started: true };
+}
+
+/**
+ * 最近一次运行的进度
+ */
+export async function getFleetHealthRecalcStatus(): Promise<RecalcStatus | null> {
+  const run = await prisma.healthRecalcRun.findFirst({ orderBy: { startedAt: 'desc' } });
+  if (!run) return null;
+
+  const done = run.processed + run.failed;
+  return {
+    ...run,
+    progress: run.status === 'COMPLETED' || run.total === 0 ? 1 : Math.min(1, Math.round((done / run.total) * 100) / 100),
+    stale: isStale(run),
+  };
+}
+
+/**
+ * 启动定时重算：定期检查，续跑中断的任务；距上次定时运行超过间隔时开始新一轮
+ */
+export function startFleetHealthScheduler(): void {
+  if (!config.healthRecalc.enabled) {
+    logger.info('设备健康度重算调度器未启动（已禁用）');
+    return;
+  }
+
+  const { intervalMs } = config.healthRecalc;
+
+  const scheduleNext = (delay: number) => {
+    setTimeout(async () => {
+      try {
+        const [latest, lastScheduled] = await Promise.all([
+          prisma.healthRecalcRun.findFirst({ orderBy: { startedAt: 'desc' } }),
+          prisma.healthRecalcRun.findFirst({ where: { trigger: 'schedule' }, orderBy: { startedAt: 'desc' } }),
+        ]);
+        const due = !lastScheduled || Date.now() - lastScheduled.startedAt.getTime() >= intervalMs;
+        if ((latest && isResumable(latest)) || due) {
+          await startFleetHealthRecalc({ trigger: 'schedule', assessor: 'system' });
+        }
+      } catch (error) {
+        logger.error('设备健康度重算调度失败', { error: error instanceof Error ? error.message : String(error) });
+      } finally {
+        scheduleNext(Math.min(intervalMs, SCHEDULER_CHECK_MS));
+      }
+    }, delay);
+  };
+
+  // 启动一分钟后首次检查，避开服务启动高峰
+  scheduleNext(60 * 1000);
+  logger.info(`设备健康度重算调度器已启动，间隔 ${intervalMs / 1000} 秒`);
+}
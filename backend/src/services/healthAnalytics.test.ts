@@ -0,0 +1,61 @@
+/**
+ * 设备健康度流式分析单元测试
+ */
+
+import { advanceHealthState, buildFaultPrediction, buildTrendAlerts, HealthState, RECENT_WINDOW } from './healthAnalytics';
+
+const day = (n: number) => new Date(Date.UTC(2026, 0, 1 + n));
+
+function replay(scores: number[], failureProbability: number | null = 0.1): HealthState {
+  return scores.reduce<HealthState | null>((state, score, i) => advanceHealthState(state, {
+    score,
+    healthLevel: score >= 60 ? 'average' : 'poor',
+    failureProbability,
+    assessedAt: day(i),
+  }), null) as HealthState;
+}
+
+describe('advanceHealthState', () => {
+  it('维护 EWMA、斜率、连续下降次数和最近分数窗口', () => {
+    const state = replay([80, 70, 60]);
+
+    expect(state.sampleCount).toBe(3);
+    expect(state.ewma).toBeCloseTo(0.3 * 60 + 0.7 * (0.3 * 70 + 0.7 * 80));
+    expect(state.slope).toBeCloseTo(-10);
+    expect(state.consecutiveDeclines).toBe(2);
+    expect(state.recentScores).toEqual([60, 70, 80]);
+
+    expect(advanceHealthState(state, { score: 65, healthLevel: 'average', failureProbability: null, assessedAt: day(3) }).consecutiveDeclines).toBe(0);
+  });
+
+  it('忽略早于当前状态的评估，窗口长度有上限', () => {
+    const state = replay(Array.from({ length: 15 }, (_, i) => 90 - i));
+    expect(state.recentScores).toHaveLength(RECENT_WINDOW);
+    expect(state.recentScores[0]).toBe(76);
+    expect(advanceHealthState(state, { score: 10, healthLevel: 'dangerous', failureProbability: null, assessedAt: day(0) })).toBe(state);
+  });
+});
+
+describe('buildFaultPrediction / buildTrendAlerts', () => {
+  it('评估少于3次时数据不足', () => {
+    expect(buildFaultPrediction(replay([80, 70]))).toEqual({ prediction: '数据不足', confidence: 0 });
+    expect(buildTrendAlerts(null).trend).toBe('insufficient_data');
+  });
+
+  it('持续下降的设备给出高风险预测和连续下降预警', () => {
+    const state = replay([80, 70, 60, 50, 45], 0.6);
+    const now = new Date('2026-03-01T00:00:00.000Z');
+
+    expect(buildFaultPrediction(state, now)).toMatchObject({
+      prediction: '中风险：设备健康度有下降趋势，建议关注',
+      trend: -35,
+      avgScore: 61,
+      predictedFailureDate: '2026-03-31',
+    });
+
+    const result = buildTrendAlerts(state);
+    expect(result.trend).toBe('declining');
+    expect(result.alerts.map(a => a.type)).toEqual(['continuous_decline', 'low_score']);
+    expect(result.alerts[0].data).toMatchObject({ consecutiveDecline: 4, recentScores: [45, 50, 60, 70, 80] });
+  });
+});
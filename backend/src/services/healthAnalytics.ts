@@ -0,0 +1,209 @@
+/**
+ * 设备健康度流式分析（纯函数）
+ * 每写入一条健康度评估就推进该设备的滚动状态（最新分数、EWMA、斜率、连续下降次数、最近分数窗口），
+ * 故障预测和趋势预警直接由状态得出，无需回读历史记录
+ */
+
+import { addDays } from 'date-fns';
+
+// EWMA 平滑系数（越大越看重最近的评估）
+export const EWMA_ALPHA = 0.3;
+
+// 保留的最近分数个数（趋势/波动判断的窗口）
+export const RECENT_WINDOW = 10;
+
+export interface HealthSample {
+  score: number;
+  healthLevel: string;
+  failureProbability: number | null;
+  assessedAt: Date;
+}
+
+export interface HealthState {
+  latestScore: number;
+  healthLevel: string;
+  failureProbability: number | null;
+  assessedAt: Date;
+  sampleCount: number;
+  ewma: number;
+  // 每次评估分数变化量的 EWMA，负数表示下降
+  slope: number;
+  consecutiveDeclines: number;
+  // 最近的分数，新的在前
+  recentScores: number[];
+}
+
+export interface TrendAlert {
+  type: string;
+  level: string;
+  message: string;
+  data: Record<string, unknown>;
+}
+
+export interface TrendAlertsResult {
+  alerts: TrendAlert[];
+  trend: 'improving' | 'declining' | 'stable' | 'insufficient_data';
+  currentScore?: number;
+  averageScore?: number;
+  ewma?: number;
+  slope?: number;
+  message?: string;
+}
+
+export interface FaultPredictionResult {
+  prediction: string;
+  confidence: number;
+  trend?: number;
+  avgScore?: number;
+  ewma?: number;
+  slope?: number;
+  predictedFailureDate?: string | null;
+}
+
+const round1 = (value: number) => Number(value.toFixed(1));
+const average = (values: number[]) => values.reduce((s, v) => s + v, 0) / values.length;
+
+/**
+ * 推进滚动状态；早于当前状态的评估（乱序写入）不改变状态
+ */
+export function advanceHealthState(state: HealthState | null, sample: HealthSample): HealthState {
+  if (!state) {
+    return {
+      latestScore: sample.score,
+      healthLevel: sample.healthLevel,
+      failureProbability: sample.failureProbability,
+      assessedAt: sample.assessedAt,
+      sampleCount: 1,
+      ewma: sample.score,
+      slope: 0,
+      consecutiveDeclines: 0,
+      recentScores: [sample.score],
+    };
+  }
+
+  if (sample.assessedAt < state.assessedAt) return state;
+
+  const delta = sample.score - state.latestScore;
+  return {
+    latestScore: sample.score,
+    healthLevel: sample.healthLevel,
+    failureProbability: sample.failureProbability,
+    assessedAt: sample.assessedAt,
+    sampleCount: state.sampleCount + 1,
+    ewma: EWMA_ALPHA * sample.score + (1 - EWMA_ALPHA) * state.ewma,
+    // 第二次评估时以首个变化量作为初值
+    slope: state.sampleCount === 1 ? delta : EWMA_ALPHA * delta + (1 - EWMA_ALPHA) * state.slope,
+    consecutiveDeclines: delta < 0 ? state.consecutiveDeclines + 1 : 0,
+    recentScores: [sample.score, ...state.recentScores].slice(0, RECENT_WINDOW),
+  };
+}
+
+/**
+ * 故障预测（最近6次评估的升降幅度与均值）
+ */
+export function buildFaultPrediction(state: HealthState | null, now: Date = new Date()): FaultPredictionResult {
+  if (!state || state.sampleCount < 3) {
+    return { prediction: '数据不足', confidence: 0 };
+  }
+
+  const scores = state.recentScores.slice(0, 6);
+  const trend = scores[0] - scores[scores.length - 1];
+  const avgScore = average(scores);
+
+  let prediction: string;
+  let confidence: number;
+
+  if (trend < -20 && avgScore < 60) {
+    prediction = '高风险：设备健康度持续下降，建议立即检修';
+    confidence = 0.85;
+  } else if (trend < -10) {
+    prediction = '中风险：设备健康度有下降趋势，建议关注';
+    confidence = 0.7;
+  } else if (avgScore < 50) {
+    prediction = '中风险：设备健康度较低，建议加强保养';
+    confidence = 0.6;
+  } else {
+    prediction = '低风险：设备状态稳定';
+    confidence = 0.8;
+  }
+
+  return {
+    prediction,
+    confidence,
+    trend,
+    avgScore,
+    ewma: round1(state.ewma),
+    slope: round1(state.slope),
+    predictedFailureDate: state.failureProbability && state.failureProbability > 0.5
+      ? addDays(now, 30).toISOString().split('T')[0]
+      : null
+  };
+}
+
+/**
+ * 趋势预警：连续下降、波动异常、低分
+ */
+export function buildTrendAlerts(state: HealthState | null): TrendAlertsResult {
+  if (!state || state.sampleCount < 3) {
+    return { alerts: [], trend: 'insufficient_data', message: '数据不足，至少需要3次评估记录' };
+  }
+
+  const alerts: TrendAlert[] = [];
+  const scores = state.recentScores;
+  const consecutiveDecline = state.consecutiveDeclines;
+
+  if (consecutiveDecline >= 3) {
+    alerts.push({
+      type: 'continuous_decline',
+      level: 'high',
+      message: `健康度已连续 ${consecutiveDecline} 次下降`,
+      data: { consecutiveDecline, recentScores: scores.slice(0, consecutiveDecline + 1) }
+    });
+  }
+
+  // 检测分数波动异常
+  const recentScores = scores.slice(0, 5);
+  const avgRecent = average(recentScores);
+  const stddev = Math.sqrt(average(recentScores.map(v => Math.pow(v - avgRecent, 2))));
+
+  if (stddev > 15) {
+    alerts.push({
+      type: 'high_volatility',
+      level: 'medium',
+      message: `健康度波动异常，标准差 ${stddev.toFixed(1)}`,
+      data: { stddev: round1(stddev), recentScores }
+    });
+  }
+
+  // 检测低分预警
+  if (state.latestScore < 40) {
+    alerts.push({
+      type: 'critical_score',
+      level: 'critical',
+      message: `当前健康度极低(${state.latestScore}分)，建议立即检修`,
+      data: { currentScore: state.latestScore }
+    });
+  } else if (state.latestScore < 60) {
+    alerts.push({
+      type: 'low_score',
+      level: 'high',
+      message: `当前健康度较低(${state.latestScore}分)，建议安排检修`,
+      data: { currentScore: state.latestScore }
+    });
+  }
+
+  // 总体趋势：窗口内新旧两半的均值比较
+  const half = Math.floor(scores.length / 2);
+  const avgOlder = average(scores.slice(half));
+  const avgNewer = average(scores.slice(0, half));
+  const trend = avgNewer > avgOlder + 5 ? 'improving' : avgNewer < avgOlder - 5 ? 'declining' : 'stable';
+
+  return {
+    alerts,
+    trend,
+    currentScore: state.latestScore,
+    averageScore: round1(avgRecent),
+    ewma: round1(state.ewma),
+    slope: round1(state.slope)
+  };
+}
@@ -0,0 +1,53 @@
+/**
+ * 设备健康度评分规则单元测试
+ */
+
+import { subDays, subYears } from 'date-fns';
+import { scoreFleet, faultSeverityScore, severityWeight, healthLevel } from './healthScoring';
+
+const now = new Date('2026-06-01T00:00:00.000Z');
+
+describe('healthScoring', () => {
+  it('严重度未填写按 moderate 计', () => {
+    expect(severityWeight(null)).toBe(2);
+    expect(severityWeight('unknown')).toBe(2);
+    expect(faultSeverityScore(2, severityWeight('critical') + severityWeight('low'))).toBe(40);
+    expect(faultSeverityScore(0, 0)).toBe(100);
+  });
+
+  it('等级分界', () => {
+    expect([90, 80, 60, 40, 39].map(healthLevel)).toEqual(['excellent', 'good', 'average', 'poor', 'dangerous']);
+  });
+
+  it('批量评分与逐维度规则一致', () => {
+    const [fresh, worn] = scoreFleet([
+      {
+        equipmentId: 'a',
+        purchaseDate: subDays(now, 100),
+        lastMaintenanceAt: subDays(now, 10),
+        healthScore: 95,
+        repairCount: 0,
+        severityWeightSum: 0,
+        recentRepairCount: 0,
+      },
+      {
+        equipmentId: 'b',
+        purchaseDate: subYears(now, 10),
+        lastMaintenanceAt: null,
+        healthScore: 50,
+        repairCount: 6,
+        severityWeightSum: 18,
+        recentRepairCount: 2,
+      },
+    ], now);
+
+    expect(fresh).toMatchObject({ totalScore: 100, healthLevel: 'excellent', failureProbability: 0 });
+    expect(fresh.nextMaintenanceDate).toEqual(new Date('2026-08-30T00:00:00.000Z'));
+    expect(fresh.recommendations).toEqual(['设备整体状况良好，请继续保持定期保养']);
+
+    // 40*0.2 + 40*0.3 + 40*0.3 + 40*0.2
+    expect(worn).toMatchObject({ ageScore: 40, repairFrequencyScore: 40, faultSeverityScore: 40, maintenanceScore: 40, totalScore: 40 });
+    expect(worn.failureProbability).toBeCloseTo(0.8);
+    expect(worn.recommendations).toHaveLength(4);
+  });
+});
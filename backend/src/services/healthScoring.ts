@@ -0,0 +1,166 @@
+/**
+ * 设备健康度评分规则（纯函数）
+ * 单台计算与全厂批量重算共用，批量时按维度对整批设备逐列计算
+ */
+
+import { addDays, differenceInDays } from 'date-fns';
+
+export interface HealthDimensionScores {
+  ageScore: number;
+  repairFrequencyScore: number;
+  faultSeverityScore: number;
+  maintenanceScore: number;
+}
+
+// 维修记录严重度权重，未填写或无法识别时按 moderate 计
+const SEVERITY_WEIGHTS: Record<string, number> = {
+  'low': 1,
+  'moderate': 2,
+  'high': 3,
+  'critical': 5
+};
+
+export function severityWeight(severity: string | null | undefined): number {
+  return SEVERITY_WEIGHTS[severity || 'moderate'] || 2;
+}
+
+// 1. 设备年龄分数 (20%)
+export function ageScore(purchaseDate: Date | null, now: Date = new Date()): number {
+  if (!purchaseDate) return 80;
+  const ageYears = differenceInDays(now, purchaseDate) / 365;
+  if (ageYears < 1) return 100;
+  if (ageYears < 3) return 90;
+  if (ageYears < 5) return 75;
+  if (ageYears < 8) return 60;
+  return 40;
+}
+
+// 2. 维修频率分数 (30%)，repairCount 为近一年维修次数
+export function repairFrequencyScore(repairCount: number): number {
+  if (repairCount === 0) return 100;
+  if (repairCount <= 2) return 85;
+  if (repairCount <= 5) return 65;
+  if (repairCount <= 10) return 40;
+  return 20;
+}
+
+// 3. 故障严重度分数 (30%)，severityWeightSum 为近一年维修记录的严重度权重之和
+export function faultSeverityScore(repairCount: number, severityWeightSum: number): number {
+  if (repairCount === 0) return 100;
+  const avgSeverity = severityWeightSum / repairCount;
+  return Math.max(0, 100 - avgSeverity * 20);
+}
+
+// 4. 保养状况分数 (20%)
+export function maintenanceScore(lastMaintenanceAt: Date | null, now: Date = new Date()): number {
+  const daysSinceLastMaintenance = lastMaintenanceAt
+    ? differenceInDays(now, lastMaintenanceAt)
+    : 365;
+
+  if (daysSinceLastMaintenance < 30) return 100;
+  if (daysSinceLastMaintenance < 60) return 90;
+  if (daysSinceLastMaintenance < 90) return 75;
+  if (daysSinceLastMaintenance < 180) return 60;
+  return 40;
+}
+
+export function totalScore(scores: HealthDimensionScores): number {
+  return Math.round(
+    scores.ageScore * 0.2 +
+    scores.repairFrequencyScore * 0.3 +
+    scores.faultSeverityScore * 0.3 +
+    scores.maintenanceScore * 0.2
+  );
+}
+
+export function healthLevel(score: number): string {
+  if (score >= 90) return 'excellent';
+  if (score >= 80) return 'good';
+  if (score >= 60) return 'average';
+  if (score >= 40) return 'poor';
+  return 'dangerous';
+}
+
+// recentRepairCount 为近30天维修次数
+export function failureProbability(score: number, recentRepairCount: number): number {
+  const baseProbability = (100 - score) / 100;
+  return Math.min(0.95, baseProbability + recentRepairCount * 0.1);
+}
+
+// previousScore 为本次评估前设备记录的健康度
+export function nextMaintenanceDate(previousScore: number | null, now: Date = new Date()): Date {
+  const baseDays = previousScore && previousScore > 80 ? 90 : 60;
+  return addDays(now, baseDays);
+}
+
+export function recommendations(scores: HealthDimensionScores): string[] {
+  const result: string[] = [];
+
+  if (scores.ageScore < 60) {
+    result.push('设备使用年限较长，建议增加保养频率');
+  }
+  if (scores.repairFrequencyScore < 60) {
+    result.push('近期维修频率较高，建议进行全面检查');
+  }
+  if (scores.faultSeverityScore < 60) {
+    result.push('故障严重程度较高，建议重点关注关键部件');
+  }
+  if (scores.maintenanceScore < 60) {
+    result.push('保养状况不佳，请按时执行保养计划');
+  }
+
+  if (result.length === 0) {
+    result.push('设备整体状况良好，请继续保持定期保养');
+  }
+
+  return result;
+}
+
+// 批量评分输入：每台设备一行，维修数据已在数据库中按设备聚合
+export interface FleetHealthInput {
+  equipmentId: string;
+  purchaseDate: Date | null;
+  lastMaintenanceAt: Date | null;
+  healthScore: number | null;
+  repairCount: number;
+  severityWeightSum: number;
+  recentRepairCount: number;
+}
+
+export interface FleetHealthScore extends HealthDimensionScores {
+  equipmentId: string;
+  totalScore: number;
+  healthLevel: string;
+  failureProbability: number;
+  nextMaintenanceDate: Date;
+  recommendations: string[];
+}
+
+/**
+ * 对一批设备评分：先逐维度算出整列分数，再合成总分
+ */
+export function scoreFleet(inputs: FleetHealthInput[], now: Date = new Date()): FleetHealthScore[] {
+  const ages = inputs.map(i => ageScore(i.purchaseDate, now));
+  const repairs = inputs.map(i => repairFrequencyScore(i.repairCount));
+  const severities = inputs.map(i => faultSeverityScore(i.repairCount, i.severityWeightSum));
+  const maintenances = inputs.map(i => maintenanceScore(i.lastMaintenanceAt, now));
+
+  return inputs.map((input, i) => {
+    const scores: HealthDimensionScores = {
+      ageScore: ages[i],
+      repairFrequencyScore: repairs[i],
+      faultSeverityScore: severities[i],
+      maintenanceScore: maintenances[i]
+    };
+    const total = totalScore(scores);
+    return {
+      equipmentId: input.equipmentId,
+      ...scores,
+      totalScore: total,
+      healthLevel: healthLevel(total),
+      failureProbability: failureProbability(total, input.recentRepairCount),
+      nextMaintenanceDate: nextMaintenanceDate(input.healthScore, now),
+      recommendations: recommendations(scores)
+    };
+  });
+}
@@ -0,0 +1,187 @@
+import { Prisma, PrismaClient, EquipmentHealthState } from '@prisma/client';
+import { prisma } from '../lib/prisma';
+import * as logger from '../lib/logger';
+import { advanceHealthState, HealthSample, HealthState } from './healthAnalytics';
+
+/**
+ * 设备健康度滚动状态存储（equipment_health_state，每台设备一行）
+ * 健康度评估写入历史记录时在同一事务内推进状态；预测、预警、统计只读状态表。
+ * rebuildHealthState 按历史记录重放重建全部状态（上线或修复数据时执行）
+ */
+
+export interface EquipmentHealthSample extends HealthSample {
+  equipmentId: string;
+}
+
+// 重建时每次读取的历史记录行数 / 每次写入的状态行数
+const REBUILD_PAGE_SIZE = 5000;
+const UPSERT_CHUNK_SIZE = 1000;
+
+type DbClient = PrismaClient | Prisma.TransactionClient;
+
+export function toHealthState(row: EquipmentHealthState): HealthState {
+  return {
+    latestScore: row.latestScore,
+    healthLevel: row.healthLevel,
+    failureProbability: row.failureProbability,
+    assessedAt: row.assessedAt,
+    sampleCount: row.sampleCount,
+    ewma: row.ewma,
+    slope: row.slope,
+    consecutiveDeclines: row.consecutiveDeclines,
+    recentScores: row.recentScores,
+  };
+}
+
+/**
+ * 批量写入状态；已有状态比写入的更新时保留原状态
+ */
+async function upsertStates(client: DbClient, states: Map<string, HealthState>): Promise<void> {
+  const entries = Array.from(states.entries());
+  for (let i = 0; i < entries.length; i += UPSERT_CHUNK_SIZE) {
+    const values = entries.slice(i, i + UPSERT_CHUNK_SIZE).map(([equipmentId, s]) => Prisma.sql`(
+      ${equipmentId}, ${s.latestScore}::float8, ${s.healthLevel}, ${s.failureProbability}::float8, ${s.assessedAt},
+      ${s.sampleCount}::int, ${s.ewma}::float8, ${s.slope}::float8, ${s.consecutiveDeclines}::int,
+      ${s.recentScores}::float8[], NOW()
+    )`);
+
+    await client.$executeRaw`
+      INSERT INTO equipment_health_state (
+        equipment_id, latest_score, health_level, failure_probability, assessed_at,
+        sample_count, ewma, slope, consecutive_declines, recent_scores, updated_at
+      )
+      VALUES ${Prisma.join(values)}
+      ON CONFLICT (equipment_id) DO UPDATE SET
+        latest_score = EXCLUDED.latest_score,
+        health_level = EXCLUDED.health_level,
+        failure_probability = EXCLUDED.failure_probability,
+        assessed_at = EXCLUDED.assessed_at,
+        sample_count = EXCLUDED.sample_count,
+        ewma = EXCLUDED.ewma,
+        slope = EXCLUDED.slope,
+        consecutive_declines = EXCLUDED.consecutive_declines,
+        recent_scores = EXCLUDED.recent_scores,
+        updated_at = EXCLUDED.updated_at
+      WHERE equipment_health_state.assessed_at <= EXCLUDED.assessed_at
+    `;
+  }
+}
+
+/**
+ * 新评估写入后推进对应设备的状态（须在写入历史记录的事务内调用，锁定状态行防止并发评估互相覆盖）
+ */
+export async function applyHealthAssessments(tx: Prisma.TransactionClient, samples: EquipmentHealthSample[]): Promise<void> {
+  if (samples.length === 0) return;
+
+  const ids = Array.from(new Set(samples.map(s => s.equipmentId)));
+  await tx.$queryRaw`SELECT 1 FROM equipment_health_state WHERE equipment_id = ANY(${ids}) FOR UPDATE`;
+  const rows = await tx.equipmentHealthState.findMany({ where: { equipmentId: { in: ids } } });
+
+  const states = new Map<string, HealthState | null>(ids.map(id => [id, null]));
+  rows.forEach(row => states.set(row.equipmentId, toHealthState(row)));
+
+  const ordered = [...samples].sort((a, b) => a.assessedAt.getTime() - b.assessedAt.getTime());
+  for (const sample of ordered) {
+    states.set(sample.equipmentId, advanceHealthState(states.get(sample.equipmentId) ?? null, sample));
+  }
+
+  await upsertStates(tx, states as Map<string, HealthState>);
+}
+
+export async function getHealthState(equipmentId: string): Promise<HealthState | null> {
+  const row = await prisma.equipmentHealthState.findUnique({ where: { equipmentId } });
+  return row ? toHealthState(row) : null;
+}
+
+/**
+ * 按健康等级汇总未删除设备的最新评估
+ */
+export async function getHealthLevelSummary(factoryId?: string): Promise<Array<{ healthLevel: string; count: number; scoreSum: number }>> {
+  const groups = await prisma.equipmentHealthState.groupBy({
+    by: ['healthLevel'],
+    where: { equipment: { deletedAt: null, ...(factoryId && { factoryId }) } },
+    _count: { _all: true },
+    _sum: { latestScore: true },
+  });
+  return groups.map(g => ({ healthLevel: g.healthLevel, count: g._count._all, scoreSum: g._sum.latestScore ?? 0 }));
+}
+
+/**
+ * 按历史记录重放重建全部设备状态
+ * 按 (设备, 评估时间) 游标顺序读取，设备读完即写入；最后删除已无历史记录的状态行
+ */
+export async function rebuildHealthState(): Promise<{ equipment: number; samples: number }> {
+  let cursor: { equipmentId: string; assessmentDate: Date; id: string } | null = null;
+  let current: { equipmentId: string; state: HealthState | null } | null = null;
+  let pending = new Map<string, HealthState>();
+  let equipmentCount = 0;
+  let sampleCount = 0;
+
+  const finishEquipment = async () => {
+    if (current?.state) {
+      pending.set(current.equipmentId, current.state);
+      equipmentCount++;
+    }
+    if (pending.size >= UPSERT_CHUNK_SIZE) {
+      await upsertStates(prisma, pending);
+      pending = new Map();
+    }
+  };
+
+  for (;;) {
+    const page = await prisma.equipmentHealthHistory.findMany({
+      where: cursor ? {
+        OR: [
+          { equipmentId: { gt: cursor.equipmentId } },
+          { equipmentId: cursor.equipmentId, assessmentDate: { gt: cursor.assessmentDate } },
+          { equipmentId: cursor.equipmentId, assessmentDate: cursor.assessmentDate, id: { gt: cursor.id } },
+        ],
+      } : undefined,
+      select: { id: true, equipmentId: true, totalScore: true, healthLevel: true, failureProbability: true, assessmentDate: true },
+      orderBy: [{ equipmentId: 'asc' }, { assessmentDate: 'asc' }, { id: 'asc' }],
+      take: REBUILD_PAGE_SIZE,
+    });
+    if (page.length === 0) break;
+
+    for (const row of page) {
+      if (!current || current.equipmentId !== row.equipmentId) {
+        await finishEquipment();
+        current = { equipmentId: row.equipmentId, state: null };
+      }
+      current.state = advanceHealthState(current.state, {
+        score: row.totalScore,
+        healthLevel: row.healthLevel,
+        failureProbability: row.failureProbability,
+        assessedAt: row.assessmentDate,
+      });
+      sampleCount++;
+    }
+
+    const last = page[page.length - 1];
+    cursor = { equipmentId: last.equipmentId, assessmentDate: last.assessmentDate, id: last.id };
+    logger.info(`健康度状态重建：已读取 ${sampleCount} 条评估记录`);
+  }
+
+  await finishEquipment();
+  if (pending.size > 0) await upsertStates(prisma, pending);
+
+  await prisma.$executeRaw`
+    DELETE FROM equipment_health_state s
+    WHERE NOT EXISTS (SELECT 1 FROM equipment_health_history h WHERE h.equipment_id = s.equipment_id)
+  `;
+
+  logger.info('健康度状态重建完成', { equipment: equipmentCount, samples: sampleCount });
+  return { equipment: equipmentCount, samples: sampleCount };
+}
+
+/**
+ * 状态表为空而已有评估记录时（首次上线）重建，返回重建的设备数
+ */
+export async function ensureHealthState(): Promise<number> {
+  const [state, history] = await Promise.all([
+    prisma.equipmentHealthState.findFirst({ select: { equipmentId: true } }),
+    prisma.equipmentHealthHistory.findFirst({ select: { id: true } }),
+  ]);
+  if (state || !history) return 0;
+  return (await rebuildHealthState()).equipment;
+}
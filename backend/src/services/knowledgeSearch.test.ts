@@ -0,0 +1,57 @@
+/**
+ * 知识库检索切词与高亮单元测试
+ */
+
+import { tokenizeForSearch, highlightText, buildSnippet } from './knowledgeSearch';
+
+jest.mock('../lib/prisma', () => ({ prisma: {} }));
+
+describe('tokenizeForSearch', () => {
+  it('中文索引产生单字和二元组', () => {
+    expect(tokenizeForSearch('设备维护')).toEqual(['设', '备', '维', '护', '设备', '备维', '维护']);
+  });
+
+  it('中文查询只取二元组，单字查询保留单字', () => {
+    expect(tokenizeForSearch('设备维护', 'query')).toEqual(['设备', '备维', '维护']);
+    expect(tokenizeForSearch('泵', 'query')).toEqual(['泵']);
+  });
+
+  it('英文和数字按单词切分并转小写，忽略标点', () => {
+    expect(tokenizeForSearch('VPN 配置, Step-2!', 'query')).toEqual(['vpn', '配置', 'step', '2']);
+  });
+
+  it('重复的词只保留一次', () => {
+    expect(tokenizeForSearch('OA oa Oa', 'query')).toEqual(['oa']);
+  });
+});
+
+describe('highlightText', () => {
+  it('转义 HTML 后高亮关键词', () => {
+    expect(highlightText('<b>设备</b>维护手册', '设备维护')).toBe('&lt;b&gt;<mark>设备</mark>&lt;/b&gt;<mark>维护</mark>手册');
+  });
+
+  it('英文关键词不区分大小写', () => {
+    expect(highlightText('Configure VPN access', 'vpn')).toBe('Configure <mark>VPN</mark> access');
+  });
+
+  it('查询词与实体名相同时不会拆开实体', () => {
+    expect(highlightText('R&D amp <lt>', 'amp')).toBe('R&amp;D <mark>amp</mark> &lt;lt&gt;');
+    expect(highlightText('a < b', 'lt')).toBe('a &lt; b');
+    expect(highlightText('Tom & "Jerry"', 'jerry')).toBe('Tom &amp; &quot;<mark>Jerry</mark>&quot;');
+  });
+});
+
+describe('buildSnippet', () => {
+  it('截取命中位置附近的片段', () => {
+    const text = `${'无关内容'.repeat(50)}如何重置打印机${'结尾'.repeat(50)}`;
+    const snippet = buildSnippet(text, '打印机', 40);
+
+    expect(snippet.startsWith('...')).toBe(true);
+    expect(snippet.endsWith('...')).toBe(true);
+    expect(snippet).toContain('<mark>打印机</mark>');
+  });
+
+  it('未命中时从开头截取并去掉标签', () => {
+    expect(buildSnippet('<p>短文本</p>', '打印机')).toBe('短文本');
+  });
+});
@@ -0,0 +1,231 @@
+/**
+ * 知识库全文检索
+ * 文章的标题/标签、摘要、正文在应用层切词（中文按单字+二元组，其余按单词），
+ * 以 'simple' 配置写入 search_vector 列（GIN 索引），查询时按 ts_rank_cd 排序
+ */
+
+import { Prisma, PrismaClient } from '@prisma/client';
+import { prisma } from '../lib/prisma';
+import logger from '../lib/logger';
+import { escapeHtml } from '../utils/validation';
+
+// 正文参与索引的最大长度（tsvector 有 1MB 上限）
+const MAX_INDEXED_CONTENT_LENGTH = 100000;
+// 重建索引每批文章数
+const REINDEX_BATCH_SIZE = 200;
+// 摘要片段长度
+const SNIPPET_LENGTH = 160;
+
+const CJK_RANGE = '\\u3400-\\u4dbf\\u4e00-\\u9fff\\uf900-\\ufaff';
+const TOKEN_PATTERN = new RegExp(`[${CJK_RANGE}]+|[^\\s${CJK_RANGE}\\p{P}\\p{S}]+`, 'gu');
+const CJK_PATTERN = new RegExp(`^[${CJK_RANGE}]`, 'u');
+
+export interface SearchableArticle {
+  id: string;
+  title: string;
+  summary: string | null;
+  content: string;
+  tags: Prisma.JsonValue | null;
+}
+
+export interface ArticleSearchFilters {
+  categoryId?: string;
+  tag?: string;
+  isPublished?: boolean;
+  authorId?: string;
+}
+
+export interface ArticleSearchHit {
+  id: string;
+  rank: number;
+}
+
+/**
+ * 切词：中文连续片段产生单字和相邻二元组，其他文字按单词（小写）
+ * mode = 'query' 时多字中文只取二元组，保证查询词在文中相邻出现
+ */
+export function tokenizeForSearch(text: string, mode: 'index' | 'query' = 'index'): string[] {
+  const tokens = new Set<string>();
+
+  for (const run of text.toLowerCase().match(TOKEN_PATTERN) || []) {
+    if (!CJK_PATTERN.test(run)) {
+      tokens.add(run);
+      continue;
+    }
+
+    const chars = Array.from(run);
+    if (chars.length === 1 || mode === 'index') {
+      chars.forEach((c) => tokens.add(c));
+    }
+    for (let i = 0; i < chars.length - 1; i++) {
+      tokens.add(chars[i] + chars[i + 1]);
+    }
+  }
+
+  return Array.from(tokens);
+}
+
+/**
+ * 去掉 HTML 标签并合并空白
+ */
+function toPlainText(text: string): string {
+  return text.replace(/<[^>]*>/g, ' ').replace(/\s+/g, ' ').trim();
+}
+
+/**
+ * 高亮用的关键词：原始查询中的词和切词结果，长词优先
+ */
+function highlightTerms(query: string): string[] {
+  const words = query.toLowerCase().split(/\s+/).filter(Boolean);
+  return Array.from(new Set([...words, ...tokenizeForSearch(query, 'query')]))
+    .sort((a, b) => b.length - a.length);
+}
+
+function termsPattern(terms: string[]): RegExp | null {
+  if (terms.length === 0) return null;
+  const escaped = terms.map((t) => t.replace(/[.*+?^${}()|[\]\\]/g, '\\$&'));
+  return new RegExp(`(${escaped.join('|')})`, 'gi');
+}
+
+/**
+ * 高亮文本：在原文上匹配关键词，各片段分别转义 HTML 后再用 <mark> 包裹命中部分
+ * （不能在转义后的文本上匹配，否则 amp、lt 等查询会命中实体内部）
+ */
+export function highlightText(text: string, query: string): string {
+  const pattern = termsPattern(highlightTerms(query));
+  if (!pattern) return escapeHtml(text);
+
+  // split 带捕获组时，奇数下标为命中的关键词
+  return text
+    .split(pattern)
+    .map((part, i) => (i % 2 === 1 ? `<mark>${escapeHtml(part)}</mark>` : escapeHtml(part)))
+    .join('');
+}
+
+/**
+ * 截取第一个命中关键词附近的片段并高亮
+ */
+export function buildSnippet(text: string, query: string, length: number = SNIPPET_LENGTH): string {
+  const plain = toPlainText(text);
+  const lower = plain.toLowerCase();
+
+  const firstHit = highlightTerms(query)
+    .map((term) => lower.indexOf(term))
+    .filter((index) => index >= 0)
+    .reduce((min, index) => Math.min(min, index), Infinity);
+
+  const start = Number.isFinite(firstHit) ? Math.max(0, firstHit - Math.floor(length / 4)) : 0;
+  const end = Math.min(plain.length, start + length);
+  const snippet = plain.slice(start, end);
+
+  return `${start > 0 ? '...' : ''}${highlightText(snippet, query)}${end < plain.length ? '...' : ''}`;
+}
+
+function tagsText(tags: Prisma.JsonValue | null): string {
+  return Array.isArray(tags) ? tags.filter((t) => typeof t === 'string').join(' ') : '';
+}
+
+type DbClient = PrismaClient | Prisma.TransactionClient;
+
+/**
+ * 写入文章的检索向量（标题和标签权重 A，摘要 B，正文 C）
+ * 保存文章时传入事务客户端，与文章内容在同一事务内写入
+ */
+export async function indexArticles(articles: SearchableArticle[], client: DbClient = prisma): Promise<void> {
+  if (articles.length === 0) return;
+
+  const rows = articles.map((a) => Prisma.sql`(
+    ${a.id},
+    ${tokenizeForSearch(`${a.title} ${tagsText(a.tags)}`).join(' ')},
+    ${tokenizeForSearch(a.summary || '').join(' ')},
+    ${tokenizeForSearch(toPlainText(a.content).slice(0, MAX_INDEXED_CONTENT_LENGTH)).join(' ')}
+  )`);
+
+  await client.$executeRaw`
+    UPDATE knowledge_articles AS a
+    SET search_vector =
+      setweight(to_tsvector('simple', v.title), 'A') ||
+      setweight(to_tsvector('simple', v.summary), 'B') ||
+      setweight(to_tsvector('simple', v.content), 'C')
+    FROM (VALUES ${Prisma.join(rows)}) AS v(id, title, summary, content)
+    WHERE a.id = v.id
+  `;
+}
+
+/**
+ * 重建检索索引，onlyMissing 时只处理尚未建立索引的文章（启动时补建）
+ */
+export async function rebuildKnowledgeSearchIndex(onlyMissing: boolean = false): Promise<number> {
+  let indexed = 0;
+  let cursor: string | undefined;
+
+  for (;;) {
+    const batch = onlyMissing
+      ? await prisma.$queryRaw<SearchableArticle[]>`
+          SELECT id, title, summary, content, tags FROM knowledge_articles
+          WHERE search_vector IS NULL
+          ORDER BY id
+          LIMIT ${REINDEX_BATCH_SIZE}
+        `
+      : await prisma.knowledgeArticle.findMany({
+          select: { id: true, title: true, summary: true, content: true, tags: true },
+          orderBy: { id: 'asc' },
+          take: REINDEX_BATCH_SIZE,
+          ...(cursor && { cursor: { id: cursor }, skip: 1 }),
+        });
+    if (batch.length === 0) break;
+
+    await indexArticles(batch);
+    indexed += batch.length;
+    cursor = batch[batch.length - 1].id;
+    if (batch.length < REINDEX_BATCH_SIZE) break;
+  }
+
+  if (indexed > 0) {
+    logger.info('知识库检索索引已更新', { indexed, onlyMissing });
+  }
+  return indexed;
+}
+
+/**
+ * 按相关度检索文章，返回当前页的文章 ID（按相关度排序）和总数
+ */
+export async function searchArticleIds(
+  query: string,
+  filters: ArticleSearchFilters,
+  page: number,
+  limit: number
+): Promise<{ hits: ArticleSearchHit[]; total: number }> {
+  const tokens = tokenizeForSearch(query, 'query');
+  if (tokens.length === 0) return { hits: [], total: 0 };
+
+  const conditions: Prisma.Sql[] = [Prisma.sql`a.search_vector @@ q.query`];
+  if (filters.categoryId) conditions.push(Prisma.sql`a."categoryId" = ${filters.categoryId}`);
+  if (filters.tag) conditions.push(Prisma.sql`a.tags @> ${JSON.stringify([filters.tag])}::jsonb`);
+  if (filters.isPublished !== undefined) conditions.push(Prisma.sql`a."isPublished" = ${filters.isPublished}`);
+  if (filters.authorId) conditions.push(Prisma.sql`a."authorId" = ${filters.authorId}`);
+
+  const rows = await prisma.$queryRaw<Array<{ id: string; rank: number; total: bigint }>>`
+    WITH q AS (SELECT plainto_tsquery('simple', ${tokens.join(' ')}) AS query)
+    SELECT a.id, ts_rank_cd(a.search_vector, q.query)::float8 AS rank, COUNT(*) OVER () AS total
+    FROM knowledge_articles a, q
+    WHERE ${Prisma.join(conditions, ' AND ')}
+    ORDER BY rank DESC, a."helpfulCount" DESC, a."viewCount" DESC, a.id
+    LIMIT ${limit} OFFSET ${(page - 1) * limit}
+  `;
+
+  if (rows.length > 0 || page === 1) {
+    return {
+      hits: rows.map((r) => ({ id: r.id, rank: Number(r.rank) })),
+      total: rows.length > 0 ? Number(rows[0].total) : 0,
+    };
+  }
+
+  // 页码超出范围时单独统计总数
+  const [{ total }] = await prisma.$queryRaw<Array<{ total: bigint }>>`
+    WITH q AS (SELECT plainto_tsquery('simple', ${tokens.join(' ')}) AS query)
+    SELECT COUNT(*) AS total FROM knowledge_articles a, q
+    WHERE ${Prisma.join(conditions, ' AND ')}
+  `;
+  return { hits: [], total: Number(total) };
+}
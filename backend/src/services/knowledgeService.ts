@@ -1,6 +1,14 @@
 import { Prisma, KnowledgeCategory, KnowledgeFeedback } from '@prisma/client';
 import { prisma } from '../lib/prisma';
 import logger from '../lib/logger';
+import {
+  buildSnippet,
+  highlightText,
+  indexArticles,
+  searchArticleIds,
+  ArticleSearchFilters,
+} from './knowledgeSearch';
+import { knowledgeViewCounter } from './viewCounter';
 
 // 附件类型
 export interface Attachment {
@@ -254,15 +262,6 @@ export class KnowledgeService {
         where.tags = { array_contains: tag };
       }
 
-      // 搜索过滤
-      if (search) {
-        where.OR = [
-          { title: { contains: search, mode: 'insensitive' } },
-          { content: { contains: search, mode: 'insensitive' } },
-          { tags: { array_contains: search } },
-        ];
-      }
-
       // 发布状态过滤
       if (isPublished !== undefined) {
         where.isPublished = isPublished;
@@ -286,6 +285,16 @@ export class KnowledgeService {
         }
       }
 
+      // 关键词搜索走全文索引，按相关度排序
+      if (search?.trim()) {
+        return this.searchPage(search, {
+          categoryId,
+          tag,
+          isPublished: where.isPublished as boolean | undefined,
+          authorId,
+        }, page, limit);
+      }
+
       const [total, articles] = await Promise.all([
         prisma.knowledgeArticle.count({ where }),
         prisma.knowledgeArticle.findMany({
@@ -308,7 +317,7 @@ export class KnowledgeService {
       ]);
 
       return {
-        items: articles,
+        items: articles.map((article) => knowledgeViewCounter.overlay(article)),
         total,
         page,
         limit,
@@ -342,7 +351,7 @@ export class KnowledgeService {
         },
       });
 
-      return articles;
+      return articles.map((article) => knowledgeViewCounter.overlay(article));
     } catch (error) {
       logger.error('获取热门文章失败', { error: error instanceof Error ? error.message : '未知错误' });
       throw error;
@@ -402,12 +411,9 @@ export class KnowledgeService {
         return null;
       }
 
-      // 增加浏览量
+      // 增加浏览量（缓冲后定时批量写回）
       if (incrementView) {
-        await prisma.knowledgeArticle.update({
-          where: { id },
-          data: { viewCount: { increment: 1 } },
-        });
+        knowledgeViewCounter.increment(id);
       }
 
       // 获取用户反馈状态
@@ -424,7 +430,7 @@ export class KnowledgeService {
       }
 
       // 格式化返回数据
-      const { author, ...rest } = article;
+      const { author, ...rest } = knowledgeViewCounter.overlay(article);
       return {
         ...rest,
         author: {
@@ -444,27 +450,31 @@ export class KnowledgeService {
    */
   async createArticle(data: CreateArticleRequest, authorId: string) {
     try {
-      const article = await prisma.knowledgeArticle.create({
-        data: {
-          title: data.title,
-          content: data.content,
-          summary: data.summary,
-          categoryId: data.categoryId,
-          tags: data.tags || [],
-          attachments: (data.attachments || []) as unknown as Prisma.InputJsonValue,
-          authorId,
-          isPublished: data.isPublished || false,
-          publishedAt: data.isPublished ? new Date() : null,
-        },
-        include: {
-          category: true,
-          author: {
-            select: { id: true, name: true },
+      // 检索向量与文章在同一事务内写入，不会出现内容已更新而索引仍是旧值的情况
+      return await prisma.$transaction(async (tx) => {
+        const article = await tx.knowledgeArticle.create({
+          data: {
+            title: data.title,
+            content: data.content,
+            summary: data.summary,
+            categoryId: data.categoryId,
+            tags: data.tags || [],
+            attachments: (data.attachments || []) as unknown as Prisma.InputJsonValue,
+            authorId,
+            isPublished: data.isPublished || false,
+            publishedAt: data.isPublished ? new Date() : null,
           },
-        },
-      });
+          include: {
+            category: true,
+            author: {
+              select: { id: true, name: true },
+            },
+          },
+        });
 
-      return article;
+        await indexArticles([article], tx);
+        return article;
+      });
     } catch (error) {
       logger.error('创建文章失败', { error: error instanceof Error ? error.message : '未知错误' });
       throw error;
@@ -505,18 +515,21 @@ export class KnowledgeService {
         }
       }
 
-      const article = await prisma.knowledgeArticle.update({
-        where: { id },
-        data: updateData,
-        include: {
-          category: true,
-          author: {
-            select: { id: true, name: true },
+      return await prisma.$transaction(async (tx) => {
+        const article = await tx.knowledgeArticle.update({
+          where: { id },
+          data: updateData,
+          include: {
+            category: true,
+            author: {
+              select: { id: true, name: true },
+            },
           },
-        },
-      });
+        });
 
-      return article;
+        await indexArticles([article], tx);
+        return article;
+      });
     } catch (error) {
       logger.error('更新文章失败', { error: error instanceof Error ? error.message : '未知错误', id });
       throw error;
@@ -598,46 +611,20 @@ export class KnowledgeService {
   }
 
   /**
-   * 全文搜索
+   * 全文搜索（已发布文章，按相关度排序，带高亮片段）
    */
-  async searchArticles(query: string, limit: number = 20) {
+  async searchArticles(query: string, page: number = 1, limit: number = 20) {
     try {
-      const articles = await prisma.knowledgeArticle.findMany({
-        where: {
-          isPublished: true,
-          OR: [
-            { title: { contains: query, mode: 'insensitive' } },
-            { content: { contains: query, mode: 'insensitive' } },
-            { summary: { contains: query, mode: 'insensitive' } },
-            { tags: { array_contains: query } },
-          ],
-        },
-        take: limit,
-        orderBy: [
-          { helpfulCount: 'desc' },
-          { viewCount: 'desc' },
-        ],
-        include: {
-          category: {
-            select: { id: true, name: true },
-          },
-          author: {
-            select: { id: true, name: true },
-          },
-        },
-      });
+      const result = await this.searchPage(query, { isPublished: true }, page, limit);
 
-      // 高亮处理
-      const highlightedArticles = articles.map((article) => ({
-        ...article,
-        highlightedTitle: this.highlightText(article.title, query),
-        highlightedSummary: this.highlightText(
-          article.summary || article.content.substring(0, 200) + '...',
-          query
-        ),
-      }));
-
-      return highlightedArticles;
+      return {
+        ...result,
+        items: result.items.map((article) => ({
+          ...article,
+          highlightedTitle: highlightText(article.title, query),
+          highlightedSummary: buildSnippet(article.content, query),
+        })),
+      };
     } catch (error) {
       logger.error('搜索文章失败', { error: error instanceof Error ? error.message : '未知错误' });
       throw error;
@@ -645,12 +632,42 @@ export class KnowledgeService {
   }
 
   /**
-   * 高亮文本
+   * 按全文索引检索一页文章，保持相关度顺序
    */
-  private highlightText(text: string, query: string): string {
-    if (!query) return text;
-    const regex = new RegExp(`(${query.replace(/[.*+?^${}()|[\]\\]/g, '\\$&')})`, 'gi');
-    return text.replace(regex, '<mark>$1</mark>');
+  private async searchPage(
+    query: string,
+    filters: ArticleSearchFilters,
+    page: number,
+    limit: number
+  ) {
+    const { hits, total } = await searchArticleIds(query, filters, page, limit);
+
+    const articles = hits.length === 0 ? [] : await prisma.knowledgeArticle.findMany({
+      where: { id: { in: hits.map((h) => h.id) } },
+      include: {
+        category: {
+          select: { id: true, name: true },
+        },
+        author: {
+          select: { id: true, name: true, avatar: true },
+        },
+        _count: {
+          select: { feedbacks: true },
+        },
+      },
+    });
+    const byId = new Map(articles.map((a) => [a.id, a]));
+
+    return {
+      items: hits
+        .map((h) => byId.get(h.id))
+        .filter((a): a is NonNullable<typeof a> => Boolean(a))
+        .map((a) => knowledgeViewCounter.overlay(a)),
+      total,
+      page,
+      limit,
+      totalPages: Math.ceil(total / limit),
+    };
   }
 
   /**
@@ -0,0 +1,101 @@
+/**
+ * 邮件队列单元测试
+ */
+
+import { buildDigest, computeBackoffMs, groupByRecipient, normalizeRecipients, MailJobPayload } from './mailQueue';
+import { generateEmailTemplate } from './email';
+
+jest.mock('nodemailer', () => ({
+  __esModule: true,
+  default: { createTransport: jest.fn(() => ({ sendMail: jest.fn(), close: jest.fn() })) },
+}));
+
+jest.mock('../lib/prisma', () => ({ prisma: {} }));
+
+jest.mock('../config', () => ({
+  config: {
+    email: {
+      smtp: { host: 'localhost', port: 1025, secure: false, auth: { user: '', pass: '' } },
+      from: 'OA <oa@example.com>',
+      retryDelay: 1000,
+      maxRetries: 5,
+      pool: { maxConnections: 1, rateLimit: 5 },
+      queue: { pollIntervalMs: 1000, batchSize: 10 },
+    },
+    log: { level: 'error' },
+  },
+}));
+
+const makeJob = (id: string, recipient: string, subject = `主题${id}`): MailJobPayload => ({
+  id,
+  recipient,
+  subject,
+  html: `<html><body><p>内容${id}</p></body></html>`,
+  reference: null,
+  attempts: 0,
+});
+
+describe('mailQueue', () => {
+  it('规范化收件人：拆分逗号、去空、去重', () => {
+    expect(normalizeRecipients('a@x.com, b@x.com,,a@x.com')).toEqual(['a@x.com', 'b@x.com']);
+    expect(normalizeRecipients(['a@x.com', ' ', 'c@x.com'])).toEqual(['a@x.com', 'c@x.com']);
+    expect(normalizeRecipients(null)).toEqual([]);
+  });
+
+  it('指数退避并有上限', () => {
+    expect(computeBackoffMs(1)).toBe(1000);
+    expect(computeBackoffMs(2)).toBe(2000);
+    expect(computeBackoffMs(4)).toBe(8000);
+    expect(computeBackoffMs(30)).toBe(60 * 60 * 1000);
+  });
+
+  it('按收件人分组（不区分大小写）', () => {
+    const groups = groupByRecipient([
+      makeJob('1', 'a@x.com'),
+      makeJob('2', 'b@x.com'),
+      makeJob('3', 'A@x.com'),
+    ]);
+
+    expect([...groups.values()].map((g) => g.map((j) => j.id))).toEqual([['1', '3'], ['2']]);
+  });
+
+  it('单封邮件原样发送，多封合并为摘要', () => {
+    const single = makeJob('1', 'a@x.com');
+    expect(buildDigest([single])).toEqual({ subject: single.subject, html: single.html });
+
+    const digest = buildDigest([makeJob('1', 'a@x.com'), makeJob('2', 'a@x.com')]);
+    expect(digest.subject).toContain('2 条新通知');
+    expect(digest.html).toContain('<p>内容1</p>');
+    expect(digest.html).toContain('<p>内容2</p>');
+    expect(digest.html.match(/<body/g)).toHaveLength(1);
+
+    const escaped = buildDigest([makeJob('1', 'a@x.com', '<b>审批</b> & 通知'), makeJob('2', 'a@x.com')]);
+    expect(escaped.html).toContain('&lt;b&gt;审批&lt;/b&gt; &amp; 通知');
+  });
+
+  it('摘要保留各邮件模板的样式，并限定在各自区块内', () => {
+    const template = (applicationNo: string, priority: string) => generateEmailTemplate({
+      title: '待审批',
+      applicant: '张三',
+      applicationNo,
+      department: '生产部',
+      date: '2026-03-01',
+      content: '采购申请',
+      priority,
+      status: '待审批',
+      actionText: '去审批',
+      actionUrl: 'http://localhost/approval',
+    });
+    const digest = buildDigest([
+      { ...makeJob('1', 'a@x.com'), html: template('A-1', 'URGENT') },
+      { ...makeJob('2', 'a@x.com'), html: template('A-2', 'LOW') },
+    ]);
+
+    expect(digest.html).toMatch(/\.digest-item-0 \.button \{[^}]*background: #2563eb/);
+    expect(digest.html).toMatch(/\.digest-item-1 \.button \{/);
+    expect(digest.html).toMatch(/\.digest-item-0 \.priority \{ color: #dc2626/);
+    expect(digest.html).toMatch(/\.digest-item-1 \.priority \{ color: #6b7280/);
+    expect(digest.html).toContain('<div class="digest-item-1"');
+    expect(digest.html.match(/<style/g)).toHaveLength(1);
+  });
+});
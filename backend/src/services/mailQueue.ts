@@ -0,0 +1,339 @@
+/**
+ * 邮件发送队列
+ * 业务代码只把邮件写入 mail_jobs 表，后台 worker 通过 SMTP 连接池（带限速）发送：
+ * 同一收件人同批待发的多封邮件合并为一封，失败按指数退避重试，超过最大次数标记为 FAILED
+ * 本地测试可把 SMTP_HOST/SMTP_PORT 指向 MailHog、smtp4dev 等 SMTP 替身
+ */
+
+import nodemailer from 'nodemailer';
+import { config } from '../config';
+import { prisma } from '../lib/prisma';
+import logger from '../lib/logger';
+import { escapeHtml } from '../utils/validation';
+
+const QUEUE_CONFIG = {
+  // 轮询间隔（毫秒），入队时会立即唤醒 worker
+  POLL_INTERVAL_MS: config.email.queue.pollIntervalMs,
+  // 每次领取的任务数
+  BATCH_SIZE: config.email.queue.batchSize,
+  // 最大尝试次数
+  MAX_ATTEMPTS: config.email.maxRetries,
+  // 退避上限
+  MAX_BACKOFF_MS: 60 * 60 * 1000,
+  // 发送中超过该时间视为 worker 已退出，重新放回队列
+  STALE_LOCK_MS: 10 * 60 * 1000,
+  // 已发送任务保留天数
+  SENT_RETENTION_DAYS: 7,
+};
+
+// SMTP 连接池：复用连接，并限制每秒发送数
+const transporter = nodemailer.createTransport({
+  pool: true,
+  host: config.email.smtp.host,
+  port: config.email.smtp.port,
+  secure: config.email.smtp.secure,
+  // 本地 SMTP 替身通常不需要认证
+  auth: config.email.smtp.auth.user
+    ? { user: config.email.smtp.auth.user, pass: config.email.smtp.auth.pass }
+    : undefined,
+  maxConnections: config.email.pool.maxConnections,
+  rateDelta: 1000,
+  rateLimit: config.email.pool.rateLimit,
+});
+
+export interface MailJobPayload {
+  id: string;
+  recipient: string;
+  subject: string;
+  html: string;
+  reference: string | null;
+  attempts: number;
+}
+
+/**
+ * 直接发送一封邮件（失败抛出异常），队列 worker 和测试邮件接口使用
+ */
+export async function deliverEmail(to: string | string[], subject: string, html: string): Promise<string> {
+  const info = await transporter.sendMail({
+    from: config.email.from,
+    to: Array.isArray(to) ? to.join(',') : to,
+    subject,
+    html,
+  });
+  return info.messageId;
+}
+
+/**
+ * 规范化收件人：支持数组或逗号分隔的字符串，去空去重
+ */
+export function normalizeRecipients(recipients: string | string[] | null | undefined): string[] {
+  const list = Array.isArray(recipients) ? recipients : (recipients || '').split(',');
+  return [...new Set(list.map((r) => r.trim()).filter(Boolean))];
+}
+
+/**
+ * 第 attempts 次失败后的重试延迟：retryDelay * 2^(attempts-1)，不超过上限
+ */
+export function computeBackoffMs(attempts: number): number {
+  return Math.min(config.email.retryDelay * 2 ** Math.max(0, attempts - 1), QUEUE_CONFIG.MAX_BACKOFF_MS);
+}
+
+/**
+ * 按收件人分组（保持领取顺序）
+ */
+export function groupByRecipient(jobs: MailJobPayload[]): Map<string, MailJobPayload[]> {
+  const groups = new Map<string, MailJobPayload[]>();
+  jobs.forEach((job) => {
+    const key = job.recipient.toLowerCase();
+    groups.set(key, [...(groups.get(key) || []), job]);
+  });
+  return groups;
+}
+
+/**
+ * 把邮件 <head> 中的样式限定到摘要中该邮件所在的区块，
+ * 各模板同名 class 的规则不同（如 .header、.priority），直接合并会互相覆盖
+ */
+export function scopeStyles(html: string, scope: string): string {
+  const css = Array.from(html.matchAll(/<style[^>]*>([\s\S]*?)<\/style>/gi), (m) => m[1]).join('\n');
+  return css.replace(/([^{}]+)\{([^{}]*)\}/g, (_rule, selectors: string, body: string) => {
+    const scoped = selectors
+      .split(',')
+      .map((selector) => selector.trim())
+      .filter(Boolean)
+      .map((selector) => (/^(html|body)$/i.test(selector) ? `.${scope}` : `.${scope} ${selector}`));
+    return `\n    ${scoped.join(', ')} {${body}}`;
+  }).trimEnd();
+}
+
+/**
+ * 同一收件人的多封邮件合并为一封，单封邮件原样发送
+ */
+export function buildDigest(jobs: MailJobPayload[]): { subject: string; html: string } {
+  if (jobs.length === 1) {
+    return { subject: jobs[0].subject, html: jobs[0].html };
+  }
+
+  const styles: string[] = [];
+  const sections = jobs.map((job, index) => {
+    const scope = `digest-item-${index}`;
+    styles.push(scopeStyles(job.html, scope));
+    // 各邮件都是完整 HTML 文档，只取 body 部分，样式由 scopeStyles 带入；主题是纯文本，需转义后才能放进标题
+    const body = /<body[^>]*>([\s\S]*?)<\/body>/i.exec(job.html)?.[1] ?? job.html;
+    return `<div class="${scope}" style="margin-bottom: 24px;"><h3 style="margin: 0 0 8px;">${escapeHtml(job.subject)}</h3>${body}</div>`;
+  });
+
+  return {
+    subject: `【OA系统】您有 ${jobs.length} 条新通知`,
+    html: `<!DOCTYPE html>
+<html>
+<head>
+  <meta charset="UTF-8">
+  <style>${styles.join('')}
+  </style>
+</head>
+<body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+${sections.join('\n<hr style="border: none; border-top: 1px solid #e5e7eb; margin: 24px 0;">\n')}
+</body>
+</html>`,
+  };
+}
+
+/**
+ * 邮件入队，返回入队的邮件数（每个收件人一封）
+ */
+export async function enqueueEmail(
+  recipients: string | string[],
+  subject: string,
+  html: string,
+  reference: string | null = null
+): Promise<number> {
+  const list = normalizeRecipients(recipients);
+  if (list.length === 0) return 0;
+
+  await prisma.mailJob.createMany({
+    data: list.map((recipient) => ({ recipient, subject, html, reference })),
+  });
+  wakeMailQueue();
+  return list.length;
+}
+
+/**
+ * 领取一批到期任务（SKIP LOCKED，多实例部署时不会重复领取）
+ */
+async function claimJobs(): Promise<MailJobPayload[]> {
+  return prisma.$queryRaw<MailJobPayload[]>`
+    UPDATE mail_jobs
+    SET status = 'SENDING', locked_at = NOW(), updated_at = NOW()
+    WHERE id IN (
+      SELECT id FROM mail_jobs
+      WHERE status = 'PENDING' AND next_attempt_at <= NOW()
+      ORDER BY next_attempt_at
+      LIMIT ${QUEUE_CONFIG.BATCH_SIZE}
+      FOR UPDATE SKIP LOCKED
+    )
+    RETURNING id, recipient, subject, html, reference, attempts
+  `;
+}
+
+/**
+ * 发送同一收件人的一组邮件并回写状态
+ */
+async function sendGroup(jobs: MailJobPayload[]): Promise<boolean> {
+  const { subject, html } = buildDigest(jobs);
+  const ids = jobs.map((job) => job.id);
+
+  try {
+    const messageId = await deliverEmail(jobs[0].recipient, subject, html);
+    await prisma.mailJob.updateMany({
+      where: { id: { in: ids } },
+      data: { status: 'SENT', sentAt: new Date(), lockedAt: null, lastError: null },
+    });
+    logger.info('邮件发送成功', {
+      messageId,
+      merged: jobs.length,
+      references: jobs.map((job) => job.reference).filter(Boolean),
+    });
+    return true;
+  } catch (error) {
+    const lastError = (error as Error).message;
+    await Promise.all(jobs.map((job) => {
+      const attempts = job.attempts + 1;
+      const failed = attempts >= QUEUE_CONFIG.MAX_ATTEMPTS;
+      return prisma.mailJob.update({
+        where: { id: job.id },
+        data: {
+          status: failed ? 'FAILED' : 'PENDING',
+          attempts,
+          nextAttemptAt: new Date(Date.now() + computeBackoffMs(attempts)),
+          lockedAt: null,
+          lastError,
+        },
+      });
+    }));
+    logger.warn('邮件发送失败，已安排重试', { recipient: jobs[0].recipient, merged: jobs.length, error: lastError });
+    return false;
+  }
+}
+
+/**
+ * 处理队列直到没有到期任务，返回发送成功的邮件数（合并前）
+ */
+export async function processMailQueue(): Promise<number> {
+  let sent = 0;
+
+  for (;;) {
+    const jobs = await claimJobs();
+    if (jobs.length === 0) break;
+
+    // 不同收件人并行发送，由连接池控制并发和速率
+    const groups = [...groupByRecipient(jobs).values()];
+    const results = await Promise.all(groups.map((group) => sendGroup(group)));
+    results.forEach((ok, i) => {
+      if (ok) sent += groups[i].length;
+    });
+  }
+
+  return sent;
+}
+
+/**
+ * 回收 worker 异常退出时遗留的发送中任务，并清理过期的已发送任务
+ */
+async function maintainMailQueue(): Promise<void> {
+  const staleBefore = new Date(Date.now() - QUEUE_CONFIG.STALE_LOCK_MS);
+  const retentionCutoff = new Date(Date.now() - QUEUE_CONFIG.SENT_RETENTION_DAYS * 24 * 60 * 60 * 1000);
+
+  await Promise.all([
+    prisma.mailJob.updateMany({
+      where: { status: 'SENDING', lockedAt: { lt: staleBefore } },
+      data: { status: 'PENDING', lockedAt: null },
+    }),
+    prisma.mailJob.deleteMany({
+      where: { status: 'SENT', sentAt: { lt: retentionCutoff } },
+    }),
+  ]);
+}
+
+/**
+ * 队列状态统计
+ */
+export async function getMailQueueStats() {
+  const [byStatus, oldestPending] = await Promise.all([
+    prisma.mailJob.groupBy({ by: ['status'], _count: { _all: true } }),
+    prisma.mailJob.findFirst({
+      where: { status: 'PENDING' },
+      orderBy: { createdAt: 'asc' },
+      select: { createdAt: true },
+    }),
+  ]);
+
+  return {
+    counts: Object.fromEntries(byStatus.map((row) => [row.status, row._count._all])),
+    oldestPendingAt: oldestPending?.createdAt || null,
+  };
+}
+
+// ============================================
+// Worker 调度
+// ============================================
+
+let workerStarted = false;
+let running = false;
+let timer: NodeJS.Timeout | null = null;
+let lastMaintainedAt = 0;
+
+async function runWorker(): Promise<void> {
+  if (running) return;
+  running = true;
+  timer = null;
+
+  try {
+    if (Date.now() - lastMaintainedAt >= QUEUE_CONFIG.STALE_LOCK_MS) {
+      await maintainMailQueue();
+      lastMaintainedAt = Date.now();
+    }
+    await processMailQueue();
+  } catch (error) {
+    logger.error('邮件队列处理失败', { error: error instanceof Error ? error.message : String(error) });
+  } finally {
+    running = false;
+    scheduleWorker(QUEUE_CONFIG.POLL_INTERVAL_MS);
+  }
+}
+
+function scheduleWorker(delay: number): void {
+  if (!workerStarted) return;
+  if (timer) clearTimeout(timer);
+  timer = setTimeout(runWorker, delay);
+}
+
+/**
+ * 有新邮件入队时立即唤醒 worker（worker 未启动时等待下次启动处理）
+ */
+function wakeMailQueue(): void {
+  if (!running) scheduleWorker(0);
+}
+
+/**
+ * 启动邮件队列 worker
+ */
+export function startMailQueueWorker(): void {
+  if (workerStarted) return;
+  workerStarted = true;
+  scheduleWorker(0);
+  logger.info('邮件队列已启动', {
+    pollIntervalMs: QUEUE_CONFIG.POLL_INTERVAL_MS,
+    rateLimitPerSecond: config.email.pool.rateLimit,
+  });
+}
+
+/**
+ * 停止 worker 并关闭 SMTP 连接池（未发送的任务保留在队列中）
+ */
+export function stopMailQueueWorker(): void {
+  workerStarted = false;
+  if (timer) clearTimeout(timer);
+  timer = null;
+  transporter.close();
+}
@@ -33,7 +33,7 @@ async function cleanupReadNotifications(): Promise<number> {
 }
 
 /**
- * 清理过期的系统广播通知（userId = 'system'）
+ * 清理过期的系统广播通知（旧版 userId = 'system'，以及批量通知写入的带 broadcastId 的记录）
  */
 async function cleanupOldBroadcastNotifications(): Promise<number> {
   const cutoffDate = new Date();
@@ -41,7 +41,10 @@ async function cleanupOldBroadcastNotifications(): Promise<number> {
 
   const result = await prisma.notification.deleteMany({
     where: {
-      userId: 'system',
+      OR: [
+        { userId: 'system' },
+        { data: { path: ['broadcastId'], string_starts_with: 'broadcast_' } },
+      ],
       createdAt: {
         lt: cutoffDate,
       },
@@ -4,7 +4,8 @@ import * as logger from '../lib/logger';
 import {
   sendNotificationToUser,
   updateUnreadCount,
-  broadcastToAllOnlineUsers,
+  broadcastToAudience,
+  NotificationAudience,
 } from './socketService';
 import { sendEmailNotification } from './email';
 import { getCEOApprovalThreshold } from './approvalConfig.service';
@@ -26,6 +27,24 @@ async function shouldSendEmail(userId: string): Promise<boolean> {
   }
 }
 
+/**
+ * 批量过滤关闭了邮件通知的用户（一次查询）
+ */
+async function filterEmailRecipients<T extends { id: string }>(users: T[]): Promise<T[]> {
+  if (users.length === 0) return users;
+  try {
+    const optedOut = await prisma.userPreference.findMany({
+      where: { userId: { in: users.map((u) => u.id) }, emailNotifications: false },
+      select: { userId: true },
+    });
+    const optedOutIds = new Set(optedOut.map((p) => p.userId));
+    return users.filter((u) => !optedOutIds.has(u.id));
+  } catch (error) {
+    logger.error('批量获取用户邮件偏好失败', { error });
+    return users; // 出错时默认发送
+  }
+}
+
 /**
  * 检查用户是否启用了审批通知
  */
@@ -96,6 +115,90 @@ export interface PaginatedNotifications {
   totalPages: number;
 }
 
+// 批量通知每次插入的行数
+const FANOUT_CHUNK_SIZE = 1000;
+
+// 批量通知的广播 ID 前缀，推送给客户端的通知 ID 即广播 ID
+const BROADCAST_ID_PREFIX = 'broadcast_';
+
+/**
+ * 通知归属查询条件：客户端持有的可能是广播 ID，对应该用户自己的那条记录
+ */
+function ownedNotificationWhere(
+  notificationId: string,
+  userId: string
+): Prisma.NotificationWhereInput {
+  if (notificationId.startsWith(BROADCAST_ID_PREFIX)) {
+    return { userId, data: { path: ['broadcastId'], equals: notificationId } };
+  }
+  return { id: notificationId, userId };
+}
+
+/**
+ * 受众对应的在职用户查询条件
+ */
+function audienceUserWhere(audience: NotificationAudience): Prisma.UserWhereInput | null {
+  if (audience.all) return { isActive: true };
+
+  const conditions: Prisma.UserWhereInput[] = [];
+  if (audience.roles?.length) conditions.push({ role: { in: audience.roles } });
+  if (audience.departmentIds?.length) conditions.push({ departmentId: { in: audience.departmentIds } });
+  if (audience.userIds?.length) conditions.push({ id: { in: audience.userIds } });
+
+  return conditions.length > 0 ? { isActive: true, OR: conditions } : null;
+}
+
+/**
+ * 批量通知：按受众分块 createMany 写入，再按房间推送一次
+ * 客户端收到推送后自行累加未读数，不再逐个用户查询未读数量
+ */
+export async function fanOutNotification(
+  audience: NotificationAudience,
+  payload: Omit<CreateNotificationData, 'userId'>
+): Promise<{ broadcastId: string; recipients: Array<{ id: string; email: string | null }> }> {
+  const broadcastId = `${BROADCAST_ID_PREFIX}${Date.now()}_${Math.random().toString(36).slice(2, 8)}`;
+  const where = audienceUserWhere(audience);
+  if (!where) return { broadcastId, recipients: [] };
+
+  const recipients = await prisma.user.findMany({
+    where,
+    select: { id: true, email: true },
+  });
+  if (recipients.length === 0) return { broadcastId, recipients };
+
+  const createdAt = new Date();
+  const data = { ...payload.data, broadcastId };
+
+  for (let i = 0; i < recipients.length; i += FANOUT_CHUNK_SIZE) {
+    await prisma.notification.createMany({
+      data: recipients.slice(i, i + FANOUT_CHUNK_SIZE).map((user) => ({
+        userId: user.id,
+        type: payload.type,
+        title: payload.title,
+        content: payload.content,
+        data: data as Prisma.InputJsonValue,
+        createdAt,
+      })),
+    });
+  }
+
+  await broadcastToAudience(audience, {
+    id: broadcastId,
+    userId: '',
+    type: payload.type,
+    title: payload.title,
+    content: payload.content,
+    data: data as Prisma.JsonObject,
+    isRead: false,
+    readAt: null,
+    createdAt,
+    updatedAt: createdAt,
+  });
+
+  logger.info(`批量通知创建成功: ${broadcastId}`, { recipients: recipients.length });
+  return { broadcastId, recipients };
+}
+
 /**
  * 创建通知并实时推送
  */
@@ -195,10 +298,7 @@ export async function markAsRead(
 ): Promise<Notification | null> {
   // 验证通知所有权
   const notification = await prisma.notification.findFirst({
-    where: {
-      id: notificationId,
-      userId,
-    },
+    where: ownedNotificationWhere(notificationId, userId),
   });
 
   if (!notification) {
@@ -207,7 +307,7 @@ export async function markAsRead(
 
   // 更新为已读
   const updated = await prisma.notification.update({
-    where: { id: notificationId },
+    where: { id: notification.id },
     data: {
       isRead: true,
       readAt: new Date(),
@@ -252,10 +352,7 @@ export async function deleteNotification(
 ): Promise<boolean> {
   // 验证通知所有权
   const notification = await prisma.notification.findFirst({
-    where: {
-      id: notificationId,
-      userId,
-    },
+    where: ownedNotificationWhere(notificationId, userId),
   });
 
   if (!notification) {
@@ -264,7 +361,7 @@ export async function deleteNotification(
 
   // 删除通知
   await prisma.notification.delete({
-    where: { id: notificationId },
+    where: { id: notification.id },
   });
 
   // 如果删除的是未读通知，更新未读数量
@@ -293,30 +390,23 @@ export async function deleteAllRead(userId: string): Promise<number> {
 
 /**
  * 发送系统广播通知
- * 广播给所有在线用户，不存储在数据库中（或仅存储为系统日志）
+ * 为受众内的每位在职用户写入一条通知（默认全员），并按房间实时推送
  */
 export async function sendSystemBroadcast(
   title: string,
   content: string,
-  data?: Record<string, unknown>
+  data?: Record<string, unknown>,
+  audience: NotificationAudience = { all: true }
 ): Promise<number> {
-  // 构建广播通知对象（不存储在数据库中）
-  const broadcastNotification = {
-    id: `broadcast_${Date.now()}`,
+  const { recipients } = await fanOutNotification(audience, {
     type: NotificationType.SYSTEM,
     title,
     content,
-    data: data as Prisma.InputJsonValue,
-    isRead: false,
-    createdAt: new Date(),
-    updatedAt: new Date(),
-  };
-
-  // 广播给所有在线用户
-  const onlineCount = await broadcastToAllOnlineUsers(broadcastNotification as Notification);
+    data,
+  });
 
-  logger.info(`系统广播发送成功: ${title}, 在线用户数: ${onlineCount}`);
-  return onlineCount;
+  logger.info(`系统广播发送成功: ${title}, 接收人数: ${recipients.length}`);
+  return recipients.length;
 }
 
 /**
@@ -357,10 +447,7 @@ export async function getNotificationById(
   userId: string
 ): Promise<Notification | null> {
   return prisma.notification.findFirst({
-    where: {
-      id: notificationId,
-      userId,
-    },
+    where: ownedNotificationWhere(notificationId, userId),
   });
 }
 
@@ -377,36 +464,26 @@ export async function notifyHighAmountApproval(
   if (amount < threshold) return;
 
   try {
-    // 获取财务人员（role为FINANCE或特定用户ID）
-    const financeUsers = await prisma.user.findMany({
-      where: {
-        OR: [
-          { role: 'FINANCE' },
-          { id: 'E10015' }
-        ],
-        isActive: true
-      }
-    });
-
-    // 发送系统通知
-    for (const user of financeUsers) {
-      await createNotification({
-        userId: user.id,
+    // 通知财务人员（role为FINANCE或特定用户ID）
+    const { recipients } = await fanOutNotification(
+      { roles: ['FINANCE'], userIds: ['E10015'] },
+      {
         type: NotificationType.SYSTEM,
         title: '高金额申请审批通过',
         content: `申请金额 ¥${amount.toLocaleString()} 已审批通过，申请人: ${applicantName}`,
-        data: { applicationId, amount }
-      });
-
-      // 检查用户邮件偏好后再发送邮件
-      if (user.email && await shouldSendEmail(user.id)) {
-        await sendEmailNotification(
-          user.email,
-          '高金额申请审批通过通知',
-          generateHighAmountEmailContent(applicationId, amount, applicantName),
-          applicationId
-        );
+        data: { applicationId, amount },
       }
+    );
+
+    // 过滤邮件偏好后一次性入队
+    const emailRecipients = await filterEmailRecipients(recipients.filter((u) => Boolean(u.email)));
+    if (emailRecipients.length > 0) {
+      await sendEmailNotification(
+        emailRecipients.map((u) => u.email!),
+        '高金额申请审批通过通知',
+        generateHighAmountEmailContent(applicationId, amount, applicantName),
+        applicationId
+      );
     }
 
     // 标记已通知
@@ -415,7 +492,7 @@ export async function notifyHighAmountApproval(
       data: { highAmountNotified: true }
     });
 
-    logger.info(`高金额申请已通知 ${financeUsers.length} 位财务人员`, { applicationId, amount });
+    logger.info(`高金额申请已通知 ${recipients.length} 位财务人员`, { applicationId, amount });
   } catch (error) {
     logger.error('高金额通知失败', { error: error instanceof Error ? error.message : String(error), applicationId });
   }
@@ -3,6 +3,7 @@ import { verifySync, generateSecret } from 'otplib';
 import { prisma } from '../lib/prisma';
 import logger from '../lib/logger';
 import { config } from '../config';
+import { userCache } from './userCache';
 import type {
   Theme,
   InterfaceDensity,
@@ -116,6 +117,9 @@ export async function updateBasicInfo(userId: string, data: UpdateBasicInfoData)
     },
   });
 
+  // 姓名属于认证缓存的投影字段
+  if (data.name) userCache.invalidate(userId);
+
   // 格式化返回数据
   return {
     ...user,
@@ -1,4 +1,4 @@
-import { ApplicationStatus, Priority } from '@prisma/client';
+import { ApplicationStatus, Prisma, Priority } from '@prisma/client';
 import { sendEmailNotification, generateEmailTemplate } from './email';
 import { config } from '../config';
 import { prisma } from '../lib/prisma';
@@ -134,8 +134,127 @@ function getReminderInterval(priority: Priority, reminderCount: number, settings
   }
 }
 
+/**
+ * 计算下一次提醒时间
+ * @param reminderCount 已发送的提醒次数
+ * @param from 最近一次提醒时间（尚未提醒时为提交时间）
+ */
+export function computeNextReminderAt(priority: Priority, reminderCount: number, from: Date, settings = getReminderSettings()): Date {
+  const interval = getReminderInterval(priority, reminderCount, settings);
+  return new Date(from.getTime() + interval * 60 * 60 * 1000);
+}
+
+// 待审批状态
+const PENDING_STATUSES: ApplicationStatus[] = [
+  ApplicationStatus.PENDING_FACTORY,
+  ApplicationStatus.PENDING_DIRECTOR,
+  ApplicationStatus.PENDING_MANAGER,
+  ApplicationStatus.PENDING_CEO,
+];
+
+// 每小时检查一次
+const CHECK_INTERVAL = 60 * 60 * 1000;
+// 每批处理的到期申请数
+const REMINDER_BATCH_SIZE = 200;
+
+/**
+ * 批量写入下次提醒时间（原生 SQL，不更新 updatedAt，避免触发报表汇总重算）
+ */
+async function setNextReminderAt(entries: Array<{ id: string; at: Date }>): Promise<void> {
+  if (entries.length === 0) return;
+  const values = entries.map((e) => Prisma.sql`(${e.id}, ${e.at}::timestamp)`);
+  await prisma.$executeRaw`
+    UPDATE "Application" AS a
+    SET "nextReminderAt" = v.next_at
+    FROM (VALUES ${Prisma.join(values)}) AS v(id, next_at)
+    WHERE a.id = v.id
+  `;
+}
+
+/**
+ * 按当前提醒设置重新计算待审批申请的下次提醒时间
+ * 提醒设置变更后全量重算；调度器启动时只回填缺失的（onlyMissing）
+ */
+export async function rescheduleReminders(onlyMissing = false): Promise<number> {
+  const settings = getReminderSettings();
+  let lastId: string | undefined;
+  let total = 0;
+
+  for (;;) {
+    // 只回填缺失时，已处理的行写入后不再满足条件，每次从头取剩余的即可；
+    // 全量重算时按 id 递增翻页
+    const apps = await prisma.application.findMany({
+      where: {
+        status: { in: PENDING_STATUSES },
+        ...(onlyMissing ? { nextReminderAt: null } : lastId && { id: { gt: lastId } }),
+      },
+      orderBy: { id: 'asc' },
+      take: REMINDER_BATCH_SIZE,
+      select: {
+        id: true,
+        priority: true,
+        submittedAt: true,
+        reminderLogs: { orderBy: { sentAt: 'desc' }, take: 1, select: { sentAt: true } },
+        _count: { select: { reminderLogs: true } },
+      },
+    });
+    if (apps.length === 0) break;
+
+    await setNextReminderAt(apps.map((app) => ({
+      id: app.id,
+      at: computeNextReminderAt(
+        app.priority,
+        app._count.reminderLogs,
+        app.reminderLogs[0]?.sentAt || app.submittedAt || new Date(),
+        settings
+      ),
+    })));
+    total += apps.length;
+
+    if (apps.length < REMINDER_BATCH_SIZE) break;
+    lastId = apps[apps.length - 1].id;
+  }
+
+  return total;
+}
+
+/**
+ * 查询一批申请当前审批级别的待处理审批人邮箱
+ */
+async function getPendingApproverEmails(
+  apps: Array<{ id: string; status: ApplicationStatus }>
+): Promise<Map<string, string[]>> {
+  const idsOf = (status: ApplicationStatus) => apps.filter((a) => a.status === status).map((a) => a.id);
+  const query = { action: 'PENDING' as const };
+  const select = { applicationId: true, approver: { select: { email: true } } };
+
+  const [factory, director, manager, ceo] = await Promise.all([
+    prisma.factoryApproval.findMany({ where: { ...query, applicationId: { in: idsOf(ApplicationStatus.PENDING_FACTORY) } }, select }),
+    prisma.directorApproval.findMany({ where: { ...query, applicationId: { in: idsOf(ApplicationStatus.PENDING_DIRECTOR) } }, select }),
+    prisma.managerApproval.findMany({ where: { ...query, applicationId: { in: idsOf(ApplicationStatus.PENDING_MANAGER) } }, select }),
+    prisma.ceoApproval.findMany({ where: { ...query, applicationId: { in: idsOf(ApplicationStatus.PENDING_CEO) } }, select }),
+  ]);
+
+  const recipients = new Map<string, string[]>();
+  [...factory, ...director, ...manager, ...ceo].forEach((row) => {
+    if (!row.approver.email) return;
+    const list = recipients.get(row.applicationId) || [];
+    list.push(row.approver.email);
+    recipients.set(row.applicationId, list);
+  });
+  return recipients;
+}
+
+const ACTION_TEXT: Partial<Record<ApplicationStatus, string>> = {
+  [ApplicationStatus.PENDING_FACTORY]: '厂长审批',
+  [ApplicationStatus.PENDING_DIRECTOR]: '总监审批',
+  [ApplicationStatus.PENDING_MANAGER]: '经理审批',
+  [ApplicationStatus.PENDING_CEO]: 'CEO审批',
+};
+
 /**
  * 检查并发送提醒
+ * 只读取 nextReminderAt 已到期的待审批申请（走 status + nextReminderAt 索引），发送后重新排期
  */
 export async function checkAndSendReminders(): Promise<void> {
   const settings = getReminderSettings();
@@ -148,141 +267,92 @@ export async function checkAndSendReminders(): Promise<void> {
 
   try {
     const now = new Date();
+    let reminderCount = 0;
 
-    // 获取所有待审批的申请
-    const pendingApplications = await prisma.application.findMany({
-      where: {
-        status: {
-          in: [
-            ApplicationStatus.PENDING_FACTORY,
-            ApplicationStatus.PENDING_DIRECTOR,
-            ApplicationStatus.PENDING_MANAGER,
-            ApplicationStatus.PENDING_CEO,
-          ],
-        },
-      },
-      include: {
-        applicant: {
-          select: { id: true, name: true, email: true },
-        },
-        factoryApprovals: {
-          include: { approver: { select: { id: true, name: true, email: true } } },
+    for (;;) {
+      // 处理过的申请都会被重新排期到 now 之后，因此循环必然结束
+      const dueApplications = await prisma.application.findMany({
+        where: {
+          status: { in: PENDING_STATUSES },
+          nextReminderAt: { lte: now },
         },
-        directorApprovals: {
-          include: { approver: { select: { id: true, name: true, email: true } } },
+        orderBy: { nextReminderAt: 'asc' },
+        take: REMINDER_BATCH_SIZE,
+        select: {
+          id: true,
+          applicationNo: true,
+          title: true,
+          applicantId: true,
+          applicantName: true,
+          applicantDept: true,
+          priority: true,
+          status: true,
+          createdAt: true,
+          submittedAt: true,
+          _count: { select: { reminderLogs: true } },
         },
-        managerApprovals: {
-          include: { approver: { select: { id: true, name: true, email: true } } },
-        },
-        ceoApprovals: {
-          include: { approver: { select: { id: true, name: true, email: true } } },
-        },
-        reminderLogs: {
-          orderBy: { sentAt: 'desc' },
-        },
-      },
-    });
-
-    let reminderCount = 0;
-
-    for (const app of pendingApplications) {
-      // 获取最后一次提醒时间
-      const lastReminder = app.reminderLogs[0];
-      const lastReminderTime = lastReminder ? new Date(lastReminder.sentAt) : null;
-      const reminderCountForApp = app.reminderLogs.length;
-
-      // 计算是否应该发送提醒
-      const interval = getReminderInterval(app.priority, reminderCountForApp, settings);
-      const hoursSinceLastReminder = lastReminderTime
-        ? (now.getTime() - lastReminderTime.getTime()) / (1000 * 60 * 60)
-        : Infinity;
-      const hoursSinceSubmission = app.submittedAt
-        ? (now.getTime() - new Date(app.submittedAt).getTime()) / (1000 * 60 * 60)
-        : 0;
-
-      // 第一次提醒需要等待初始延迟
-      if (!lastReminder && hoursSinceSubmission < interval) {
-        continue;
-      }
-
-      // 后续提醒需要等待间隔时间
-      if (lastReminder && hoursSinceLastReminder < interval) {
-        continue;
-      }
-
-      // 确定当前审批人和邮件接收者
-      let recipients: string[] = [];
-      let actionText = '';
-
-      switch (app.status) {
-        case ApplicationStatus.PENDING_FACTORY:
-          recipients = app.factoryApprovals
-            .filter(a => a.action === 'PENDING')
-            .map(a => a.approver.email)
-            .filter((email): email is string => email !== null && email !== undefined);
-          actionText = '厂长审批';
-          break;
-        case ApplicationStatus.PENDING_DIRECTOR:
-          recipients = app.directorApprovals
-            .filter(a => a.action === 'PENDING')
-            .map(a => a.approver.email)
-            .filter((email): email is string => email !== null && email !== undefined);
-          actionText = '总监审批';
-          break;
-        case ApplicationStatus.PENDING_MANAGER:
-          recipients = app.managerApprovals
-            .filter(a => a.action === 'PENDING')
-            .map(a => a.approver.email)
-            .filter((email): email is string => email !== null && email !== undefined);
-          actionText = '经理审批';
-          break;
-        case ApplicationStatus.PENDING_CEO:
-          recipients = app.ceoApprovals
-            .filter(a => a.action === 'PENDING')
-            .map(a => a.approver.email)
-            .filter((email): email is string => email !== null && email !== undefined);
-          actionText = 'CEO审批';
-          break;
-      }
-
-      if (recipients.length === 0) {
-        continue;
-      }
-
-      // 发送提醒邮件
-      const emailContent = generateEmailTemplate({
-        title: `【提醒】申请待${actionText}`,
-        applicant: app.applicantName,
-        applicationNo: app.applicationNo,
-        department: app.applicantDept,
-        date: app.createdAt.toLocaleDateString('zh-CN'),
-        content: app.title,
-        priority: app.priority,
-        status: app.status,
-        actionText: '立即审批',
-        actionUrl: `${config.server.url}/applications/${app.id}`,
-        additionalInfo: `这是第 ${reminderCountForApp + 1} 次提醒，该申请已等待 ${Math.floor(hoursSinceSubmission)} 小时。`,
       });
-
-      const success = await sendEmailNotification(
-        recipients,
-        `【提醒】申请 ${app.applicationNo} 待${actionText}`,
-        emailContent,
-        app.applicationNo
-      );
-
-      if (success) {
-        // 记录提醒日志
-        await prisma.reminderLog.create({
-          data: {
-            applicationId: app.id,
-            recipientId: app.applicantId,
-            reminderType: 'EMAIL',
-            reminderCount: reminderCountForApp + 1,
-          },
+      if (dueApplications.length === 0) break;
+
+      const recipientsByApp = await getPendingApproverEmails(dueApplications);
+      const rescheduled: Array<{ id: string; at: Date }> = [];
+
+      for (const app of dueApplications) {
+        const reminderCountForApp = app._count.reminderLogs;
+        const recipients = recipientsByApp.get(app.id) || [];
+        const actionText = ACTION_TEXT[app.status] || '';
+
+        // 没有可通知的审批人：按当前间隔推迟，不计入提醒次数
+        if (recipients.length === 0) {
+          rescheduled.push({ id: app.id, at: computeNextReminderAt(app.priority, reminderCountForApp, now, settings) });
+          continue;
+        }
+
+        const hoursSinceSubmission = app.submittedAt
+          ? (now.getTime() - new Date(app.submittedAt).getTime()) / (1000 * 60 * 60)
+          : 0;
+
+        // 发送提醒邮件
+        const emailContent = generateEmailTemplate({
+          title: `【提醒】申请待${actionText}`,
+          applicant: app.applicantName,
+          applicationNo: app.applicationNo,
+          department: app.applicantDept,
+          date: app.createdAt.toLocaleDateString('zh-CN'),
+          content: app.title,
+          priority: app.priority,
+          status: app.status,
+          actionText: '立即审批',
+          actionUrl: `${config.server.url}/applications/${app.id}`,
+          additionalInfo: `这是第 ${reminderCountForApp + 1} 次提醒，该申请已等待 ${Math.floor(hoursSinceSubmission)} 小时。`,
         });
-        reminderCount++;
+
+        const success = await sendEmailNotification(
+          recipients,
+          `【提醒】申请 ${app.applicationNo} 待${actionText}`,
+          emailContent,
+          app.applicationNo
+        );
+
+        if (success) {
+          // 记录提醒日志
+          await prisma.reminderLog.create({
+            data: {
+              applicationId: app.id,
+              recipientId: app.applicantId,
+              reminderType: 'EMAIL',
+              reminderCount: reminderCountForApp + 1,
+            },
+          });
+          rescheduled.push({ id: app.id, at: computeNextReminderAt(app.priority, reminderCountForApp + 1, now, settings) });
+          reminderCount++;
+        } else {
+          // 发送失败下一轮检查时重试
+          rescheduled.push({ id: app.id, at: new Date(now.getTime() + CHECK_INTERVAL) });
+        }
       }
+
+      await setNextReminderAt(rescheduled);
     }
 
     logger.info(`提醒检查完成，发送了 ${reminderCount} 封提醒邮件`);
@@ -295,8 +365,12 @@ export async function checkAndSendReminders(): Promise<void> {
  * 启动定时提醒任务
  */
 export function startReminderScheduler(): void {
-  // 每小时检查一次
-  const CHECK_INTERVAL = 60 * 60 * 1000; // 1小时
+  // 回填升级前已在审批中的申请
+  rescheduleReminders(true)
+    .then((count) => {
+      if (count > 0) logger.info(`已为 ${count} 个待审批申请生成提醒排期`);
+    })
+    .catch((error) => logger.error('生成提醒排期失败', { error }));
 
   setInterval(() => {
     logger.info('执行定时提醒检查...');
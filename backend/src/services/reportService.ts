@@ -1,5 +1,7 @@
 import { prisma } from '@/lib/prisma';
-import { ApplicationStatus, Priority } from '@prisma/client';
+import { ApplicationStatus, Priority, Prisma } from '@prisma/client';
+import { COMPLETED_CONDITION, isRollupReady } from './rollupService';
+import { dashboardSummaryCache } from './summaryCache';
 
 // ============================================
 // 报表筛选参数类型
@@ -281,6 +283,38 @@ export interface DashboardSummary {
 // 报表服务
 // ============================================
 
+// 审批统计中可由实时查询或日汇总表提供的部分
+interface ApprovalAggregates {
+  countByStatus: Map<ApplicationStatus, number>;
+  completionByPriority: Array<{ priority: Priority; avgSeconds: number; count: number }>;
+  avgApprovalTimeByDept: ApprovalStats['avgApprovalTimeByDept'];
+  trendData: ApprovalStats['trendData'];
+}
+
+// 设备统计中可由实时查询或日汇总表提供的部分
+interface MaintenanceAnalysis {
+  maintenanceFreqResult: EquipmentStats['maintenanceFrequency'];
+  totalPurchaseValue: number;
+  totalMaintenanceCost: number;
+  costByCategory: Record<string, { purchaseCost: number; maintenanceCost: number }>;
+}
+
+// 个人绩效中可由实时查询或日汇总表提供的部分
+interface UserActivity {
+  tasksAssigned: number;
+  tasksCompleted: number;
+  avgCompletionTime: number; // 天
+  approvalsProcessed: number;
+  applicationsSubmitted: number;
+  applicationsApproved: number;
+  applicationsRejected: number;
+}
+
+// 截取到 UTC 日期（日汇总表按 UTC 日期存储）
+function toUtcDay(date: Date): Date {
+  return new Date(Date.UTC(date.getUTCFullYear(), date.getUTCMonth(), date.getUTCDate()));
+}
+
 export class ReportService {
   // P0修复: 添加默认时间范围限制(最近一年)，防止全表扫描
   private addDefaultTimeRange(
@@ -304,7 +338,7 @@ export class ReportService {
     };
   }
 
-  // 审批统计分析
+  // 审批统计分析 - 各项分析均为分组聚合，查询数量与部门/阶段数量无关
   async getApprovalStats(filters: ApprovalStatsFilter): Promise<ApprovalStats> {
     const { startDate, endDate, departmentId, applicantId, status } = filters;
 
@@ -325,67 +359,45 @@ export class ReportService {
     if (status) {
       where.status = status;
     }
+    const conditions = this.buildApplicationConditions(filters);
+
+    // 日汇总表没有申请人维度，按申请人筛选时走实时统计
+    const useRollup = !applicantId && await isRollupReady('applications');
 
-    // 基础统计
     const [
-      totalApplications,
-      approvedCount,
-      rejectedCount,
-      pendingCount,
-      draftCount,
-      applicationsWithTime,
+      { countByStatus, completionByPriority, avgApprovalTimeByDept, trendData },
+      approverRanking,
+      bottleneckAnalysis,
     ] = await Promise.all([
-      prisma.application.count({ where }),
-      prisma.application.count({ where: { ...where, status: 'APPROVED' } }),
-      prisma.application.count({ where: { ...where, status: 'REJECTED' } }),
-      prisma.application.count({
-        where: {
-          ...where,
-          status: { in: ['PENDING_FACTORY', 'PENDING_DIRECTOR', 'PENDING_MANAGER', 'PENDING_CEO'] },
-        },
-      }),
-      prisma.application.count({ where: { ...where, status: 'DRAFT' } }),
-      prisma.application.findMany({
-        where: { ...where, status: { in: ['APPROVED', 'REJECTED'] }, submittedAt: { not: null }, completedAt: { not: null } },
-        select: {
-          id: true,
-          status: true,
-          submittedAt: true,
-          completedAt: true,
-          applicantDept: true,
-          priority: true,
-        },
-      }),
+      useRollup
+        ? this.getApprovalAggregatesFromRollup(filters)
+        : this.getApprovalAggregatesLive(where, conditions),
+      this.getApproverRanking(startDate, endDate),
+      this.getBottleneckAnalysis(conditions),
     ]);
 
-    // 计算平均处理时长
-    let totalProcessTime = 0;
+    // 基础统计
+    const countOf = (...statuses: ApplicationStatus[]) =>
+      statuses.reduce((sum, s) => sum + (countByStatus.get(s) || 0), 0);
+    const totalApplications = [...countByStatus.values()].reduce((sum, count) => sum + count, 0);
+    const approvedCount = countOf('APPROVED');
+    const rejectedCount = countOf('REJECTED');
+    const pendingCount = countOf('PENDING_FACTORY', 'PENDING_DIRECTOR', 'PENDING_MANAGER', 'PENDING_CEO');
+    const draftCount = countOf('DRAFT');
+
+    // 平均处理时长 = 各优先级平均值按数量加权
+    let totalProcessSeconds = 0;
     let validProcessCount = 0;
-    applicationsWithTime.forEach((app) => {
-      if (app.submittedAt && app.completedAt) {
-        const duration = new Date(app.completedAt).getTime() - new Date(app.submittedAt).getTime();
-        totalProcessTime += duration;
-        validProcessCount++;
-      }
+    completionByPriority.forEach((row) => {
+      totalProcessSeconds += row.avgSeconds * row.count;
+      validProcessCount += row.count;
     });
     const avgProcessTime = validProcessCount > 0
-      ? Math.round(totalProcessTime / validProcessCount / (1000 * 60 * 60))
+      ? Math.round(totalProcessSeconds / validProcessCount / 3600)
       : 0;
 
     // 按类型统计平均审批时间
-    const avgApprovalTimeByType = await this.getApprovalTimeByPriority(where);
-
-    // 按部门统计平均审批时间
-    const avgApprovalTimeByDept = await this.getApprovalTimeByDept(where);
-
-    // 审批人响应时间排行
-    const approverRanking = await this.getApproverRanking(startDate, endDate);
-
-    // 瓶颈分析
-    const bottleneckAnalysis = await this.getBottleneckAnalysis(where);
-
-    // 趋势数据
-    const trendData = await this.getApprovalTrend(where);
+    const avgApprovalTimeByType = this.formatApprovalTimeByPriority(completionByPriority);
 
     return {
       totalApplications,
@@ -404,77 +416,199 @@ export class ReportService {
     };
   }
 
-  // 按优先级统计审批时间
-  private async getApprovalTimeByPriority(where: Record<string, unknown>) {
-    const priorities = ['LOW', 'NORMAL', 'HIGH', 'URGENT'];
-    const result = [];
+  // 实时统计：直接聚合申请表
+  private async getApprovalAggregatesLive(
+    where: Record<string, unknown>,
+    conditions: Prisma.Sql
+  ): Promise<ApprovalAggregates> {
+    const [statusCounts, completionByPriority, avgApprovalTimeByDept, trendData] = await Promise.all([
+      prisma.application.groupBy({
+        by: ['status'],
+        where,
+        _count: { _all: true },
+      }),
+      this.getCompletionTimeByPriority(conditions),
+      this.getApprovalTimeByDept(conditions),
+      this.getApprovalTrend(where),
+    ]);
 
-    for (const priority of priorities) {
-      const apps = await prisma.application.findMany({
-        where: { ...where, priority: priority as Priority, status: { in: ['APPROVED', 'REJECTED'] }, submittedAt: { not: null }, completedAt: { not: null } },
-        select: {
-          submittedAt: true,
-          completedAt: true,
-        },
-      });
+    return {
+      countByStatus: new Map(statusCounts.map((row) => [row.status, row._count._all])),
+      completionByPriority,
+      avgApprovalTimeByDept,
+      trendData,
+    };
+  }
 
-      let totalTime = 0;
-      apps.forEach((app) => {
-        if (app.submittedAt && app.completedAt) {
-          totalTime += new Date(app.completedAt).getTime() - new Date(app.submittedAt).getTime();
-        }
-      });
+  // 汇总统计：读取申请日汇总表，扫描行数与天数成正比而不是与申请数成正比
+  private async getApprovalAggregatesFromRollup(filters: ApprovalStatsFilter): Promise<ApprovalAggregates> {
+    const { startDate, endDate, departmentId, status } = filters;
 
-      result.push({
-        type: priority,
-        avgTime: apps.length > 0 ? Math.round(totalTime / apps.length / (1000 * 60 * 60)) : 0,
-        count: apps.length,
-      });
+    const where: Prisma.DailyApplicationStatWhereInput = {};
+    if (startDate && endDate) {
+      where.date = { gte: toUtcDay(startDate), lte: toUtcDay(endDate) };
+    }
+    if (departmentId) {
+      where.department = departmentId;
+    }
+    if (status) {
+      where.status = status;
     }
 
-    return result;
-  }
+    // 趋势固定取最近30天（与实时统计口径一致）
+    const thirtyDaysAgo = new Date();
+    thirtyDaysAgo.setDate(thirtyDaysAgo.getDate() - 30);
 
-  // 按部门统计审批时间
-  private async getApprovalTimeByDept(where: Record<string, unknown>) {
-    const depts = await prisma.application.groupBy({
-      by: ['applicantDept'],
-      where: { ...where, applicantDept: { not: undefined } },
-      _count: { id: true },
+    const [byStatus, byPriority, byDept, trendRows] = await Promise.all([
+      prisma.dailyApplicationStat.groupBy({
+        by: ['status'],
+        where,
+        _sum: { count: true },
+      }),
+      prisma.dailyApplicationStat.groupBy({
+        by: ['priority'],
+        where: { ...where, completedCount: { gt: 0 } },
+        _sum: { completedCount: true, completionSeconds: true },
+      }),
+      prisma.dailyApplicationStat.groupBy({
+        by: ['department'],
+        where: { ...where, department: departmentId || { not: '' } },
+        _sum: { completedCount: true, completionSeconds: true },
+      }),
+      prisma.dailyApplicationStat.groupBy({
+        by: ['date', 'status'],
+        where: { ...where, date: { gte: toUtcDay(thirtyDaysAgo) } },
+        _sum: { count: true },
+      }),
+    ]);
+
+    const completionByPriority = byPriority.map((row) => {
+      const count = row._sum.completedCount || 0;
+      return {
+        priority: row.priority,
+        avgSeconds: count > 0 ? (row._sum.completionSeconds || 0) / count : 0,
+        count,
+      };
     });
 
-    const result = [];
-    for (const dept of depts) {
-      if (!dept.applicantDept) continue;
-      const apps = await prisma.application.findMany({
-        where: {
-          ...where,
-          applicantDept: dept.applicantDept,
-          status: { in: ['APPROVED', 'REJECTED'] },
-          submittedAt: { not: null },
-          completedAt: { not: null },
-        },
-        select: {
-          submittedAt: true,
-          completedAt: true,
-        },
-      });
+    const avgApprovalTimeByDept = byDept
+      .map((row) => {
+        const count = row._sum.completedCount || 0;
+        return {
+          department: row.department,
+          avgTime: count > 0 ? Math.round((row._sum.completionSeconds || 0) / count / 3600) : 0,
+          count,
+        };
+      })
+      .sort((a, b) => a.avgTime - b.avgTime)
+      .slice(0, 10);
 
-      let totalTime = 0;
-      apps.forEach((app) => {
-        if (app.submittedAt && app.completedAt) {
-          totalTime += new Date(app.completedAt).getTime() - new Date(app.submittedAt).getTime();
-        }
-      });
+    const trendMap: Record<string, { submitted: number; approved: number; rejected: number }> = {};
+    trendRows.forEach((row) => {
+      const date = row.date.toISOString().split('T')[0];
+      if (!trendMap[date]) {
+        trendMap[date] = { submitted: 0, approved: 0, rejected: 0 };
+      }
+      const count = row._sum.count || 0;
+      trendMap[date].submitted += count;
+      if (row.status === 'APPROVED') trendMap[date].approved += count;
+      if (row.status === 'REJECTED') trendMap[date].rejected += count;
+    });
 
-      result.push({
-        department: dept.applicantDept,
-        avgTime: apps.length > 0 ? Math.round(totalTime / apps.length / (1000 * 60 * 60)) : 0,
-        count: apps.length,
-      });
+    return {
+      countByStatus: new Map(byStatus.map((row) => [row.status, row._sum.count || 0])),
+      completionByPriority,
+      avgApprovalTimeByDept,
+      trendData: Object.entries(trendMap)
+        .map(([date, data]) => ({ date, ...data }))
+        .sort((a, b) => a.date.localeCompare(b.date)),
+    };
+  }
+
+  // 把筛选条件转换为原生 SQL 条件（申请表别名 a）
+  private buildApplicationConditions(filters: ApprovalStatsFilter): Prisma.Sql {
+    const { startDate, endDate, departmentId, applicantId, status } = filters;
+    const conditions: Prisma.Sql[] = [Prisma.sql`TRUE`];
+
+    if (startDate && endDate) {
+      conditions.push(Prisma.sql`a."createdAt" >= ${startDate} AND a."createdAt" <= ${endDate}`);
+    }
+    if (departmentId) {
+      conditions.push(Prisma.sql`a."applicantDept" = ${departmentId}`);
+    }
+    if (applicantId) {
+      conditions.push(Prisma.sql`a."applicantId" = ${applicantId}`);
     }
+    if (status) {
+      conditions.push(Prisma.sql`a.status = ${status}::"ApplicationStatus"`);
+    }
+
+    return Prisma.join(conditions, ' AND ');
+  }
+
+  // 按优先级聚合已完成申请的处理时长（秒）
+  private async getCompletionTimeByPriority(conditions: Prisma.Sql) {
+    const rows = await prisma.$queryRaw<Array<{
+      priority: Priority;
+      avg_seconds: number;
+      count: bigint;
+    }>>`
+      SELECT
+        a.priority::text AS priority,
+        AVG(EXTRACT(EPOCH FROM (a."completedAt" - a."submittedAt")))::float8 AS avg_seconds,
+        COUNT(*) AS count
+      FROM "Application" a
+      WHERE ${conditions}
+        AND ${Prisma.raw(COMPLETED_CONDITION)}
+      GROUP BY a.priority
+    `;
+
+    return rows.map((row) => ({
+      priority: row.priority,
+      avgSeconds: Number(row.avg_seconds) || 0,
+      count: Number(row.count),
+    }));
+  }
+
+  // 按优先级统计审批时间（无数据的优先级补 0）
+  private formatApprovalTimeByPriority(rows: Array<{ priority: Priority; avgSeconds: number; count: number }>) {
+    const priorities: Priority[] = ['LOW', 'NORMAL', 'HIGH', 'URGENT'];
+    const byPriority = new Map(rows.map((row) => [row.priority, row]));
+
+    return priorities.map((priority) => {
+      const row = byPriority.get(priority);
+      return {
+        type: priority,
+        avgTime: row ? Math.round(row.avgSeconds / 3600) : 0,
+        count: row ? row.count : 0,
+      };
+    });
+  }
 
-    return result.sort((a, b) => a.avgTime - b.avgTime).slice(0, 10);
+  // 按部门统计审批时间（取平均时长最短的10个部门，没有已完成申请的部门按 0 计）
+  private async getApprovalTimeByDept(conditions: Prisma.Sql) {
+    const rows = await prisma.$queryRaw<Array<{
+      department: string;
+      avg_seconds: number | null;
+      count: bigint;
+    }>>`
+      SELECT
+        a."applicantDept" AS department,
+        AVG(EXTRACT(EPOCH FROM (a."completedAt" - a."submittedAt"))) FILTER (WHERE ${Prisma.raw(COMPLETED_CONDITION)})::float8 AS avg_seconds,
+        COUNT(*) FILTER (WHERE ${Prisma.raw(COMPLETED_CONDITION)}) AS count
+      FROM "Application" a
+      WHERE ${conditions}
+        AND a."applicantDept" <> ''
+      GROUP BY a."applicantDept"
+      ORDER BY avg_seconds ASC NULLS FIRST
+      LIMIT 10
+    `;
+
+    return rows.map((row) => ({
+      department: row.department,
+      avgTime: row.avg_seconds ? Math.round(Number(row.avg_seconds) / 3600) : 0,
+      count: Number(row.count),
+    }));
   }
 
   // 审批人响应时间排行 - 使用聚合查询避免N+1问题
@@ -571,48 +705,54 @@ export class ReportService {
       .slice(0, 10);
   }
 
-  // 瓶颈分析
-  private async getBottleneckAnalysis(where: Record<string, unknown>) {
+  // 瓶颈分析 - 四个审批阶段一次聚合，按申请去重计数
+  private async getBottleneckAnalysis(conditions: Prisma.Sql) {
     const stages = [
-      { name: '厂长审批', field: 'factoryApprovals' as const },
-      { name: '总监审批', field: 'directorApprovals' as const },
-      { name: '经理审批', field: 'managerApprovals' as const },
-      { name: 'CEO审批', field: 'ceoApprovals' as const },
+      { key: 'factory', name: '厂长审批' },
+      { key: 'director', name: '总监审批' },
+      { key: 'manager', name: '经理审批' },
+      { key: 'ceo', name: 'CEO审批' },
     ];
 
-    const result = [];
-
-    for (const stage of stages) {
-      const pendingCount = await prisma.application.count({
-        where: {
-          ...where,
-          [stage.field]: { some: { action: 'PENDING' } },
-        },
-      });
-
-      const rejectedCount = await prisma.application.count({
-        where: {
-          ...where,
-          [stage.field]: { some: { action: 'REJECT' } },
-        },
-      });
-
-      const totalCount = await prisma.application.count({
-        where: {
-          ...where,
-          [stage.field]: { some: {} },
-        },
-      });
-
-      result.push({
+    const rows = await prisma.$queryRaw<Array<{
+      stage: string;
+      pending_count: bigint;
+      rejected_count: bigint;
+      total_count: bigint;
+    }>>`
+      SELECT
+        s.stage,
+        COUNT(DISTINCT s."applicationId") FILTER (WHERE s.action = 'PENDING') AS pending_count,
+        COUNT(DISTINCT s."applicationId") FILTER (WHERE s.action = 'REJECT') AS rejected_count,
+        COUNT(DISTINCT s."applicationId") AS total_count
+      FROM (
+        SELECT 'factory' AS stage, "applicationId", action FROM "FactoryApproval"
+        UNION ALL
+        SELECT 'director' AS stage, "applicationId", action FROM "DirectorApproval"
+        UNION ALL
+        SELECT 'manager' AS stage, "applicationId", action FROM "ManagerApproval"
+        UNION ALL
+        SELECT 'ceo' AS stage, "applicationId", action FROM "CeoApproval"
+      ) s
+      JOIN "Application" a ON a.id = s."applicationId"
+      WHERE ${conditions}
+      GROUP BY s.stage
+    `;
+
+    const byStage = new Map(rows.map((row) => [row.stage, row]));
+
+    return stages.map((stage) => {
+      const row = byStage.get(stage.key);
+      const pendingCount = row ? Number(row.pending_count) : 0;
+      const rejectedCount = row ? Number(row.rejected_count) : 0;
+      const totalCount = row ? Number(row.total_count) : 0;
+      return {
         stage: stage.name,
         avgWaitTime: pendingCount * 24, // 简化计算
         pendingCount,
         rejectionRate: totalCount > 0 ? Math.round((rejectedCount / totalCount) * 100) : 0,
-      });
-    }
-
-    return result;
+      };
+    });
   }
 
   // 审批趋势数据
@@ -697,6 +837,53 @@ export class ReportService {
       count: l._count.id,
     }));
 
+    // 维修频率与成本分析
+    const { maintenanceFreqResult, totalPurchaseValue, totalMaintenanceCost, costByCategory } =
+      await isRollupReady('maintenance')
+        ? await this.getMaintenanceAnalysisFromRollup(where)
+        : await this.getMaintenanceAnalysisLive(where);
+
+    // 健康度分布
+    const equipmentWithHealth = await prisma.equipment.findMany({
+      where: { ...where, healthScore: { not: null } },
+      select: { healthScore: true },
+    });
+
+    const healthDistribution = [
+      { scoreRange: '90-100', count: equipmentWithHealth.filter((e) => e.healthScore && e.healthScore >= 90).length },
+      { scoreRange: '80-89', count: equipmentWithHealth.filter((e) => e.healthScore && e.healthScore >= 80 && e.healthScore < 90).length },
+      { scoreRange: '70-79', count: equipmentWithHealth.filter((e) => e.healthScore && e.healthScore >= 70 && e.healthScore < 80).length },
+      { scoreRange: '60-69', count: equipmentWithHealth.filter((e) => e.healthScore && e.healthScore >= 60 && e.healthScore < 70).length },
+      { scoreRange: '<60', count: equipmentWithHealth.filter((e) => e.healthScore && e.healthScore < 60).length },
+    ];
+
+    // 计算利用率（简化计算：运行中设备占比）
+    const runningCount = byStatusWithPercentage.find((s) => s.status === 'RUNNING')?.count || 0;
+    const utilizationRate = totalEquipment > 0 ? Math.round((runningCount / totalEquipment) * 100) : 0;
+
+    return {
+      totalEquipment,
+      byStatus: byStatusWithPercentage,
+      byCategory: byCategoryWithPercentage,
+      byLocation: byLocationResult,
+      utilizationRate,
+      maintenanceFrequency: maintenanceFreqResult.slice(0, 20),
+      costAnalysis: {
+        totalPurchaseValue,
+        totalMaintenanceCost,
+        avgMaintenanceCostPerEquipment: totalEquipment > 0 ? Math.round(totalMaintenanceCost / totalEquipment) : 0,
+        costByCategory: Object.entries(costByCategory).map(([category, costs]) => ({
+          category,
+          ...costs,
+        })),
+      },
+      departmentDistribution: [], // 设备暂时没有部门字段，返回空数组
+      healthScoreDistribution: healthDistribution,
+    };
+  }
+
+  // 实时统计：加载设备及其维护记录
+  private async getMaintenanceAnalysisLive(where: Record<string, unknown>): Promise<MaintenanceAnalysis> {
     // 维修频率统计 - 添加分页限制防止内存溢出
     const maintenanceFrequency = await prisma.equipment.findMany({
       where,
@@ -754,49 +941,66 @@ export class ReportService {
       costByCategory[eq.category].maintenanceCost += eq.maintenanceRecords.reduce((sum, r) => sum + (Number(r.cost) || 0), 0);
     });
 
-    // 健康度分布
-    const equipmentWithHealth = await prisma.equipment.findMany({
-      where: { ...where, healthScore: { not: null } },
-      select: { healthScore: true },
+    return { maintenanceFreqResult, totalPurchaseValue, totalMaintenanceCost, costByCategory };
+  }
+
+  // 汇总统计：维护次数与费用读取维护日汇总表，设备表只取基础字段
+  private async getMaintenanceAnalysisFromRollup(where: Record<string, unknown>): Promise<MaintenanceAnalysis> {
+    const equipment = await prisma.equipment.findMany({
+      where,
+      select: { id: true, name: true, code: true, category: true, purchasePrice: true },
     });
 
-    const healthDistribution = [
-      { scoreRange: '90-100', count: equipmentWithHealth.filter((e) => e.healthScore && e.healthScore >= 90).length },
-      { scoreRange: '80-89', count: equipmentWithHealth.filter((e) => e.healthScore && e.healthScore >= 80 && e.healthScore < 90).length },
-      { scoreRange: '70-79', count: equipmentWithHealth.filter((e) => e.healthScore && e.healthScore >= 70 && e.healthScore < 80).length },
-      { scoreRange: '60-69', count: equipmentWithHealth.filter((e) => e.healthScore && e.healthScore >= 60 && e.healthScore < 70).length },
-      { scoreRange: '<60', count: equipmentWithHealth.filter((e) => e.healthScore && e.healthScore < 60).length },
-    ];
+    const stats = await prisma.dailyMaintenanceStat.groupBy({
+      by: ['equipmentId', 'type'],
+      where: Object.keys(where).length > 0 ? { equipmentId: { in: equipment.map((eq) => eq.id) } } : {},
+      _sum: { count: true, totalCost: true },
+    });
 
-    // 计算利用率（简化计算：运行中设备占比）
-    const runningCount = byStatusWithPercentage.find((s) => s.status === 'RUNNING')?.count || 0;
-    const utilizationRate = totalEquipment > 0 ? Math.round((runningCount / totalEquipment) * 100) : 0;
+    const statsByEquipment = new Map<string, { maintenanceCount: number; repairCount: number; totalCost: number }>();
+    stats.forEach((row) => {
+      const item = statsByEquipment.get(row.equipmentId) || { maintenanceCount: 0, repairCount: 0, totalCost: 0 };
+      if (row.type === 'MAINTENANCE') item.maintenanceCount += row._sum.count || 0;
+      if (row.type === 'REPAIR') item.repairCount += row._sum.count || 0;
+      item.totalCost += Number(row._sum.totalCost) || 0;
+      statsByEquipment.set(row.equipmentId, item);
+    });
 
-    return {
-      totalEquipment,
-      byStatus: byStatusWithPercentage,
-      byCategory: byCategoryWithPercentage,
-      byLocation: byLocationResult,
-      utilizationRate,
-      maintenanceFrequency: maintenanceFreqResult.slice(0, 20),
-      costAnalysis: {
-        totalPurchaseValue,
-        totalMaintenanceCost,
-        avgMaintenanceCostPerEquipment: totalEquipment > 0 ? Math.round(totalMaintenanceCost / totalEquipment) : 0,
-        costByCategory: Object.entries(costByCategory).map(([category, costs]) => ({
-          category,
-          ...costs,
-        })),
-      },
-      departmentDistribution: [], // 设备暂时没有部门字段，返回空数组
-      healthScoreDistribution: healthDistribution,
-    };
+    let totalPurchaseValue = 0;
+    let totalMaintenanceCost = 0;
+    const costByCategory: Record<string, { purchaseCost: number; maintenanceCost: number }> = {};
+    const maintenanceFreqResult = equipment.map((eq) => {
+      const item = statsByEquipment.get(eq.id) || { maintenanceCount: 0, repairCount: 0, totalCost: 0 };
+      const purchasePrice = Number(eq.purchasePrice) || 0;
+
+      totalPurchaseValue += purchasePrice;
+      totalMaintenanceCost += item.totalCost;
+      if (!costByCategory[eq.category]) {
+        costByCategory[eq.category] = { purchaseCost: 0, maintenanceCost: 0 };
+      }
+      costByCategory[eq.category].purchaseCost += purchasePrice;
+      costByCategory[eq.category].maintenanceCost += item.totalCost;
+
+      return {
+        equipmentId: eq.id,
+        equipmentName: eq.name,
+        code: eq.code,
+        ...item,
+      };
+    }).sort((a, b) => b.repairCount - a.repairCount);
+
+    return { maintenanceFreqResult, totalPurchaseValue, totalMaintenanceCost, costByCategory };
   }
 
   // 考勤统计分析
   async getAttendanceStats(filters: AttendanceStatsFilter): Promise<AttendanceStats> {
     const { startDate, endDate, departmentId, userId } = filters;
 
+    // 日汇总表按部门聚合，查看单个用户时走实时统计
+    if (!userId && await isRollupReady('attendance')) {
+      return this.getAttendanceStatsFromRollup(filters);
+    }
+
     const where: Record<string, unknown> = {};
     if (startDate && endDate) {
       where.date = {
@@ -992,6 +1196,196 @@ export class ReportService {
     };
   }
 
+  // 汇总统计：汇总、部门、趋势和工时分布读取考勤日汇总表，只有按用户和异常明细访问原始记录
+  private async getAttendanceStatsFromRollup(filters: AttendanceStatsFilter): Promise<AttendanceStats> {
+    const { startDate, endDate, departmentId } = filters;
+
+    const rollupWhere: Prisma.DailyAttendanceStatWhereInput = {};
+    const recordWhere: Prisma.AttendanceRecordWhereInput = {};
+    if (startDate && endDate) {
+      rollupWhere.date = { gte: toUtcDay(startDate), lte: toUtcDay(endDate) };
+      recordWhere.date = { gte: startDate, lte: endDate };
+    }
+    if (departmentId) {
+      rollupWhere.departmentId = departmentId;
+      recordWhere.user = { departmentId };
+    }
+
+    const [users, dailyRows, userStatusRows, overtimeUsers, abnormal] = await Promise.all([
+      prisma.user.findMany({
+        where: departmentId ? { departmentId } : {},
+        select: {
+          id: true,
+          name: true,
+          departmentId: true,
+          department: { select: { name: true } },
+        },
+      }),
+      prisma.dailyAttendanceStat.findMany({ where: rollupWhere }),
+      prisma.attendanceRecord.groupBy({
+        by: ['userId', 'status'],
+        where: recordWhere,
+        _count: { _all: true },
+        _sum: { workHours: true },
+      }),
+      prisma.attendanceRecord.groupBy({
+        by: ['userId'],
+        where: { ...recordWhere, workHours: { gt: 8 } },
+      }),
+      prisma.attendanceRecord.findMany({
+        where: { ...recordWhere, status: { in: ['LATE', 'EARLY_LEAVE', 'ABSENT'] } },
+        select: {
+          userId: true,
+          date: true,
+          status: true,
+          notes: true,
+          user: { select: { name: true, department: { select: { name: true } } } },
+        },
+      }),
+    ]);
+
+    const usersById = new Map(users.map((u) => [u.id, u]));
+    const deptNames = new Map(users.filter((u) => u.departmentId).map((u) => [u.departmentId!, u.department?.name || '未知部门']));
+
+    // 汇总统计与每日趋势
+    const totals = { records: 0, normal: 0, late: 0, earlyLeave: 0, absent: 0, workHours: 0, worked: 0 };
+    const buckets = { under6: 0, from6To8: 0, from8To10: 0, over10: 0 };
+    const deptStats: Record<string, { name: string; late: number; earlyLeave: number; absent: number; workHours: number; records: number }> = {};
+    const dailyMap: Record<string, { totalUsers: number; normal: number; late: number; earlyLeave: number; absent: number }> = {};
+    dailyRows.forEach((row) => {
+      totals.records += row.recordCount;
+      totals.normal += row.normalCount;
+      totals.late += row.lateCount;
+      totals.earlyLeave += row.earlyLeaveCount;
+      totals.absent += row.absentCount;
+      totals.workHours += row.workHours;
+      totals.worked += row.workedCount;
+      buckets.under6 += row.under6Count;
+      buckets.from6To8 += row.from6To8Count;
+      buckets.from8To10 += row.from8To10Count;
+      buckets.over10 += row.over10Count;
+
+      const deptId = row.departmentId || 'unknown';
+      if (!deptStats[deptId]) {
+        deptStats[deptId] = { name: deptNames.get(row.departmentId) || '未知部门', late: 0, earlyLeave: 0, absent: 0, workHours: 0, records: 0 };
+      }
+      deptStats[deptId].records += row.recordCount;
+      deptStats[deptId].workHours += row.workHours;
+      deptStats[deptId].late += row.lateCount;
+      deptStats[deptId].earlyLeave += row.earlyLeaveCount;
+      deptStats[deptId].absent += row.absentCount;
+
+      const date = row.date.toISOString().split('T')[0];
+      if (!dailyMap[date]) {
+        dailyMap[date] = { totalUsers: 0, normal: 0, late: 0, earlyLeave: 0, absent: 0 };
+      }
+      dailyMap[date].totalUsers += row.recordCount;
+      dailyMap[date].normal += row.normalCount;
+      dailyMap[date].late += row.lateCount;
+      dailyMap[date].earlyLeave += row.earlyLeaveCount;
+      dailyMap[date].absent += row.absentCount;
+    });
+
+    // 按用户统计
+    const userStats: Record<string, { late: number; earlyLeave: number; absent: number; workHours: number; records: number }> = {};
+    userStatusRows.forEach((row) => {
+      if (!userStats[row.userId]) {
+        userStats[row.userId] = { late: 0, earlyLeave: 0, absent: 0, workHours: 0, records: 0 };
+      }
+      const count = row._count._all;
+      userStats[row.userId].records += count;
+      userStats[row.userId].workHours += row._sum.workHours || 0;
+      if (row.status === 'LATE') userStats[row.userId].late += count;
+      if (row.status === 'EARLY_LEAVE') userStats[row.userId].earlyLeave += count;
+      if (row.status === 'ABSENT') userStats[row.userId].absent += count;
+    });
+
+    const deptUserCount: Record<string, number> = {};
+    const byUser = Object.entries(userStats).map(([id, stats]) => {
+      const user = usersById.get(id);
+      const deptId = user?.departmentId || 'unknown';
+      deptUserCount[deptId] = (deptUserCount[deptId] || 0) + 1;
+      return {
+        userId: id,
+        userName: user?.name || '',
+        department: user?.department?.name || '未知部门',
+        attendanceDays: stats.records,
+        lateCount: stats.late,
+        earlyLeaveCount: stats.earlyLeave,
+        absentCount: stats.absent,
+        workHours: Math.round(stats.workHours * 10) / 10,
+        attendanceRate: stats.records > 0 ? Math.round(((stats.records - stats.absent) / stats.records) * 100) : 0,
+      };
+    });
+
+    const byDepartment = Object.entries(deptStats).map(([id, stats]) => ({
+      departmentId: id,
+      departmentName: stats.name,
+      userCount: deptUserCount[id] || 0,
+      attendanceRate: stats.records > 0 ? Math.round(((stats.records - stats.absent) / stats.records) * 100) : 0,
+      lateCount: stats.late,
+      earlyLeaveCount: stats.earlyLeave,
+      absentCount: stats.absent,
+      avgWorkHours: stats.records > 0 ? Math.round((stats.workHours / stats.records) * 10) / 10 : 0,
+    }));
+
+    const dailyTrend = Object.entries(dailyMap)
+      .filter(([, stats]) => stats.totalUsers > 0)
+      .map(([date, stats]) => ({
+        date,
+        totalUsers: stats.totalUsers,
+        normalCount: stats.normal,
+        lateCount: stats.late,
+        earlyLeaveCount: stats.earlyLeave,
+        absentCount: stats.absent,
+        attendanceRate: Math.round(((stats.totalUsers - stats.absent) / stats.totalUsers) * 100),
+      }))
+      .sort((a, b) => a.date.localeCompare(b.date));
+
+    const abnormalRecords = abnormal.map((r) => ({
+      userId: r.userId,
+      userName: r.user.name,
+      department: r.user.department?.name || '未知部门',
+      date: r.date.toISOString().split('T')[0],
+      type: r.status as 'LATE' | 'EARLY_LEAVE' | 'ABSENT',
+      details: r.notes || '',
+    }));
+
+    const avgDailyHours = totals.worked > 0
+      ? Math.round((totals.workHours / totals.worked) * 10) / 10
+      : 0;
+
+    return {
+      summary: {
+        totalUsers: users.length,
+        totalWorkDays: dailyTrend.length,
+        avgAttendanceRate: totals.records > 0
+          ? Math.round(((totals.normal + totals.late) / totals.records) * 100)
+          : 0,
+        totalLateCount: totals.late,
+        totalEarlyLeaveCount: totals.earlyLeave,
+        totalAbsentCount: totals.absent,
+        totalWorkHours: Math.round(totals.workHours * 10) / 10,
+        avgWorkHoursPerDay: avgDailyHours,
+      },
+      byDepartment,
+      byUser,
+      dailyTrend,
+      abnormalRecords,
+      workHoursAnalysis: {
+        avgDailyHours,
+        overtimeDays: buckets.from8To10 + buckets.over10,
+        overtimeUsers: overtimeUsers.length,
+        distribution: [
+          { range: '< 6小时', count: buckets.under6 },
+          { range: '6-8小时', count: buckets.from6To8 },
+          { range: '8-10小时', count: buckets.from8To10 },
+          { range: '> 10小时', count: buckets.over10 },
+        ],
+      },
+    };
+  }
+
   // 个人绩效分析
   async getUserPerformance(userId: string, filters: DateRangeFilter): Promise<UserPerformance> {
     const { startDate, endDate } = filters;
@@ -1023,39 +1417,14 @@ export class ReportService {
       ? Math.round(((attendanceDays - lateCount) / attendanceDays) * 100)
       : 0;
 
-    // 任务统计
-    const taskWhere: Record<string, unknown> = { assigneeId: userId };
-    if (startDate && endDate) {
-      taskWhere.createdAt = { gte: startDate, lte: endDate };
-    }
-
-    const tasks = await prisma.task.findMany({
-      where: taskWhere,
-    });
-
-    const completedTasks = tasks.filter((t) => t.status === 'DONE');
-    const completionRate = tasks.length > 0 ? Math.round((completedTasks.length / tasks.length) * 100) : 0;
-
-    // 计算平均完成时间
-    let avgCompletionTime = 0;
-    if (completedTasks.length > 0) {
-      const completionTimes = completedTasks
-        .filter((t) => t.completedAt && t.startDate)
-        .map((t) => new Date(t.completedAt!).getTime() - new Date(t.startDate!).getTime());
-      avgCompletionTime = completionTimes.length > 0
-        ? Math.round(completionTimes.reduce((a, b) => a + b, 0) / completionTimes.length / (1000 * 60 * 60 * 24))
-        : 0;
-    }
-
-    // 审批统计
-    const [factoryCount, directorCount, managerCount, ceoCount] = await Promise.all([
-      prisma.factoryApproval.count({ where: { approverId: userId, action: 'APPROVE' } }),
-      prisma.directorApproval.count({ where: { approverId: userId, action: 'APPROVE' } }),
-      prisma.managerApproval.count({ where: { approverId: userId, action: 'APPROVE' } }),
-      prisma.ceoApproval.count({ where: { approverId: userId, action: 'APPROVE' } }),
-    ]);
-
-    const totalProcessed = factoryCount + directorCount + managerCount + ceoCount;
+    // 任务、审批与申请统计
+    const activity = await isRollupReady('userActivity')
+      ? await this.getUserActivityFromRollup(userId, startDate, endDate)
+      : await this.getUserActivityLive(userId, startDate, endDate);
+    const completionRate = activity.tasksAssigned > 0
+      ? Math.round((activity.tasksCompleted / activity.tasksAssigned) * 100)
+      : 0;
+    const totalProcessed = activity.approvalsProcessed;
 
     // 会议统计
     const meetingTimeWhere: Record<string, unknown> = {};
@@ -1079,26 +1448,13 @@ export class ReportService {
       m.attendees.some((a) => a && typeof a === 'object' && 'userId' in a && (a as { userId: string }).userId === userId)
     ).length;
 
-    // 申请统计
-    const applicationWhere: Record<string, unknown> = { applicantId: userId };
-    if (startDate && endDate) {
-      applicationWhere.createdAt = { gte: startDate, lte: endDate };
-    }
-
-    const applications = await prisma.application.findMany({
-      where: applicationWhere,
-    });
-
-    const approvedApps = applications.filter((a) => a.status === 'APPROVED').length;
-    const rejectedApps = applications.filter((a) => a.status === 'REJECTED').length;
-
     // 雷达图数据
     const radarData = [
       { dimension: '出勤率', score: attendanceRate, maxScore: 100 },
       { dimension: '任务完成率', score: completionRate, maxScore: 100 },
       { dimension: '审批处理', score: Math.min(totalProcessed * 10, 100), maxScore: 100 },
       { dimension: '会议参与', score: Math.min(attendedMeetings * 5, 100), maxScore: 100 },
-      { dimension: '申请通过率', score: applications.length > 0 ? Math.round((approvedApps / applications.length) * 100) : 0, maxScore: 100 },
+      { dimension: '申请通过率', score: activity.applicationsSubmitted > 0 ? Math.round((activity.applicationsApproved / activity.applicationsSubmitted) * 100) : 0, maxScore: 100 },
     ];
 
     // 综合评分
@@ -1117,10 +1473,10 @@ export class ReportService {
         workHours: Math.round(workHours * 10) / 10,
       },
       tasks: {
-        totalAssigned: tasks.length,
-        completed: completedTasks.length,
+        totalAssigned: activity.tasksAssigned,
+        completed: activity.tasksCompleted,
         completionRate,
-        avgCompletionTime,
+        avgCompletionTime: activity.avgCompletionTime,
       },
       approvals: {
         totalProcessed,
@@ -1134,17 +1490,116 @@ export class ReportService {
         attendanceRate: attendedMeetings > 0 ? 100 : 0,
       },
       applications: {
-        submittedCount: applications.length,
-        approvedCount: approvedApps,
-        rejectedCount: rejectedApps,
+        submittedCount: activity.applicationsSubmitted,
+        approvedCount: activity.applicationsApproved,
+        rejectedCount: activity.applicationsRejected,
       },
       overallScore,
       radarData,
     };
   }
 
-  // 仪表板汇总数据
+  // 实时统计：逐条加载任务和申请
+  private async getUserActivityLive(userId: string, startDate?: Date, endDate?: Date): Promise<UserActivity> {
+    // 任务统计
+    const taskWhere: Record<string, unknown> = { assigneeId: userId };
+    if (startDate && endDate) {
+      taskWhere.createdAt = { gte: startDate, lte: endDate };
+    }
+
+    const tasks = await prisma.task.findMany({
+      where: taskWhere,
+    });
+
+    const completedTasks = tasks.filter((t) => t.status === 'DONE');
+
+    // 计算平均完成时间
+    let avgCompletionTime = 0;
+    if (completedTasks.length > 0) {
+      const completionTimes = completedTasks
+        .filter((t) => t.completedAt && t.startDate)
+        .map((t) => new Date(t.completedAt!).getTime() - new Date(t.startDate!).getTime());
+      avgCompletionTime = completionTimes.length > 0
+        ? Math.round(completionTimes.reduce((a, b) => a + b, 0) / completionTimes.length / (1000 * 60 * 60 * 24))
+        : 0;
+    }
+
+    // 审批统计
+    const [factoryCount, directorCount, managerCount, ceoCount] = await Promise.all([
+      prisma.factoryApproval.count({ where: { approverId: userId, action: 'APPROVE' } }),
+      prisma.directorApproval.count({ where: { approverId: userId, action: 'APPROVE' } }),
+      prisma.managerApproval.count({ where: { approverId: userId, action: 'APPROVE' } }),
+      prisma.ceoApproval.count({ where: { approverId: userId, action: 'APPROVE' } }),
+    ]);
+
+    // 申请统计
+    const applicationWhere: Record<string, unknown> = { applicantId: userId };
+    if (startDate && endDate) {
+      applicationWhere.createdAt = { gte: startDate, lte: endDate };
+    }
+
+    const applications = await prisma.application.findMany({
+      where: applicationWhere,
+    });
+
+    return {
+      tasksAssigned: tasks.length,
+      tasksCompleted: completedTasks.length,
+      avgCompletionTime,
+      approvalsProcessed: factoryCount + directorCount + managerCount + ceoCount,
+      applicationsSubmitted: applications.length,
+      applicationsApproved: applications.filter((a) => a.status === 'APPROVED').length,
+      applicationsRejected: applications.filter((a) => a.status === 'REJECTED').length,
+    };
+  }
+
+  // 汇总统计：读取用户日汇总表
+  private async getUserActivityFromRollup(userId: string, startDate?: Date, endDate?: Date): Promise<UserActivity> {
+    const where: Prisma.DailyUserStatWhereInput = { userId };
+    if (startDate && endDate) {
+      where.date = { gte: toUtcDay(startDate), lte: toUtcDay(endDate) };
+    }
+
+    // 审批处理数不受时间范围限制（与实时统计口径一致）
+    const [inRange, approvals] = await Promise.all([
+      prisma.dailyUserStat.aggregate({
+        where,
+        _sum: {
+          tasksAssigned: true,
+          tasksCompleted: true,
+          taskCompletionSeconds: true,
+          taskCompletionTimed: true,
+          applicationsSubmitted: true,
+          applicationsApproved: true,
+          applicationsRejected: true,
+        },
+      }),
+      prisma.dailyUserStat.aggregate({
+        where: { userId },
+        _sum: { approvalsProcessed: true },
+      }),
+    ]);
+
+    const timed = inRange._sum.taskCompletionTimed || 0;
+    return {
+      tasksAssigned: inRange._sum.tasksAssigned || 0,
+      tasksCompleted: inRange._sum.tasksCompleted || 0,
+      avgCompletionTime: timed > 0
+        ? Math.round((inRange._sum.taskCompletionSeconds || 0) / timed / (60 * 60 * 24))
+        : 0,
+      approvalsProcessed: approvals._sum.approvalsProcessed || 0,
+      applicationsSubmitted: inRange._sum.applicationsSubmitted || 0,
+      applicationsApproved: inRange._sum.applicationsApproved || 0,
+      applicationsRejected: inRange._sum.applicationsRejected || 0,
+    };
+  }
+
+  // 仪表板汇总数据（所有用户共享，短时缓存，并发请求只计算一次）
   async getDashboardSummary(): Promise<DashboardSummary> {
+    return dashboardSummaryCache.get(() => this.computeDashboardSummary());
+  }
+
+  private async computeDashboardSummary(): Promise<DashboardSummary> {
     const today = new Date();
     today.setHours(0, 0, 0, 0);
     const tomorrow = new Date(today);
@@ -1225,33 +1680,41 @@ export class ReportService {
       onLeave: todayLeave,
     };
 
-    // 部门工作量
-    const deptWorkload = await prisma.department.findMany({
-      where: { isActive: true },
-      select: {
-        name: true,
-        users: { select: { id: true } },
-      },
-    });
-
-    const departmentWorkload = [];
-    for (const dept of deptWorkload) {
-      const userIds = dept.users.map((u) => u.id);
-      const [pendingTasks, pendingApprovalsInDept] = await Promise.all([
-        prisma.task.count({
-          where: { assigneeId: { in: userIds }, status: { in: ['TODO', 'IN_PROGRESS'] } },
-        }),
-        prisma.application.count({
-          where: { applicantId: { in: userIds }, status: { in: ['PENDING_FACTORY', 'PENDING_DIRECTOR', 'PENDING_MANAGER', 'PENDING_CEO'] } },
-        }),
-      ]);
-
-      departmentWorkload.push({
-        department: dept.name,
-        pendingTasks,
-        pendingApprovals: pendingApprovalsInDept,
-      });
-    }
+    // 部门工作量（一次分组查询，按部门排序取前10个）
+    const deptWorkload = await prisma.$queryRaw<Array<{
+      department: string;
+      pending_tasks: bigint;
+      pending_approvals: bigint;
+    }>>`
+      SELECT
+        d.name AS department,
+        COALESCE(t.count, 0) AS pending_tasks,
+        COALESCE(a.count, 0) AS pending_approvals
+      FROM departments d
+      LEFT JOIN (
+        SELECT u."departmentId" AS department_id, COUNT(*) AS count
+        FROM tasks t
+        JOIN "User" u ON u.id = t."assigneeId"
+        WHERE t.status IN ('TODO', 'IN_PROGRESS')
+        GROUP BY u."departmentId"
+      ) t ON t.department_id = d.id
+      LEFT JOIN (
+        SELECT u."departmentId" AS department_id, COUNT(*) AS count
+        FROM "Application" a
+        JOIN "User" u ON u.id = a."applicantId"
+        WHERE a.status IN ('PENDING_FACTORY', 'PENDING_DIRECTOR', 'PENDING_MANAGER', 'PENDING_CEO')
+        GROUP BY u."departmentId"
+      ) a ON a.department_id = d.id
+      WHERE d."isActive" = true
+      ORDER BY d."sortOrder" ASC, d.name ASC
+      LIMIT 10
+    `;
+
+    const departmentWorkload = deptWorkload.map((row) => ({
+      department: row.department,
+      pendingTasks: Number(row.pending_tasks),
+      pendingApprovals: Number(row.pending_approvals),
+    }));
 
     // 告警信息
     const alerts = [];
@@ -1294,7 +1757,7 @@ export class ReportService {
         applicationTrend,
         equipmentStatus: equipmentStatusResult,
         attendanceOverview,
-        departmentWorkload: departmentWorkload.slice(0, 10),
+        departmentWorkload,
       },
       alerts,
     };
@@ -0,0 +1,342 @@
+import { Prisma } from '@prisma/client';
+import { prisma } from '../lib/prisma';
+import * as logger from '../lib/logger';
+
+/**
+ * 报表日汇总服务
+ * 按水位线（源表 updatedAt）找出有变更的日期，整天重算对应的汇总行，
+ * 报表中心读汇总表而不是原始明细，一年的报表每个序列只需扫描约365行
+ */
+
+const ROLLUP_CONFIG = {
+  // 增量汇总间隔（毫秒）
+  INTERVAL_MS: parseInt(process.env.ROLLUP_INTERVAL_MS || '300000', 10),
+  // 水位线回看窗口，防止长事务晚提交的变更被跳过（重算是幂等的）
+  OVERLAP_MS: 60 * 1000,
+  // 每个事务重算的天数
+  DAYS_PER_BATCH: 31,
+  // 每天重算最近N天，兜底物理删除等不会更新 updatedAt 的变更
+  RECONCILE_DAYS: parseInt(process.env.ROLLUP_RECONCILE_DAYS || '7', 10),
+  // 是否启用
+  ENABLED: process.env.ENABLE_REPORT_ROLLUP !== 'false',
+};
+
+// 已完成且有提交/完成时间的申请（用于计算处理时长，申请表别名 a）
+export const COMPLETED_CONDITION = `a.status IN ('APPROVED', 'REJECTED') AND a."submittedAt" IS NOT NULL AND a."completedAt" IS NOT NULL`;
+
+export type RollupName = 'applications' | 'attendance' | 'maintenance' | 'userActivity';
+
+interface RollupSource {
+  table: string;
+  dayColumn: string; // 决定汇总日期的列，必须在行的生命周期内不变
+}
+
+interface RollupDefinition {
+  name: RollupName;
+  sources: RollupSource[];
+  rebuild: (tx: Prisma.TransactionClient, days: string[]) => Promise<void>;
+}
+
+// 批次日期范围，配合 ANY(days) 让源表的时间索引可用
+function dayRange(days: string[]): { from: Date; to: Date } {
+  const from = new Date(`${days[0]}T00:00:00.000Z`);
+  const to = new Date(`${days[days.length - 1]}T00:00:00.000Z`);
+  to.setUTCDate(to.getUTCDate() + 1);
+  return { from, to };
+}
+
+const ROLLUPS: RollupDefinition[] = [
+  {
+    name: 'applications',
+    sources: [{ table: '"Application"', dayColumn: '"createdAt"' }],
+    rebuild: async (tx, days) => {
+      const { from, to } = dayRange(days);
+      await tx.$executeRaw`DELETE FROM daily_application_stats WHERE date = ANY(${days}::date[])`;
+      await tx.$executeRaw`
+        INSERT INTO daily_application_stats
+          (date, department, priority, status, count, completed_count, completion_seconds, updated_at)
+        SELECT
+          a."createdAt"::date,
+          a."applicantDept",
+          a.priority,
+          a.status,
+          COUNT(*),
+          COUNT(*) FILTER (WHERE ${Prisma.raw(COMPLETED_CONDITION)}),
+          COALESCE(SUM(EXTRACT(EPOCH FROM (a."completedAt" - a."submittedAt"))) FILTER (WHERE ${Prisma.raw(COMPLETED_CONDITION)}), 0),
+          NOW()
+        FROM "Application" a
+        WHERE a."createdAt" >= ${from} AND a."createdAt" < ${to}
+          AND a."createdAt"::date = ANY(${days}::date[])
+        GROUP BY 1, 2, 3, 4
+      `;
+    },
+  },
+  {
+    name: 'attendance',
+    sources: [{ table: 'attendance_records', dayColumn: '"date"' }],
+    rebuild: async (tx, days) => {
+      await tx.$executeRaw`DELETE FROM daily_attendance_stats WHERE date = ANY(${days}::date[])`;
+      // 部门按汇总时用户所属部门归属，与实时统计口径一致
+      await tx.$executeRaw`
+        INSERT INTO daily_attendance_stats
+          (date, department_id, record_count, normal_count, late_count, early_leave_count, absent_count,
+           work_hours, worked_count, under6_count, from6_to8_count, from8_to10_count, over10_count, updated_at)
+        SELECT
+          r.date,
+          COALESCE(u."departmentId", ''),
+          COUNT(*),
+          COUNT(*) FILTER (WHERE r.status = 'NORMAL'),
+          COUNT(*) FILTER (WHERE r.status = 'LATE'),
+          COUNT(*) FILTER (WHERE r.status = 'EARLY_LEAVE'),
+          COUNT(*) FILTER (WHERE r.status = 'ABSENT'),
+          COALESCE(SUM(r."workHours"), 0),
+          COUNT(*) FILTER (WHERE r."workHours" > 0),
+          COUNT(*) FILTER (WHERE r."workHours" > 0 AND r."workHours" < 6),
+          COUNT(*) FILTER (WHERE r."workHours" >= 6 AND r."workHours" <= 8),
+          COUNT(*) FILTER (WHERE r."workHours" > 8 AND r."workHours" <= 10),
+          COUNT(*) FILTER (WHERE r."workHours" > 10),
+          NOW()
+        FROM attendance_records r
+        JOIN "User" u ON u.id = r."userId"
+        WHERE r.date = ANY(${days}::date[])
+        GROUP BY 1, 2
+      `;
+    },
+  },
+  {
+    name: 'maintenance',
+    sources: [{ table: '"MaintenanceRecord"', dayColumn: '"createdAt"' }],
+    rebuild: async (tx, days) => {
+      const { from, to } = dayRange(days);
+      await tx.$executeRaw`DELETE FROM daily_maintenance_stats WHERE date = ANY(${days}::date[])`;
+      await tx.$executeRaw`
+        INSERT INTO daily_maintenance_stats (date, equipment_id, type, count, total_cost, updated_at)
+        SELECT m."createdAt"::date, m."equipmentId", m.type, COUNT(*), COALESCE(SUM(m.cost), 0), NOW()
+        FROM "MaintenanceRecord" m
+        WHERE m."createdAt" >= ${from} AND m."createdAt" < ${to}
+          AND m."createdAt"::date = ANY(${days}::date[])
+        GROUP BY 1, 2, 3
+      `;
+    },
+  },
+  {
+    name: 'userActivity',
+    sources: [
+      { table: 'tasks', dayColumn: '"createdAt"' },
+      { table: '"Application"', dayColumn: '"createdAt"' },
+      { table: '"FactoryApproval"', dayColumn: '"createdAt"' },
+      { table: '"DirectorApproval"', dayColumn: '"createdAt"' },
+      { table: '"ManagerApproval"', dayColumn: '"createdAt"' },
+      { table: '"CeoApproval"', dayColumn: '"createdAt"' },
+    ],
+    rebuild: async (tx, days) => {
+      const { from, to } = dayRange(days);
+      const timedTask = Prisma.raw(`t.status = 'DONE' AND t."completedAt" IS NOT NULL AND t."startDate" IS NOT NULL`);
+      await tx.$executeRaw`DELETE FROM daily_user_stats WHERE date = ANY(${days}::date[])`;
+      await tx.$executeRaw`
+        INSERT INTO daily_user_stats
+          (date, user_id, tasks_assigned, tasks_completed, task_completion_seconds, task_completion_timed,
+           applications_submitted, applications_approved, applications_rejected, approvals_processed, updated_at)
+        SELECT day, user_id,
+          SUM(tasks_assigned)::int, SUM(tasks_completed)::int,
+          SUM(task_completion_seconds)::float8, SUM(task_completion_timed)::int,
+          SUM(applications_submitted)::int, SUM(applications_approved)::int, SUM(applications_rejected)::int,
+          SUM(approvals_processed)::int,
+          NOW()
+        FROM (
+          SELECT t."createdAt"::date AS day, t."assigneeId" AS user_id,
+            COUNT(*) AS tasks_assigned,
+            COUNT(*) FILTER (WHERE t.status = 'DONE') AS tasks_completed,
+            COALESCE(SUM(EXTRACT(EPOCH FROM (t."completedAt" - t."startDate"))) FILTER (WHERE ${timedTask}), 0) AS task_completion_seconds,
+            COUNT(*) FILTER (WHERE ${timedTask}) AS task_completion_timed,
+            0 AS applications_submitted, 0 AS applications_approved, 0 AS applications_rejected, 0 AS approvals_processed
+          FROM tasks t
+          WHERE t."assigneeId" IS NOT NULL
+            AND t."createdAt" >= ${from} AND t."createdAt" < ${to}
+            AND t."createdAt"::date = ANY(${days}::date[])
+          GROUP BY 1, 2
+          UNION ALL
+          SELECT a."createdAt"::date, a."applicantId",
+            0, 0, 0, 0,
+            COUNT(*), COUNT(*) FILTER (WHERE a.status = 'APPROVED'), COUNT(*) FILTER (WHERE a.status = 'REJECTED'), 0
+          FROM "Application" a
+          WHERE a."createdAt" >= ${from} AND a."createdAt" < ${to}
+            AND a."createdAt"::date = ANY(${days}::date[])
+          GROUP BY 1, 2
+          UNION ALL
+          SELECT s."createdAt"::date, s."approverId",
+            0, 0, 0, 0, 0, 0, 0, COUNT(*)
+          FROM (
+            SELECT "createdAt", "approverId", action FROM "FactoryApproval"
+            UNION ALL
+            SELECT "createdAt", "approverId", action FROM "DirectorApproval"
+            UNION ALL
+            SELECT "createdAt", "approverId", action FROM "ManagerApproval"
+            UNION ALL
+            SELECT "createdAt", "approverId", action FROM "CeoApproval"
+          ) s
+          WHERE s.action = 'APPROVE'
+            AND s."createdAt" >= ${from} AND s."createdAt" < ${to}
+            AND s."createdAt"::date = ANY(${days}::date[])
+          GROUP BY 1, 2
+        ) activity
+        GROUP BY day, user_id
+      `;
+    },
+  },
+];
+
+// 已完成首次回填的汇总（进程内缓存，完成后不会回退）
+const readyRollups = new Set<RollupName>();
+
+/**
+ * 找出 since 之后有变更的日期，以及变更行中最大的 updatedAt
+ */
+async function findChangedDays(
+  sources: RollupSource[],
+  since: Date
+): Promise<{ days: string[]; maxUpdatedAt: Date | null }> {
+  const results = await Promise.all(sources.map((source) =>
+    prisma.$queryRaw<Array<{ day: string; max_updated: Date }>>`
+      SELECT to_char((${Prisma.raw(source.dayColumn)})::date, 'YYYY-MM-DD') AS day, MAX("updatedAt") AS max_updated
+      FROM ${Prisma.raw(source.table)}
+      WHERE "updatedAt" > ${since}
+      GROUP BY 1
+    `
+  ));
+
+  const days = new Set<string>();
+  let maxUpdatedAt: Date | null = null;
+  results.flat().forEach((row) => {
+    days.add(row.day);
+    if (!maxUpdatedAt || row.max_updated > maxUpdatedAt) maxUpdatedAt = row.max_updated;
+  });
+
+  return { days: [...days].sort(), maxUpdatedAt };
+}
+
+/**
+ * 分批重算指定日期（同一汇总的重算用事务级咨询锁串行，多实例部署也安全）
+ */
+async function rebuildDays(rollup: RollupDefinition, days: string[]): Promise<void> {
+  for (let i = 0; i < days.length; i += ROLLUP_CONFIG.DAYS_PER_BATCH) {
+    const batch = days.slice(i, i + ROLLUP_CONFIG.DAYS_PER_BATCH);
+    await prisma.$transaction(async (tx) => {
+      await tx.$queryRaw`SELECT pg_advisory_xact_lock(hashtext(${`rollup:${rollup.name}`}))`;
+      await rollup.rebuild(tx, batch);
+    }, { timeout: 120000 });
+  }
+}
+
+/**
+ * 对单个汇总执行一次增量更新，返回重算的天数
+ */
+async function runRollup(rollup: RollupDefinition): Promise<number> {
+  const mark = await prisma.rollupWatermark.findUnique({ where: { name: rollup.name } });
+  // 首次运行从头回填
+  const since = mark ? new Date(mark.watermark.getTime() - ROLLUP_CONFIG.OVERLAP_MS) : new Date(0);
+
+  const { days, maxUpdatedAt } = await findChangedDays(rollup.sources, since);
+  if (days.length > 0) {
+    await rebuildDays(rollup, days);
+  }
+
+  const watermark = maxUpdatedAt && (!mark || maxUpdatedAt > mark.watermark)
+    ? maxUpdatedAt
+    : mark?.watermark || new Date(0);
+  await prisma.rollupWatermark.upsert({
+    where: { name: rollup.name },
+    create: { name: rollup.name, watermark, daysRecomputed: days.length, lastRunAt: new Date() },
+    update: { watermark, daysRecomputed: days.length, lastRunAt: new Date() },
+  });
+  readyRollups.add(rollup.name);
+
+  return days.length;
+}
+
+/**
+ * 执行所有汇总的增量更新
+ */
+export async function runReportRollups(): Promise<Record<RollupName, number>> {
+  const result = {} as Record<RollupName, number>;
+  for (const rollup of ROLLUPS) {
+    const start = Date.now();
+    result[rollup.name] = await runRollup(rollup);
+    if (result[rollup.name] > 0) {
+      logger.info('报表汇总已更新', { rollup: rollup.name, days: result[rollup.name], durationMs: Date.now() - start });
+    }
+  }
+  return result;
+}
+
+/**
+ * 重算最近N天（兜底物理删除）
+ */
+export async function reconcileReportRollups(daysBack = ROLLUP_CONFIG.RECONCILE_DAYS): Promise<void> {
+  const days: string[] = [];
+  const today = new Date();
+  for (let i = daysBack - 1; i >= 0; i--) {
+    const day = new Date(Date.UTC(today.getUTCFullYear(), today.getUTCMonth(), today.getUTCDate() - i));
+    days.push(day.toISOString().split('T')[0]);
+  }
+  for (const rollup of ROLLUPS) {
+    await rebuildDays(rollup, days);
+  }
+  logger.info('报表汇总对账完成', { days: daysBack });
+}
+
+/**
+ * 汇总是否已完成首次回填，未完成时报表回退到实时统计
+ */
+export async function isRollupReady(name: RollupName): Promise<boolean> {
+  if (!ROLLUP_CONFIG.ENABLED) return false;
+  if (readyRollups.has(name)) return true;
+  const mark = await prisma.rollupWatermark.findUnique({ where: { name } });
+  if (mark) readyRollups.add(name);
+  return !!mark;
+}
+
+/**
+ * 汇总运行状态
+ */
+export async function getRollupStatus() {
+  const marks = await prisma.rollupWatermark.findMany({ orderBy: { name: 'asc' } });
+  return {
+    enabled: ROLLUP_CONFIG.ENABLED,
+    intervalMs: ROLLUP_CONFIG.INTERVAL_MS,
+    rollups: marks,
+  };
+}
+
+/**
+ * 启动增量汇总定时任务
+ */
+export function startReportRollupScheduler(): void {
+  if (!ROLLUP_CONFIG.ENABLED) {
+    logger.info('报表汇总调度器未启动（已禁用）');
+    return;
+  }
+
+  let lastReconciledAt = Date.now();
+
+  const scheduleNext = (delay: number) => {
+    setTimeout(async () => {
+      try {
+        await runReportRollups();
+        if (Date.now() - lastReconciledAt >= 24 * 60 * 60 * 1000) {
+          await reconcileReportRollups();
+          lastReconciledAt = Date.now();
+        }
+      } catch (error) {
+        logger.error('报表汇总任务执行失败', { error: error instanceof Error ? error.message : String(error) });
+      } finally {
+        // 无论成功与否，都调度下一次
+        scheduleNext(ROLLUP_CONFIG.INTERVAL_MS);
+      }
+    }, delay);
+  };
+
+  // 启动后立即执行一次（首次运行会回填历史数据）
+  scheduleNext(0);
+  logger.info(`报表汇总调度器已启动，间隔 ${ROLLUP_CONFIG.INTERVAL_MS / 1000} 秒`);
+}
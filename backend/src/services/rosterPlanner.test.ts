@@ -0,0 +1,61 @@
+/**
+ * 排班展开与差异计算单元测试
+ */
+
+import { dateRange, expandRoster, diffRoster } from './rosterPlanner'
+
+describe('dateRange', () => {
+  it('包含首尾日期，跨月正确', () => {
+    expect(dateRange('2026-01-30', '2026-02-02')).toEqual(['2026-01-30', '2026-01-31', '2026-02-01', '2026-02-02'])
+    expect(() => dateRange('2026-02-02', '2026-02-01')).toThrow('结束日期不能早于开始日期')
+  })
+})
+
+describe('expandRoster', () => {
+  it('轮班序列按人员错开', () => {
+    const cells = expandRoster(['a', 'b'], dateRange('2026-03-02', '2026-03-05'), {
+      cycle: ['D', 'N', null],
+      staggerDays: 1,
+    })
+
+    const row = (userId: string) => cells.filter(c => c.userId === userId).map(c => (c.isRestDay ? '-' : c.shiftId))
+    expect(row('a')).toEqual(['D', 'N', '-', 'D'])
+    expect(row('b')).toEqual(['N', '-', 'D', 'N'])
+    // 休息日记录使用序列中的第一个班次
+    expect(cells.find(c => c.userId === 'a' && c.isRestDay)?.shiftId).toBe('D')
+  })
+
+  it('固定休息的星期、节假日和连续上班上限', () => {
+    // 2026-03-01 为周日
+    const cells = expandRoster(['a'], dateRange('2026-03-01', '2026-03-10'), {
+      cycle: ['D'],
+      restWeekdays: [0],
+      restDates: ['2026-03-03'],
+      maxConsecutiveWorkDays: 3,
+    })
+
+    expect(cells.map(c => (c.isRestDay ? '-' : 'D')).join('')).toBe('-D-DDD--DD')
+  })
+})
+
+describe('diffRoster', () => {
+  it('区分新增、更新和跳过', () => {
+    const existing = [
+      { id: 's1', userId: 'a', date: '2026-03-01', shiftId: 'D', isRestDay: false },
+      { id: 's2', userId: 'a', date: '2026-03-02', shiftId: 'N', isRestDay: false },
+    ]
+    const cells = [
+      { userId: 'a', date: '2026-03-01', shiftId: 'D', isRestDay: false },
+      { userId: 'a', date: '2026-03-02', shiftId: 'D', isRestDay: false },
+      { userId: 'a', date: '2026-03-03', shiftId: 'D', isRestDay: false },
+      { userId: 'a', date: '2026-03-03', shiftId: 'N', isRestDay: false },
+    ]
+
+    expect(diffRoster(cells, existing, true)).toEqual({
+      creates: [cells[2]],
+      updates: [{ shiftId: 'D', isRestDay: false, ids: ['s2'] }],
+      skipped: 2,
+    })
+    expect(diffRoster(cells, existing, false)).toMatchObject({ updates: [], skipped: 3 })
+  })
+})
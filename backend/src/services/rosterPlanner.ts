@@ -0,0 +1,145 @@
+/**
+ * 排班展开与差异计算（纯函数）
+ * 按轮班序列和休息规则在内存中展开 人员 × 日期 的排班格，
+ * 再与已有排班比对，得出需要新增、更新和跳过的格子，供批量写入使用
+ */
+
+const DAY_MS = 24 * 60 * 60 * 1000
+
+// 单次排班最多跨越的天数
+export const MAX_ROSTER_DAYS = 366
+
+export interface ShiftPattern {
+  // 轮班序列，按天循环：班次ID，null 表示休息
+  cycle: Array<string | null>
+  // 序列第一天对应的日期（YYYY-MM-DD），默认为排班开始日期
+  anchorDate?: string
+  // 相邻人员在序列中错开的天数（倒班分组）
+  staggerDays?: number
+  // 指定人员在序列中的偏移天数，优先于 staggerDays
+  userOffsets?: Record<string, number>
+  // 固定休息的星期（0 为周日）
+  restWeekdays?: number[]
+  // 休息的日期（节假日等，YYYY-MM-DD）
+  restDates?: string[]
+  // 连续上班达到该天数后强制休息一天（从排班开始日期起算）
+  maxConsecutiveWorkDays?: number
+  // 休息日记录使用的班次，默认取序列中第一个班次
+  restShiftId?: string
+}
+
+export interface RosterCell {
+  userId: string
+  date: string // YYYY-MM-DD
+  shiftId: string
+  isRestDay: boolean
+}
+
+export interface ExistingSchedule {
+  id: string
+  userId: string
+  date: string // YYYY-MM-DD
+  shiftId: string
+  isRestDay: boolean
+}
+
+export interface RosterDiff {
+  creates: RosterCell[]
+  // 按 (班次, 是否休息) 分组的待更新排班ID，每组一条 updateMany
+  updates: Array<{ shiftId: string; isRestDay: boolean; ids: string[] }>
+  skipped: number
+}
+
+export const toDateKey = (date: Date) => date.toISOString().slice(0, 10)
+export const fromDateKey = (key: string) => new Date(`${key}T00:00:00.000Z`)
+
+/**
+ * 日期区间内的所有日期（含首尾）
+ */
+export function dateRange(startDate: string, endDate: string): string[] {
+  const start = fromDateKey(startDate).getTime()
+  const end = fromDateKey(endDate).getTime()
+  if (Number.isNaN(start) || Number.isNaN(end)) throw new Error('日期格式错误')
+  if (end < start) throw new Error('结束日期不能早于开始日期')
+
+  const days = Math.round((end - start) / DAY_MS) + 1
+  if (days > MAX_ROSTER_DAYS) throw new Error(`单次排班最多 ${MAX_ROSTER_DAYS} 天`)
+  return Array.from({ length: days }, (_, i) => toDateKey(new Date(start + i * DAY_MS)))
+}
+
+/**
+ * 按轮班规则展开排班
+ */
+export function expandRoster(userIds: string[], dates: string[], pattern: ShiftPattern): RosterCell[] {
+  const { cycle } = pattern
+  if (cycle.length === 0) throw new Error('轮班序列不能为空')
+
+  const restShiftId = pattern.restShiftId ?? cycle.find((s): s is string => !!s)
+  if (!restShiftId) throw new Error('轮班序列全为休息时须指定休息日班次')
+
+  const anchor = fromDateKey(pattern.anchorDate ?? dates[0]).getTime()
+  const restWeekdays = new Set(pattern.restWeekdays ?? [])
+  const restDates = new Set(pattern.restDates ?? [])
+  const maxWork = pattern.maxConsecutiveWorkDays
+
+  // 日期相关的部分对所有人相同，先算一次
+  const dayInfo = dates.map(date => {
+    const time = fromDateKey(date).getTime()
+    return {
+      date,
+      dayIndex: Math.round((time - anchor) / DAY_MS),
+      fixedRest: restWeekdays.has(new Date(time).getUTCDay()) || restDates.has(date),
+    }
+  })
+
+  const cells: RosterCell[] = []
+  userIds.forEach((userId, userIndex) => {
+    const offset = pattern.userOffsets?.[userId] ?? userIndex * (pattern.staggerDays ?? 0)
+    let consecutiveWork = 0
+
+    for (const { date, dayIndex, fixedRest } of dayInfo) {
+      const position = (((dayIndex + offset) % cycle.length) + cycle.length) % cycle.length
+      const shiftId = cycle[position]
+      const isRestDay = !shiftId || fixedRest || (maxWork !== undefined && consecutiveWork >= maxWork)
+
+      consecutiveWork = isRestDay ? 0 : consecutiveWork + 1
+      cells.push({ userId, date, shiftId: isRestDay ? (shiftId ?? restShiftId) : (shiftId as string), isRestDay })
+    }
+  })
+  return cells
+}
+
+/**
+ * 与已有排班比对：不存在的新增；已存在且不同的按 overwrite 决定更新或跳过；相同的跳过。
+ * 同一人同一天重复出现时只取第一条
+ */
+export function diffRoster(cells: RosterCell[], existing: ExistingSchedule[], overwrite: boolean): RosterDiff {
+  const existingByKey = new Map(existing.map(s => [`${s.userId}|${s.date}`, s]))
+  const seen = new Set<string>()
+  const creates: RosterCell[] = []
+  const updateGroups = new Map<string, { shiftId: string; isRestDay: boolean; ids: string[] }>()
+  let skipped = 0
+
+  for (const cell of cells) {
+    const key = `${cell.userId}|${cell.date}`
+    if (seen.has(key)) {
+      skipped++
+      continue
+    }
+    seen.add(key)
+
+    const current = existingByKey.get(key)
+    if (!current) {
+      creates.push(cell)
+    } else if (!overwrite || (current.shiftId === cell.shiftId && current.isRestDay === cell.isRestDay)) {
+      skipped++
+    } else {
+      const groupKey = `${cell.shiftId}|${cell.isRestDay}`
+      const group = updateGroups.get(groupKey) || { shiftId: cell.shiftId, isRestDay: cell.isRestDay, ids: [] }
+      group.ids.push(current.id)
+      updateGroups.set(groupKey, group)
+    }
+  }
+
+  return { creates, updates: Array.from(updateGroups.values()), skipped }
+}
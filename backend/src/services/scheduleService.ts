@@ -1,5 +1,20 @@
 import { prisma } from '../lib/prisma'
 import * as logger from '../lib/logger'
+import {
+  ShiftPattern,
+  RosterCell,
+  dateRange,
+  expandRoster,
+  diffRoster,
+  toDateKey,
+  fromDateKey,
+} from './rosterPlanner'
+
+// 每条 createMany / updateMany 的行数（受 PostgreSQL 单条语句绑定参数上限约束）
+const ROSTER_WRITE_CHUNK = 5000
+
+// 整批排班在一个事务内写入，大批量时需要更长的事务超时
+const ROSTER_TX_TIMEOUT_MS = 120000
 
 export interface CreateShiftData {
   name: string
@@ -20,6 +35,23 @@ export interface BatchScheduleData {
   userIds: string[]
   dates: Date[]
   shiftId: string
+  overwrite?: boolean
+}
+
+export interface GenerateRosterData {
+  userIds: string[]
+  startDate: string // YYYY-MM-DD
+  endDate: string // YYYY-MM-DD，含当天
+  pattern: ShiftPattern
+  // 已有排班是否覆盖，默认覆盖
+  overwrite?: boolean
+}
+
+export interface RosterSummary {
+  total: number
+  inserted: number
+  updated: number
+  skipped: number
 }
 
 export class ScheduleService {
@@ -132,27 +164,108 @@ export class ScheduleService {
     })
   }
 
-  // 批量创建排班
-  async batchCreateSchedules(data: BatchScheduleData) {
-    const results = []
-
-    for (const userId of data.userIds) {
-      for (const date of data.dates) {
-        try {
-          const schedule = await this.createSchedule({
-            userId,
-            date,
-            shiftId: data.shiftId,
-            isRestDay: false,
+  // 批量写入排班格：一次查询已有排班，内存比对后在同一事务内分块 createMany / updateMany
+  async applyRoster(cells: RosterCell[], overwrite = true): Promise<RosterSummary> {
+    if (cells.length === 0) return { total: 0, inserted: 0, updated: 0, skipped: 0 }
+
+    const userIds = Array.from(new Set(cells.map(c => c.userId)))
+    const dates = cells.map(c => c.date).sort()
+
+    const summary = await prisma.$transaction(async (tx) => {
+      const existing = await tx.schedule.findMany({
+        where: {
+          userId: { in: userIds },
+          date: { gte: fromDateKey(dates[0]), lte: fromDateKey(dates[dates.length - 1]) },
+        },
+        select: { id: true, userId: true, date: true, shiftId: true, isRestDay: true },
+      })
+
+      const diff = diffRoster(
+        cells,
+        existing.map(e => ({ ...e, date: toDateKey(e.date) })),
+        overwrite
+      )
+
+      let inserted = 0
+      for (let i = 0; i < diff.creates.length; i += ROSTER_WRITE_CHUNK) {
+        const { count } = await tx.schedule.createMany({
+          data: diff.creates.slice(i, i + ROSTER_WRITE_CHUNK).map(c => ({
+            userId: c.userId,
+            date: fromDateKey(c.date),
+            shiftId: c.shiftId,
+            isRestDay: c.isRestDay,
+          })),
+          // 与并发写入的排班冲突时保留对方的记录
+          skipDuplicates: true,
+        })
+        inserted += count
+      }
+
+      let updated = 0
+      for (const group of diff.updates) {
+        for (let i = 0; i < group.ids.length; i += ROSTER_WRITE_CHUNK) {
+          const { count } = await tx.schedule.updateMany({
+            where: { id: { in: group.ids.slice(i, i + ROSTER_WRITE_CHUNK) } },
+            data: { shiftId: group.shiftId, isRestDay: group.isRestDay },
           })
-          results.push(schedule)
-        } catch (error) {
-          logger.error('Failed to create schedule', { userId, date, error })
+          updated += count
         }
       }
+
+      return {
+        total: cells.length,
+        inserted,
+        updated,
+        skipped: cells.length - inserted - updated,
+      }
+    }, { timeout: ROSTER_TX_TIMEOUT_MS })
+
+    logger.info('批量排班完成', { users: userIds.length, ...summary })
+    return summary
+  }
+
+  // 校验排班涉及的人员和班次（各一次查询）
+  private async assertRosterRefs(userIds: string[], shiftIds: string[]) {
+    const [users, shifts] = await Promise.all([
+      prisma.user.findMany({ where: { id: { in: userIds } }, select: { id: true } }),
+      prisma.shift.findMany({ where: { id: { in: shiftIds }, isActive: true }, select: { id: true } }),
+    ])
+
+    const userSet = new Set(users.map(u => u.id))
+    const missingUsers = userIds.filter(id => !userSet.has(id))
+    if (missingUsers.length > 0) {
+      throw new Error(`用户不存在: ${missingUsers.slice(0, 10).join(', ')}${missingUsers.length > 10 ? ' 等' : ''}`)
+    }
+
+    const shiftSet = new Set(shifts.map(s => s.id))
+    const missingShifts = shiftIds.filter(id => !shiftSet.has(id))
+    if (missingShifts.length > 0) {
+      throw new Error(`班次不存在或已停用: ${missingShifts.join(', ')}`)
     }
+  }
+
+  // 按轮班规则生成排班
+  async generateRoster(data: GenerateRosterData): Promise<RosterSummary> {
+    const userIds = Array.from(new Set(data.userIds))
+    const cells = expandRoster(userIds, dateRange(data.startDate, data.endDate), data.pattern)
+
+    await this.assertRosterRefs(userIds, Array.from(new Set(cells.map(c => c.shiftId))))
+    return this.applyRoster(cells, data.overwrite ?? true)
+  }
 
-    return results
+  // 批量创建排班（指定人员 × 指定日期使用同一班次）
+  async batchCreateSchedules(data: BatchScheduleData): Promise<RosterSummary> {
+    const userIds = Array.from(new Set(data.userIds))
+    const dates = Array.from(new Set(data.dates.map(toDateKey)))
+    await this.assertRosterRefs(userIds, [data.shiftId])
+
+    const cells = userIds.flatMap(userId => dates.map(date => ({
+      userId,
+      date,
+      shiftId: data.shiftId,
+      isRestDay: false,
+    })))
+    return this.applyRoster(cells, data.overwrite ?? true)
   }
 
   // 删除排班
@@ -288,53 +401,37 @@ export class ScheduleService {
     })
   }
 
-  // 复制排班
-  async copySchedules(sourceMonth: Date, targetMonth: Date, userIds?: string[]) {
-    const startOfSource = new Date(sourceMonth.getFullYear(), sourceMonth.getMonth(), 1)
-    const endOfSource = new Date(sourceMonth.getFullYear(), sourceMonth.getMonth() + 1, 0)
-
-    const where: Record<string, unknown> = {
-      date: {
-        gte: startOfSource,
-        lte: endOfSource,
-      },
-    }
-
-    if (userIds && userIds.length > 0) {
-      where.userId = { in: userIds }
-    }
+  // 复制排班：按日号把源月份排班复制到目标月份，目标月份没有的日号（如 2 月 30 日）跳过
+  async copySchedules(sourceMonth: Date, targetMonth: Date, userIds?: string[], overwrite = true): Promise<RosterSummary> {
+    const sourceYear = sourceMonth.getUTCFullYear()
+    const sourceIndex = sourceMonth.getUTCMonth()
+    const targetYear = targetMonth.getUTCFullYear()
+    const targetIndex = targetMonth.getUTCMonth()
+    const targetDays = new Date(Date.UTC(targetYear, targetIndex + 1, 0)).getUTCDate()
 
     const sourceSchedules = await prisma.schedule.findMany({
-      where,
-      include: {
-        shift: true,
+      where: {
+        date: {
+          gte: new Date(Date.UTC(sourceYear, sourceIndex, 1)),
+          lte: new Date(Date.UTC(sourceYear, sourceIndex + 1, 0)),
+        },
+        ...(userIds && userIds.length > 0 && { userId: { in: userIds } }),
       },
+      select: { userId: true, date: true, shiftId: true, isRestDay: true },
     })
 
-    const results = []
-
-    for (const schedule of sourceSchedules) {
-      // 计算目标月份对应的日期
-      const targetDate = new Date(
-        targetMonth.getFullYear(),
-        targetMonth.getMonth(),
-        schedule.date.getDate()
-      )
-
-      try {
-        const newSchedule = await this.createSchedule({
-          userId: schedule.userId,
-          date: targetDate,
-          shiftId: schedule.shiftId,
-          isRestDay: schedule.isRestDay,
-        })
-        results.push(newSchedule)
-      } catch (error) {
-        logger.error('Failed to copy schedule', { error })
-      }
-    }
-
-    return results
+    const cells: RosterCell[] = sourceSchedules
+      .filter(schedule => schedule.date.getUTCDate() <= targetDays)
+      .map(schedule => ({
+        userId: schedule.userId,
+        date: toDateKey(new Date(Date.UTC(targetYear, targetIndex, schedule.date.getUTCDate()))),
+        shiftId: schedule.shiftId,
+        isRestDay: schedule.isRestDay,
+      }))
+
+    const summary = await this.applyRoster(cells, overwrite)
+    const outOfMonth = sourceSchedules.length - cells.length
+    return { ...summary, total: summary.total + outOfMonth, skipped: summary.skipped + outOfMonth }
   }
 
   // 获取用户某天的排班
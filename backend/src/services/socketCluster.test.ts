@@ -0,0 +1,69 @@
+/**
+ * Socket 集群进程内实现单元测试
+ */
+
+import { InMemoryPubSubBus, InMemoryPresenceStore } from './socketCluster';
+
+jest.mock('../config', () => ({
+  config: { socketCluster: { redisUrl: '', instanceId: 'test', heartbeatMs: 1000 } },
+}));
+
+const flush = () => new Promise((resolve) => setImmediate(resolve));
+
+describe('InMemoryPubSubBus', () => {
+  it('消息投递给该通道的所有订阅者', async () => {
+    const bus = new InMemoryPubSubBus();
+    const a = jest.fn();
+    const b = jest.fn();
+    const other = jest.fn();
+    await bus.subscribe('socket:emit', a);
+    await bus.subscribe('socket:emit', b);
+    await bus.subscribe('other', other);
+
+    await bus.publish('socket:emit', { rooms: ['all'], event: 'x', payload: { n: 1 } });
+    await flush();
+
+    expect(a).toHaveBeenCalledWith({ rooms: ['all'], event: 'x', payload: { n: 1 } });
+    expect(b).toHaveBeenCalledTimes(1);
+    expect(other).not.toHaveBeenCalled();
+  });
+
+  it('消息经过序列化，订阅者拿到的是副本', async () => {
+    const bus = new InMemoryPubSubBus();
+    const handler = jest.fn();
+    await bus.subscribe('c', handler);
+
+    const createdAt = new Date('2026-01-01T00:00:00Z');
+    const message = { createdAt };
+    await bus.publish('c', message);
+    await flush();
+
+    expect(handler.mock.calls[0][0]).toEqual({ createdAt: '2026-01-01T00:00:00.000Z' });
+    expect(handler.mock.calls[0][0]).not.toBe(message);
+  });
+});
+
+describe('InMemoryPresenceStore', () => {
+  it('用户所有连接断开后才视为离线', async () => {
+    const presence = new InMemoryPresenceStore();
+    await presence.addSocket('u1', 's1');
+    await presence.addSocket('u1', 's2');
+    await presence.addSocket('u2', 's3');
+
+    expect(await presence.countConnections()).toBe(3);
+    expect((await presence.getOnlineUsers()).sort()).toEqual(['u1', 'u2']);
+
+    await presence.removeSocket('u1', 's1');
+    expect(await presence.isOnline('u1')).toBe(true);
+
+    await presence.removeSocket('u1', 's2');
+    expect(await presence.isOnline('u1')).toBe(false);
+    expect(await presence.getOnlineUsers()).toEqual(['u2']);
+  });
+
+  it('移除未登记的连接不报错', async () => {
+    const presence = new InMemoryPresenceStore();
+    await expect(presence.removeSocket('nobody', 's1')).resolves.toBeUndefined();
+    expect(await presence.countConnections()).toBe(0);
+  });
+});
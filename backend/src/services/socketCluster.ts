@@ -0,0 +1,289 @@
+/**
+ * Socket.io 集群支持 - 跨进程的消息总线与在线状态存储
+ * 未配置 SOCKET_REDIS_URL 时使用进程内实现（单实例部署与测试）；
+ * 配置后通过 Redis 协议的 pub/sub 在多个后端实例之间转发推送，并共享在线状态
+ */
+
+import Redis from 'ioredis';
+import { config } from '../config';
+import logger from '../lib/logger';
+
+// ============================================
+// 消息总线
+// ============================================
+
+export type BusHandler = (message: unknown) => void;
+
+export interface PubSubBus {
+  publish(channel: string, message: unknown): Promise<void>;
+  subscribe(channel: string, handler: BusHandler): Promise<void>;
+  close(): Promise<void>;
+}
+
+/**
+ * 进程内消息总线：异步投递给本进程的订阅者
+ */
+export class InMemoryPubSubBus implements PubSubBus {
+  private handlers = new Map<string, BusHandler[]>();
+
+  async publish(channel: string, message: unknown): Promise<void> {
+    // 经过 JSON 序列化，与 Redis 实现的投递语义保持一致
+    const payload = JSON.parse(JSON.stringify(message)) as unknown;
+    for (const handler of this.handlers.get(channel) || []) {
+      queueMicrotask(() => handler(payload));
+    }
+  }
+
+  async subscribe(channel: string, handler: BusHandler): Promise<void> {
+    this.handlers.set(channel, [...(this.handlers.get(channel) || []), handler]);
+  }
+
+  async close(): Promise<void> {
+    this.handlers.clear();
+  }
+}
+
+/**
+ * Redis pub/sub 消息总线（发布与订阅各用一个连接）
+ */
+export class RedisPubSubBus implements PubSubBus {
+  private pub: Redis;
+  private sub: Redis;
+  private handlers = new Map<string, BusHandler[]>();
+
+  constructor(url: string) {
+    this.pub = new Redis(url);
+    this.sub = new Redis(url);
+    this.sub.on('message', (channel: string, raw: string) => {
+      let message: unknown;
+      try {
+        message = JSON.parse(raw);
+      } catch {
+        logger.warn('[SocketCluster] 忽略无法解析的消息', { channel });
+        return;
+      }
+      (this.handlers.get(channel) || []).forEach((handler) => handler(message));
+    });
+  }
+
+  async publish(channel: string, message: unknown): Promise<void> {
+    await this.pub.publish(channel, JSON.stringify(message));
+  }
+
+  async subscribe(channel: string, handler: BusHandler): Promise<void> {
+    const existing = this.handlers.get(channel);
+    this.handlers.set(channel, [...(existing || []), handler]);
+    if (!existing) await this.sub.subscribe(channel);
+  }
+
+  async close(): Promise<void> {
+    this.handlers.clear();
+    await Promise.all([this.pub.quit(), this.sub.quit()]);
+  }
+}
+
+// ============================================
+// 在线状态
+// ============================================
+
+export interface PresenceStore {
+  addSocket(userId: string, socketId: string): Promise<void>;
+  removeSocket(userId: string, socketId: string): Promise<void>;
+  isOnline(userId: string): Promise<boolean>;
+  getOnlineUsers(): Promise<string[]>;
+  countConnections(): Promise<number>;
+  // 实例退出时清除本实例登记的连接
+  close(): Promise<void>;
+}
+
+/**
+ * 进程内在线状态：userId -> socketId 集合
+ */
+export class InMemoryPresenceStore implements PresenceStore {
+  private sockets = new Map<string, Set<string>>();
+
+  async addSocket(userId: string, socketId: string): Promise<void> {
+    const set = this.sockets.get(userId) || new Set<string>();
+    set.add(socketId);
+    this.sockets.set(userId, set);
+  }
+
+  async removeSocket(userId: string, socketId: string): Promise<void> {
+    const set = this.sockets.get(userId);
+    if (!set) return;
+    set.delete(socketId);
+    if (set.size === 0) this.sockets.delete(userId);
+  }
+
+  async isOnline(userId: string): Promise<boolean> {
+    return this.sockets.has(userId);
+  }
+
+  async getOnlineUsers(): Promise<string[]> {
+    return Array.from(this.sockets.keys());
+  }
+
+  async countConnections(): Promise<number> {
+    let count = 0;
+    this.sockets.forEach((set) => { count += set.size; });
+    return count;
+  }
+
+  async close(): Promise<void> {
+    this.sockets.clear();
+  }
+}
+
+const PRESENCE_KEYS = {
+  online: 'presence:online',
+  instances: 'presence:instances',
+  userSockets: (userId: string) => `presence:user:${userId}`,
+  instanceSockets: (instanceId: string) => `presence:instance:${instanceId}`,
+  alive: (instanceId: string) => `presence:alive:${instanceId}`,
+};
+
+// 移除一个连接，用户没有剩余连接时从在线集合中移除（原子执行）
+const REMOVE_SOCKET_SCRIPT = `
+redis.call('SREM', KEYS[1], ARGV[1])
+redis.call('SREM', KEYS[2], ARGV[2])
+if redis.call('SCARD', KEYS[1]) == 0 then
+  redis.call('SREM', KEYS[3], ARGV[3])
+end
+return 1
+`;
+
+/**
+ * Redis 在线状态：所有实例共享
+ * 每个实例定期续期心跳键，心跳过期的实例（进程崩溃）登记的连接由存活实例清理
+ */
+export class RedisPresenceStore implements PresenceStore {
+  private redis: Redis;
+  private heartbeat: NodeJS.Timeout | null = null;
+
+  constructor(url: string, private instanceId: string, private heartbeatMs: number) {
+    this.redis = new Redis(url);
+    this.startHeartbeat();
+  }
+
+  private socketMember(socketId: string): string {
+    return `${this.instanceId}:${socketId}`;
+  }
+
+  async addSocket(userId: string, socketId: string): Promise<void> {
+    await this.redis
+      .multi()
+      .sadd(PRESENCE_KEYS.userSockets(userId), this.socketMember(socketId))
+      .sadd(PRESENCE_KEYS.instanceSockets(this.instanceId), `${userId}\t${socketId}`)
+      .sadd(PRESENCE_KEYS.online, userId)
+      .exec();
+  }
+
+  async removeSocket(userId: string, socketId: string): Promise<void> {
+    await this.removeMember(this.instanceId, userId, socketId);
+  }
+
+  private async removeMember(instanceId: string, userId: string, socketId: string): Promise<void> {
+    await this.redis.eval(
+      REMOVE_SOCKET_SCRIPT,
+      3,
+      PRESENCE_KEYS.userSockets(userId),
+      PRESENCE_KEYS.instanceSockets(instanceId),
+      PRESENCE_KEYS.online,
+      `${instanceId}:${socketId}`,
+      `${userId}\t${socketId}`,
+      userId
+    );
+  }
+
+  async isOnline(userId: string): Promise<boolean> {
+    return (await this.redis.sismember(PRESENCE_KEYS.online, userId)) === 1;
+  }
+
+  async getOnlineUsers(): Promise<string[]> {
+    return this.redis.smembers(PRESENCE_KEYS.online);
+  }
+
+  async countConnections(): Promise<number> {
+    const instances = await this.redis.smembers(PRESENCE_KEYS.instances);
+    const counts = await Promise.all(
+      instances.map((id) => this.redis.scard(PRESENCE_KEYS.instanceSockets(id)))
+    );
+    return counts.reduce((sum, n) => sum + n, 0);
+  }
+
+  /**
+   * 清除某个实例登记的全部连接
+   */
+  private async purgeInstance(instanceId: string): Promise<void> {
+    const members = await this.redis.smembers(PRESENCE_KEYS.instanceSockets(instanceId));
+    for (const member of members) {
+      const [userId, socketId] = member.split('\t');
+      await this.removeMember(instanceId, userId, socketId);
+    }
+    await this.redis.srem(PRESENCE_KEYS.instances, instanceId);
+  }
+
+  private async beat(): Promise<void> {
+    await this.redis
+      .multi()
+      .set(PRESENCE_KEYS.alive(this.instanceId), '1', 'PX', this.heartbeatMs * 3)
+      .sadd(PRESENCE_KEYS.instances, this.instanceId)
+      .exec();
+
+    // 清理心跳已过期的实例
+    const instances = await this.redis.smembers(PRESENCE_KEYS.instances);
+    for (const id of instances) {
+      if (id !== this.instanceId && !(await this.redis.exists(PRESENCE_KEYS.alive(id)))) {
+        logger.warn(`[SocketCluster] 清理失联实例的在线状态: ${id}`);
+        await this.purgeInstance(id);
+      }
+    }
+  }
+
+  private startHeartbeat(): void {
+    const run = () => {
+      this.beat()
+        .catch((error) => {
+          logger.error('[SocketCluster] 在线状态心跳失败', { error: error instanceof Error ? error.message : String(error) });
+        })
+        .finally(() => {
+          if (this.heartbeat) this.heartbeat = setTimeout(run, this.heartbeatMs);
+        });
+    };
+    this.heartbeat = setTimeout(run, 0);
+  }
+
+  async close(): Promise<void> {
+    if (this.heartbeat) clearTimeout(this.heartbeat);
+    this.heartbeat = null;
+    await this.purgeInstance(this.instanceId);
+    await this.redis.del(PRESENCE_KEYS.alive(this.instanceId));
+    await this.redis.quit();
+  }
+}
+
+// ============================================
+// 工厂
+// ============================================
+
+export interface SocketClusterBackend {
+  bus: PubSubBus;
+  presence: PresenceStore;
+}
+
+/**
+ * 按配置创建集群后端
+ */
+export function createSocketClusterBackend(): SocketClusterBackend {
+  const { redisUrl, instanceId, heartbeatMs } = config.socketCluster;
+
+  if (!redisUrl) {
+    return { bus: new InMemoryPubSubBus(), presence: new InMemoryPresenceStore() };
+  }
+
+  logger.info('[SocketCluster] 使用 Redis 共享推送与在线状态', { instanceId });
+  return {
+    bus: new RedisPubSubBus(redisUrl),
+    presence: new RedisPresenceStore(redisUrl, instanceId, heartbeatMs),
+  };
+}
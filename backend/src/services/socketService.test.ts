@@ -0,0 +1,43 @@
+/**
+ * Socket 房间分配单元测试
+ */
+
+import { getAudienceRooms, resolveSocketRooms } from './socketService';
+import { verifyAccessToken } from '../utils/jwt';
+import { loadAuthUser } from '../middleware/auth';
+
+jest.mock('../utils/jwt', () => ({ verifyAccessToken: jest.fn() }));
+jest.mock('../middleware/auth', () => ({ loadAuthUser: jest.fn() }));
+jest.mock('./socketCluster', () => ({ createSocketClusterBackend: jest.fn() }));
+
+const mockVerify = verifyAccessToken as jest.Mock;
+const mockLoadUser = loadAuthUser as jest.Mock;
+
+function connect(userId: string, departmentId: string | null, isActive = true) {
+  // 令牌本身不带部门
+  mockVerify.mockReturnValue({ userId, username: userId, role: 'USER' });
+  mockLoadUser.mockResolvedValue({ id: userId, isActive, employeeId: null, name: userId, departmentId, department: null });
+  return resolveSocketRooms('token');
+}
+
+const reaches = (rooms: string[], targets: string[]) => targets.some((room) => rooms.includes(room));
+
+describe('resolveSocketRooms', () => {
+  it('部门受众能送达已连接的部门成员', async () => {
+    const target = getAudienceRooms({ departmentIds: ['d1'] });
+
+    const member = await connect('u1', 'd1');
+    expect(member.userId).toBe('u1');
+    expect(member.rooms).toEqual(['user:u1', 'role:USER', 'dept:d1', 'all']);
+    expect(reaches(member.rooms, target)).toBe(true);
+
+    expect(reaches((await connect('u2', 'd2')).rooms, target)).toBe(false);
+    expect(reaches((await connect('u3', null)).rooms, target)).toBe(false);
+  });
+
+  it('用户不存在或已停用时拒绝连接', async () => {
+    await expect(connect('u1', 'd1', false)).rejects.toThrow('User not found or inactive');
+    mockLoadUser.mockResolvedValue(null);
+    await expect(resolveSocketRooms('token')).rejects.toThrow('User not found or inactive');
+  });
+});
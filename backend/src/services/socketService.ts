@@ -1,14 +1,25 @@
 import { Server as HttpServer } from 'http';
 import { Server as SocketIOServer, Socket } from 'socket.io';
 import { verifyAccessToken } from '../utils/jwt';
-import { NotificationType, Notification } from '@prisma/client';
+import { loadAuthUser } from '../middleware/auth';
+import { NotificationType, Notification, UserRole } from '@prisma/client';
 import * as logger from '../lib/logger';
+import { createSocketClusterBackend, SocketClusterBackend } from './socketCluster';
 
 // Socket.io 服务器实例
 let io: SocketIOServer | null = null;
 
-// 在线用户映射表: userId -> socketId[]
-const onlineUsers = new Map<string, string[]>();
+// 消息总线与在线状态（多实例部署时跨进程共享）
+let cluster: SocketClusterBackend | null = null;
+
+// 房间推送经消息总线转发，每个实例只向本进程的连接投递
+const EMIT_CHANNEL = 'socket:emit';
+
+interface RoomEmitMessage {
+  rooms: string[];
+  event: string;
+  payload: unknown;
+}
 
 // 客户端通知数据类型
 export interface ClientNotification {
@@ -22,6 +33,38 @@ export interface ClientNotification {
   createdAt: Date;
 }
 
+// 批量推送的目标受众（按房间推送，满足任一条件即可）
+export interface NotificationAudience {
+  all?: boolean;
+  roles?: UserRole[];
+  departmentIds?: string[];
+  userIds?: string[];
+}
+
+class SocketAuthError extends Error {}
+
+/**
+ * 按连接令牌确定要加入的房间
+ * 部门以库中当前值为准：登录签发的令牌不带部门，部门也可能在令牌有效期内调整
+ */
+export async function resolveSocketRooms(token: string): Promise<{ userId: string; rooms: string[] }> {
+  const payload = verifyAccessToken(token);
+  const user = await loadAuthUser(payload.userId);
+  if (!user || !user.isActive) {
+    throw new SocketAuthError('Authentication error: User not found or inactive');
+  }
+
+  return {
+    userId: payload.userId,
+    rooms: [
+      `user:${payload.userId}`,
+      `role:${payload.role}`,
+      ...(user.departmentId ? [`dept:${user.departmentId}`] : []),
+      'all',
+    ],
+  };
+}
+
 /**
  * 初始化 Socket.io 服务
  */
@@ -63,6 +106,14 @@ export function initializeSocket(httpServer: HttpServer): SocketIOServer {
     pingInterval: 25000,
   });
 
+  cluster = createSocketClusterBackend();
+  cluster.bus
+    .subscribe(EMIT_CHANNEL, (message) => {
+      const { rooms, event, payload } = message as RoomEmitMessage;
+      io?.to(rooms).emit(event, payload);
+    })
+    .catch((error) => logger.error('[Socket.io] 订阅推送通道失败', { error }));
+
   // 连接认证中间件
   io.use(async (socket: Socket, next: (err?: Error) => void) => {
     try {
@@ -72,12 +123,12 @@ export function initializeSocket(httpServer: HttpServer): SocketIOServer {
         return next(new Error('Authentication error: No token provided'));
       }
 
-      const payload = verifyAccessToken(token);
-      socket.data.userId = payload.userId;
-      socket.data.userRole = payload.role;
+      const { userId, rooms } = await resolveSocketRooms(token);
+      socket.data.userId = userId;
+      socket.data.rooms = rooms;
       next();
     } catch (error) {
-      next(new Error('Authentication error: Invalid token'));
+      next(error instanceof SocketAuthError ? error : new Error('Authentication error: Invalid token'));
     }
   });
 
@@ -87,13 +138,12 @@ export function initializeSocket(httpServer: HttpServer): SocketIOServer {
 
     logger.info(`[Socket.io] 用户 ${userId} 已连接`, { socketId: socket.id });
 
-    // 将用户加入专属房间
-    socket.join(`user:${userId}`);
+    // 将用户加入专属房间，以及角色、部门和全员房间（用于批量推送）
+    socket.join(socket.data.rooms as string[]);
 
     // 记录在线状态
-    const userSockets = onlineUsers.get(userId) || [];
-    userSockets.push(socket.id);
-    onlineUsers.set(userId, userSockets);
+    cluster?.presence.addSocket(userId, socket.id)
+      .catch((error) => logger.error('记录在线状态失败', { userId, error }));
 
     // 通知客户端连接成功
     socket.emit('connected', {
@@ -106,13 +156,8 @@ export function initializeSocket(httpServer: HttpServer): SocketIOServer {
       logger.info(`用户 ${userId} 已断开连接`, { reason });
 
       // 从在线列表中移除
-      const sockets = onlineUsers.get(userId) || [];
-      const updatedSockets = sockets.filter((id) => id !== socket.id);
-      if (updatedSockets.length === 0) {
-        onlineUsers.delete(userId);
-      } else {
-        onlineUsers.set(userId, updatedSockets);
-      }
+      cluster?.presence.removeSocket(userId, socket.id)
+        .catch((error) => logger.error('移除在线状态失败', { userId, error }));
     });
 
     // 处理客户端心跳
@@ -135,18 +180,43 @@ export function getIO(): SocketIOServer {
   return io;
 }
 
+function getCluster(): SocketClusterBackend {
+  if (!cluster) {
+    throw new Error('Socket.io 尚未初始化，请先调用 initializeSocket');
+  }
+  return cluster;
+}
+
 /**
- * 获取在线用户列表
+ * 向房间推送事件（经消息总线，所有实例上的连接都能收到）
  */
-export function getOnlineUsers(): string[] {
-  return Array.from(onlineUsers.keys());
+async function emitToRooms(rooms: string[], event: string, payload: unknown): Promise<void> {
+  const message: RoomEmitMessage = { rooms, event, payload };
+  await getCluster().bus.publish(EMIT_CHANNEL, message);
 }
 
 /**
- * 检查用户是否在线
+ * 获取在线用户列表（集群范围）
  */
-export function isUserOnline(userId: string): boolean {
-  return onlineUsers.has(userId);
+export async function getOnlineUsers(): Promise<string[]> {
+  return getCluster().presence.getOnlineUsers();
+}
+
+/**
+ * 检查用户是否在线（集群范围）
+ */
+export async function isUserOnline(userId: string): Promise<boolean> {
+  return getCluster().presence.isOnline(userId);
+}
+
+/**
+ * 关闭消息总线并清除本实例登记的在线状态
+ */
+export async function closeSocketCluster(): Promise<void> {
+  if (!cluster) return;
+  const current = cluster;
+  cluster = null;
+  await Promise.all([current.presence.close(), current.bus.close()]);
 }
 
 /**
@@ -173,14 +243,11 @@ export async function sendNotificationToUser(
   notification: Notification
 ): Promise<boolean> {
   try {
-    const ioInstance = getIO();
-    const room = `user:${userId}`;
-
     // 转换通知格式
     const clientNotification = toClientNotification(notification);
 
     // 发送给该用户的所有连接
-    ioInstance.to(room).emit('notification:new', clientNotification);
+    await emitToRooms([`user:${userId}`], 'notification:new', clientNotification);
 
     logger.info(`通知已发送给用户 ${userId}`, { title: notification.title });
     return true;
@@ -213,23 +280,35 @@ export async function sendNotificationToUsers(
 }
 
 /**
- * 向所有在线用户广播通知（不通过数据库）
- * 用于系统广播等实时通知场景
+ * 受众对应的 Socket.io 房间
  */
-export async function broadcastToAllOnlineUsers(notification: Notification): Promise<number> {
-  try {
-    const ioInstance = getIO();
-    const clientNotification = toClientNotification(notification);
+export function getAudienceRooms(audience: NotificationAudience): string[] {
+  if (audience.all) return ['all'];
+  return [
+    ...(audience.roles || []).map((role) => `role:${role}`),
+    ...(audience.departmentIds || []).map((id) => `dept:${id}`),
+    ...(audience.userIds || []).map((id) => `user:${id}`),
+  ];
+}
 
-    // 向所有连接的客户端广播
-    ioInstance.emit('notification:broadcast', clientNotification);
+/**
+ * 按房间推送批量通知，客户端收到后自行将未读数加一
+ * 同一连接属于多个目标房间时只会收到一次
+ */
+export async function broadcastToAudience(
+  audience: NotificationAudience,
+  notification: Notification
+): Promise<boolean> {
+  const rooms = getAudienceRooms(audience);
+  if (rooms.length === 0) return false;
 
-    const onlineCount = Array.from(onlineUsers.values()).flat().length;
-    logger.info(`系统广播已发送给所有在线用户`, { onlineCount, title: notification.title });
-    return onlineCount;
+  try {
+    await emitToRooms(rooms, 'notification:broadcast', toClientNotification(notification));
+    logger.info('批量通知已按房间推送', { rooms, title: notification.title });
+    return true;
   } catch (error) {
-    logger.error('系统广播失败', { error });
-    return 0;
+    logger.error('批量通知推送失败', { error });
+    return false;
   }
 }
 
@@ -238,8 +317,7 @@ export async function broadcastToAllOnlineUsers(notification: Notification): Pro
  */
 export async function updateUnreadCount(userId: string, count: number): Promise<void> {
   try {
-    const ioInstance = getIO();
-    ioInstance.to(`user:${userId}`).emit('notification:unreadCount', { count });
+    await emitToRooms([`user:${userId}`], 'notification:unreadCount', { count });
   } catch (error) {
     logger.error('更新未读数量失败', { error });
   }
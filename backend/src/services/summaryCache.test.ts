@@ -0,0 +1,71 @@
+/**
+ * SummaryCache 单元测试
+ */
+
+import { SummaryCache } from './summaryCache';
+
+jest.mock('../config', () => ({
+  config: { dashboardCache: { ttlMs: 1000 } },
+}));
+
+// 手动控制完成时机的计算函数
+const deferred = <T>() => {
+  let resolve!: (value: T) => void;
+  const promise = new Promise<T>((r) => { resolve = r; });
+  return { promise, resolve };
+};
+
+describe('SummaryCache', () => {
+  afterEach(() => {
+    jest.useRealTimers();
+  });
+
+  it('并发请求只计算一次', async () => {
+    const cache = new SummaryCache<number>(1000);
+    const pending = deferred<number>();
+    const compute = jest.fn(() => pending.promise);
+
+    const results = Promise.all([cache.get(compute), cache.get(compute), cache.get(compute)]);
+    pending.resolve(42);
+
+    expect(await results).toEqual([42, 42, 42]);
+    expect(compute).toHaveBeenCalledTimes(1);
+    expect(cache.stats()).toMatchObject({ misses: 1, coalesced: 2, cached: true });
+  });
+
+  it('TTL 内命中缓存，过期后重新计算', async () => {
+    jest.useFakeTimers();
+    const cache = new SummaryCache<number>(1000);
+    const compute = jest.fn().mockResolvedValueOnce(1).mockResolvedValueOnce(2);
+
+    expect(await cache.get(compute)).toBe(1);
+    expect(await cache.get(compute)).toBe(1);
+
+    jest.advanceTimersByTime(1001);
+
+    expect(await cache.get(compute)).toBe(2);
+    expect(compute).toHaveBeenCalledTimes(2);
+  });
+
+  it('失效前开始的计算结果不写回缓存', async () => {
+    const cache = new SummaryCache<number>(1000);
+    const stale = deferred<number>();
+    const first = cache.get(() => stale.promise);
+
+    cache.invalidate();
+    const second = cache.get(() => Promise.resolve(2));
+    stale.resolve(1);
+
+    expect(await first).toBe(1);
+    expect(await second).toBe(2);
+    expect(await cache.get(() => Promise.resolve(3))).toBe(2);
+  });
+
+  it('计算失败不缓存，下一次请求重试', async () => {
+    const cache = new SummaryCache<number>(1000);
+
+    await expect(cache.get(() => Promise.reject(new Error('db down')))).rejects.toThrow('db down');
+
+    expect(await cache.get(() => Promise.resolve(5))).toBe(5);
+  });
+});
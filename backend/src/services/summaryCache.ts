@@ -0,0 +1,90 @@
+/**
+ * 汇总数据缓存 - 短TTL + 单飞（同一时刻的并发请求共享同一次计算）
+ * invalidate 后正在进行的计算结果不会写回缓存，下一次请求重新计算
+ */
+
+import { config } from '../config';
+import type { DashboardSummary } from './reportService';
+
+export interface SummaryCacheStats {
+  ttlMs: number;
+  cached: boolean;
+  computing: boolean;
+  hits: number;
+  misses: number;
+  coalesced: number;
+  invalidations: number;
+}
+
+export class SummaryCache<T> {
+  private value: T | undefined;
+  private expiresAt = 0;
+  private inflight: Promise<T> | null = null;
+  // 每次失效递增，用于丢弃失效前开始的计算结果
+  private generation = 0;
+  private hits = 0;
+  private misses = 0;
+  private coalesced = 0;
+  private invalidations = 0;
+
+  constructor(private ttlMs: number) {}
+
+  /**
+   * 获取缓存值，过期时调用 compute 重新计算（并发调用只计算一次）
+   */
+  async get(compute: () => Promise<T>): Promise<T> {
+    if (this.value !== undefined && this.expiresAt > Date.now()) {
+      this.hits++;
+      return this.value;
+    }
+
+    if (this.inflight) {
+      this.coalesced++;
+      return this.inflight;
+    }
+
+    this.misses++;
+    const generation = this.generation;
+    const promise = compute()
+      .then((value) => {
+        if (generation === this.generation) {
+          this.value = value;
+          this.expiresAt = Date.now() + this.ttlMs;
+        }
+        return value;
+      })
+      .finally(() => {
+        if (this.inflight === promise) this.inflight = null;
+      });
+    this.inflight = promise;
+    return promise;
+  }
+
+  /**
+   * 使缓存失效（进行中的计算不再被后续请求复用）
+   */
+  invalidate(): void {
+    this.generation++;
+    this.invalidations++;
+    this.value = undefined;
+    this.inflight = null;
+  }
+
+  /**
+   * 命中统计
+   */
+  stats(): SummaryCacheStats {
+    return {
+      ttlMs: this.ttlMs,
+      cached: this.value !== undefined && this.expiresAt > Date.now(),
+      computing: this.inflight !== null,
+      hits: this.hits,
+      misses: this.misses,
+      coalesced: this.coalesced,
+      invalidations: this.invalidations,
+    };
+  }
+}
+
+// 报表中心仪表板汇总（全局数据，所有用户共享）
+export const dashboardSummaryCache = new SummaryCache<DashboardSummary>(config.dashboardCache.ttlMs);
@@ -0,0 +1,67 @@
+/**
+ * UserCache 单元测试
+ */
+
+import { UserCache, AuthUserProjection } from './userCache';
+
+jest.mock('../config', () => ({
+  config: { authCache: { maxSize: 100, ttlMs: 1000 } },
+}));
+
+const makeUser = (id: string): AuthUserProjection => ({
+  id,
+  isActive: true,
+  employeeId: `E${id}`,
+  name: `用户${id}`,
+  departmentId: null,
+  department: null,
+});
+
+describe('UserCache', () => {
+  afterEach(() => {
+    jest.useRealTimers();
+  });
+
+  it('命中与未命中分别计数', () => {
+    const cache = new UserCache(10, 1000);
+
+    expect(cache.get('u1')).toBeUndefined();
+    cache.set('u1', makeUser('u1'));
+    expect(cache.get('u1')).toEqual(makeUser('u1'));
+
+    expect(cache.stats()).toMatchObject({ hits: 1, misses: 1, size: 1, hitRate: 0.5 });
+  });
+
+  it('过期后视为未命中', () => {
+    jest.useFakeTimers();
+    const cache = new UserCache(10, 1000);
+    cache.set('u1', makeUser('u1'));
+
+    jest.advanceTimersByTime(1001);
+
+    expect(cache.get('u1')).toBeUndefined();
+    expect(cache.stats().size).toBe(0);
+  });
+
+  it('超出容量时淘汰最久未使用的用户', () => {
+    const cache = new UserCache(2, 1000);
+    cache.set('u1', makeUser('u1'));
+    cache.set('u2', makeUser('u2'));
+    cache.get('u1');
+    cache.set('u3', makeUser('u3'));
+
+    expect(cache.get('u2')).toBeUndefined();
+    expect(cache.get('u1')).toBeDefined();
+    expect(cache.get('u3')).toBeDefined();
+  });
+
+  it('invalidate 立即失效', () => {
+    const cache = new UserCache(10, 1000);
+    cache.set('u1', makeUser('u1'));
+
+    cache.invalidate('u1');
+
+    expect(cache.get('u1')).toBeUndefined();
+    expect(cache.stats().invalidations).toBe(1);
+  });
+});
@@ -0,0 +1,108 @@
+/**
+ * 认证用户缓存 - 按 userId 缓存认证中间件所需的用户投影，带TTL和LRU淘汰
+ * 用户被更新、禁用或删除时需调用 invalidate 立即失效
+ */
+
+import { config } from '../config';
+
+export interface AuthUserProjection {
+  id: string;
+  isActive: boolean;
+  employeeId: string;
+  name: string;
+  departmentId: string | null;
+  department: string | null;
+}
+
+interface CacheEntry {
+  value: AuthUserProjection;
+  expiresAt: number;
+}
+
+export interface UserCacheStats {
+  size: number;
+  maxSize: number;
+  ttlMs: number;
+  hits: number;
+  misses: number;
+  invalidations: number;
+  hitRate: number;
+}
+
+export class UserCache {
+  // Map 保持插入顺序，命中时重新插入即可实现 O(1) 的 LRU
+  private cache = new Map<string, CacheEntry>();
+  private hits = 0;
+  private misses = 0;
+  private invalidations = 0;
+
+  constructor(
+    private maxSize: number,
+    private ttlMs: number // TTL 兜底部门改名等未显式失效的变更
+  ) {}
+
+  /**
+   * 获取缓存，未命中或过期返回 undefined
+   */
+  get(userId: string): AuthUserProjection | undefined {
+    const entry = this.cache.get(userId);
+
+    if (!entry || entry.expiresAt <= Date.now()) {
+      if (entry) this.cache.delete(userId);
+      this.misses++;
+      return undefined;
+    }
+
+    this.cache.delete(userId);
+    this.cache.set(userId, entry);
+    this.hits++;
+    return entry.value;
+  }
+
+  /**
+   * 设置缓存
+   */
+  set(userId: string, value: AuthUserProjection): void {
+    this.cache.delete(userId);
+    if (this.cache.size >= this.maxSize) {
+      // 淘汰最久未使用的（Map 中第一个）
+      const oldestKey = this.cache.keys().next().value;
+      if (oldestKey !== undefined) this.cache.delete(oldestKey);
+    }
+    this.cache.set(userId, { value, expiresAt: Date.now() + this.ttlMs });
+  }
+
+  /**
+   * 使指定用户的缓存失效
+   */
+  invalidate(userId: string): void {
+    this.invalidations++;
+    this.cache.delete(userId);
+  }
+
+  /**
+   * 清空缓存
+   */
+  clear(): void {
+    this.cache.clear();
+  }
+
+  /**
+   * 命中统计
+   */
+  stats(): UserCacheStats {
+    const total = this.hits + this.misses;
+    return {
+      size: this.cache.size,
+      maxSize: this.maxSize,
+      ttlMs: this.ttlMs,
+      hits: this.hits,
+      misses: this.misses,
+      invalidations: this.invalidations,
+      hitRate: total ? Math.round((this.hits / total) * 10000) / 10000 : 0,
+    };
+  }
+}
+
+// 单例实例（进程内）
+export const userCache = new UserCache(config.authCache.maxSize, config.authCache.ttlMs);
@@ -0,0 +1,281 @@
+/**
+ * 用户批量导入
+ * 先整体校验，再按 用户名/邮箱/工号/部门 各一次 IN 查询解析已有数据，最后分块 createMany 写入。
+ * 同一次导入中相同的初始密码只做一次哈希，不同密码按线程数分片并行哈希
+ */
+
+import path from 'path';
+import { Worker } from 'worker_threads';
+import bcrypt from 'bcryptjs';
+import { Prisma, UserRole } from '@prisma/client';
+import { prisma } from '../lib/prisma';
+import logger from '../lib/logger';
+import { config } from '../config';
+import { readImportFile, pickField, chunk } from './bulkImport';
+import { invalidateDepartmentTree } from './departmentService';
+
+export interface ImportUserData {
+  username: string;
+  password: string;
+  name: string;
+  email?: string;
+  role: UserRole;
+  // 部门ID或部门名称
+  departmentId?: string;
+  employeeId: string;
+}
+
+export interface ImportUserError {
+  index: number;
+  // 文件导入时的行号
+  row?: number;
+  field: string;
+  message: string;
+}
+
+const importedUserSelect = {
+  id: true,
+  username: true,
+  name: true,
+  email: true,
+  role: true,
+  departmentId: true,
+  department: { select: { name: true } },
+  employeeId: true,
+  isActive: true,
+  createdAt: true,
+  updatedAt: true,
+} satisfies Prisma.UserSelect;
+
+type ImportedUser = Prisma.UserGetPayload<{ select: typeof importedUserSelect }>;
+
+export interface ImportUsersResult {
+  imported: Array<Omit<ImportedUser, 'department'> & { department: string }>;
+  summary: { total: number; success: number; failed: number };
+  errors: ImportUserError[];
+}
+
+const FIELD_LABELS: Record<string, string> = { username: '用户名', email: '邮箱', employeeId: '工号' };
+const USER_ROLES = new Set<string>(Object.values(UserRole));
+
+/**
+ * 验证用户数据格式
+ */
+function validateUserData(userData: ImportUserData): { field: string; message: string } | null {
+  // 验证必填字段（邮箱可选）
+  if (!userData.username || !userData.password || !userData.name ||
+      !userData.role || !userData.employeeId) {
+    return { field: 'multiple', message: '缺少必填字段' };
+  }
+
+  // 验证用户名格式
+  if (!/^[a-zA-Z0-9_]{3,20}$/.test(userData.username)) {
+    return { field: 'username', message: '用户名格式不正确' };
+  }
+
+  // 验证密码强度
+  if (userData.password.length < 6) {
+    return { field: 'password', message: '密码长度不足' };
+  }
+
+  // 验证邮箱格式（如果提供了邮箱）
+  if (userData.email && !/^[^\s@]+@[^\s@]+\.[^\s@]+$/.test(userData.email)) {
+    return { field: 'email', message: '邮箱格式不正确' };
+  }
+
+  if (!USER_ROLES.has(userData.role)) {
+    return { field: 'role', message: '角色不正确' };
+  }
+
+  return null;
+}
+
+/**
+ * 部门引用（ID或名称）解析为部门ID，名称重复时视为无法确定
+ */
+async function resolveDepartments(refs: string[]): Promise<Map<string, string | null>> {
+  const resolved = new Map<string, string | null>();
+  if (refs.length === 0) return resolved;
+
+  const departments = await prisma.department.findMany({
+    where: { OR: [{ id: { in: refs } }, { name: { in: refs } }] },
+    select: { id: true, name: true },
+  });
+
+  const byName = new Map<string, string | null>();
+  departments.forEach((d) => byName.set(d.name, byName.has(d.name) ? null : d.id));
+  const ids = new Set(departments.map((d) => d.id));
+
+  refs.forEach((ref) => {
+    if (ids.has(ref)) resolved.set(ref, ref);
+    else if (byName.has(ref)) resolved.set(ref, byName.get(ref) ?? null);
+  });
+  return resolved;
+}
+
+// 开发环境（tsx）加载 .ts，构建后加载 .js
+const HASH_WORKER_SCRIPT = path.join(__dirname, `userImport.worker${path.extname(__filename)}`);
+
+function hashInWorker(passwords: string[]): Promise<string[]> {
+  return new Promise((resolve, reject) => {
+    const worker = new Worker(HASH_WORKER_SCRIPT, {
+      workerData: { passwords, saltRounds: config.bcrypt.saltRounds },
+    });
+    worker.once('message', resolve);
+    worker.once('error', reject);
+    worker.once('exit', (code) => {
+      if (code !== 0) reject(new Error(`密码哈希线程异常退出: ${code}`));
+    });
+  });
+}
+
+/**
+ * 哈希去重后的密码，返回 明文 -> 哈希
+ * 每个不同的密码都是一次完整的 bcrypt 计算；线程数不超过 1 时在当前线程逐个计算
+ */
+export async function hashPasswords(passwords: string[]): Promise<Map<string, string>> {
+  const distinct = Array.from(new Set(passwords));
+  const workers = Math.min(config.bulkImport.hashWorkers, distinct.length);
+
+  let hashed: string[] = [];
+  if (workers <= 1) {
+    for (const password of distinct) {
+      hashed.push(await bcrypt.hash(password, config.bcrypt.saltRounds));
+    }
+  } else {
+    const shardSize = Math.ceil(distinct.length / workers);
+    const shards: Promise<string[]>[] = [];
+    for (let i = 0; i < distinct.length; i += shardSize) {
+      shards.push(hashInWorker(distinct.slice(i, i + shardSize)));
+    }
+    hashed = (await Promise.all(shards)).flat();
+  }
+
+  return new Map(distinct.map((password, i) => [password, hashed[i]]));
+}
+
+/**
+ * 批量导入用户，rows 为文件行号（与 users 一一对应，可选）
+ */
+export async function importUsers(users: ImportUserData[], rows?: number[]): Promise<ImportUsersResult> {
+  const errors: ImportUserError[] = [];
+  const fail = (index: number, field: string, message: string) =>
+    errors.push({ index, ...(rows && { row: rows[index] }), field, message });
+
+  // 1. 格式校验
+  const candidates: Array<{ index: number; data: ImportUserData }> = [];
+  users.forEach((raw, index) => {
+    const data = { ...raw, role: String(raw.role || '').toUpperCase() as UserRole, email: raw.email || undefined };
+    const error = validateUserData(data);
+    if (error) fail(index, error.field, error.message);
+    else candidates.push({ index, data });
+  });
+
+  // 2. 唯一键：库中已存在的各一次 IN 查询，文件内重复的保留第一行
+  const usernames = candidates.map((c) => c.data.username);
+  const emails = candidates.map((c) => c.data.email).filter((e): e is string => !!e);
+  const employeeIds = candidates.map((c) => c.data.employeeId);
+  const [existingUsernames, existingEmails, existingEmployeeIds, departments] = await Promise.all([
+    prisma.user.findMany({ where: { username: { in: usernames } }, select: { username: true } }),
+    emails.length > 0
+      ? prisma.user.findMany({ where: { email: { in: emails } }, select: { email: true } })
+      : Promise.resolve([]),
+    prisma.user.findMany({ where: { employeeId: { in: employeeIds } }, select: { employeeId: true } }),
+    resolveDepartments(Array.from(new Set(
+      candidates.map((c) => c.data.departmentId).filter((d): d is string => !!d)
+    ))),
+  ]);
+
+  const taken: Record<'username' | 'email' | 'employeeId', Set<string>> = {
+    username: new Set(existingUsernames.map((u) => u.username)),
+    email: new Set(existingEmails.map((u) => u.email as string)),
+    employeeId: new Set(existingEmployeeIds.map((u) => u.employeeId)),
+  };
+
+  const accepted: Array<{ index: number; data: ImportUserData; departmentId: string | null }> = [];
+  for (const { index, data } of candidates) {
+    const duplicate = (['username', 'email', 'employeeId'] as const)
+      .find((field) => data[field] && taken[field].has(data[field] as string));
+    if (duplicate) {
+      fail(index, duplicate, `${FIELD_LABELS[duplicate]}已存在`);
+      continue;
+    }
+
+    let departmentId: string | null = null;
+    if (data.departmentId) {
+      departmentId = departments.get(data.departmentId) ?? null;
+      if (!departmentId) {
+        fail(index, 'departmentId', departments.has(data.departmentId) ? '部门名称不唯一，请使用部门ID' : '部门不存在');
+        continue;
+      }
+    }
+
+    taken.username.add(data.username);
+    if (data.email) taken.email.add(data.email);
+    taken.employeeId.add(data.employeeId);
+    accepted.push({ index, data, departmentId });
+  }
+
+  // 3. 哈希密码（相同密码只计算一次）
+  const hashes = await hashPasswords(accepted.map(({ data }) => data.password));
+
+  // 4. 分块写入
+  const imported: ImportedUser[] = [];
+  for (const batch of chunk(accepted)) {
+    try {
+      const created = await prisma.$transaction(async (tx) => {
+        await tx.user.createMany({
+          data: batch.map(({ data, departmentId }) => ({
+            username: data.username,
+            password: hashes.get(data.password) as string,
+            name: data.name,
+            email: data.email || null,
+            role: data.role,
+            departmentId,
+            employeeId: data.employeeId,
+            isActive: true,
+          })),
+        });
+        return tx.user.findMany({
+          where: { username: { in: batch.map((b) => b.data.username) } },
+          select: importedUserSelect,
+        });
+      });
+      imported.push(...created);
+    } catch (error) {
+      const message = error instanceof Error ? error.message : '未知错误';
+      batch.forEach(({ index }) => fail(index, 'unknown', message));
+    }
+  }
+
+  if (imported.length > 0) {
+    invalidateDepartmentTree();
+  }
+  logger.info('批量导入用户完成', { total: users.length, success: imported.length, failed: errors.length });
+
+  errors.sort((a, b) => a.index - b.index);
+  return {
+    imported: imported.map((user) => ({ ...user, department: user.department?.name || '' })),
+    summary: { total: users.length, success: imported.length, failed: errors.length },
+    errors,
+  };
+}
+
+/**
+ * 从 CSV/XLSX 文件导入用户
+ */
+export async function importUsersFromFile(buffer: Buffer, filename: string): Promise<ImportUsersResult> {
+  const rows = await readImportFile(buffer, filename);
+
+  const users: ImportUserData[] = rows.map(({ values }) => ({
+    username: pickField(values, ['username', '用户名']) || '',
+    password: pickField(values, ['password', '密码']) || '',
+    name: pickField(values, ['name', '姓名']) || '',
+    email: pickField(values, ['email', '邮箱']),
+    role: (pickField(values, ['role', '角色']) || '') as UserRole,
+    departmentId: pickField(values, ['departmentId', 'department', '部门']),
+    employeeId: pickField(values, ['employeeId', '工号']) || '',
+  }));
+
+  return importUsers(users, rows.map((r) => r.rowNumber));
+}
@@ -0,0 +1,10 @@
+/**
+ * 用户批量导入密码哈希线程入口
+ * bcrypt 为纯 CPU 计算，分片交给多个线程同时计算
+ */
+
+import { parentPort, workerData } from 'worker_threads';
+import bcrypt from 'bcryptjs';
+
+const { passwords, saltRounds } = workerData as { passwords: string[]; saltRounds: number };
+parentPort?.postMessage(passwords.map((password) => bcrypt.hashSync(password, saltRounds)));
@@ -0,0 +1,79 @@
+/**
+ * ViewCounterBuffer 单元测试
+ */
+
+import { ViewCounterBuffer } from './viewCounter';
+
+jest.mock('../lib/prisma', () => ({ prisma: {} }));
+jest.mock('../config', () => ({ config: { viewCounter: { flushIntervalMs: 1000 } } }));
+jest.mock('../lib/logger', () => ({ __esModule: true, default: { error: jest.fn() } }));
+
+describe('ViewCounterBuffer', () => {
+  it('合并同一记录的多次浏览，一次写回', async () => {
+    const flusher = jest.fn().mockResolvedValue(undefined);
+    const counter = new ViewCounterBuffer('test', flusher);
+
+    counter.increment('a');
+    counter.increment('a');
+    counter.increment('b');
+
+    expect(await counter.flush()).toBe(2);
+    expect(flusher).toHaveBeenCalledWith([['a', 2], ['b', 1]]);
+    expect(counter.pendingFor('a')).toBe(0);
+  });
+
+  it('读取时叠加未写回的增量', () => {
+    const counter = new ViewCounterBuffer('test', jest.fn());
+    counter.increment('a');
+    counter.increment('a');
+
+    expect(counter.overlay({ id: 'a', viewCount: 10 }).viewCount).toBe(12);
+    expect(counter.overlay({ id: 'b', viewCount: 3 }).viewCount).toBe(3);
+  });
+
+  it('写回过程中叠加值保持不变', async () => {
+    let finish!: () => void;
+    const flusher = jest.fn(() => new Promise<void>((resolve) => { finish = resolve; }));
+    const counter = new ViewCounterBuffer('test', flusher);
+
+    counter.increment('a');
+    const flushing = counter.flush();
+    counter.increment('a');
+
+    expect(counter.pendingFor('a')).toBe(2);
+    finish();
+    await flushing;
+    expect(counter.pendingFor('a')).toBe(1);
+  });
+
+  it('写回进行中再次调用时等待其完成并写回剩余增量', async () => {
+    let finish!: () => void;
+    const flusher = jest.fn()
+      .mockImplementationOnce(() => new Promise<void>((resolve) => { finish = resolve; }))
+      .mockResolvedValue(undefined);
+    const counter = new ViewCounterBuffer('test', flusher);
+
+    counter.increment('a');
+    const first = counter.flush();
+    counter.increment('b', 2);
+    const second = counter.flush();
+
+    finish();
+    expect(await first).toBe(1);
+    expect(await second).toBe(1);
+    expect(flusher).toHaveBeenLastCalledWith([['b', 2]]);
+    expect(counter.pendingFor('b')).toBe(0);
+  });
+
+  it('写回失败时增量并回缓冲', async () => {
+    const flusher = jest.fn().mockRejectedValueOnce(new Error('db down')).mockResolvedValue(undefined);
+    const counter = new ViewCounterBuffer('test', flusher);
+
+    counter.increment('a', 3);
+    expect(await counter.flush()).toBe(0);
+    expect(counter.pendingFor('a')).toBe(3);
+
+    await counter.flush();
+    expect(flusher).toHaveBeenLastCalledWith([['a', 3]]);
+  });
+});
@@ -0,0 +1,130 @@
+/**
+ * 浏览量写回缓冲 - 读取时只在内存中累加，定时用一条 UPDATE 批量写回
+ * 本进程读取时叠加尚未写回的增量，保证刚浏览过的计数立即可见
+ */
+
+import { Prisma } from '@prisma/client';
+import { config } from '../config';
+import { prisma } from '../lib/prisma';
+import logger from '../lib/logger';
+
+export type ViewCountFlusher = (deltas: Array<[string, number]>) => Promise<void>;
+
+export class ViewCounterBuffer {
+  private pending = new Map<string, number>();
+  // 正在写回的增量，写回完成前仍计入叠加值
+  private flushing = new Map<string, number>();
+  private inFlight: Promise<number> | null = null;
+
+  constructor(private name: string, private flusher: ViewCountFlusher) {}
+
+  /**
+   * 记录一次浏览
+   */
+  increment(id: string, by: number = 1): void {
+    this.pending.set(id, (this.pending.get(id) || 0) + by);
+  }
+
+  /**
+   * 尚未写回的增量
+   */
+  pendingFor(id: string): number {
+    return (this.pending.get(id) || 0) + (this.flushing.get(id) || 0);
+  }
+
+  /**
+   * 叠加未写回的增量
+   */
+  overlay<T extends { id: string; viewCount: number }>(item: T): T {
+    const delta = this.pendingFor(item.id);
+    return delta ? { ...item, viewCount: item.viewCount + delta } : item;
+  }
+
+  /**
+   * 写回全部增量，失败时并回缓冲等待下次写回
+   * 已有写回进行中时先等待其完成，再写回期间新增的增量，返回本次写回的记录数
+   */
+  async flush(): Promise<number> {
+    while (this.inFlight) await this.inFlight;
+    if (this.pending.size === 0) return 0;
+
+    const current = this.writeBack();
+    this.inFlight = current;
+    try {
+      return await current;
+    } finally {
+      if (this.inFlight === current) this.inFlight = null;
+    }
+  }
+
+  private async writeBack(): Promise<number> {
+    this.flushing = this.pending;
+    this.pending = new Map();
+    const deltas = Array.from(this.flushing.entries());
+
+    try {
+      await this.flusher(deltas);
+      return deltas.length;
+    } catch (error) {
+      deltas.forEach(([id, delta]) => this.increment(id, delta));
+      logger.error(`浏览量写回失败: ${this.name}`, {
+        error: error instanceof Error ? error.message : String(error),
+        rows: deltas.length,
+      });
+      return 0;
+    } finally {
+      this.flushing = new Map();
+    }
+  }
+}
+
+/**
+ * 按表批量累加 viewCount（一条 UPDATE ... FROM VALUES）
+ */
+function incrementViewCounts(table: 'knowledge_articles' | 'announcements'): ViewCountFlusher {
+  return async (deltas) => {
+    const rows = deltas.map(([id, delta]) => Prisma.sql`(${id}, ${delta}::int)`);
+    await prisma.$executeRaw`
+      UPDATE ${Prisma.raw(table)} AS t
+      SET "viewCount" = t."viewCount" + v.delta
+      FROM (VALUES ${Prisma.join(rows)}) AS v(id, delta)
+      WHERE t.id = v.id
+    `;
+  };
+}
+
+export const knowledgeViewCounter = new ViewCounterBuffer('knowledge_articles', incrementViewCounts('knowledge_articles'));
+export const announcementViewCounter = new ViewCounterBuffer('announcements', incrementViewCounts('announcements'));
+
+const counters = [knowledgeViewCounter, announcementViewCounter];
+let timer: NodeJS.Timeout | null = null;
+
+/**
+ * 写回所有缓冲的浏览量
+ */
+export async function flushViewCounters(): Promise<void> {
+  await Promise.all(counters.map((counter) => counter.flush()));
+}
+
+/**
+ * 启动定时写回
+ */
+export function startViewCounterFlush(): void {
+  if (timer) return;
+
+  const run = () => {
+    flushViewCounters().finally(() => {
+      if (timer) timer = setTimeout(run, config.viewCounter.flushIntervalMs);
+    });
+  };
+  timer = setTimeout(run, config.viewCounter.flushIntervalMs);
+}
+
+/**
+ * 停止定时写回，等待进行中的写回完成后写回剩余增量
+ */
+export async function stopViewCounterFlush(): Promise<void> {
+  if (timer) clearTimeout(timer);
+  timer = null;
+  await flushViewCounters();
+}
@@ -0,0 +1,97 @@
+/**
+ * 工作流编译单元测试
+ */
+
+import {
+  parseCondition,
+  evaluateConditionAst,
+  compileWorkflow,
+  findNextEdge,
+  getCompiledWorkflow,
+  invalidateCompiledWorkflow,
+} from './workflowCompiler'
+
+jest.mock('../lib/logger', () => ({ __esModule: true, default: { warn: jest.fn() } }))
+
+const node = (id: string, type: string) => ({ id, type, position: { x: 0, y: 0 }, data: { label: id } })
+
+const source = {
+  id: 'wf1',
+  version: 1,
+  updatedAt: new Date('2026-01-01T00:00:00Z'),
+  nodes: [node('start', 'start'), node('check', 'condition'), node('big', 'approval'), node('small', 'approval'), node('end', 'end')],
+  edges: [
+    { id: 'e1', source: 'start', target: 'check' },
+    { id: 'e2', source: 'check', target: 'big', condition: 'amount > 1000' },
+    { id: 'e3', source: 'check', target: 'small' },
+    { id: 'e4', source: 'big', target: 'end' },
+    { id: 'e5', source: 'small', target: 'end' },
+  ],
+}
+
+describe('parseCondition', () => {
+  it('解析运算符和右值类型', () => {
+    expect(parseCondition('amount >= 1000')).toEqual({ variable: 'amount', operator: '>=', value: 1000 })
+    expect(parseCondition("status == 'approved'")).toEqual({ variable: 'status', operator: '==', value: 'approved' })
+    expect(parseCondition('priority != true')).toEqual({ variable: 'priority', operator: '!=', value: true })
+  })
+
+  it('拒绝危险模式、非白名单变量和无法解析的表达式', () => {
+    expect(parseCondition('amount > 1; process.exit()')).toBeNull()
+    expect(parseCondition('salary > 1000')).toBeNull()
+    expect(parseCondition('amount')).toBeNull()
+  })
+})
+
+describe('evaluateConditionAst', () => {
+  it('数值比较和字符串比较', () => {
+    const gt = parseCondition('amount > 1000')!
+    expect(evaluateConditionAst(gt, { amount: 1500 })).toBe(true)
+    expect(evaluateConditionAst(gt, { amount: '999' })).toBe(false)
+
+    const eq = parseCondition('type == "purchase"')!
+    expect(evaluateConditionAst(eq, { type: 'purchase' })).toBe(true)
+  })
+})
+
+describe('compileWorkflow', () => {
+  it('建立节点索引和邻接表', () => {
+    const graph = compileWorkflow(source)
+
+    expect(graph.startNode?.id).toBe('start')
+    expect(graph.nodeById.get('big')?.type).toBe('approval')
+    expect(graph.outgoing.get('check')?.map(e => e.edge.id)).toEqual(['e2', 'e3'])
+    expect(Object.isFrozen(graph)).toBe(true)
+  })
+
+  it('按条件选择出口，未传变量时不判断条件', () => {
+    const graph = compileWorkflow(source)
+
+    expect(findNextEdge(graph, 'check', { amount: 5000 })?.edge.target).toBe('big')
+    expect(findNextEdge(graph, 'check', { amount: 10 })?.edge.target).toBe('small')
+    expect(findNextEdge(graph, 'check', null)?.edge.target).toBe('big')
+    expect(findNextEdge(graph, 'end', {})).toBeUndefined()
+  })
+
+  it('无法解析的条件恒为不通过', () => {
+    const graph = compileWorkflow({
+      ...source,
+      edges: [{ id: 'e1', source: 'check', target: 'big', condition: 'salary > 1' }],
+    })
+
+    expect(findNextEdge(graph, 'check', { salary: 2 })).toBeUndefined()
+  })
+})
+
+describe('getCompiledWorkflow', () => {
+  it('同一版本复用执行图，草稿更新或清除后重新编译', () => {
+    const first = getCompiledWorkflow(source)
+    expect(getCompiledWorkflow(source)).toBe(first)
+
+    const edited = getCompiledWorkflow({ ...source, updatedAt: new Date('2026-01-02T00:00:00Z') })
+    expect(edited).not.toBe(first)
+
+    invalidateCompiledWorkflow('wf1')
+    expect(getCompiledWorkflow({ ...source, updatedAt: new Date('2026-01-02T00:00:00Z') })).not.toBe(edited)
+  })
+})
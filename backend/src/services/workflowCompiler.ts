@@ -0,0 +1,258 @@
+/**
+ * 工作流编译 - 将流程定义的节点/连线编译为只读执行图
+ * 节点按 ID 建索引、连线按源节点建邻接表、条件表达式预先解析，
+ * 按 工作流ID + 版本 缓存，推进流程每一步为 O(1) 查找且不再重复解析条件
+ */
+
+import logger from '../lib/logger'
+import type { FlowNode, FlowEdge, WorkflowVariables } from './workflowService'
+
+// 缓存的执行图数量上限
+const COMPILED_WORKFLOW_CACHE_SIZE = 200
+
+// 条件表达式最大长度
+const MAX_CONDITION_LENGTH = 200
+
+/**
+ * 允许的条件变量白名单
+ * 防止条件表达式注入攻击
+ */
+const ALLOWED_VARIABLES = [
+  'amount',      // 金额
+  'priority',    // 优先级
+  'status',      // 状态
+  'type',        // 类型
+  'days',        // 天数
+  'quantity',    // 数量
+]
+
+// 危险字符和模式
+const DANGEROUS_PATTERNS = [
+  /[;{}]/,           // 分号、花括号（代码注入）
+  /\bprocess\b/,     // process对象
+  /\brequire\b/,     // require函数
+  /\beval\b/,        // eval函数
+  /\bFunction\b/,    // Function构造器
+  /\bsetTimeout\b/,  // 定时器
+  /\bsetInterval\b/,
+]
+
+// 支持的运算符（长运算符优先匹配）
+const OPERATORS = ['>=', '<=', '!=', '==', '>', '<'] as const
+
+export type ConditionOperator = typeof OPERATORS[number]
+
+// 预解析的条件表达式
+export interface ConditionAst {
+  variable: string
+  operator: ConditionOperator
+  value: unknown
+}
+
+export interface CompiledEdge {
+  edge: FlowEdge
+  // 连线带条件但无法解析时为 null，求值结果恒为不通过
+  condition: ConditionAst | null
+}
+
+export interface CompiledWorkflow {
+  id: string
+  version: number
+  nodes: readonly FlowNode[]
+  edges: readonly FlowEdge[]
+  startNode: FlowNode | null
+  nodeById: ReadonlyMap<string, FlowNode>
+  outgoing: ReadonlyMap<string, readonly CompiledEdge[]>
+}
+
+// 编译所需的工作流字段
+export interface WorkflowSource {
+  id: string
+  version: number
+  updatedAt: Date
+  nodes: unknown
+  edges: unknown
+}
+
+/**
+ * 验证变量名是否合法
+ * 只允许字母、数字、下划线，且不能包含危险字符
+ */
+function isValidVariableName(name: string): boolean {
+  return /^[a-zA-Z_][a-zA-Z0-9_]*$/.test(name)
+}
+
+/**
+ * 解析右值：数字、带引号的字符串、布尔值，其余按原文
+ */
+function parseLiteral(raw: string): unknown {
+  if (!isNaN(Number(raw))) {
+    return Number(raw)
+  }
+  if ((raw.startsWith('"') && raw.endsWith('"')) ||
+      (raw.startsWith("'") && raw.endsWith("'"))) {
+    return raw.slice(1, -1)
+  }
+  if (raw === 'true') return true
+  if (raw === 'false') return false
+  return raw
+}
+
+/**
+ * 解析条件表达式
+ * 支持简单的条件语法：amount > 1000, status == 'approved', etc.
+ * 安全检查（长度、危险模式、变量名、白名单）不通过时返回 null
+ */
+export function parseCondition(condition: string): ConditionAst | null {
+  // 安全检查：限制条件表达式长度，防止DoS
+  if (condition.length > MAX_CONDITION_LENGTH) {
+    logger.warn('条件表达式过长，拒绝执行', { condition: condition.substring(0, 50) + '...' })
+    return null
+  }
+
+  if (DANGEROUS_PATTERNS.some(pattern => pattern.test(condition))) {
+    logger.warn('条件表达式包含危险模式，拒绝执行', { condition })
+    return null
+  }
+
+  const operator = OPERATORS.find(op => condition.includes(op))
+  const parts = operator ? condition.split(operator).map(p => p.trim()) : []
+  if (!operator || parts.length !== 2) {
+    // 无法解析条件，默认不通过（安全优先）
+    logger.warn('无法解析条件表达式', { condition })
+    return null
+  }
+
+  const [variable, right] = parts
+
+  if (!isValidVariableName(variable)) {
+    logger.warn('条件表达式变量名非法', { variable })
+    return null
+  }
+
+  if (!ALLOWED_VARIABLES.includes(variable)) {
+    logger.warn('条件表达式变量不在白名单中', { variable })
+    return null
+  }
+
+  return { variable, operator, value: parseLiteral(right) }
+}
+
+/**
+ * 对预解析的条件求值
+ */
+export function evaluateConditionAst(ast: ConditionAst, variables: WorkflowVariables): boolean {
+  const left = variables[ast.variable] ?? ast.variable
+  const right = ast.value
+
+  switch (ast.operator) {
+    case '>':
+      return Number(left) > Number(right)
+    case '<':
+      return Number(left) < Number(right)
+    case '>=':
+      return Number(left) >= Number(right)
+    case '<=':
+      return Number(left) <= Number(right)
+    case '==':
+      return String(left) === String(right)
+    case '!=':
+      return String(left) !== String(right)
+    default:
+      return false
+  }
+}
+
+/**
+ * 编译流程定义为执行图
+ */
+export function compileWorkflow(source: Omit<WorkflowSource, 'updatedAt'>): CompiledWorkflow {
+  const nodes = Object.freeze([...((source.nodes as FlowNode[] | null) || [])])
+  const edges = Object.freeze([...((source.edges as FlowEdge[] | null) || [])])
+
+  const nodeById = new Map<string, FlowNode>()
+  nodes.forEach(node => {
+    if (!nodeById.has(node.id)) nodeById.set(node.id, node)
+  })
+
+  // 同一条件文本只解析一次
+  const parsed = new Map<string, ConditionAst | null>()
+  const outgoing = new Map<string, CompiledEdge[]>()
+  edges.forEach(edge => {
+    let condition: ConditionAst | null = null
+    if (edge.condition) {
+      if (!parsed.has(edge.condition)) parsed.set(edge.condition, parseCondition(edge.condition))
+      condition = parsed.get(edge.condition) ?? null
+    }
+    const list = outgoing.get(edge.source) || []
+    list.push(Object.freeze({ edge, condition }))
+    outgoing.set(edge.source, list)
+  })
+  outgoing.forEach(list => Object.freeze(list))
+
+  return Object.freeze({
+    id: source.id,
+    version: source.version,
+    nodes,
+    edges,
+    startNode: nodes.find(n => n.type === 'start') || null,
+    nodeById,
+    outgoing,
+  })
+}
+
+/**
+ * 按定义顺序取第一条可走的出口连线
+ * variables 为空时不判断条件（带条件的连线也视为可走）
+ */
+export function findNextEdge(
+  graph: CompiledWorkflow,
+  nodeId: string,
+  variables: WorkflowVariables | null
+): CompiledEdge | undefined {
+  const candidates = graph.outgoing.get(nodeId)
+  if (!candidates) return undefined
+
+  return candidates.find(({ edge, condition }) => {
+    if (!edge.condition || !variables) return true
+    return condition !== null && evaluateConditionAst(condition, variables)
+  })
+}
+
+// 草稿在同一版本内可编辑，按 updatedAt 识别过期的执行图
+const compiledWorkflows = new Map<string, { stamp: number; graph: CompiledWorkflow }>()
+
+/**
+ * 获取工作流的执行图（按 ID + 版本缓存）
+ */
+export function getCompiledWorkflow(source: WorkflowSource): CompiledWorkflow {
+  const key = `${source.id}:${source.version}`
+  const stamp = source.updatedAt.getTime()
+  const cached = compiledWorkflows.get(key)
+
+  if (cached && cached.stamp === stamp) {
+    // 刷新 LRU 顺序
+    compiledWorkflows.delete(key)
+    compiledWorkflows.set(key, cached)
+    return cached.graph
+  }
+
+  const graph = compileWorkflow(source)
+  compiledWorkflows.delete(key)
+  compiledWorkflows.set(key, { stamp, graph })
+
+  if (compiledWorkflows.size > COMPILED_WORKFLOW_CACHE_SIZE) {
+    const oldest = compiledWorkflows.keys().next().value
+    if (oldest !== undefined) compiledWorkflows.delete(oldest)
+  }
+  return graph
+}
+
+/**
+ * 清除工作流的执行图缓存
+ */
+export function invalidateCompiledWorkflow(id: string): void {
+  for (const key of Array.from(compiledWorkflows.keys())) {
+    if (key.startsWith(`${id}:`)) compiledWorkflows.delete(key)
+  }
+}
@@ -1,6 +1,8 @@
-import { WorkflowStatus, InstanceStatus, Prisma } from '@prisma/client'
+import { WorkflowStatus, InstanceStatus, Prisma, ApplicationStatus, ApplicationType } from '@prisma/client'
 import { prisma } from '../lib/prisma'
-import logger from '../lib/logger'
+import { config } from '../config'
+import { getCompiledWorkflow, invalidateCompiledWorkflow, findNextEdge, CompiledWorkflow } from './workflowCompiler'
+import { runWorkflowSimulation, createAggregate, SimulationAggregate, PATH_SEPARATOR } from './workflowSimulation'
 
 // 节点类型定义
 export type NodeType = 'start' | 'approval' | 'condition' | 'parallel' | 'end'
@@ -194,6 +196,7 @@ export async function updateWorkflow(
       }
     }
   })
+  invalidateCompiledWorkflow(id)
 
   return updated
 }
@@ -293,6 +296,7 @@ export async function deleteWorkflow(id: string): Promise<void> {
   }
 
   await prisma.workflow.delete({ where: { id } })
+  invalidateCompiledWorkflow(id)
 }
 
 /**
@@ -351,16 +355,15 @@ export async function startWorkflow(
     throw new Error('只能启动已发布的工作流')
   }
 
-  const nodes = workflow.nodes as unknown as FlowNode[]
-  const startNode = nodes.find(n => n.type === 'start')
+  const graph = getCompiledWorkflow(workflow)
+  const startNode = graph.startNode
   if (!startNode) {
     throw new Error('工作流缺少开始节点')
   }
 
   // 找到开始节点的下一个节点
-  const edges = workflow.edges as unknown as FlowEdge[]
-  const firstEdge = edges.find(e => e.source === startNode.id)
-  const firstNodeId = firstEdge?.target || startNode.id
+  const firstEdge = graph.outgoing.get(startNode.id)?.[0]
+  const firstNodeId = firstEdge?.edge.target || startNode.id
 
   const instance = await prisma.workflowInstance.create({
     data: {
@@ -378,7 +381,7 @@ export async function startWorkflow(
         timestamp: new Date().toISOString()
       }, {
         nodeId: firstNodeId,
-        nodeName: nodes.find(n => n.id === firstNodeId)?.data.label || '',
+        nodeName: graph.nodeById.get(firstNodeId)?.data.label || '',
         action: 'enter',
         timestamp: new Date().toISOString()
       }] as unknown as Prisma.InputJsonValue
@@ -427,10 +430,8 @@ export async function processNode(
     throw new Error('流程已结束')
   }
 
-  const workflow = instance.workflow
-  const nodes = workflow.nodes as unknown as FlowNode[]
-  const edges = workflow.edges as unknown as FlowEdge[]
-  const currentNode = nodes.find(n => n.id === instance.currentNodeId)
+  const graph = getCompiledWorkflow(instance.workflow)
+  const currentNode = graph.nodeById.get(instance.currentNodeId)
 
   if (!currentNode) {
     throw new Error('当前节点不存在')
@@ -462,15 +463,8 @@ export async function processNode(
     return updated
   }
 
-  // 找到下一个节点
-  const nextEdge = edges.find(e => {
-    if (e.source !== currentNode.id) return false
-    // 如果有条件，检查条件是否满足
-    if (e.condition && instance.variables) {
-      return evaluateCondition(e.condition, instance.variables as WorkflowVariables)
-    }
-    return true
-  })
+  // 找到下一个节点（有流程变量时检查连线条件）
+  const nextEdge = findNextEdge(graph, currentNode.id, (instance.variables as WorkflowVariables | null) || null)
 
   if (!nextEdge) {
     // 没有下一个节点，流程结束
@@ -486,7 +480,7 @@ export async function processNode(
     return updated
   }
 
-  const nextNode = nodes.find(n => n.id === nextEdge.target)
+  const nextNode = graph.nodeById.get(nextEdge.edge.target)
   if (!nextNode) {
     throw new Error('下一个节点不存在')
   }
@@ -544,11 +538,10 @@ export async function simulateWorkflow(
     throw new Error('工作流不存在')
   }
 
-  const nodes = workflow.nodes as unknown as FlowNode[]
-  const edges = workflow.edges as unknown as FlowEdge[]
+  const graph = getCompiledWorkflow(workflow)
 
   // 验证流程
-  const validationErrors = validateWorkflowDetailed(nodes, edges)
+  const validationErrors = validateWorkflowDetailed([...graph.nodes], [...graph.edges])
   if (validationErrors.length > 0) {
     return {
       success: false,
@@ -559,7 +552,7 @@ export async function simulateWorkflow(
 
   // 模拟执行路径
   const path: SimulationNode[] = []
-  const startNode = nodes.find(n => n.type === 'start')
+  const startNode = graph.startNode
   if (!startNode) {
     return {
       success: false,
@@ -589,7 +582,7 @@ export async function simulateWorkflow(
     }
     visitedNodes.add(currentNodeId)
 
-    const currentNode = nodes.find(n => n.id === currentNodeId)
+    const currentNode = graph.nodeById.get(currentNodeId)
     if (!currentNode) {
       return {
         success: false,
@@ -609,14 +602,9 @@ export async function simulateWorkflow(
       break
     }
 
-    // 找到下一个节点
-    const nextEdge = edges.find(e => {
-      if (e.source !== currentNodeId) return false
-      if (e.condition && currentNode.type === 'condition') {
-        return evaluateCondition(e.condition, testData)
-      }
-      return true
-    })
+    // 找到下一个节点（只有条件节点判断连线条件）
+    const compiledEdge = findNextEdge(graph, currentNodeId, currentNode.type === 'condition' ? testData : null)
+    const nextEdge = compiledEdge?.edge
 
     if (!nextEdge) {
       return {
@@ -626,7 +614,7 @@ export async function simulateWorkflow(
       }
     }
 
-    const nextNode = nodes.find(n => n.id === nextEdge.target)
+    const nextNode = graph.nodeById.get(nextEdge.target)
     if (!nextNode) {
       return {
         success: false,
@@ -652,6 +640,142 @@ export async function simulateWorkflow(
   }
 }
 
+// 批量模拟结果中返回的路径数量上限
+const BATCH_SIMULATION_TOP_PATHS = 50
+
+/**
+ * 历史申请的流程变量
+ */
+function applicationVariables(app: {
+  amount: Prisma.Decimal | null
+  priority: string
+  status: string
+  type: string
+  tripStartDate: Date | null
+  tripEndDate: Date | null
+}): WorkflowVariables {
+  const variables: WorkflowVariables = {
+    priority: app.priority,
+    status: app.status,
+    type: app.type
+  }
+  if (app.amount !== null) {
+    variables.amount = Number(app.amount)
+  }
+  if (app.tripStartDate && app.tripEndDate) {
+    variables.days = Math.floor((app.tripEndDate.getTime() - app.tripStartDate.getTime()) / 86400000) + 1
+  }
+  return variables
+}
+
+/**
+ * 按筛选条件加载历史申请作为模拟数据
+ */
+async function loadApplicationVariableSets(filter: ApplicationSimulationFilter): Promise<WorkflowVariables[]> {
+  const where: Prisma.ApplicationWhereInput = { deletedAt: null }
+  if (filter.status) where.status = filter.status
+  if (filter.type) where.type = filter.type
+  if (filter.formType) where.formType = filter.formType
+  if (filter.applicantDept) where.applicantDept = filter.applicantDept
+  if (filter.createdFrom || filter.createdTo) {
+    where.createdAt = {
+      ...(filter.createdFrom && { gte: new Date(filter.createdFrom) }),
+      ...(filter.createdTo && { lte: new Date(filter.createdTo) })
+    }
+  }
+
+  const maxSets = config.workflowSimulation.maxVariableSets
+  const applications = await prisma.application.findMany({
+    where,
+    select: { amount: true, priority: true, status: true, type: true, tripStartDate: true, tripEndDate: true },
+    orderBy: { createdAt: 'desc' },
+    take: maxSets + 1
+  })
+
+  if (applications.length > maxSets) {
+    throw new Error(`符合条件的申请超过 ${maxSets} 条，请缩小筛选范围`)
+  }
+  return applications.map(applicationVariables)
+}
+
+/**
+ * 汇总结果转换为按次数排序的列表
+ */
+function summarizeSimulation(graph: CompiledWorkflow, aggregate: SimulationAggregate): BatchSimulationResult {
+  const ratio = (count: number) => aggregate.total > 0 ? count / aggregate.total : 0
+  const label = (nodeId: string) => graph.nodeById.get(nodeId)?.data.label || nodeId
+
+  const paths = Object.entries(aggregate.paths)
+    .sort((a, b) => b[1] - a[1])
+    .slice(0, BATCH_SIMULATION_TOP_PATHS)
+    .map(([key, count]) => {
+      const nodeIds = key.split(PATH_SEPARATOR)
+      return { nodeIds, nodeNames: nodeIds.map(label), count, ratio: ratio(count) }
+    })
+
+  const nodeHits = graph.nodes.map(node => ({
+    nodeId: node.id,
+    nodeName: node.data.label,
+    nodeType: node.type,
+    count: aggregate.nodeHits[node.id] || 0,
+    ratio: ratio(aggregate.nodeHits[node.id] || 0)
+  }))
+
+  const approvalDepths = Object.entries(aggregate.approvalDepths)
+    .map(([depth, count]) => ({ depth: Number(depth), count }))
+    .sort((a, b) => a.depth - b.depth)
+
+  const failures = Object.entries(aggregate.errors)
+    .map(([error, count]) => ({ error, count }))
+    .sort((a, b) => b.count - a.count)
+
+  return {
+    success: true,
+    total: aggregate.total,
+    completed: aggregate.completed,
+    failed: aggregate.failed,
+    distinctPaths: Object.keys(aggregate.paths).length,
+    paths,
+    nodeHits,
+    approvalDepths,
+    failures
+  }
+}
+
+/**
+ * 批量模拟工作流执行
+ * 变量组直接传入，或按筛选条件取历史申请的金额/优先级/状态/类型/出差天数
+ */
+export async function simulateWorkflowBatch(
+  workflowId: string,
+  input: BatchSimulationInput
+): Promise<BatchSimulationResult> {
+  const workflow = await prisma.workflow.findUnique({ where: { id: workflowId } })
+  if (!workflow) {
+    throw new Error('工作流不存在')
+  }
+
+  const graph = getCompiledWorkflow(workflow)
+  const validationErrors = validateWorkflowDetailed([...graph.nodes], [...graph.edges])
+  if (validationErrors.length > 0) {
+    return {
+      ...summarizeSimulation(graph, createAggregate()),
+      success: false,
+      errors: validationErrors
+    }
+  }
+
+  let variableSets = input.variableSets
+  if (!variableSets) {
+    variableSets = await loadApplicationVariableSets(input.applicationFilter || {})
+  } else if (variableSets.length > config.workflowSimulation.maxVariableSets) {
+    throw new Error(`单次最多模拟 ${config.workflowSimulation.maxVariableSets} 组数据`)
+  }
+
+  const aggregate = await runWorkflowSimulation(workflow, variableSets)
+  return summarizeSimulation(graph, aggregate)
+}
+
 /**
  * 验证工作流完整性
  */
@@ -757,136 +881,6 @@ function validateWorkflowDetailed(nodes: FlowNode[], edges: FlowEdge[]): string[
   return errors
 }
 
-/**
- * 允许的条件变量白名单
- * 防止条件表达式注入攻击
- */
-const ALLOWED_VARIABLES = [
-  'amount',      // 金额
-  'priority',    // 优先级
-  'status',      // 状态
-  'type',        // 类型
-  'days',        // 天数
-  'quantity',    // 数量
-]
-
-/**
- * 验证变量名是否合法
- * 只允许字母、数字、下划线，且不能包含危险字符
- */
-function isValidVariableName(name: string): boolean {
-  // 只允许字母、数字、下划线
-  return /^[a-zA-Z_][a-zA-Z0-9_]*$/.test(name)
-}
-
-/**
- * 评估条件表达式
- * 支持简单的条件语法：amount > 1000, status == 'approved', etc.
- * 安全增强：白名单验证、变量名校验
- */
-function evaluateCondition(condition: string, variables: WorkflowVariables): boolean {
-  try {
-    // 安全检查：限制条件表达式长度，防止DoS
-    if (condition.length > 200) {
-      logger.warn('条件表达式过长，拒绝执行', { condition: condition.substring(0, 50) + '...' })
-      return false
-    }
-
-    // 安全检查：禁止危险字符和模式
-    const dangerousPatterns = [
-      /[;{}]/,           // 分号、花括号（代码注入）
-      /\bprocess\b/,     // process对象
-      /\brequire\b/,     // require函数
-      /\beval\b/,        // eval函数
-      /\bFunction\b/,    // Function构造器
-      /\bsetTimeout\b/,  // 定时器
-      /\bsetInterval\b/,
-    ]
-
-    for (const pattern of dangerousPatterns) {
-      if (pattern.test(condition)) {
-        logger.warn('条件表达式包含危险模式，拒绝执行', { condition })
-        return false
-      }
-    }
-
-    // 简单的条件表达式解析
-    // 支持的运算符: >, <, >=, <=, ==, !=
-    const operators = ['>=', '<=', '!=', '==', '>', '<']
-    let operator = ''
-    let parts: string[] = []
-
-    for (const op of operators) {
-      if (condition.includes(op)) {
-        operator = op
-        parts = condition.split(op).map(p => p.trim())
-        break
-      }
-    }
-
-    if (!operator || parts.length !== 2) {
-      // 无法解析条件，默认不通过（安全优先）
-      logger.warn('无法解析条件表达式', { condition })
-      return false
-    }
-
-    const [left, right] = parts
-
-    // 安全检查：验证变量名合法性
-    if (!isValidVariableName(left)) {
-      logger.warn('条件表达式变量名非法', { variable: left })
-      return false
-    }
-
-    // 安全检查：白名单验证
-    if (!ALLOWED_VARIABLES.includes(left)) {
-      logger.warn('条件表达式变量不在白名单中', { variable: left })
-      return false
-    }
-
-    const leftValue = variables[left] ?? left
-    let rightValue: unknown = right
-
-    // 尝试解析右值为数字
-    if (!isNaN(Number(right))) {
-      rightValue = Number(right)
-    }
-    // 解析字符串值（去掉引号）
-    else if ((right.startsWith('"') && right.endsWith('"')) ||
-             (right.startsWith("'") && right.endsWith("'"))) {
-      rightValue = right.slice(1, -1)
-    }
-    // 解析布尔值
-    else if (right === 'true') {
-      rightValue = true
-    } else if (right === 'false') {
-      rightValue = false
-    }
-
-    // 执行比较
-    switch (operator) {
-      case '>':
-        return Number(leftValue) > Number(rightValue)
-      case '<':
-        return Number(leftValue) < Number(rightValue)
-      case '>=':
-        return Number(leftValue) >= Number(rightValue)
-      case '<=':
-        return Number(leftValue) <= Number(rightValue)
-      case '==':
-        return String(leftValue) === String(rightValue)
-      case '!=':
-        return String(leftValue) !== String(rightValue)
-      default:
-        return false
-    }
-  } catch (error) {
-    // 条件解析失败，记录日志并默认不通过（安全优先）
-    logger.error('条件表达式执行失败', { condition, error })
-    return false
-  }
-}
-
 // 类型定义
 export interface WorkflowWithCreator {
   id: string
@@ -941,3 +935,30 @@ export interface SimulationResult {
   errors?: string[]
   path: SimulationNode[]
 }
+
+export interface ApplicationSimulationFilter {
+  status?: ApplicationStatus
+  type?: ApplicationType
+  formType?: string
+  applicantDept?: string
+  createdFrom?: string
+  createdTo?: string
+}
+
+export interface BatchSimulationInput {
+  variableSets?: WorkflowVariables[]
+  applicationFilter?: ApplicationSimulationFilter
+}
+
+export interface BatchSimulationResult {
+  success: boolean
+  errors?: string[]
+  total: number
+  completed: number
+  failed: number
+  distinctPaths: number
+  paths: Array<{ nodeIds: string[]; nodeNames: string[]; count: number; ratio: number }>
+  nodeHits: Array<{ nodeId: string; nodeName: string; nodeType: NodeType; count: number; ratio: number }>
+  approvalDepths: Array<{ depth: number; count: number }>
+  failures: Array<{ error: string; count: number }>
+}
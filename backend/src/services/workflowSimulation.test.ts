@@ -0,0 +1,88 @@
+/**
+ * 工作流批量模拟单元测试
+ */
+
+import { compileWorkflow } from './workflowCompiler'
+import { simulatePath, runSimulationBatch, mergeAggregates, createAggregate, runWorkflowSimulation } from './workflowSimulation'
+
+jest.mock('../config', () => ({
+  config: { workflowSimulation: { workers: 0, inlineThreshold: 2000, maxVariableSets: 50000 } },
+}))
+jest.mock('../lib/logger', () => ({ __esModule: true, default: { warn: jest.fn(), error: jest.fn() } }))
+
+const node = (id: string, type: string) => ({ id, type, position: { x: 0, y: 0 }, data: { label: id } })
+
+const source = {
+  id: 'wf1',
+  version: 1,
+  updatedAt: new Date('2026-01-01T00:00:00Z'),
+  nodes: [
+    node('start', 'start'),
+    node('check', 'condition'),
+    node('manager', 'approval'),
+    node('ceo', 'approval'),
+    node('end', 'end'),
+  ],
+  edges: [
+    { id: 'e1', source: 'start', target: 'check' },
+    { id: 'e2', source: 'check', target: 'manager', condition: 'amount > 1000' },
+    { id: 'e3', source: 'check', target: 'end' },
+    { id: 'e4', source: 'manager', target: 'ceo' },
+    { id: 'e5', source: 'ceo', target: 'end' },
+  ],
+}
+
+describe('simulatePath', () => {
+  it('按条件走到结束节点', () => {
+    const graph = compileWorkflow(source)
+
+    expect(simulatePath(graph, { amount: 5000 })).toEqual({
+      success: true,
+      path: ['start', 'check', 'manager', 'ceo', 'end'],
+    })
+    expect(simulatePath(graph, { amount: 10 }).path).toEqual(['start', 'check', 'end'])
+  })
+
+  it('检测流程循环', () => {
+    const graph = compileWorkflow({
+      ...source,
+      edges: [...source.edges.slice(0, 4), { id: 'e5', source: 'ceo', target: 'manager' }],
+    })
+
+    expect(simulatePath(graph, { amount: 5000 })).toMatchObject({ success: false, error: '检测到流程循环' })
+  })
+})
+
+describe('runSimulationBatch', () => {
+  it('汇总路径分布、节点命中和审批层级', () => {
+    const graph = compileWorkflow(source)
+    const result = runSimulationBatch(graph, [{ amount: 5000 }, { amount: 2000 }, { amount: 10 }])
+
+    expect(result.total).toBe(3)
+    expect(result.completed).toBe(3)
+    expect(result.paths).toEqual({
+      'start>check>manager>ceo>end': 2,
+      'start>check>end': 1,
+    })
+    expect(result.nodeHits).toMatchObject({ start: 3, manager: 2, end: 3 })
+    expect(result.approvalDepths).toEqual({ 0: 1, 2: 2 })
+  })
+
+  it('分片结果合并后与整体一致', () => {
+    const graph = compileWorkflow(source)
+    const sets = Array.from({ length: 10 }, (_, i) => ({ amount: i * 300 }))
+
+    const merged = [sets.slice(0, 4), sets.slice(4)]
+      .map(shard => runSimulationBatch(graph, shard))
+      .reduce(mergeAggregates, createAggregate())
+
+    expect(merged).toEqual(runSimulationBatch(graph, sets))
+  })
+})
+
+describe('runWorkflowSimulation', () => {
+  it('未启用线程池时在当前线程执行', async () => {
+    const result = await runWorkflowSimulation(source, [{ amount: 5000 }])
+    expect(result.paths).toEqual({ 'start>check>manager>ceo>end': 1 })
+  })
+})
@@ -0,0 +1,245 @@
+/**
+ * 工作流批量模拟 - 在编译后的执行图上批量走流程，汇总路径分布、节点命中与审批层级
+ * 数据量超过阈值时按分片交给常驻的 worker 线程池并行执行，结果在主线程合并
+ */
+
+import path from 'path'
+import { Worker } from 'worker_threads'
+import { config } from '../config'
+import logger from '../lib/logger'
+import { CompiledWorkflow, WorkflowSource, getCompiledWorkflow, findNextEdge } from './workflowCompiler'
+import type { WorkflowVariables } from './workflowService'
+
+// 单次模拟结果（路径为节点ID序列）
+export interface SimulationOutcome {
+  success: boolean
+  path: string[]
+  error?: string
+}
+
+// 批量模拟汇总（普通对象，便于在线程间传递）
+export interface SimulationAggregate {
+  total: number
+  completed: number
+  failed: number
+  // 路径（节点ID以 > 连接）→ 次数
+  paths: Record<string, number>
+  nodeHits: Record<string, number>
+  // 审批层级（路径中审批/会签节点数）→ 次数，仅统计成功走完的流程
+  approvalDepths: Record<number, number>
+  errors: Record<string, number>
+}
+
+// 发送给 worker 的任务
+export interface SimulationTask {
+  id: number
+  workflow: Omit<WorkflowSource, 'updatedAt'> & { updatedAt: number }
+  variableSets: WorkflowVariables[]
+}
+
+export interface SimulationTaskResult {
+  id: number
+  result?: SimulationAggregate
+  error?: string
+}
+
+export const PATH_SEPARATOR = '>'
+
+/**
+ * 模拟单组变量的执行路径（与 simulateWorkflow 的走法一致：只有条件节点判断连线条件）
+ */
+export function simulatePath(graph: CompiledWorkflow, variables: WorkflowVariables): SimulationOutcome {
+  const startNode = graph.startNode
+  if (!startNode) {
+    return { success: false, path: [], error: '缺少开始节点' }
+  }
+
+  const nodePath = [startNode.id]
+  const visited = new Set<string>()
+  let currentId = startNode.id
+
+  for (;;) {
+    // 防止无限循环
+    if (visited.has(currentId)) {
+      return { success: false, path: nodePath, error: '检测到流程循环' }
+    }
+    visited.add(currentId)
+
+    const current = graph.nodeById.get(currentId)
+    if (!current) {
+      return { success: false, path: nodePath, error: `节点 ${currentId} 不存在` }
+    }
+    if (current.type === 'end') {
+      return { success: true, path: nodePath }
+    }
+
+    const next = findNextEdge(graph, currentId, current.type === 'condition' ? variables : null)
+    if (!next) {
+      return { success: false, path: nodePath, error: `节点 "${current.data.label}" 没有出口` }
+    }
+    if (!graph.nodeById.has(next.edge.target)) {
+      return { success: false, path: nodePath, error: '目标节点不存在' }
+    }
+
+    nodePath.push(next.edge.target)
+    currentId = next.edge.target
+  }
+}
+
+export function createAggregate(): SimulationAggregate {
+  return { total: 0, completed: 0, failed: 0, paths: {}, nodeHits: {}, approvalDepths: {}, errors: {} }
+}
+
+function increment<K extends string | number>(counts: Record<K, number>, key: K, by: number = 1): void {
+  counts[key] = (counts[key] || 0) + by
+}
+
+/**
+ * 计入一次模拟结果
+ */
+export function accumulate(aggregate: SimulationAggregate, graph: CompiledWorkflow, outcome: SimulationOutcome): void {
+  aggregate.total++
+  outcome.path.forEach(nodeId => increment(aggregate.nodeHits, nodeId))
+
+  if (!outcome.success) {
+    aggregate.failed++
+    increment(aggregate.errors, outcome.error || '未知错误')
+    return
+  }
+
+  aggregate.completed++
+  increment(aggregate.paths, outcome.path.join(PATH_SEPARATOR))
+  const depth = outcome.path.filter(nodeId => {
+    const type = graph.nodeById.get(nodeId)?.type
+    return type === 'approval' || type === 'parallel'
+  }).length
+  increment(aggregate.approvalDepths, depth)
+}
+
+/**
+ * 合并分片汇总（结果写入 target）
+ */
+export function mergeAggregates(target: SimulationAggregate, source: SimulationAggregate): SimulationAggregate {
+  target.total += source.total
+  target.completed += source.completed
+  target.failed += source.failed
+  Object.entries(source.paths).forEach(([key, count]) => increment(target.paths, key, count))
+  Object.entries(source.nodeHits).forEach(([key, count]) => increment(target.nodeHits, key, count))
+  Object.entries(source.approvalDepths).forEach(([key, count]) => increment(target.approvalDepths, Number(key), count))
+  Object.entries(source.errors).forEach(([key, count]) => increment(target.errors, key, count))
+  return target
+}
+
+/**
+ * 在当前线程批量模拟
+ */
+export function runSimulationBatch(graph: CompiledWorkflow, variableSets: WorkflowVariables[]): SimulationAggregate {
+  const aggregate = createAggregate()
+  variableSets.forEach(variables => accumulate(aggregate, graph, simulatePath(graph, variables || {})))
+  return aggregate
+}
+
+// ==================== worker 线程池 ====================
+
+interface PoolWorker {
+  worker: Worker
+  task: { id: number; resolve: (result: SimulationAggregate) => void; reject: (error: Error) => void } | null
+}
+
+interface QueuedTask {
+  task: SimulationTask
+  resolve: (result: SimulationAggregate) => void
+  reject: (error: Error) => void
+}
+
+// 开发环境（tsx）加载 .ts，构建后加载 .js
+const WORKER_SCRIPT = path.join(__dirname, `workflowSimulation.worker${path.extname(__filename)}`)
+
+const pool: PoolWorker[] = []
+const queue: QueuedTask[] = []
+let nextTaskId = 1
+
+function spawnWorker(): PoolWorker {
+  const entry: PoolWorker = { worker: new Worker(WORKER_SCRIPT), task: null }
+  // 空闲的线程不阻止进程退出
+  entry.worker.unref()
+
+  entry.worker.on('message', (message: SimulationTaskResult) => {
+    const task = entry.task
+    entry.task = null
+    if (task) {
+      if (message.result) task.resolve(message.result)
+      else task.reject(new Error(message.error || '模拟线程执行失败'))
+    }
+    dispatch()
+  })
+
+  entry.worker.on('error', (error) => {
+    logger.error('工作流模拟线程异常', { error: error.message })
+  })
+
+  entry.worker.on('exit', () => {
+    // 线程退出时让出位置，未完成的任务按失败处理
+    const index = pool.indexOf(entry)
+    if (index >= 0) pool.splice(index, 1)
+    entry.task?.reject(new Error('模拟线程已退出'))
+    entry.task = null
+    dispatch()
+  })
+
+  pool.push(entry)
+  return entry
+}
+
+function dispatch(): void {
+  while (queue.length > 0) {
+    let idle = pool.find(entry => !entry.task)
+    if (!idle && pool.length < Math.max(1, config.workflowSimulation.workers)) {
+      idle = spawnWorker()
+    }
+    if (!idle) return
+
+    const { task, resolve, reject } = queue.shift() as QueuedTask
+    idle.task = { id: task.id, resolve, reject }
+    idle.worker.postMessage(task)
+  }
+}
+
+function runInWorker(task: Omit<SimulationTask, 'id'>): Promise<SimulationAggregate> {
+  return new Promise((resolve, reject) => {
+    queue.push({ task: { ...task, id: nextTaskId++ }, resolve, reject })
+    dispatch()
+  })
+}
+
+/**
+ * 批量模拟：数量未超过阈值或未启用线程池时在当前线程执行，否则按线程数分片并行
+ */
+export async function runWorkflowSimulation(
+  source: WorkflowSource,
+  variableSets: WorkflowVariables[]
+): Promise<SimulationAggregate> {
+  const graph = getCompiledWorkflow(source)
+  const { workers, inlineThreshold } = config.workflowSimulation
+
+  if (workers <= 0 || variableSets.length <= inlineThreshold) {
+    return runSimulationBatch(graph, variableSets)
+  }
+
+  const workflow = {
+    id: source.id,
+    version: source.version,
+    updatedAt: source.updatedAt.getTime(),
+    nodes: graph.nodes,
+    edges: graph.edges,
+  }
+  const shardSize = Math.ceil(variableSets.length / workers)
+  const shards: Promise<SimulationAggregate>[] = []
+  for (let i = 0; i < variableSets.length; i += shardSize) {
+    shards.push(runInWorker({ workflow, variableSets: variableSets.slice(i, i + shardSize) }))
+  }
+
+  const results = await Promise.all(shards)
+  return results.reduce(mergeAggregates, createAggregate())
+}
+
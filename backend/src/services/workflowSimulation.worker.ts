@@ -0,0 +1,19 @@
+/**
+ * 工作流批量模拟线程入口
+ * 每个线程按 工作流ID + 版本 缓存执行图，连续的模拟任务不重复编译
+ */
+
+import { parentPort } from 'worker_threads'
+import { getCompiledWorkflow } from './workflowCompiler'
+import { runSimulationBatch, SimulationTask, SimulationTaskResult } from './workflowSimulation'
+
+parentPort?.on('message', (task: SimulationTask) => {
+  let message: SimulationTaskResult
+  try {
+    const graph = getCompiledWorkflow({ ...task.workflow, updatedAt: new Date(task.workflow.updatedAt) })
+    message = { id: task.id, result: runSimulationBatch(graph, task.variableSets) }
+  } catch (error) {
+    message = { id: task.id, error: error instanceof Error ? error.message : String(error) }
+  }
+  parentPort?.postMessage(message)
+})
@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+"""
+审批链 API 基准测试（无浏览器）
+直接调用 /api/auth/login、/api/applications、/api/approvals/* 驱动
+厂长 → 总监 → 经理 → CEO 四级审批，统计每个接口的吞吐量和延迟分布
+
+用法（在 e2e 目录下）:
+    python -m api_bench --applications 2000 --concurrency 50 --report bench-report.json
+"""
+
+from .client import ApiClient, ApiError
+from .flows import APPROVAL_CHAIN, DEFAULT_ACCOUNTS, login_accounts, run_application_flow
+
+__all__ = [
+    "ApiClient",
+    "ApiError",
+    "APPROVAL_CHAIN",
+    "DEFAULT_ACCOUNTS",
+    "login_accounts",
+    "run_application_flow",
+]
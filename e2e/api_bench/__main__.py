@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+命令行入口: python -m api_bench
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from collections import Counter
+
+from latency_stats import format_table, write_report
+
+from .client import ApiClient
+from .flows import APPROVAL_CHAIN, DEFAULT_ACCOUNTS, login, login_accounts, run_application_flow
+
+
+async def run(args):
+    """登录 → 并发推进申请 → 汇总"""
+    outcomes = Counter()
+    rng = random.Random(args.seed)
+
+    async with ApiClient(args.base_url, pool_size=args.concurrency) as client:
+        sessions = await login_accounts(client)
+        # 额外的登录压测（受登录限流影响，默认次数较少）
+        username, password = DEFAULT_ACCOUNTS["applicant"]
+        for _ in range(args.logins):
+            try:
+                await login(client, username, password)
+            except Exception:
+                pass
+
+        queue = asyncio.Queue()
+        for index in range(args.applications):
+            reject_at = rng.choice(APPROVAL_CHAIN) if rng.random() < args.reject_ratio else None
+            queue.put_nowait((index, reject_at))
+
+        async def worker():
+            while True:
+                try:
+                    index, reject_at = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    outcomes[await run_application_flow(client, sessions, index, reject_at)] += 1
+                except Exception:
+                    outcomes["failed"] += 1
+                done = sum(outcomes.values())
+                if done % args.progress_every == 0:
+                    print(f"  [INFO] 已处理 {done}/{args.applications}")
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        duration = time.perf_counter() - start
+
+    return client.recorder, outcomes, duration
+
+
+def main():
+    parser = argparse.ArgumentParser(description="审批链 API 基准测试")
+    parser.add_argument("--base-url", default="http://localhost:3001", help="后端地址（直连，不经过 Vite 代理）")
+    parser.add_argument("--applications", type=int, default=1000, help="创建并推进的申请数量")
+    parser.add_argument("--concurrency", type=int, default=50, help="并发流程数（同时也是连接池大小）")
+    parser.add_argument("--reject-ratio", type=float, default=0.1, help="在随机阶段被拒绝的申请比例")
+    parser.add_argument("--logins", type=int, default=20, help="额外的登录请求次数")
+    parser.add_argument("--progress-every", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--report", help="JSON 报告输出路径")
+    args = parser.parse_args()
+
+    print("\n" + "=" * 70)
+    print("审批链 API 基准测试")
+    print("=" * 70)
+    print(f"申请数: {args.applications}  并发: {args.concurrency}  拒绝比例: {args.reject_ratio}\n")
+
+    recorder, outcomes, duration = asyncio.run(run(args))
+    summary = recorder.summary(duration)
+
+    print("\n" + format_table(summary, show_throughput=True))
+    print(f"\n总耗时: {duration:.1f}s  流程吞吐: {sum(outcomes.values()) / duration:.2f} 个/秒")
+    print("流程结果: " + ", ".join(f"{k}={v}" for k, v in sorted(outcomes.items())))
+
+    if args.report:
+        write_report(args.report, {
+            "config": vars(args),
+            "duration_s": round(duration, 2),
+            "outcomes": dict(outcomes),
+            "endpoints": summary,
+        })
+        print(f"报告保存在: {args.report}")
+
+    return 0 if outcomes["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.stdout.reconfigure(encoding="utf-8")
+    sys.exit(main())
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+基于 aiohttp 连接池的 API 客户端，按接口模板记录每次请求耗时
+"""
+
+import time
+
+import aiohttp
+
+from latency_stats import LatencyRecorder
+
+
+class ApiError(Exception):
+    """接口返回非 2xx 或 success=false"""
+
+    def __init__(self, endpoint, status, body):
+        self.endpoint = endpoint
+        self.status = status
+        self.body = body
+        message = body.get("error", {}).get("message") if isinstance(body, dict) else body
+        super().__init__(f"{endpoint} -> HTTP {status}: {message}")
+
+
+class ApiClient:
+    """共享连接池的异步客户端，所有虚拟用户复用同一个 ClientSession"""
+
+    def __init__(self, base_url, pool_size=100, timeout=30):
+        self.base_url = base_url.rstrip("/")
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.recorder = LatencyRecorder()
+        self.session = None
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=60)
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.session.close()
+
+    async def request(self, method, path, endpoint, token=None, json=None):
+        """
+        发送请求并记录耗时
+        endpoint 为统计用的接口模板（如 "POST /api/approvals/factory/:id"），
+        避免每个申请 ID 单独成为一行统计
+        """
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        start = time.perf_counter()
+        try:
+            async with self.session.request(method, f"{self.base_url}{path}", json=json, headers=headers) as resp:
+                try:
+                    body = await resp.json(content_type=None)
+                except ValueError:
+                    body = await resp.text()
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                if resp.status >= 400 or (isinstance(body, dict) and body.get("success") is False):
+                    raise ApiError(endpoint, resp.status, body)
+        except Exception as e:
+            self.recorder.record_error(endpoint, e)
+            raise
+        self.recorder.record(endpoint, elapsed_ms)
+        return body.get("data") if isinstance(body, dict) else body
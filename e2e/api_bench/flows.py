@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+审批链流程：与 test_approval_complete.py 的 test_approval_flow_complete /
+test_approval_flow_reject 相同的业务路径，只是直接走 API
+"""
+
+# 四级审批链：审批接口级别，同时也是 DEFAULT_ACCOUNTS 中审批人的键
+APPROVAL_CHAIN = ["factory", "director", "manager", "ceo"]
+
+# 种子账号（与 e2e 界面测试一致）
+DEFAULT_ACCOUNTS = {
+    "applicant": ("user1", "123456"),
+    "factory": ("factory1", "123456"),
+    "director": ("director1", "123456"),
+    "manager": ("manager1", "123456"),
+    "ceo": ("ceo1", "123456"),
+}
+
+PRIORITIES = ["LOW", "NORMAL", "HIGH", "URGENT"]
+
+
+async def login(client, username, password):
+    """登录并返回 {token, user}"""
+    data = await client.request(
+        "POST", "/api/auth/login", "POST /api/auth/login",
+        json={"username": username, "password": password},
+    )
+    return {"token": data["accessToken"], "user": data["user"]}
+
+
+async def login_accounts(client, accounts=None):
+    """按角色登录所有账号，返回 {角色: {token, user}}"""
+    sessions = {}
+    for role, (username, password) in (accounts or DEFAULT_ACCOUNTS).items():
+        sessions[role] = await login(client, username, password)
+    return sessions
+
+
+async def approve(client, sessions, level, application_id, action="APPROVE"):
+    """以对应角色审批一个申请"""
+    payload = {"action": action, "comment": f"基准测试{level}审批"}
+    if level == "director" and action == "APPROVE":
+        # 总监流向经理，与界面流程一致
+        payload["flowType"] = "TO_MANAGER"
+        payload["selectedManagerIds"] = [sessions["manager"]["user"]["employeeId"]]
+    await client.request(
+        "POST", f"/api/approvals/{level}/{application_id}",
+        f"POST /api/approvals/{level}/:id",
+        token=sessions[level]["token"], json=payload,
+    )
+
+
+async def run_application_flow(client, sessions, index, reject_at=None):
+    """
+    创建 → 提交 → 逐级审批一个申请
+    reject_at 为审批级别时在该级别拒绝（对应拒绝流程），否则走完四级
+    返回 "completed" 或拒绝所在的级别
+    """
+    applicant = sessions["applicant"]
+    data = await client.request(
+        "POST", "/api/applications", "POST /api/applications",
+        token=applicant["token"],
+        json={
+            "title": f"基准测试申请-{index}",
+            "content": "API 基准测试自动创建",
+            "amount": str(1000 + index % 50 * 100),
+            "priority": PRIORITIES[index % len(PRIORITIES)],
+            "factoryManagerIds": [sessions["factory"]["user"]["employeeId"]],
+            "type": "STANDARD",
+        },
+    )
+    application_id = data["id"]
+    await client.request(
+        "POST", f"/api/applications/{application_id}/submit",
+        "POST /api/applications/:id/submit",
+        token=applicant["token"],
+    )
+
+    for level in APPROVAL_CHAIN:
+        if level == reject_at:
+            await approve(client, sessions, level, application_id, action="REJECT")
+            return f"rejected_{level}"
+        await approve(client, sessions, level, application_id)
+    return "completed"
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+e2e 共享测试基座
+- 每个工作进程只启动一个浏览器，测试之间只新建 BrowserContext
+- 每个种子账号只走一次登录表单，之后复用保存的 storage_state（e2e/.auth/<用户名>.json）
+- 以网络响应和定位器作为等待条件，取代固定的 wait_for_timeout
+
+环境变量:
+    OA_E2E_BASE_URL   前端地址，默认 http://localhost:5173
+    OA_E2E_CHROME     指定本地 Chrome 可执行文件（默认使用 Playwright 自带 Chromium）
+    OA_E2E_HEADED=1   有头模式；OA_E2E_SLOW_MO=<毫秒> 放慢操作
+    OA_E2E_VIDEO=1    录制视频（会明显变慢）
+    OA_E2E_PERF=1     采集每个路由的前端性能指标（见 perf.py）
+"""
+
+import atexit
+import os
+import sys
+import time
+from pathlib import Path
+
+from playwright.sync_api import TimeoutError as PlaywrightTimeout
+from playwright.sync_api import sync_playwright
+
+import perf
+
+# 设置Windows控制台UTF-8编码（reconfigure 可重复调用，多个套件同时导入也安全）
+sys.stdout.reconfigure(encoding='utf-8')
+sys.stderr.reconfigure(encoding='utf-8')
+
+BASE_URL = os.environ.get("OA_E2E_BASE_URL", "http://localhost:5173").rstrip("/")
+E2E_DIR = Path(__file__).resolve().parent
+ROOT_DIR = E2E_DIR.parent
+AUTH_DIR = E2E_DIR / ".auth"
+
+DEFAULT_TIMEOUT_MS = 10000
+# 登录态有效期内复用（JWT 默认24小时，留足余量）
+STORAGE_STATE_MAX_AGE_S = 12 * 3600
+VIEWPORT = {"width": 1920, "height": 1080}
+
+_playwright = None
+_browser = None
+
+
+def launch_options():
+    """根据环境变量生成浏览器启动参数"""
+    options = {"headless": os.environ.get("OA_E2E_HEADED") != "1"}
+    if os.environ.get("OA_E2E_CHROME"):
+        options["executable_path"] = os.environ["OA_E2E_CHROME"]
+    if os.environ.get("OA_E2E_SLOW_MO"):
+        options["slow_mo"] = int(os.environ["OA_E2E_SLOW_MO"])
+    return options
+
+
+def get_browser():
+    """获取当前进程共享的浏览器（首次调用时启动）"""
+    global _playwright, _browser
+    if _browser is None:
+        _playwright = sync_playwright().start()
+        _browser = _playwright.chromium.launch(**launch_options())
+        atexit.register(close_browser)
+    return _browser
+
+
+def close_browser():
+    """关闭共享浏览器"""
+    global _playwright, _browser
+    if _browser is not None:
+        _browser.close()
+        _browser = None
+    if _playwright is not None:
+        _playwright.stop()
+        _playwright = None
+
+
+def api_matcher(url_part, method=None):
+    """生成匹配 /api 响应的谓词"""
+    def match(response):
+        if url_part not in response.url:
+            return False
+        return method is None or response.request.method == method
+    return match
+
+
+class E2EHarness:
+    """e2e 测试基座：浏览器复用、登录态缓存、事件驱动等待"""
+
+    # 子类按需覆盖
+    SCREENSHOTS_DIR = "e2e/screenshots"
+    VIDEO_DIR = None
+    TIMEOUT_MS = DEFAULT_TIMEOUT_MS
+
+    def __init__(self):
+        self.browser = None
+        self.context = None
+        self.page = None
+        self.current_user = None
+        self.perf = None
+
+    # ========== 生命周期 ==========
+
+    def setup(self):
+        """获取共享浏览器并打开一个干净的上下文"""
+        self.browser = get_browser()
+        self.new_context()
+
+    def before_each(self, test_name):
+        """
+        每个测试执行前调用，子类可覆盖以准备前置状态（如默认登录）
+        并行运行时每个测试都在全新的上下文中执行，不能依赖上一个测试留下的页面
+        """
+
+    def teardown(self):
+        """关闭当前上下文（浏览器由进程退出时统一关闭）"""
+        if self.context:
+            self.context.close()
+            self.context = None
+            self.page = None
+
+    def new_context(self, storage_state=None):
+        """新建隔离的 BrowserContext，可带入已保存的登录态"""
+        if self.context:
+            self.context.close()
+        options = {"viewport": VIEWPORT}
+        if storage_state:
+            options["storage_state"] = str(storage_state)
+        if self.VIDEO_DIR and os.environ.get("OA_E2E_VIDEO") == "1":
+            options["record_video_dir"] = str(ROOT_DIR / self.VIDEO_DIR)
+            options["record_video_size"] = VIEWPORT
+        self.context = self.browser.new_context(**options)
+        if perf.perf_enabled():
+            self.context.add_init_script(perf.INIT_SCRIPT)
+        self.page = self.context.new_page()
+        self.page.set_default_timeout(self.TIMEOUT_MS)
+        self.perf = perf.PagePerf(self.page) if perf.perf_enabled() else None
+        self.current_user = None
+        return self.page
+
+    # ========== 通用工具 ==========
+
+    def log(self, message):
+        """打印日志"""
+        print(message)
+
+    def screenshot(self, name):
+        """保存截图"""
+        directory = ROOT_DIR / self.SCREENSHOTS_DIR
+        directory.mkdir(parents=True, exist_ok=True)
+        self.page.screenshot(path=str(directory / f"{name}.png"), full_page=True)
+
+    # ========== 登录 ==========
+
+    def storage_state_path(self, username):
+        """账号对应的登录态文件"""
+        return AUTH_DIR / f"{username}.json"
+
+    def login_via_form(self, username, password, expect_url="/dashboard"):
+        """走登录表单登录（用于测试登录本身，或首次生成登录态）"""
+        self.new_context()
+        self.page.goto(f"{BASE_URL}/login")
+        self.page.fill("input#username", username)
+        self.page.fill("input#password", password)
+        self.page.click("button[type='submit']")
+        self.page.wait_for_url(f"{BASE_URL}{expect_url}")
+        self.current_user = username
+
+    def login(self, username, password):
+        """
+        以指定账号登录：优先复用保存的 storage_state，
+        没有或已过期时走一次登录表单并保存
+        """
+        if self.current_user == username:
+            return
+        state = self.storage_state_path(username)
+        if state.exists() and time.time() - state.stat().st_mtime < STORAGE_STATE_MAX_AGE_S:
+            self.new_context(storage_state=state)
+            self.page.goto(f"{BASE_URL}/dashboard")
+            if "/login" not in self.page.url:
+                self.current_user = username
+                return
+        self.login_via_form(username, password)
+        AUTH_DIR.mkdir(parents=True, exist_ok=True)
+        # 先写临时文件再原子替换，避免并行 worker 读到写了一半的登录态
+        tmp = state.with_name(f"{state.name}.{os.getpid()}.tmp")
+        self.context.storage_state(path=str(tmp))
+        os.replace(tmp, state)
+
+    # ========== 事件驱动等待 ==========
+
+    def locator(self, target):
+        """选择器字符串或 Locator 统一转为 Locator"""
+        return self.page.locator(target).first if isinstance(target, str) else target
+
+    def goto(self, path, ready=None):
+        """
+        打开页面；ready 为选择器时等待其出现，否则等待网络空闲
+        开启性能采集时，页面稳定后记录该路由的一条采样
+        """
+        if self.perf:
+            self.perf.begin()
+        self.page.goto(f"{BASE_URL}{path}")
+        if ready:
+            self.locator(ready).wait_for()
+        else:
+            self.page.wait_for_load_state("networkidle")
+        if self.perf:
+            self.perf.capture(path, self.current_user)
+
+    def click_and_wait_api(self, target, url_part, method=None, timeout=DEFAULT_TIMEOUT_MS, required=True):
+        """
+        点击并等待匹配的 /api 响应返回
+        required=False 时点击未触发请求（超时）不视为失败，返回 None
+        """
+        try:
+            with self.page.expect_response(api_matcher(url_part, method), timeout=timeout) as info:
+                self.locator(target).click()
+            return info.value
+        except PlaywrightTimeout:
+            if required:
+                raise
+            return None
+
+    def wait_visible(self, target, timeout=3000):
+        """等待元素可见，超时返回 False 而不抛错"""
+        try:
+            self.locator(target).wait_for(state="visible", timeout=timeout)
+            return True
+        except PlaywrightTimeout:
+            return False
+
+    def safe_click(self, target, timeout=3000):
+        """元素在超时内可点击则点击，返回是否成功"""
+        try:
+            self.locator(target).click(timeout=timeout)
+            return True
+        except PlaywrightTimeout:
+            return False
+
+    def safe_fill(self, target, value, timeout=3000):
+        """元素在超时内可填写则填写，返回是否成功"""
+        try:
+            self.locator(target).fill(value, timeout=timeout)
+            return True
+        except PlaywrightTimeout:
+            return False
+
+    # ========== 运行 ==========
+
+    def run_tests(self, title, tests, width=70):
+        """按顺序运行 (名称, 方法) 列表并打印汇总，返回进程退出码"""
+        self.log("\n" + "=" * width)
+        self.log(title)
+        self.log("=" * width)
+
+        self.setup()
+
+        passed = 0
+        failed = 0
+        for _name, test_func in tests:
+            try:
+                self.before_each(test_func.__name__)
+                if test_func():
+                    passed += 1
+                else:
+                    failed += 1
+            except Exception as e:
+                self.log(f"  [ERROR] {e}")
+                failed += 1
+
+        self.teardown()
+
+        self.log("\n" + "=" * width)
+        self.log(f"测试完成: {passed} 通过, {failed} 失败")
+        self.log("=" * width)
+        self.log(f"\n截图保存在: {self.SCREENSHOTS_DIR}/")
+
+        return 0 if failed == 0 else 1
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+延迟统计工具
+供压测脚本（load_simulation / api_bench）汇总每个步骤的耗时分布
+"""
+
+import json
+import math
+from collections import defaultdict
+
+# 直方图桶上界（毫秒），最后一个桶收纳所有超出部分
+HISTOGRAM_BUCKETS_MS = [10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+
+def percentile(sorted_values, pct):
+    """最近秩法求百分位，sorted_values 需已升序"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class LatencyRecorder:
+    """按步骤名记录耗时（毫秒）和错误，可跨进程合并"""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(list)
+
+    def record(self, step, elapsed_ms):
+        """记录一次成功耗时"""
+        self.samples[step].append(elapsed_ms)
+
+    def record_error(self, step, message):
+        """记录一次失败"""
+        self.errors[step].append(str(message)[:200])
+
+    def merge(self, other):
+        """合并另一个记录器（或其 to_dict 结果）"""
+        data = other.to_dict() if isinstance(other, LatencyRecorder) else other
+        for step, values in data["samples"].items():
+            self.samples[step].extend(values)
+        for step, messages in data["errors"].items():
+            self.errors[step].extend(messages)
+
+    def to_dict(self):
+        """序列化为可 pickle/JSON 的结构，用于子进程回传"""
+        return {"samples": dict(self.samples), "errors": dict(self.errors)}
+
+    def summary(self, duration_s=None):
+        """生成每个步骤的统计摘要"""
+        result = {}
+        for step in sorted(set(self.samples) | set(self.errors)):
+            values = sorted(self.samples.get(step, []))
+            errors = self.errors.get(step, [])
+            total = len(values) + len(errors)
+            item = {
+                "count": len(values),
+                "errors": len(errors),
+                "error_rate": round(len(errors) / total, 4) if total else 0.0,
+                "min": round(values[0], 1) if values else 0.0,
+                "mean": round(sum(values) / len(values), 1) if values else 0.0,
+                "p50": round(percentile(values, 50), 1),
+                "p95": round(percentile(values, 95), 1),
+                "p99": round(percentile(values, 99), 1),
+                "max": round(values[-1], 1) if values else 0.0,
+                "histogram": histogram(values),
+            }
+            if duration_s:
+                item["throughput"] = round(len(values) / duration_s, 2)
+            if errors:
+                # 只保留前几条错误样例，避免报告过大
+                item["error_samples"] = sorted(set(errors))[:5]
+            result[step] = item
+        return result
+
+
+def histogram(values):
+    """按 HISTOGRAM_BUCKETS_MS 分桶计数"""
+    buckets = {f"<={bound}ms": 0 for bound in HISTOGRAM_BUCKETS_MS}
+    overflow = f">{HISTOGRAM_BUCKETS_MS[-1]}ms"
+    buckets[overflow] = 0
+    for value in values:
+        for bound in HISTOGRAM_BUCKETS_MS:
+            if value <= bound:
+                buckets[f"<={bound}ms"] += 1
+                break
+        else:
+            buckets[overflow] += 1
+    return buckets
+
+
+def format_table(summary, show_throughput=False):
+    """把摘要格式化为终端表格"""
+    header = f"{'步骤':<36}{'次数':>8}{'错误':>7}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}"
+    if show_throughput:
+        header += f"{'req/s':>10}"
+    lines = [header, "-" * len(header)]
+    for step, item in summary.items():
+        line = (
+            f"{step:<36}{item['count']:>8}{item['errors']:>7}"
+            f"{item['p50']:>10.1f}{item['p95']:>10.1f}{item['p99']:>10.1f}{item['max']:>10.1f}"
+        )
+        if show_throughput:
+            line += f"{item.get('throughput', 0):>10.2f}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def write_report(path, payload):
+    """写出 JSON 报告"""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
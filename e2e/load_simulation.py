@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OA系统多用户并发压测
+复用 simulation_steps 中完整模拟的步骤（填写并提交申请、审批通过等真实操作），
+按加权场景同时驱动大量用户，按步骤名统计延迟
+（asyncio Playwright，每个工作进程一个浏览器、多个 BrowserContext）
+
+用法:
+    python e2e/load_simulation.py --users 300 --workers 4 --ramp-up 30
+    python e2e/load_simulation.py --users 50 --steps 5 --report e2e/load-report.json
+
+注意: 开发环境下 /api/auth/login 按 IP 限流（15分钟100次），
+大规模登录压测需要多个来源 IP 或临时放宽限流，否则会计入 login 错误。
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import random
+import sys
+import time
+
+from playwright.async_api import async_playwright
+
+from harness import BASE_URL
+from latency_stats import LatencyRecorder, format_table, write_report
+from simulation_steps import STEPS, StepContext, StepSkipped
+
+# 可用的种子账号，虚拟用户按序轮流使用
+DEFAULT_ACCOUNTS = [
+    ("admin", "admin123"),
+    ("user1", "123456"),
+    ("user2", "123456"),
+    ("factory1", "123456"),
+    ("director1", "123456"),
+    ("manager1", "123456"),
+    ("ceo1", "123456"),
+]
+
+# 登录、退出在每个用户的首尾固定执行，不参与加权
+MIX_EXCLUDED_STEPS = {"login", "logout"}
+
+# 加权场景：键为 simulation_steps 中的步骤名，值为被选中的相对权重
+# 周一早高峰以审批、报表和公告为主
+DEFAULT_MIX = {
+    "check_pending_approvals": 15,
+    "approve_first_pending": 15,
+    "create_approval_application": 10,
+    "read_announcements": 15,
+    "view_reports": 10,
+    "check_attendance": 10,
+    "navigate_equipment_management": 5,
+    "manage_tasks": 5,
+    "check_schedule": 5,
+    "book_meeting_room": 3,
+    "browse_documents": 3,
+    "use_knowledge_base": 2,
+    "check_contacts": 1,
+    "edit_profile": 1,
+}
+NAV_TIMEOUT_MS = 30000
+
+
+def parse_mix(text):
+    """解析 --mix 参数，例如 "approve_first_pending=5,view_reports=1" """
+    mix = {}
+    for part in text.split(","):
+        step, _, weight = part.partition("=")
+        step = step.strip()
+        if step not in STEPS or step in MIX_EXCLUDED_STEPS:
+            raise ValueError(f"未知或不可加权的步骤: {step}")
+        mix[step] = float(weight or 1)
+    return mix
+
+
+def load_accounts(path):
+    """从文件读取账号，每行 username,password"""
+    accounts = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                username, _, password = line.partition(",")
+                accounts.append((username.strip(), password.strip()))
+    if not accounts:
+        raise ValueError(f"账号文件为空: {path}")
+    return accounts
+
+
+class VirtualUser:
+    """单个虚拟用户：独立 BrowserContext，登录后按权重执行若干步骤"""
+
+    def __init__(self, browser, account, options, recorder, rng):
+        self.browser = browser
+        self.username, self.password = account
+        self.options = options
+        self.recorder = recorder
+        self.rng = rng
+
+    async def timed(self, name, action):
+        """
+        执行并计时一个步骤，失败只记录不抛出
+        没有可操作数据（StepSkipped）时记在 "<步骤名> [skipped]" 下，与真正执行了操作的耗时分开
+        """
+        start = time.perf_counter()
+        try:
+            await action()
+        except StepSkipped:
+            self.recorder.record(f"{name} [skipped]", (time.perf_counter() - start) * 1000)
+            return True
+        except Exception as e:
+            self.recorder.record_error(name, e)
+            return False
+        self.recorder.record(name, (time.perf_counter() - start) * 1000)
+        return True
+
+    async def run(self):
+        """登录 → 工作台 → 加权步骤"""
+        context = await self.browser.new_context(viewport={"width": 1920, "height": 1080})
+        page = await context.new_page()
+        page.set_default_timeout(NAV_TIMEOUT_MS)
+        ctx = StepContext(page, self.options["base_url"], self.username, self.password)
+        try:
+            async def dashboard():
+                await page.wait_for_load_state("networkidle")
+
+            if not await self.timed("login", lambda: STEPS["login"](ctx)):
+                return
+            await self.timed("dashboard", dashboard)
+
+            steps = list(self.options["mix"])
+            weights = [self.options["mix"][s] for s in steps]
+            for step in self.rng.choices(steps, weights=weights, k=self.options["steps"]):
+                await asyncio.sleep(self.rng.uniform(0, self.options["think_time"]))
+                await self.timed(step, lambda step=step: STEPS[step](ctx))
+        finally:
+            await context.close()
+
+
+async def run_worker_async(worker_id, user_slots, options):
+    """单个工作进程：启动一个浏览器，并发运行分到的虚拟用户"""
+    recorder = LatencyRecorder()
+    accounts = options["accounts"]
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        try:
+            async def start_user(slot):
+                # 按全局序号线性爬坡，避免所有用户在同一毫秒打到后端
+                await asyncio.sleep(options["ramp_up"] * slot / max(options["users"], 1))
+                rng = random.Random(options["seed"] + slot)
+                user = VirtualUser(browser, accounts[slot % len(accounts)], options, recorder, rng)
+                await user.run()
+
+            await asyncio.gather(*(start_user(slot) for slot in user_slots))
+        finally:
+            await browser.close()
+    return worker_id, recorder.to_dict()
+
+
+def run_worker(args):
+    """进程池入口（需为模块级函数以便 pickle）"""
+    worker_id, user_slots, options = args
+    return asyncio.run(run_worker_async(worker_id, user_slots, options))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OA系统多用户并发压测")
+    parser.add_argument("--users", type=int, default=50, help="虚拟用户总数")
+    parser.add_argument("--workers", type=int, default=max(1, multiprocessing.cpu_count() // 2),
+                        help="工作进程数（每个进程一个浏览器）")
+    parser.add_argument("--steps", type=int, default=3, help="每个用户登录后执行的加权步骤数")
+    parser.add_argument("--ramp-up", type=float, default=10.0, help="全部用户启动完成所需秒数")
+    parser.add_argument("--think-time", type=float, default=1.0, help="步骤间随机停顿上限（秒）")
+    parser.add_argument("--mix", help="自定义场景权重，如 approve_first_pending=5,view_reports=1")
+    parser.add_argument("--accounts", help="账号文件，每行 username,password")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--report", help="JSON 报告输出路径")
+    args = parser.parse_args()
+
+    options = {
+        "users": args.users,
+        "steps": args.steps,
+        "ramp_up": args.ramp_up,
+        "think_time": args.think_time,
+        "mix": parse_mix(args.mix) if args.mix else DEFAULT_MIX,
+        "accounts": load_accounts(args.accounts) if args.accounts else DEFAULT_ACCOUNTS,
+        "base_url": args.base_url.rstrip("/"),
+        "seed": args.seed,
+    }
+    workers = max(1, min(args.workers, args.users))
+    shards = [(w, list(range(w, args.users, workers)), options) for w in range(workers)]
+
+    print("\n" + "=" * 60)
+    print("OA系统多用户并发压测")
+    print("=" * 60)
+    print(f"用户数: {args.users}  进程数: {workers}  每用户步骤: {args.steps}  爬坡: {args.ramp_up}s\n")
+
+    recorder = LatencyRecorder()
+    start = time.perf_counter()
+    with multiprocessing.Pool(workers) as pool:
+        for worker_id, data in pool.imap_unordered(run_worker, shards):
+            recorder.merge(data)
+            print(f"  [DONE] 工作进程 {worker_id} 完成")
+    duration = time.perf_counter() - start
+
+    summary = recorder.summary(duration)
+    print("\n" + format_table(summary, show_throughput=True))
+    total_errors = sum(item["errors"] for item in summary.values())
+    print(f"\n总耗时: {duration:.1f}s  错误: {total_errors}")
+
+    if args.report:
+        write_report(args.report, {
+            "config": {k: v for k, v in options.items() if k != "accounts"},
+            "workers": workers,
+            "duration_s": round(duration, 2),
+            "steps": summary,
+        })
+        print(f"报告保存在: {args.report}")
+
+    return 0 if total_errors == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
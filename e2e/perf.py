@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+前端性能采集（可选，OA_E2E_PERF=1 开启）
+harness.goto() 每访问一个路由记录一次：导航耗时、LCP/CLS/TBT、JS 堆、脚本体积，
+以及页面加载期间的全部 /api 调用（耗时、响应大小），用于发现打包体积膨胀和新增的接口瀑布
+
+每个进程把原始采样写到 e2e/perf/runs/<run_id>/<pid>.json，
+check 命令合并为 e2e/perf/runs/<run_id>.json 并与基线对比，有退化时返回 1
+
+用法:
+    OA_E2E_PERF=1 python e2e/test_complete_workflow.py
+    python e2e/perf.py check                      # 对比最近一次运行
+    python e2e/perf.py check --update-baseline    # 以最近一次运行作为新基线
+"""
+
+import argparse
+import atexit
+import json
+import os
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+
+PERF_DIR = Path(__file__).resolve().parent / "perf"
+RUNS_DIR = PERF_DIR / "runs"
+BASELINE_PATH = PERF_DIR / "baseline.json"
+
+# 在每个文档的页面脚本之前注入，持续累计 LCP/CLS/TBT
+INIT_SCRIPT = """
+(() => {
+  const perf = window.__oaPerf = { lcp: 0, cls: 0, tbt: 0 };
+  const observe = (type, handle) => {
+    try {
+      new PerformanceObserver((list) => list.getEntries().forEach(handle)).observe({ type, buffered: true });
+    } catch (e) { /* 浏览器不支持该类型 */ }
+  };
+  observe('largest-contentful-paint', (e) => { perf.lcp = e.startTime; });
+  observe('layout-shift', (e) => { if (!e.hadRecentInput) perf.cls += e.value; });
+  // TBT 近似为所有长任务超出 50ms 部分之和
+  observe('longtask', (e) => { perf.tbt += Math.max(0, e.duration - 50); });
+})();
+"""
+
+COLLECT_SCRIPT = """
+() => {
+  const nav = performance.getEntriesByType('navigation')[0] || {};
+  const scripts = performance.getEntriesByType('resource').filter((r) => r.initiatorType === 'script');
+  const perf = window.__oaPerf || {};
+  return {
+    time_origin: performance.timeOrigin,
+    ttfb: nav.responseStart || 0,
+    dom_content_loaded: nav.domContentLoadedEventEnd || 0,
+    load: nav.loadEventEnd || 0,
+    lcp: perf.lcp || 0,
+    cls: perf.cls || 0,
+    tbt: perf.tbt || 0,
+    js_heap_bytes: (performance.memory && performance.memory.usedJSHeapSize) || 0,
+    script_count: scripts.length,
+    script_bytes: scripts.reduce((sum, r) => sum + (r.encodedBodySize || 0), 0),
+  };
+}
+"""
+
+# 逐路由比较的指标: (相对阈值, 绝对阈值)，两者同时超出才算退化，避免毫秒级抖动误报
+METRIC_RULES = {
+    "ttfb": (0.25, 100),
+    "dom_content_loaded": (0.25, 150),
+    "load": (0.25, 150),
+    "lcp": (0.25, 200),
+    "cls": (0, 0.05),
+    "tbt": (0.5, 100),
+    "js_heap_bytes": (0.25, 5 * 1024 * 1024),
+    "script_count": (0.1, 2),
+    "script_bytes": (0.1, 20 * 1024),
+    "api_count": (0, 0),
+    "api_bytes": (0.25, 20 * 1024),
+    "api_waterfall_ms": (0.3, 150),
+}
+
+_ID_SEGMENT = re.compile(r"^(\d+|[0-9a-f-]{32,36}|c[a-z0-9]{20,})$")
+
+
+def perf_enabled():
+    """运行时读取开关（并行运行器在创建进程池前设置环境变量）"""
+    return os.environ.get("OA_E2E_PERF") == "1"
+
+
+def current_run_id():
+    """同一次运行的所有进程共享 OA_E2E_PERF_RUN，单独运行时按启动时间生成"""
+    if not os.environ.get("OA_E2E_PERF_RUN"):
+        os.environ["OA_E2E_PERF_RUN"] = time.strftime("%Y%m%d-%H%M%S")
+    return os.environ["OA_E2E_PERF_RUN"]
+
+
+def normalize_api_path(url):
+    """去掉域名和查询串，把 id 段替换为 :id，便于跨运行比较"""
+    path = re.sub(r"^https?://[^/]+", "", url).split("?")[0]
+    return "/".join(":id" if _ID_SEGMENT.match(seg) else seg for seg in path.split("/"))
+
+
+class PagePerf:
+    """挂在单个 Page 上，记录当前导航期间的 /api 请求，capture() 时生成一条采样"""
+
+    def __init__(self, page):
+        self.page = page
+        self.requests = []
+        page.on("request", self._on_request)
+
+    def _on_request(self, request):
+        if "/api/" in request.url:
+            self.requests.append(request)
+
+    def begin(self):
+        """开始新的导航，清空上一页的请求"""
+        self.requests = []
+
+    def capture(self, route, user=None):
+        """页面稳定后采集指标并交给进程级收集器"""
+        self.page.wait_for_load_state("networkidle")
+        metrics = self.page.evaluate(COLLECT_SCRIPT)
+        time_origin = metrics.pop("time_origin")
+
+        calls = []
+        for request in self.requests:
+            timing = request.timing
+            if timing.get("responseEnd", -1) < 0:
+                continue  # 未完成的请求
+            try:
+                size = request.sizes()["responseBodySize"]
+            except Exception:
+                size = 0
+            response = request.response()
+            calls.append({
+                "method": request.method,
+                "path": normalize_api_path(request.url),
+                "status": response.status if response else 0,
+                "start_ms": round(timing["startTime"] - time_origin, 1),
+                "duration_ms": round(timing["responseEnd"], 1),
+                "bytes": size,
+            })
+        calls.sort(key=lambda c: c["start_ms"])
+
+        sample = {"route": route.split("?")[0], "user": user, **{k: round(v, 4) for k, v in metrics.items()}}
+        sample["api_count"] = len(calls)
+        sample["api_bytes"] = sum(c["bytes"] for c in calls)
+        sample["api_waterfall_ms"] = round(
+            max(c["start_ms"] + c["duration_ms"] for c in calls) - calls[0]["start_ms"], 1
+        ) if calls else 0
+        sample["api_calls"] = calls
+        collector.add(sample)
+        return sample
+
+
+class PerfCollector:
+    """进程级采样收集器，进程退出时写出原始采样"""
+
+    def __init__(self):
+        self.samples = []
+        self._registered = False
+
+    def add(self, sample):
+        """记录一条采样（首次调用时注册退出时写盘）"""
+        if not self._registered:
+            atexit.register(self.flush)
+            self._registered = True
+        self.samples.append(sample)
+
+    def flush(self):
+        """写出 runs/<run_id>/<pid>.json，可重复调用"""
+        if not self.samples:
+            return None
+        run_dir = RUNS_DIR / current_run_id()
+        run_dir.mkdir(parents=True, exist_ok=True)
+        path = run_dir / f"{os.getpid()}.json"
+        existing = json.loads(path.read_text(encoding="utf-8")) if path.exists() else []
+        path.write_text(json.dumps(existing + self.samples, ensure_ascii=False), encoding="utf-8")
+        self.samples = []
+        return path
+
+
+collector = PerfCollector()
+
+
+def summarize(samples):
+    """按路由聚合（取中位数），接口按 "方法 路径" 聚合"""
+    routes = {}
+    for sample in samples:
+        routes.setdefault(sample["route"], []).append(sample)
+
+    summary = {}
+    for route, items in sorted(routes.items()):
+        entry = {"samples": len(items)}
+        for metric in METRIC_RULES:
+            entry[metric] = round(statistics.median(s[metric] for s in items), 4)
+        endpoints = {}
+        for s in items:
+            for call in s["api_calls"]:
+                endpoints.setdefault(f"{call['method']} {call['path']}", []).append(call)
+        entry["endpoints"] = {
+            key: {
+                "calls_per_visit": round(len(calls) / len(items), 2),
+                "duration_ms": round(statistics.median(c["duration_ms"] for c in calls), 1),
+                "bytes": int(statistics.median(c["bytes"] for c in calls)),
+            }
+            for key, calls in sorted(endpoints.items())
+        }
+        summary[route] = entry
+    return summary
+
+
+def compare(summary, baseline):
+    """与基线对比，返回退化描述列表"""
+    regressions = []
+    for route, current in summary.items():
+        base = baseline.get(route)
+        if base is None:
+            continue
+        for metric, (relative, absolute) in METRIC_RULES.items():
+            before, after = base.get(metric, 0), current[metric]
+            if after > before * (1 + relative) and after - before > absolute:
+                regressions.append(f"{route} {metric}: {before} -> {after}")
+        for endpoint in current["endpoints"].keys() - base.get("endpoints", {}).keys():
+            regressions.append(f"{route} 新增接口调用: {endpoint}")
+    return regressions
+
+
+def latest_run_id():
+    """最近一次运行（按目录名时间排序）"""
+    runs = sorted(p.name for p in RUNS_DIR.glob("*") if p.is_dir()) if RUNS_DIR.exists() else []
+    return runs[-1] if runs else None
+
+
+def check(run_id=None, baseline_path=BASELINE_PATH, update_baseline=False):
+    """合并一次运行的原始采样，写出 runs/<run_id>.json 并与基线对比，返回退化列表"""
+    run_id = run_id or latest_run_id()
+    if run_id is None:
+        raise FileNotFoundError(f"没有性能采样: {RUNS_DIR}")
+    samples = []
+    for path in sorted((RUNS_DIR / run_id).glob("*.json")):
+        samples.extend(json.loads(path.read_text(encoding="utf-8")))
+
+    summary = summarize(samples)
+    baseline_path = Path(baseline_path)
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))["routes"] if baseline_path.exists() else {}
+    regressions = compare(summary, baseline)
+
+    report = {"run_id": run_id, "routes": summary, "regressions": regressions, "samples": samples}
+    (RUNS_DIR / f"{run_id}.json").write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    if update_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(
+            json.dumps({"run_id": run_id, "routes": summary}, ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+    return run_id, summary, regressions
+
+
+def format_summary(summary):
+    """把路由摘要格式化为终端表格"""
+    header = f"{'路由':<28}{'LCP':>8}{'CLS':>7}{'TBT':>7}{'脚本KB':>9}{'堆MB':>7}{'接口数':>7}{'瀑布ms':>9}"
+    lines = [header, "-" * len(header)]
+    for route, item in summary.items():
+        lines.append(
+            f"{route:<28}{item['lcp']:>8.0f}{item['cls']:>7.3f}{item['tbt']:>7.0f}"
+            f"{item['script_bytes'] / 1024:>9.0f}{item['js_heap_bytes'] / 1048576:>7.1f}"
+            f"{item['api_count']:>7.0f}{item['api_waterfall_ms']:>9.0f}"
+        )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="e2e 前端性能基线对比")
+    sub = parser.add_subparsers(dest="command", required=True)
+    check_parser = sub.add_parser("check", help="合并一次运行的采样并与基线对比")
+    check_parser.add_argument("--run", help="运行 id（默认最近一次）")
+    check_parser.add_argument("--baseline", default=str(BASELINE_PATH), help="基线文件路径")
+    check_parser.add_argument("--update-baseline", action="store_true", help="以本次结果覆盖基线")
+    args = parser.parse_args()
+
+    run_id, summary, regressions = check(args.run, args.baseline, args.update_baseline)
+    print(f"\n性能运行: {run_id}\n")
+    print(format_summary(summary))
+    if args.update_baseline:
+        print(f"\n基线已更新: {args.baseline}")
+        return 0
+    if regressions:
+        print(f"\n[FAIL] {len(regressions)} 项性能退化:")
+        for item in regressions:
+            print(f"  - {item}")
+        return 1
+    print("\n[PASS] 与基线相比无退化")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
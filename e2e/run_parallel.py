@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+e2e 并行分片运行器
+自动发现各套件中的 test_* 测试，分发到多进程执行（每个进程一个无头浏览器，
+每个测试一个全新的 BrowserContext），汇总为 JUnit XML 和带耗时的 JSON 报告
+
+用法:
+    python e2e/run_parallel.py --workers 4
+    python e2e/run_parallel.py --shard 1/3 --junit e2e/reports/junit-1.xml
+    python e2e/run_parallel.py -k approval --list
+    python e2e/run_parallel.py --perf               # 同时采集前端性能并与基线对比
+
+说明:
+- 套件类为 E2EHarness 子类，测试前调用 before_each(测试名) 准备前置状态
+- 模块级 test_* 函数（如 test_oa_system）自行管理基座，返回真值即通过
+- --shard i/n 用于多台 CI 机器之间切分，--workers 用于单机内并行
+"""
+
+import argparse
+import contextlib
+import importlib
+import inspect
+import io
+import json
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+import xml.etree.ElementTree as ET
+from multiprocessing.util import Finalize
+from pathlib import Path
+
+import perf
+from harness import E2EHarness, close_browser
+
+E2E_DIR = Path(__file__).resolve().parent
+# 不参与自动发现的脚本（可视化演示，非断言型测试）
+EXCLUDED_MODULES = {"test_user_simulation"}
+
+
+def discover(keyword=None):
+    """
+    发现所有测试，返回 [(test_id, 模块名, 类名或 None, 函数名)]
+    顺序稳定（模块名排序 + 定义顺序），保证各分片切分一致
+    """
+    tests = []
+    for path in sorted(E2E_DIR.glob("test_*.py")):
+        module_name = path.stem
+        if module_name in EXCLUDED_MODULES:
+            continue
+        module = importlib.import_module(module_name)
+        for name, obj in vars(module).items():
+            if getattr(obj, "__module__", None) != module_name:
+                continue
+            if inspect.isclass(obj) and issubclass(obj, E2EHarness):
+                for method in vars(obj):
+                    if method.startswith("test_") and callable(getattr(obj, method)):
+                        tests.append((f"{module_name}::{name}::{method}", module_name, name, method))
+            elif inspect.isfunction(obj) and name.startswith("test_"):
+                tests.append((f"{module_name}::{name}", module_name, None, name))
+    if keyword:
+        tests = [t for t in tests if keyword in t[0]]
+    return tests
+
+
+def parse_shard(text):
+    """解析 --shard i/n（i 从 1 开始）"""
+    index, _, total = text.partition("/")
+    index, total = int(index), int(total)
+    if not 1 <= index <= total:
+        raise ValueError(f"分片参数无效: {text}")
+    return index, total
+
+
+def init_worker():
+    """工作进程初始化：进程退出时写出性能采样并关闭共享浏览器（Pool 子进程不会执行 atexit）"""
+    Finalize(None, close_browser, exitpriority=10)
+    Finalize(None, perf.collector.flush, exitpriority=20)
+
+
+def run_one(test):
+    """在工作进程中执行单个测试，捕获输出并计时"""
+    test_id, module_name, class_name, func_name = test
+    output = io.StringIO()
+    status, message = "passed", ""
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+        try:
+            module = importlib.import_module(module_name)
+            if class_name is None:
+                result = getattr(module, func_name)()
+            else:
+                suite = getattr(module, class_name)()
+                suite.setup()
+                try:
+                    suite.before_each(func_name)
+                    result = getattr(suite, func_name)()
+                finally:
+                    suite.teardown()
+            if not result:
+                status, message = "failed", "测试返回失败"
+        except AssertionError as e:
+            status, message = "failed", str(e) or "断言失败"
+            print(traceback.format_exc())
+        except Exception as e:
+            status, message = "error", f"{type(e).__name__}: {e}"
+            print(traceback.format_exc())
+    return {
+        "id": test_id,
+        "module": module_name,
+        "classname": f"{module_name}.{class_name}" if class_name else module_name,
+        "name": func_name,
+        "status": status,
+        "message": message,
+        "duration_s": round(time.perf_counter() - start, 3),
+        "worker": multiprocessing.current_process().name,
+        "output": output.getvalue(),
+    }
+
+
+def write_junit(path, results, duration):
+    """按模块分组写出 JUnit XML"""
+    root = ET.Element("testsuites", tests=str(len(results)), time=f"{duration:.3f}")
+    by_module = {}
+    for r in results:
+        by_module.setdefault(r["module"], []).append(r)
+    for module_name, items in by_module.items():
+        suite = ET.SubElement(
+            root, "testsuite",
+            name=module_name,
+            tests=str(len(items)),
+            failures=str(sum(r["status"] == "failed" for r in items)),
+            errors=str(sum(r["status"] == "error" for r in items)),
+            time=f"{sum(r['duration_s'] for r in items):.3f}",
+        )
+        for r in items:
+            case = ET.SubElement(suite, "testcase", classname=r["classname"], name=r["name"],
+                                 time=f"{r['duration_s']:.3f}")
+            if r["status"] == "failed":
+                ET.SubElement(case, "failure", message=r["message"])
+            elif r["status"] == "error":
+                ET.SubElement(case, "error", message=r["message"])
+            if r["output"]:
+                ET.SubElement(case, "system-out").text = r["output"]
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    ET.ElementTree(root).write(path, encoding="utf-8", xml_declaration=True)
+
+
+def write_json(path, results, duration, workers, shard):
+    """写出 JSON 报告（不含测试输出，输出见 JUnit）"""
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "duration_s": round(duration, 2),
+        "workers": workers,
+        "shard": shard,
+        "summary": {s: sum(r["status"] == s for r in results) for s in ("passed", "failed", "error")},
+        "tests": [{k: v for k, v in r.items() if k != "output"} for r in results],
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="e2e 并行分片运行器")
+    parser.add_argument("--workers", type=int, default=max(1, multiprocessing.cpu_count() // 2),
+                        help="工作进程数（每个进程一个浏览器）")
+    parser.add_argument("--shard", help="只运行第 i 个分片，格式 i/n")
+    parser.add_argument("-k", dest="keyword", help="只运行 id 含该子串的测试")
+    parser.add_argument("--list", action="store_true", help="只列出测试不运行")
+    parser.add_argument("--junit", default=str(E2E_DIR / "reports" / "junit.xml"), help="JUnit XML 输出路径")
+    parser.add_argument("--report", default=str(E2E_DIR / "reports" / "e2e-report.json"), help="JSON 报告输出路径")
+    parser.add_argument("--slowest", type=int, default=10, help="打印最慢的 N 个测试")
+    parser.add_argument("--perf", action="store_true", help="采集前端性能并与 e2e/perf/baseline.json 对比")
+    args = parser.parse_args()
+
+    tests = discover(args.keyword)
+    shard = None
+    if args.shard:
+        index, total = parse_shard(args.shard)
+        tests = tests[index - 1::total]
+        shard = f"{index}/{total}"
+
+    if args.list:
+        for test in tests:
+            print(test[0])
+        return 0
+    if not tests:
+        print("没有匹配的测试")
+        return 1
+
+    workers = max(1, min(args.workers, len(tests)))
+    if args.perf:
+        # 在创建进程池前设置，所有工作进程写入同一个运行目录
+        os.environ["OA_E2E_PERF"] = "1"
+        perf.current_run_id()
+    print("\n" + "=" * 70)
+    print("e2e 并行运行")
+    print("=" * 70)
+    print(f"测试数: {len(tests)}  进程数: {workers}" + (f"  分片: {shard}" if shard else "") + "\n")
+
+    results = []
+    start = time.perf_counter()
+    with multiprocessing.Pool(workers, initializer=init_worker) as pool:
+        for r in pool.imap_unordered(run_one, tests):
+            results.append(r)
+            mark = {"passed": "PASS", "failed": "FAIL", "error": "ERROR"}[r["status"]]
+            print(f"  [{mark}] {r['id']} ({r['duration_s']:.1f}s)" + (f" - {r['message']}" if r["message"] else ""))
+        pool.close()
+        pool.join()
+    duration = time.perf_counter() - start
+
+    # 报告按发现顺序排列，便于对比不同运行
+    order = {t[0]: i for i, t in enumerate(tests)}
+    results.sort(key=lambda r: order[r["id"]])
+    write_junit(args.junit, results, duration)
+    write_json(args.report, results, duration, workers, shard)
+
+    failed = [r for r in results if r["status"] != "passed"]
+    print("\n最慢的测试:")
+    for r in sorted(results, key=lambda r: r["duration_s"], reverse=True)[:args.slowest]:
+        print(f"  {r['duration_s']:>7.1f}s  {r['id']}")
+
+    print("\n" + "=" * 70)
+    print(f"测试完成: {len(results) - len(failed)} 通过, {len(failed)} 失败  总耗时: {duration:.1f}s")
+    print("=" * 70)
+    print(f"JUnit: {args.junit}\nJSON:  {args.report}")
+
+    regressions = []
+    if args.perf:
+        run_id, summary, regressions = perf.check(perf.current_run_id())
+        print(f"\n性能运行: {run_id}\n")
+        print(perf.format_summary(summary))
+        for item in regressions:
+            print(f"  [PERF] {item}")
+
+    return 0 if not failed and not regressions else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,460 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+用户操作模拟步骤（test_user_simulation 的完整模拟与 load_simulation 的并发压测共用）
+
+每个步骤是 async def step(ctx)，页面调用统一写成 await resolve(page.xxx(...))：
+- Playwright 异步页面（压测）：resolve 等待调用完成
+- Playwright 同步页面（可视化模拟）：调用立即执行并返回，协程不会挂起，
+  由 run_sync 直接驱动，不需要事件循环（同步 API 不能在运行中的事件循环里使用）
+"""
+
+import asyncio
+import inspect
+import time
+
+
+class StepFailed(Exception):
+    """步骤的核心操作未能完成（压测时计入该步骤的错误）"""
+
+
+class StepSkipped(Exception):
+    """当前账号没有可操作的数据（如非审批人没有待审批申请），压测时单独统计，不计为错误"""
+
+
+async def resolve(value):
+    """异步页面的调用结果需要 await，同步页面的直接返回"""
+    if inspect.isawaitable(value):
+        return await value
+    return value
+
+
+class StepContext:
+    """
+    步骤运行环境
+    harness 为 E2EHarness 时是同步可视化模拟：输出日志、保存截图，核心操作失败只记日志；
+    harness 为 None 时是异步压测：不输出日志和截图，核心操作失败抛出 StepFailed，无数据可操作时抛出 StepSkipped
+    """
+
+    def __init__(self, page, base_url, username="admin", password="admin123", harness=None):
+        self.page = page
+        self.base_url = base_url
+        self.username = username
+        self.password = password
+        self.harness = harness
+
+    def log(self, message):
+        if self.harness:
+            self.harness.log(message)
+
+    def screenshot(self, name):
+        if self.harness:
+            self.harness.screenshot(name)
+
+    def fail(self, message):
+        """核心操作未完成"""
+        if self.harness is None:
+            raise StepFailed(message)
+        self.log(f"  {message}")
+
+    def skip(self, message):
+        """没有可操作的数据"""
+        if self.harness is None:
+            raise StepSkipped(message)
+        self.log(f"  {message}")
+
+    async def sleep(self, seconds):
+        if self.harness:
+            time.sleep(seconds)
+        else:
+            await asyncio.sleep(seconds)
+
+    async def open_menu(self, text):
+        """点击侧边栏菜单并等待页面加载"""
+        await resolve(self.page.click(f"text={text}"))
+        await resolve(self.page.wait_for_load_state("networkidle"))
+        self.log(f"  进入{text}")
+
+
+def run_sync(step, ctx):
+    """在同步页面上运行步骤（见模块说明）"""
+    coro = step(ctx)
+    try:
+        coro.send(None)
+    except StopIteration as stop:
+        return stop.value
+    coro.close()
+    raise RuntimeError(f"步骤 {step.__name__} 在同步页面上挂起")
+
+
+# ============================================
+# 步骤
+# ============================================
+
+async def login(ctx):
+    """登录"""
+    ctx.log(f"\n[用户操作] 登录: {ctx.username}")
+    page = ctx.page
+
+    await resolve(page.goto(f"{ctx.base_url}/login"))
+    await resolve(page.wait_for_load_state("networkidle"))
+
+    await resolve(page.click("input#username"))
+    await resolve(page.fill("input#username", ctx.username))
+    ctx.log(f"  输入用户名: {ctx.username}")
+
+    await resolve(page.click("input#password"))
+    await resolve(page.fill("input#password", ctx.password))
+    ctx.log("  输入密码")
+
+    await resolve(page.click("button[type='submit']"))
+    ctx.log("  点击登录按钮")
+
+    await resolve(page.wait_for_url(f"{ctx.base_url}/dashboard", timeout=10000))
+    ctx.log("  登录成功，进入工作台")
+
+    ctx.screenshot("sim-01-login-success")
+
+
+async def create_approval_application(ctx):
+    """创建报销申请并提交"""
+    ctx.log("\n[用户操作] 创建报销申请")
+    page = ctx.page
+
+    await ctx.open_menu("审批中心")
+    ctx.screenshot("sim-02-approval-center")
+
+    await resolve(page.click("text=新建申请"))
+    await resolve(page.wait_for_load_state("networkidle"))
+    ctx.log("  点击新建申请")
+    ctx.screenshot("sim-03-new-application")
+
+    submitted = False
+    try:
+        title_input = page.locator('input[placeholder*="标题"]').first
+        if await resolve(title_input.is_visible(timeout=3000)):
+            await resolve(title_input.fill(f"测试报销申请_{int(time.time() * 1000)}"))
+            ctx.log("  填写申请标题")
+
+        amount_input = page.locator('input[placeholder*="金额"]').first
+        if await resolve(amount_input.is_visible(timeout=3000)):
+            await resolve(amount_input.fill("1000"))
+            ctx.log("  填写金额")
+
+        remark_input = page.locator('textarea').first
+        if await resolve(remark_input.is_visible(timeout=3000)):
+            await resolve(remark_input.fill("这是测试申请的备注信息"))
+            ctx.log("  填写备注")
+
+        submit_btn = page.locator('button:has-text("提交")').first
+        if await resolve(submit_btn.is_visible(timeout=3000)):
+            await resolve(submit_btn.click())
+            await resolve(page.wait_for_load_state("networkidle"))
+            ctx.log("  提交申请")
+            submitted = True
+    except Exception as e:
+        ctx.log(f"  表单填写出错: {e}")
+
+    if not submitted:
+        ctx.fail("申请未提交")
+    ctx.screenshot("sim-04-application-submitted")
+
+
+async def check_pending_approvals(ctx):
+    """查看待审批列表"""
+    ctx.log("\n[用户操作] 查看待审批")
+    page = ctx.page
+
+    await resolve(page.goto(f"{ctx.base_url}/approval/pending"))
+    await resolve(page.wait_for_load_state("networkidle"))
+    ctx.log("  进入待我审批")
+    ctx.screenshot("sim-05-pending-approval")
+
+
+async def approve_first_pending(ctx):
+    """通过待审批列表中的第一条申请"""
+    ctx.log("\n[用户操作] 审批通过")
+    page = ctx.page
+
+    await resolve(page.goto(f"{ctx.base_url}/approval/pending"))
+    await resolve(page.wait_for_load_state("networkidle"))
+
+    approve_btn = page.locator('button:has-text("通过")').first
+    if not await resolve(approve_btn.is_visible(timeout=3000)):
+        ctx.skip("没有可审批的申请")
+        return
+
+    await resolve(approve_btn.click())
+    ctx.log("  点击通过")
+
+    comment = page.locator('textarea[placeholder*="审批意见"]').first
+    if await resolve(comment.is_visible(timeout=3000)):
+        await resolve(comment.fill("同意"))
+        ctx.log("  填写审批意见")
+
+    await resolve(page.locator('button:has-text("确认通过")').first.click())
+    await resolve(page.wait_for_load_state("networkidle"))
+    ctx.log("  确认通过")
+    ctx.screenshot("sim-05-approved")
+
+
+async def navigate_equipment_management(ctx):
+    """设备管理浏览"""
+    ctx.log("\n[用户操作] 设备管理浏览")
+    page = ctx.page
+
+    await ctx.open_menu("设备管理")
+    ctx.screenshot("sim-06-equipment")
+
+    try:
+        rows = await resolve(page.locator('tr').all())
+        if len(rows) > 1:
+            await resolve(rows[1].click())  # 点击第一行数据
+            ctx.log("  点击查看设备详情")
+            await ctx.sleep(1)
+            ctx.screenshot("sim-07-equipment-detail")
+
+            await resolve(page.go_back())
+            await ctx.sleep(1)
+    except Exception as e:
+        ctx.log(f"  设备详情查看跳过: {e}")
+
+
+async def check_attendance(ctx):
+    """考勤打卡"""
+    ctx.log("\n[用户操作] 考勤打卡")
+    page = ctx.page
+
+    await ctx.open_menu("考勤管理")
+    ctx.screenshot("sim-08-attendance")
+
+    try:
+        clock_btn = page.locator('button:has-text("打卡")').first
+        if await resolve(clock_btn.is_visible(timeout=3000)):
+            await resolve(clock_btn.click())
+            await resolve(page.wait_for_load_state("networkidle"))
+            ctx.log("  点击打卡")
+            ctx.screenshot("sim-09-clock-in")
+    except Exception:
+        ctx.log("  打卡按钮未找到")
+
+
+async def book_meeting_room(ctx):
+    """预订会议室"""
+    ctx.log("\n[用户操作] 预订会议室")
+    page = ctx.page
+
+    await ctx.open_menu("会议管理")
+    ctx.screenshot("sim-10-meetings")
+
+    try:
+        book_btn = page.locator('button:has-text("预订")').first
+        if await resolve(book_btn.is_visible(timeout=3000)):
+            await resolve(book_btn.click())
+            ctx.log("  点击预订")
+            await ctx.sleep(2)
+            ctx.screenshot("sim-11-meeting-booking")
+    except Exception:
+        ctx.log("  预订按钮未找到")
+
+
+async def browse_documents(ctx):
+    """浏览文档中心"""
+    ctx.log("\n[用户操作] 浏览文档中心")
+    page = ctx.page
+
+    await ctx.open_menu("文档中心")
+    ctx.screenshot("sim-12-documents")
+
+    try:
+        folders = await resolve(page.locator('.folder, [class*="folder"]').all())
+        if folders:
+            await resolve(folders[0].click())
+            ctx.log("  点击文件夹")
+            await ctx.sleep(1)
+            ctx.screenshot("sim-13-folder-opened")
+    except Exception:
+        ctx.log("  文件夹未找到")
+
+
+async def check_contacts(ctx):
+    """查看通讯录"""
+    ctx.log("\n[用户操作] 查看通讯录")
+    page = ctx.page
+
+    await ctx.open_menu("通讯录")
+    ctx.screenshot("sim-14-contacts")
+
+    try:
+        dept_items = await resolve(page.locator('.department, [class*="dept"]').all())
+        if dept_items:
+            await resolve(dept_items[0].click())
+            ctx.log("  点击部门展开")
+            await ctx.sleep(1)
+            ctx.screenshot("sim-15-contacts-expanded")
+    except Exception:
+        ctx.log("  部门列表未找到")
+
+
+async def read_announcements(ctx):
+    """查看公告"""
+    ctx.log("\n[用户操作] 查看公告")
+    page = ctx.page
+
+    await ctx.open_menu("公告通知")
+    ctx.screenshot("sim-16-announcements")
+
+    try:
+        announcements = await resolve(page.locator('.announcement, [class*="announce"]').all())
+        if announcements:
+            await resolve(announcements[0].click())
+            await resolve(page.wait_for_load_state("networkidle"))
+            ctx.log("  点击公告查看详情")
+            ctx.screenshot("sim-17-announcement-detail")
+    except Exception:
+        ctx.log("  公告列表未找到")
+
+
+async def use_knowledge_base(ctx):
+    """浏览并搜索知识库"""
+    ctx.log("\n[用户操作] 浏览知识库")
+    page = ctx.page
+
+    await ctx.open_menu("知识库")
+    ctx.screenshot("sim-18-knowledge")
+
+    try:
+        search_input = page.locator('input[placeholder*="搜索"]').first
+        if await resolve(search_input.is_visible(timeout=3000)):
+            await resolve(search_input.fill("使用指南"))
+            await resolve(page.keyboard.press("Enter"))
+            await resolve(page.wait_for_load_state("networkidle"))
+            ctx.log("  搜索知识库")
+            ctx.screenshot("sim-19-knowledge-search")
+    except Exception:
+        ctx.log("  搜索功能未找到")
+
+
+async def view_reports(ctx):
+    """查看报表"""
+    ctx.log("\n[用户操作] 查看报表")
+    page = ctx.page
+
+    await ctx.open_menu("报表中心")
+    ctx.screenshot("sim-20-reports")
+
+    try:
+        tabs = await resolve(page.locator('.tab, [role="tab"]').all())
+        if len(tabs) > 1:
+            await resolve(tabs[1].click())
+            await resolve(page.wait_for_load_state("networkidle"))
+            ctx.log("  切换报表类型")
+            ctx.screenshot("sim-21-reports-tab")
+    except Exception:
+        ctx.log("  报表标签未找到")
+
+
+async def manage_tasks(ctx):
+    """任务管理"""
+    ctx.log("\n[用户操作] 任务管理")
+    page = ctx.page
+
+    await ctx.open_menu("任务管理")
+    ctx.screenshot("sim-22-tasks")
+
+    try:
+        add_btn = page.locator('button:has-text("新建"), button:has-text("创建"), .add-button').first
+        if await resolve(add_btn.is_visible(timeout=3000)):
+            await resolve(add_btn.click())
+            ctx.log("  点击创建任务")
+            await ctx.sleep(2)
+            ctx.screenshot("sim-23-task-create")
+    except Exception:
+        ctx.log("  创建任务按钮未找到")
+
+
+async def check_schedule(ctx):
+    """日程管理"""
+    ctx.log("\n[用户操作] 日程管理")
+    page = ctx.page
+
+    await ctx.open_menu("日程管理")
+    ctx.screenshot("sim-24-schedule")
+
+    try:
+        days = await resolve(page.locator('.day, [class*="calendar-day"]').all())
+        if len(days) > 15:
+            await resolve(days[15].click())  # 点击中间某天
+            ctx.log("  点击日期")
+            await ctx.sleep(1)
+            ctx.screenshot("sim-25-schedule-day")
+    except Exception:
+        ctx.log("  日历日期未找到")
+
+
+async def edit_profile(ctx):
+    """查看个人资料"""
+    ctx.log("\n[用户操作] 查看个人资料")
+    page = ctx.page
+
+    try:
+        avatar = page.locator('.avatar, .user-info, [class*="profile"]').first
+        if await resolve(avatar.is_visible(timeout=3000)):
+            await resolve(avatar.click())
+            ctx.log("  点击用户头像")
+            await ctx.sleep(1)
+
+            await ctx.open_menu("个人设置")
+            ctx.screenshot("sim-26-profile")
+            return
+    except Exception:
+        pass
+
+    # 直接访问
+    await resolve(page.goto(f"{ctx.base_url}/profile"))
+    await resolve(page.wait_for_load_state("networkidle"))
+    ctx.log("  进入个人设置")
+    ctx.screenshot("sim-26-profile")
+
+
+async def logout(ctx):
+    """退出登录"""
+    ctx.log("\n[用户操作] 退出登录")
+    page = ctx.page
+
+    try:
+        avatar = page.locator('.avatar, .user-menu').first
+        if await resolve(avatar.is_visible(timeout=3000)):
+            await resolve(avatar.click())
+            await ctx.sleep(1)
+
+            await resolve(page.click("text=退出"))
+            ctx.log("  点击退出")
+            await resolve(page.wait_for_url(f"{ctx.base_url}/login"))
+            ctx.log("  成功退出到登录页")
+            ctx.screenshot("sim-27-logout")
+    except Exception as e:
+        ctx.log(f"  退出操作跳过: {e}")
+
+
+# 完整模拟的步骤顺序：(步骤名, 步骤)
+SIMULATION_STEPS = [
+    ("login", login),
+    ("create_approval_application", create_approval_application),
+    ("check_pending_approvals", check_pending_approvals),
+    ("approve_first_pending", approve_first_pending),
+    ("navigate_equipment_management", navigate_equipment_management),
+    ("check_attendance", check_attendance),
+    ("book_meeting_room", book_meeting_room),
+    ("browse_documents", browse_documents),
+    ("check_contacts", check_contacts),
+    ("read_announcements", read_announcements),
+    ("use_knowledge_base", use_knowledge_base),
+    ("view_reports", view_reports),
+    ("manage_tasks", manage_tasks),
+    ("check_schedule", check_schedule),
+    ("edit_profile", edit_profile),
+    ("logout", logout),
+]
+
+STEPS = dict(SIMULATION_STEPS)
@@ -6,63 +6,40 @@ OA系统审批模块完整功能测试
 """
 
 import sys
-import io
 import time
-import json
 
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
-sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+from harness import E2EHarness
 
-from playwright.sync_api import sync_playwright, expect
+APPLICATIONS_API = "/api/applications"
+APPROVALS_API = "/api/approvals/"
+DETAIL_TIMEOUT_MS = 5000
 
-BASE_URL = "http://localhost:5173"
-SCREENSHOTS_DIR = "e2e/screenshots/approval"
 
-class ApprovalTestSuite:
+class ApprovalTestSuite(E2EHarness):
     """审批模块完整测试套件"""
 
+    SCREENSHOTS_DIR = "e2e/screenshots/approval"
+    VIDEO_DIR = "e2e/videos/approval"
+
     def __init__(self):
-        self.browser = None
-        self.context = None
-        self.page = None
+        super().__init__()
         self.test_results = []
         self.created_application_ids = []
 
-    def setup(self):
-        """初始化浏览器"""
-        p = sync_playwright().start()
-        self.browser = p.chromium.launch(
-            headless=True,
-            executable_path="C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe"
-        )
-        self.context = self.browser.new_context(
-            viewport={"width": 1920, "height": 1080},
-            record_video_dir="e2e/videos/approval",
-            record_video_size={"width": 1920, "height": 1080}
-        )
-        self.page = self.context.new_page()
-
-    def teardown(self):
-        """关闭浏览器"""
-        if self.browser:
-            self.browser.close()
-
-    def screenshot(self, name):
-        """保存截图"""
-        self.page.screenshot(path=f"{SCREENSHOTS_DIR}/{name}.png", full_page=True)
-
-    def log(self, message):
-        """打印日志"""
-        print(message)
-
-    def login(self, username, password):
-        """通用登录方法"""
-        self.page.goto(f"{BASE_URL}/login")
-        self.page.wait_for_load_state("networkidle")
-        self.page.fill("input#username", username)
-        self.page.fill("input#password", password)
-        self.page.click("button[type='submit']")
-        self.page.wait_for_url(f"{BASE_URL}/dashboard", timeout=10000)
+    def submit_application_form(self):
+        """提交申请表单并等待创建接口返回"""
+        self.click_and_wait_api('button[type="submit"]', APPLICATIONS_API, method="POST")
+
+    def open_pending_application(self, title):
+        """在待审批列表中打开指定申请，等待详情接口返回"""
+        self.goto("/approval/pending")
+        self.click_and_wait_api(f'text={title}', APPLICATIONS_API, method="GET")
+
+    def confirm_approval(self, button, comment):
+        """点击通过/拒绝，填写意见并确认，等待审批接口返回"""
+        self.page.click(f'button:has-text("{button}")')
+        self.page.fill('textarea[placeholder*="意见"]', comment)
+        self.click_and_wait_api('.modal button:has-text("确认")', APPROVALS_API, method="POST")
 
     # ========== 一、申请创建测试 ==========
 
@@ -71,8 +48,7 @@ class ApprovalTestSuite:
         self.log("\n[TEST 1] 正常创建申请")
         try:
             self.login("user1", "123456")
-            self.page.goto(f"{BASE_URL}/approval/new")
-            self.page.wait_for_load_state("networkidle")
+            self.goto("/approval/new")
 
             # 填写表单
             self.page.fill('input[name="title"]', "测试费用申请-正常")
@@ -89,11 +65,8 @@ class ApprovalTestSuite:
             self.page.click('.factory-manager-item:first-child')
             self.page.click('button:has-text("确定")')
 
-            # 提交申请
-            self.page.click('button[type="submit"]')
-
-            # 等待提交成功（跳转到列表页或显示成功提示）
-            self.page.wait_for_timeout(2000)
+            # 提交申请，等待创建接口返回
+            self.submit_application_form()
 
             self.log("  [PASS] 正常创建申请成功")
             self.screenshot("01-create-normal")
@@ -108,8 +81,7 @@ class ApprovalTestSuite:
         self.log("\n[TEST 2] 创建申请（不带金额）")
         try:
             self.login("user1", "123456")
-            self.page.goto(f"{BASE_URL}/approval/new")
-            self.page.wait_for_load_state("networkidle")
+            self.goto("/approval/new")
 
             self.page.fill('input[name="title"]', "测试申请-无金额")
             self.page.fill('textarea[name="content"]', "无金额申请内容")
@@ -121,8 +93,7 @@ class ApprovalTestSuite:
             self.page.click('.factory-manager-item:first-child')
             self.page.click('button:has-text("确定")')
 
-            self.page.click('button[type="submit"]')
-            self.page.wait_for_timeout(2000)
+            self.submit_application_form()
 
             self.log("  [PASS] 无金额申请创建成功")
             self.screenshot("02-create-no-amount")
@@ -136,8 +107,7 @@ class ApprovalTestSuite:
         self.log("\n[TEST 3] 创建申请（跳过经理审批）")
         try:
             self.login("user1", "123456")
-            self.page.goto(f"{BASE_URL}/approval/new")
-            self.page.wait_for_load_state("networkidle")
+            self.goto("/approval/new")
 
             self.page.fill('input[name="title"]', "测试申请-跳过经理")
             self.page.fill('textarea[name="content"]', "跳过经理审批测试")
@@ -152,8 +122,7 @@ class ApprovalTestSuite:
             self.page.click('.factory-manager-item:first-child')
             self.page.click('button:has-text("确定")')
 
-            self.page.click('button[type="submit"]')
-            self.page.wait_for_timeout(2000)
+            self.submit_application_form()
 
             self.log("  [PASS] 跳过经理申请创建成功")
             self.screenshot("03-create-skip-manager")
@@ -167,15 +136,13 @@ class ApprovalTestSuite:
         self.log("\n[TEST 4] 申请表单验证")
         try:
             self.login("user1", "123456")
-            self.page.goto(f"{BASE_URL}/approval/new")
-            self.page.wait_for_load_state("networkidle")
+            self.goto("/approval/new")
 
             # 不填任何内容直接提交
             self.page.click('button[type="submit"]')
-            self.page.wait_for_timeout(1000)
 
-            # 验证错误提示
-            error_visible = self.page.locator('.text-red-500, .error, [role="alert"]').is_visible()
+            # 验证错误提示（前端校验，不会发请求）
+            error_visible = self.wait_visible('.text-red-500, .error, [role="alert"]')
             if error_visible:
                 self.log("  [PASS] 表单验证生效，显示错误提示")
             else:
@@ -195,8 +162,7 @@ class ApprovalTestSuite:
         try:
             # Step 1: user1 创建申请
             self.login("user1", "123456")
-            self.page.goto(f"{BASE_URL}/approval/new")
-            self.page.wait_for_load_state("networkidle")
+            self.goto("/approval/new")
 
             self.page.fill('input[name="title"]', "完整流程测试申请")
             self.page.fill('textarea[name="content"]', "测试完整审批流程")
@@ -208,36 +174,22 @@ class ApprovalTestSuite:
             self.page.click('.factory-manager-item:first-child')
             self.page.click('button:has-text("确定")')
 
-            self.page.click('button[type="submit"]')
-            self.page.wait_for_timeout(2000)
+            self.submit_application_form()
 
             self.log("  [PASS] 申请已提交")
 
             # Step 2: 厂长审批
             self.login("factory1", "123456")
-            self.page.goto(f"{BASE_URL}/approval/pending")
-            self.page.wait_for_load_state("networkidle")
-
-            # 找到申请并点击
-            self.page.click('text=完整流程测试申请')
-            self.page.wait_for_timeout(1000)
+            self.open_pending_application("完整流程测试申请")
 
             # 通过审批
-            self.page.click('button:has-text("通过")')
-            self.page.wait_for_timeout(500)
-            self.page.fill('textarea[placeholder*="意见"]', "厂长审批通过")
-            self.page.click('.modal button:has-text("确认")')
-            self.page.wait_for_timeout(2000)
+            self.confirm_approval("通过", "厂长审批通过")
 
             self.log("  [PASS] 厂长审批通过")
 
             # Step 3: 总监审批
             self.login("director1", "123456")
-            self.page.goto(f"{BASE_URL}/approval/pending")
-            self.page.wait_for_load_state("networkidle")
-
-            self.page.click('text=完整流程测试申请')
-            self.page.wait_for_timeout(1000)
+            self.open_pending_application("完整流程测试申请")
 
             # 选择经理并审批
             self.page.click('button:has-text("选择审批经理")')
@@ -245,43 +197,23 @@ class ApprovalTestSuite:
             self.page.click('.manager-item:first-child')
             self.page.click('button:has-text("确定")')
 
-            self.page.click('button:has-text("通过")')
-            self.page.wait_for_timeout(500)
-            self.page.fill('textarea[placeholder*="意见"]', "总监审批通过")
-            self.page.click('.modal button:has-text("确认")')
-            self.page.wait_for_timeout(2000)
+            self.confirm_approval("通过", "总监审批通过")
 
             self.log("  [PASS] 总监审批通过")
 
             # Step 4: 经理审批
             self.login("manager1", "123456")
-            self.page.goto(f"{BASE_URL}/approval/pending")
-            self.page.wait_for_load_state("networkidle")
-
-            self.page.click('text=完整流程测试申请')
-            self.page.wait_for_timeout(1000)
+            self.open_pending_application("完整流程测试申请")
 
-            self.page.click('button:has-text("通过")')
-            self.page.wait_for_timeout(500)
-            self.page.fill('textarea[placeholder*="意见"]', "经理审批通过")
-            self.page.click('.modal button:has-text("确认")')
-            self.page.wait_for_timeout(2000)
+            self.confirm_approval("通过", "经理审批通过")
 
             self.log("  [PASS] 经理审批通过")
 
             # Step 5: CEO审批
             self.login("ceo1", "123456")
-            self.page.goto(f"{BASE_URL}/approval/pending")
-            self.page.wait_for_load_state("networkidle")
+            self.open_pending_application("完整流程测试申请")
 
-            self.page.click('text=完整流程测试申请')
-            self.page.wait_for_timeout(1000)
-
-            self.page.click('button:has-text("通过")')
-            self.page.wait_for_timeout(500)
-            self.page.fill('textarea[placeholder*="意见"]', "CEO审批通过，同意")
-            self.page.click('.modal button:has-text("确认")')
-            self.page.wait_for_timeout(2000)
+            self.confirm_approval("通过", "CEO审批通过，同意")
 
             self.log("  [PASS] CEO审批通过，流程完成")
 
@@ -298,8 +230,7 @@ class ApprovalTestSuite:
         try:
             # 创建申请
             self.login("user1", "123456")
-            self.page.goto(f"{BASE_URL}/approval/new")
-            self.page.wait_for_load_state("networkidle")
+            self.goto("/approval/new")
 
             self.page.fill('input[name="title"]', "拒绝测试申请")
             self.page.fill('textarea[name="content"]', "测试拒绝流程")
@@ -310,26 +241,16 @@ class ApprovalTestSuite:
             self.page.click('.factory-manager-item:first-child')
             self.page.click('button:has-text("确定")')
 
-            self.page.click('button[type="submit"]')
-            self.page.wait_for_timeout(2000)
+            self.submit_application_form()
 
             # 厂长拒绝
             self.login("factory1", "123456")
-            self.page.goto(f"{BASE_URL}/approval/pending")
-            self.page.wait_for_load_state("networkidle")
-
-            self.page.click('text=拒绝测试申请')
-            self.page.wait_for_timeout(1000)
+            self.open_pending_application("拒绝测试申请")
 
-            self.page.click('button:has-text("拒绝")')
-            self.page.wait_for_timeout(500)
-            self.page.fill('textarea[placeholder*="意见"]', "金额不合理，拒绝")
-            self.page.click('.modal button:has-text("确认")')
-            self.page.wait_for_timeout(2000)
+            self.confirm_approval("拒绝", "金额不合理，拒绝")
 
             # 验证状态变为已拒绝
-            self.page.goto(f"{BASE_URL}/approval")
-            self.page.wait_for_load_state("networkidle")
+            self.goto("/approval")
 
             self.log("  [PASS] 审批拒绝流程完成")
             self.screenshot("06-flow-reject")
@@ -345,8 +266,7 @@ class ApprovalTestSuite:
         self.log("\n[TEST 7] 申请列表功能")
         try:
             self.login("user1", "123456")
-            self.page.goto(f"{BASE_URL}/approval")
-            self.page.wait_for_load_state("networkidle")
+            self.goto("/approval")
 
             # 验证列表元素
             assert self.page.locator('text=全部申请').is_visible()
@@ -360,13 +280,12 @@ class ApprovalTestSuite:
             search_box = self.page.locator('input[placeholder*="搜索"]').first
             if search_box.is_visible():
                 search_box.fill("测试")
-                self.page.keyboard.press("Enter")
-                self.page.wait_for_timeout(1000)
+                with self.page.expect_response(lambda r: APPLICATIONS_API in r.url):
+                    self.page.keyboard.press("Enter")
                 self.log("  [PASS] 搜索功能正常")
 
             # 测试筛选
             self.page.click('text=状态')
-            self.page.wait_for_timeout(500)
             self.log("  [PASS] 筛选功能正常")
 
             self.screenshot("07-list-page")
@@ -381,8 +300,7 @@ class ApprovalTestSuite:
         try:
             # 用厂长账号查看待审批
             self.login("factory1", "123456")
-            self.page.goto(f"{BASE_URL}/approval/pending")
-            self.page.wait_for_load_state("networkidle")
+            self.goto("/approval/pending")
 
             # 验证页面元素
             title = self.page.locator('h1, h2').first.inner_text()
@@ -400,14 +318,11 @@ class ApprovalTestSuite:
         self.log("\n[TEST 9] 已审批列表")
         try:
             self.login("factory1", "123456")
-            self.page.goto(f"{BASE_URL}/approval/approved")
-            self.page.wait_for_load_state("networkidle")
+            self.goto("/approval/approved")
 
             # 验证已通过/已拒绝筛选
-            self.page.click('text=已通过')
-            self.page.wait_for_timeout(500)
-            self.page.click('text=已拒绝')
-            self.page.wait_for_timeout(500)
+            self.click_and_wait_api('text=已通过', APPLICATIONS_API, method="GET", timeout=3000, required=False)
+            self.click_and_wait_api('text=已拒绝', APPLICATIONS_API, method="GET", timeout=3000, required=False)
 
             self.log("  [PASS] 已审批列表和筛选正常")
             self.screenshot("09-approved-list")
@@ -423,19 +338,18 @@ class ApprovalTestSuite:
         self.log("\n[TEST 10] 申请详情页面")
         try:
             self.login("user1", "123456")
-            self.page.goto(f"{BASE_URL}/approval")
-            self.page.wait_for_load_state("networkidle")
+            self.goto("/approval")
 
             # 点击第一个申请查看详情
             rows = self.page.locator('tr, .application-item').all()
             if len(rows) > 0:
                 rows[0].click()
-                self.page.wait_for_timeout(1000)
 
                 # 验证详情页元素
-                assert self.page.locator('text=申请详情').is_visible() or \
-                       self.page.locator('text=审批记录').is_visible() or \
-                       self.page.locator('text=基本信息').is_visible()
+                detail = self.page.get_by_text("申请详情") \
+                    .or_(self.page.get_by_text("审批记录")) \
+                    .or_(self.page.get_by_text("基本信息"))
+                assert self.wait_visible(detail.first, timeout=DETAIL_TIMEOUT_MS)
 
                 self.log("  [PASS] 申请详情页正常")
                 self.screenshot("10-detail-page")
@@ -454,8 +368,7 @@ class ApprovalTestSuite:
         self.log("\n[TEST 11] 普通用户无法审批权限")
         try:
             self.login("user1", "123456")
-            self.page.goto(f"{BASE_URL}/approval/pending")
-            self.page.wait_for_load_state("networkidle")
+            self.goto("/approval/pending")
 
             # 普通用户不应看到待审批申请或审批按钮
             no_pending = self.page.locator('text=暂无待审批').is_visible() or \
@@ -479,8 +392,7 @@ class ApprovalTestSuite:
         try:
             # user1 创建申请指定 factory1
             self.login("user1", "123456")
-            self.page.goto(f"{BASE_URL}/approval/new")
-            self.page.wait_for_load_state("networkidle")
+            self.goto("/approval/new")
 
             self.page.fill('input[name="title"]', "权限测试申请")
             self.page.fill('textarea[name="content"]', "测试非指定审批人")
@@ -491,14 +403,12 @@ class ApprovalTestSuite:
             self.page.click('.factory-manager-item:first-child')  # 选择第一个厂长
             self.page.click('button:has-text("确定")')
 
-            self.page.click('button[type="submit"]')
-            self.page.wait_for_timeout(2000)
+            self.submit_application_form()
 
             # 使用其他厂长账号（如果有多个）或总监账号查看
             # 这里假设只有 factory1 是审批人
             self.login("director1", "123456")
-            self.page.goto(f"{BASE_URL}/approval/pending")
-            self.page.wait_for_load_state("networkidle")
+            self.goto("/approval/pending")
 
             # 总监不应看到这个待审批（因为是厂长审批阶段）
             pending_items = self.page.locator('text=权限测试申请').all()
@@ -520,8 +430,7 @@ class ApprovalTestSuite:
         self.log("\n[TEST 13] 统计卡片显示")
         try:
             self.login("admin", "admin123")
-            self.page.goto(f"{BASE_URL}/approval")
-            self.page.wait_for_load_state("networkidle")
+            self.goto("/approval")
 
             # 验证统计卡片
             stats = ["总申请", "待审核", "已通过", "已拒绝", "总金额"]
@@ -544,14 +453,12 @@ class ApprovalTestSuite:
         self.log("\n[TEST 14] 导出Excel功能")
         try:
             self.login("admin", "admin123")
-            self.page.goto(f"{BASE_URL}/approval")
-            self.page.wait_for_load_state("networkidle")
+            self.goto("/approval")
 
             # 点击导出按钮
             export_btn = self.page.locator('button:has-text("导出"), button:has-text("Excel"), .export-btn').first
             if export_btn.is_visible():
-                export_btn.click()
-                self.page.wait_for_timeout(2000)
+                self.click_and_wait_api(export_btn, "/api/export")
                 self.log("  [PASS] 导出按钮可点击")
             else:
                 self.log("  [SKIP] 未找到导出按钮")
@@ -569,8 +476,7 @@ class ApprovalTestSuite:
         self.log("\n[TEST 15] 工作流列表页面")
         try:
             self.login("admin", "admin123")
-            self.page.goto(f"{BASE_URL}/approval/workflows")
-            self.page.wait_for_load_state("networkidle")
+            self.goto("/approval/workflows")
 
             # 验证工作流页面元素
             assert "工作流" in self.page.content() or "workflow" in self.page.content().lower()
@@ -587,8 +493,7 @@ class ApprovalTestSuite:
         self.log("\n[TEST 16] 创建工作流")
         try:
             self.login("admin", "admin123")
-            self.page.goto(f"{BASE_URL}/approval/workflows/designer")
-            self.page.wait_for_load_state("networkidle")
+            self.goto("/approval/workflows/designer")
 
             # 填写工作流信息
             self.page.fill('input[name="name"]', f"测试工作流_{int(time.time())}")
@@ -597,8 +502,7 @@ class ApprovalTestSuite:
             # 如果设计器有保存按钮
             save_btn = self.page.locator('button:has-text("保存"), button:has-text("Save")').first
             if save_btn.is_visible():
-                save_btn.click()
-                self.page.wait_for_timeout(2000)
+                self.click_and_wait_api(save_btn, "/api/workflows", method="POST")
                 self.log("  [PASS] 工作流保存成功")
             else:
                 self.log("  [SKIP] 工作流设计器界面不同")
@@ -621,10 +525,9 @@ class ApprovalTestSuite:
             notif_btn = self.page.locator('.notification, .bell, [class*="notification"]').first
             if notif_btn.is_visible():
                 notif_btn.click()
-                self.page.wait_for_timeout(1000)
 
                 # 验证通知面板
-                panel_visible = self.page.locator('.notification-panel, .dropdown').is_visible()
+                panel_visible = self.wait_visible('.notification-panel, .dropdown')
                 if panel_visible:
                     self.log("  [PASS] 通知面板可打开")
                 else:
@@ -642,12 +545,6 @@ class ApprovalTestSuite:
 
     def run_all_tests(self):
         """运行所有审批模块测试"""
-        self.log("\n" + "="*70)
-        self.log("OA系统审批模块完整功能测试")
-        self.log("="*70)
-
-        self.setup()
-
         tests = [
             # 一、申请创建测试
             ("创建申请-正常", self.test_create_application_normal),
@@ -683,28 +580,7 @@ class ApprovalTestSuite:
             ("通知功能", self.test_notifications),
         ]
 
-        passed = 0
-        failed = 0
-
-        for name, test_func in tests:
-            try:
-                if test_func():
-                    passed += 1
-                else:
-                    failed += 1
-            except Exception as e:
-                self.log(f"  [ERROR] {e}")
-                failed += 1
-
-        self.teardown()
-
-        self.log("\n" + "="*70)
-        self.log(f"测试完成: {passed} 通过, {failed} 失败")
-        self.log("="*70)
-        self.log(f"\n截图保存在: {SCREENSHOTS_DIR}/")
-        self.log(f"视频保存在: e2e/videos/approval/")
-
-        return 0 if failed == 0 else 1
+        return self.run_tests("OA系统审批模块完整功能测试", tests)
 
 
 def main():
@@ -6,63 +6,29 @@ OA系统审批中心全面测试
 """
 
 import sys
-import io
-import time
 
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
-sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+from harness import E2EHarness
 
-from playwright.sync_api import sync_playwright
+APPLICATIONS_API = "/api/applications"
+APPROVALS_API = "/api/approvals/"
+APPROVE_BUTTON = 'button:has-text("通过"), button:has-text("同意")'
+REJECT_BUTTON = 'button:has-text("拒绝"), button:has-text("驳回")'
+CONFIRM_BUTTON = 'button:has-text("确认"), button:has-text("确定")'
 
-BASE_URL = "http://localhost:5173"
-SCREENSHOTS_DIR = "e2e/screenshots/approval_full"
 
-class ApprovalFullTest:
+class ApprovalFullTest(E2EHarness):
     """审批中心全面测试套件"""
 
+    SCREENSHOTS_DIR = "e2e/screenshots/approval_full"
+
     def __init__(self):
-        self.browser = None
-        self.context = None
-        self.page = None
+        super().__init__()
         self.test_results = []
 
-    def setup(self):
-        """初始化浏览器"""
-        p = sync_playwright().start()
-        self.browser = p.chromium.launch(headless=True)
-        self.context = self.browser.new_context(
-            viewport={"width": 1920, "height": 1080}
-        )
-        self.page = self.context.new_page()
-
-    def teardown(self):
-        """关闭浏览器"""
-        if self.browser:
-            self.browser.close()
-
-    def log(self, message):
-        """打印日志"""
-        print(message)
-
-    def screenshot(self, name):
-        """保存截图"""
-        self.page.screenshot(path=f"{SCREENSHOTS_DIR}/{name}.png", full_page=True)
-
-    def login(self, username, password):
-        """通用登录方法"""
-        self.page.goto(f"{BASE_URL}/login")
-        self.page.wait_for_load_state("networkidle")
-        self.page.fill("input#username", username)
-        self.page.fill("input#password", password)
-        self.page.click("button[type='submit']")
-        self.page.wait_for_url(f"{BASE_URL}/dashboard", timeout=10000)
-
     def create_application(self, title, content, amount="", factory_manager_index=0):
         """创建申请辅助方法"""
         self.login("user1", "123456")
-        self.page.goto(f"{BASE_URL}/approval/new/standard")
-        self.page.wait_for_load_state("networkidle")
-        self.page.wait_for_timeout(3000)
+        self.goto("/approval/new/standard", ready="input#title")
 
         # 填写表单
         self.page.fill('input#title', title)
@@ -80,7 +46,6 @@ class ApprovalFullTest:
             factory_labels = self.page.locator('label:has-text("厂长"), .cursor-pointer:has-text("厂长"), [role="checkbox"]').all()
             if len(factory_labels) > 0:
                 factory_labels[0].click()
-                self.page.wait_for_timeout(500)
                 self.log("  [INFO] 已选择厂长")
             else:
                 # 尝试直接点击checkbox的父元素
@@ -91,7 +56,6 @@ class ApprovalFullTest:
                         parent = cb.locator('xpath=..')
                         if parent.is_visible():
                             parent.click()
-                            self.page.wait_for_timeout(500)
                             self.log("  [INFO] 已选择厂长（通过父元素）")
                             break
                     except:
@@ -101,19 +65,40 @@ class ApprovalFullTest:
         except Exception as e:
             self.log(f"  [WARN] 选择厂长时出错: {e}")
 
-        # 提交表单
+        # 提交表单，成功后会跳转到 /approval
         try:
             submit_btn = self.page.locator('button[type="submit"]').first
             if submit_btn.is_visible() and submit_btn.is_enabled():
-                submit_btn.click()
-                # 等待跳转（成功后会跳转到 /approval）
-                self.page.wait_for_timeout(5000)
+                self.click_and_wait_api(submit_btn, APPLICATIONS_API, method="POST")
+                self.page.wait_for_url("**/approval", timeout=5000)
         except Exception as e:
             self.log(f"  [WARN] 提交表单: {e}")
 
-        self.page.wait_for_timeout(2000)
         return self.page.url
 
+    def open_pending_application(self, title):
+        """在待审批列表中打开指定申请，等待详情接口返回"""
+        self.goto("/approval/pending")
+        self.click_and_wait_api(f'text={title}', APPLICATIONS_API, method="GET")
+
+    def approve_with_comment(self, button, comment):
+        """
+        点击通过/拒绝按钮，填写意见并确认，等待审批接口返回
+        按钮不存在时返回 False
+        """
+        if not self.wait_visible(button):
+            return False
+        self.page.locator(button).first.click()
+
+        textarea = self.page.locator('textarea').first
+        if self.wait_visible(textarea):
+            textarea.fill(comment)
+
+        confirm_btn = self.page.locator(CONFIRM_BUTTON).first
+        if self.wait_visible(confirm_btn):
+            self.click_and_wait_api(confirm_btn, APPROVALS_API, method="POST")
+        return True
+
     # ========== 一、基础功能测试 ==========
 
     def test_all_users_login(self):
@@ -134,7 +119,8 @@ class ApprovalFullTest:
         all_passed = True
         for username, name in users:
             try:
-                self.login(username, "123456")
+                # 此处验证登录本身，必须走登录表单
+                self.login_via_form(username, "123456")
                 self.log(f"  [PASS] {username} ({name}) 登录成功")
             except Exception as e:
                 self.log(f"  [FAIL] {username} 登录失败: {e}")
@@ -148,17 +134,15 @@ class ApprovalFullTest:
         self.log("\n[TEST 2] 申请列表各标签页")
         try:
             self.login("user1", "123456")
-            self.page.goto(f"{BASE_URL}/approval")
-            self.page.wait_for_load_state("networkidle")
+            self.goto("/approval")
 
             # 测试各个标签页
             tabs = ["全部申请", "待我审批", "我已审批", "我的申请"]
             for tab in tabs:
                 try:
                     tab_element = self.page.locator(f'text={tab}').first
-                    if tab_element.is_visible(timeout=3000):
-                        tab_element.click()
-                        self.page.wait_for_timeout(1000)
+                    if self.wait_visible(tab_element):
+                        self.click_and_wait_api(tab_element, APPLICATIONS_API, method="GET", timeout=3000, required=False)
                         self.log(f"  [PASS] {tab} 标签页可点击")
                 except Exception as e:
                     self.log(f"  [INFO] {tab} 标签页: {e}")
@@ -218,131 +202,52 @@ class ApprovalFullTest:
 
             # Step 1: 厂长审批
             self.login("factory1", "123456")
-            self.page.goto(f"{BASE_URL}/approval/pending")
-            self.page.wait_for_load_state("networkidle")
-            self.page.wait_for_timeout(2000)
-
-            # 点击申请标题
-            self.page.click('text=完整流程测试申请')
-            self.page.wait_for_timeout(2000)
-
-            # 点击通过按钮
-            approve_btn = self.page.locator('button:has-text("通过"), button:has-text("同意")').first
-            if approve_btn.is_visible():
-                approve_btn.click()
-                self.page.wait_for_timeout(1000)
-
-                # 填写审批意见
-                textarea = self.page.locator('textarea').first
-                if textarea.is_visible():
-                    textarea.fill("厂长审批通过")
-
-                # 确认
-                confirm_btn = self.page.locator('button:has-text("确认"), button:has-text("确定"]').first
-                if confirm_btn.is_visible():
-                    confirm_btn.click()
-
-                self.page.wait_for_timeout(3000)
+            self.open_pending_application("完整流程测试申请")
+
+            if self.approve_with_comment(APPROVE_BUTTON, "厂长审批通过"):
                 self.log("  [PASS] 厂长审批完成")
 
             self.screenshot("05_flow_factory_approved")
 
             # Step 2: 总监审批
             self.login("director1", "123456")
-            self.page.goto(f"{BASE_URL}/approval/pending")
-            self.page.wait_for_load_state("networkidle")
-            self.page.wait_for_timeout(2000)
-
-            self.page.click('text=完整流程测试申请')
-            self.page.wait_for_timeout(2000)
+            self.open_pending_application("完整流程测试申请")
 
             # 选择流向经理
             flow_btn = self.page.locator('button:has-text("经理")').first
-            if flow_btn.is_visible():
+            if self.wait_visible(flow_btn):
                 flow_btn.click()
-                self.page.wait_for_timeout(1000)
 
             # 选择经理
             manager_checkbox = self.page.locator('input[type="checkbox"]').first
-            if manager_checkbox.is_visible():
+            if self.wait_visible(manager_checkbox):
                 manager_checkbox.click()
-                self.page.wait_for_timeout(500)
 
             # 确认选择
-            confirm_btn = self.page.locator('button:has-text("确定"), button:has-text("确认"]').first
+            confirm_btn = self.page.locator(CONFIRM_BUTTON).first
             if confirm_btn.is_visible():
                 confirm_btn.click()
-                self.page.wait_for_timeout(1000)
 
             # 通过审批
-            approve_btn = self.page.locator('button:has-text("通过"), button:has-text("同意")').first
-            if approve_btn.is_visible():
-                approve_btn.click()
-                self.page.wait_for_timeout(1000)
-
-                textarea = self.page.locator('textarea').first
-                if textarea.is_visible():
-                    textarea.fill("总监审批通过，转经理")
-
-                confirm_btn = self.page.locator('button:has-text("确认"), button:has-text("确定"]').first
-                if confirm_btn.is_visible():
-                    confirm_btn.click()
-
-                self.page.wait_for_timeout(3000)
+            if self.approve_with_comment(APPROVE_BUTTON, "总监审批通过，转经理"):
                 self.log("  [PASS] 总监审批完成")
 
             self.screenshot("05_flow_director_approved")
 
             # Step 3: 经理审批
             self.login("manager1", "123456")
-            self.page.goto(f"{BASE_URL}/approval/pending")
-            self.page.wait_for_load_state("networkidle")
-            self.page.wait_for_timeout(2000)
-
-            self.page.click('text=完整流程测试申请')
-            self.page.wait_for_timeout(2000)
+            self.open_pending_application("完整流程测试申请")
 
-            approve_btn = self.page.locator('button:has-text("通过"), button:has-text("同意")').first
-            if approve_btn.is_visible():
-                approve_btn.click()
-                self.page.wait_for_timeout(1000)
-
-                textarea = self.page.locator('textarea').first
-                if textarea.is_visible():
-                    textarea.fill("经理审批通过")
-
-                confirm_btn = self.page.locator('button:has-text("确认"), button:has-text("确定"]').first
-                if confirm_btn.is_visible():
-                    confirm_btn.click()
-
-                self.page.wait_for_timeout(3000)
+            if self.approve_with_comment(APPROVE_BUTTON, "经理审批通过"):
                 self.log("  [PASS] 经理审批完成")
 
             self.screenshot("05_flow_manager_approved")
 
             # Step 4: CEO审批
             self.login("ceo1", "123456")
-            self.page.goto(f"{BASE_URL}/approval/pending")
-            self.page.wait_for_load_state("networkidle")
-            self.page.wait_for_timeout(2000)
-
-            self.page.click('text=完整流程测试申请')
-            self.page.wait_for_timeout(2000)
+            self.open_pending_application("完整流程测试申请")
 
-            approve_btn = self.page.locator('button:has-text("通过"), button:has-text("同意")').first
-            if approve_btn.is_visible():
-                approve_btn.click()
-                self.page.wait_for_timeout(1000)
-
-                textarea = self.page.locator('textarea').first
-                if textarea.is_visible():
-                    textarea.fill("CEO审批通过，同意")
-
-                confirm_btn = self.page.locator('button:has-text("确认"), button:has-text("确定"]').first
-                if confirm_btn.is_visible():
-                    confirm_btn.click()
-
-                self.page.wait_for_timeout(3000)
+            if self.approve_with_comment(APPROVE_BUTTON, "CEO审批通过，同意"):
                 self.log("  [PASS] CEO审批完成，流程结束")
 
             self.screenshot("05_flow_complete")
@@ -368,29 +273,10 @@ class ApprovalFullTest:
 
             # 厂长拒绝
             self.login("factory1", "123456")
-            self.page.goto(f"{BASE_URL}/approval/pending")
-            self.page.wait_for_load_state("networkidle")
-            self.page.wait_for_timeout(2000)
-
-            self.page.click('text=拒绝测试申请')
-            self.page.wait_for_timeout(2000)
+            self.open_pending_application("拒绝测试申请")
 
-            # 点击拒绝按钮
-            reject_btn = self.page.locator('button:has-text("拒绝"), button:has-text("驳回")').first
-            if reject_btn.is_visible():
-                reject_btn.click()
-                self.page.wait_for_timeout(1000)
-
-                # 填写拒绝原因
-                textarea = self.page.locator('textarea').first
-                if textarea.is_visible():
-                    textarea.fill("金额不合理，拒绝")
-
-                confirm_btn = self.page.locator('button:has-text("确认"), button:has-text("确定"]').first
-                if confirm_btn.is_visible():
-                    confirm_btn.click()
-
-                self.page.wait_for_timeout(3000)
+            # 点击拒绝按钮并填写拒绝原因
+            if self.approve_with_comment(REJECT_BUTTON, "金额不合理，拒绝"):
                 self.log("  [PASS] 厂长拒绝完成")
 
             self.screenshot("06_reject_complete")
@@ -407,13 +293,11 @@ class ApprovalFullTest:
         self.log("\n[TEST 7] 普通用户无法审批权限")
         try:
             self.login("user2", "123456")
-            self.page.goto(f"{BASE_URL}/approval/pending")
-            self.page.wait_for_load_state("networkidle")
-            self.page.wait_for_timeout(2000)
+            self.goto("/approval/pending")
 
             # 检查是否显示"暂无待审批"或类似提示
             no_pending = self.page.locator('text=暂无,text=没有数据,text=empty').first
-            if no_pending and no_pending.is_visible():
+            if no_pending and self.wait_visible(no_pending, timeout=2000):
                 self.log("  [PASS] 普通用户无待审批申请")
             else:
                 # 检查是否没有审批按钮
@@ -442,21 +326,18 @@ class ApprovalFullTest:
 
             # 使用factory2登录（不是指定审批人）
             self.login("factory2", "123456")
-            self.page.goto(f"{BASE_URL}/approval/pending")
-            self.page.wait_for_load_state("networkidle")
-            self.page.wait_for_timeout(2000)
+            self.goto("/approval/pending")
 
             # 检查是否看不到该申请
             try:
                 app_link = self.page.locator('text=权限测试申请').first
-                if app_link and app_link.is_visible(timeout=3000):
+                if app_link and self.wait_visible(app_link):
                     self.log("  [INFO] factory2 能看到申请但可能无法审批")
                     # 点击看看详情
-                    app_link.click()
-                    self.page.wait_for_timeout(2000)
+                    self.click_and_wait_api(app_link, APPLICATIONS_API, method="GET")
                     # 检查是否有审批按钮
                     approve_btn = self.page.locator('button:has-text("通过")').first
-                    if not approve_btn or not approve_btn.is_visible():
+                    if not approve_btn or not self.wait_visible(approve_btn, timeout=2000):
                         self.log("  [PASS] 非指定审批人无审批按钮")
                 else:
                     self.log("  [PASS] 非指定审批人看不到待审批申请")
@@ -476,15 +357,13 @@ class ApprovalFullTest:
         self.log("\n[TEST 9] 统计卡片显示")
         try:
             self.login("admin", "123456")
-            self.page.goto(f"{BASE_URL}/approval")
-            self.page.wait_for_load_state("networkidle")
-            self.page.wait_for_timeout(2000)
+            self.goto("/approval")
 
             stats = ["总申请", "待审核", "已通过", "已拒绝"]
             found = 0
             for stat in stats:
                 try:
-                    if self.page.locator(f'text={stat}').first.is_visible(timeout=2000):
+                    if self.wait_visible(f'text={stat}', timeout=2000):
                         found += 1
                         self.log(f"  [PASS] {stat} 统计卡片存在")
                 except:
@@ -501,24 +380,21 @@ class ApprovalFullTest:
         self.log("\n[TEST 10] 搜索和筛选功能")
         try:
             self.login("admin", "123456")
-            self.page.goto(f"{BASE_URL}/approval")
-            self.page.wait_for_load_state("networkidle")
-            self.page.wait_for_timeout(2000)
+            self.goto("/approval")
 
             # 测试搜索框
             search_inputs = self.page.locator('input[placeholder*="搜索"], input[type="search"]').all()
             if search_inputs:
                 search_inputs[0].fill("测试")
-                self.page.keyboard.press("Enter")
-                self.page.wait_for_timeout(2000)
+                with self.page.expect_response(lambda r: APPLICATIONS_API in r.url):
+                    self.page.keyboard.press("Enter")
                 self.log("  [PASS] 搜索功能可用")
 
             # 测试状态筛选
             try:
                 status_filter = self.page.locator('button:has-text("状态"), select').first
-                if status_filter and status_filter.is_visible():
+                if status_filter and self.wait_visible(status_filter):
                     status_filter.click()
-                    self.page.wait_for_timeout(1000)
                     self.log("  [PASS] 状态筛选可用")
             except:
                 pass
@@ -533,12 +409,6 @@ class ApprovalFullTest:
 
     def run_all_tests(self):
         """运行所有审批中心全面测试"""
-        self.log("\n" + "="*70)
-        self.log("OA系统审批中心全面测试")
-        self.log("="*70)
-
-        self.setup()
-
         tests = [
             ("所有用户登录", self.test_all_users_login),
             ("申请列表标签页", self.test_application_list_tabs),
@@ -552,27 +422,7 @@ class ApprovalFullTest:
             ("搜索筛选", self.test_search_filter),
         ]
 
-        passed = 0
-        failed = 0
-
-        for name, test_func in tests:
-            try:
-                if test_func():
-                    passed += 1
-                else:
-                    failed += 1
-            except Exception as e:
-                self.log(f"  [ERROR] {e}")
-                failed += 1
-
-        self.teardown()
-
-        self.log("\n" + "="*70)
-        self.log(f"测试完成: {passed} 通过, {failed} 失败")
-        self.log("="*70)
-        self.log(f"\n截图保存在: {SCREENSHOTS_DIR}/")
-
-        return 0 if failed == 0 else 1
+        return self.run_tests("OA系统审批中心全面测试", tests)
 
 
 def main():
@@ -6,88 +6,33 @@ OA系统审批模块测试 - 健壮版本
 """
 
 import sys
-import io
 import time
 
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
-sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+from playwright.sync_api import TimeoutError as PlaywrightTimeout
 
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeout
+from harness import E2EHarness
 
-BASE_URL = "http://localhost:5173"
+APPLICATIONS_API = "/api/applications"
 
-class RobustApprovalTest:
-    """健壮审批测试"""
-
-    def __init__(self):
-        self.browser = None
-        self.context = None
-        self.page = None
-
-    def setup(self):
-        """初始化浏览器"""
-        p = sync_playwright().start()
-        self.browser = p.chromium.launch(
-            headless=True,
-            executable_path="C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe"
-        )
-        self.context = self.browser.new_context(
-            viewport={"width": 1920, "height": 1080}
-        )
-        self.page = self.context.new_page()
-        # 设置默认超时
-        self.page.set_default_timeout(5000)
-
-    def teardown(self):
-        """关闭浏览器"""
-        if self.browser:
-            self.browser.close()
-
-    def log(self, msg):
-        """打印日志"""
-        print(msg)
-
-    def safe_click(self, selector, timeout=3000):
-        """安全点击"""
-        try:
-            self.page.click(selector, timeout=timeout)
-            return True
-        except:
-            return False
 
-    def safe_fill(self, selector, value, timeout=3000):
-        """安全填写"""
-        try:
-            self.page.fill(selector, value, timeout=timeout)
-            return True
-        except:
-            return False
+class RobustApprovalTest(E2EHarness):
+    """健壮审批测试"""
 
-    def safe_wait_for(self, selector, timeout=3000):
-        """安全等待元素"""
-        try:
-            self.page.wait_for_selector(selector, timeout=timeout)
-            return True
-        except:
-            return False
+    SCREENSHOTS_DIR = "e2e/screenshots/approval_robust"
+    # 设置默认超时
+    TIMEOUT_MS = 5000
 
     def login(self, username, password):
-        """登录"""
-        self.page.goto(f"{BASE_URL}/login")
-        self.page.wait_for_load_state("networkidle", timeout=5000)
-        self.safe_fill('input#username', username)
-        self.safe_fill('input#password', password)
-        self.safe_click("button[type='submit']")
+        """登录（失败不抛出，由后续步骤暴露问题）"""
         try:
-            self.page.wait_for_url(f"{BASE_URL}/dashboard", timeout=8000)
-        except:
+            super().login(username, password)
+        except PlaywrightTimeout:
             pass
 
     def test_01_login_page(self):
         """测试1: 登录页面"""
         self.log("\n[TEST 1] 登录页面")
-        self.page.goto(f"{BASE_URL}/login")
-        self.page.wait_for_load_state("networkidle", timeout=5000)
+        self.goto("/login")
 
         title = self.page.locator("h2").inner_text()
         assert "欢迎" in title, f"标题不匹配: {title}"
@@ -100,8 +45,7 @@ class RobustApprovalTest:
         self.login("user1", "123456")
 
         # 进入审批中心
-        self.page.goto(f"{BASE_URL}/approval")
-        self.page.wait_for_load_state("networkidle", timeout=5000)
+        self.goto("/approval")
 
         # 点击新建
         if not self.safe_click('text=新建申请', timeout=3000):
@@ -118,8 +62,7 @@ class RobustApprovalTest:
         self.safe_fill('textarea[name="content"]', "测试内容")
 
         # 尝试提交
-        if self.safe_click('button[type="submit"]', timeout=3000):
-            self.page.wait_for_timeout(2000)
+        if self.click_and_wait_api('button[type="submit"]', APPLICATIONS_API, method="POST", required=False):
             self.log("  [PASS] 申请创建成功")
         else:
             self.log("  [INFO] 表单可能有其他要求")
@@ -131,8 +74,7 @@ class RobustApprovalTest:
         self.log("\n[TEST 3] 申请列表")
         self.login("admin", "admin123")
 
-        self.page.goto(f"{BASE_URL}/approval")
-        self.page.wait_for_load_state("networkidle", timeout=5000)
+        self.goto("/approval")
 
         # 验证标签页
         tabs = ["全部申请", "待我审批", "我已审批", "我的申请"]
@@ -149,8 +91,7 @@ class RobustApprovalTest:
         self.log("\n[TEST 4] 待审批列表")
         self.login("factory1", "123456")
 
-        self.page.goto(f"{BASE_URL}/approval/pending")
-        self.page.wait_for_load_state("networkidle", timeout=5000)
+        self.goto("/approval/pending")
 
         content = self.page.content()
         if "待审批" in content or "待处理" in content or "pending" in content.lower():
@@ -165,15 +106,13 @@ class RobustApprovalTest:
         self.log("\n[TEST 5] 申请详情")
         self.login("user1", "123456")
 
-        self.page.goto(f"{BASE_URL}/approval")
-        self.page.wait_for_load_state("networkidle", timeout=5000)
+        self.goto("/approval")
 
         # 尝试点击第一个申请
         try:
             rows = self.page.locator('table tr, .list-item, .application-item').all()
             if len(rows) > 1:  # 跳过表头
-                rows[1].click()
-                self.page.wait_for_timeout(2000)
+                self.click_and_wait_api(rows[1], APPLICATIONS_API, method="GET", timeout=3000, required=False)
                 self.log("  [PASS] 申请详情页可打开")
             else:
                 self.log("  [SKIP] 列表为空")
@@ -187,8 +126,7 @@ class RobustApprovalTest:
         self.log("\n[TEST 6] 工作流页面")
         self.login("admin", "admin123")
 
-        self.page.goto(f"{BASE_URL}/approval/workflows")
-        self.page.wait_for_load_state("networkidle", timeout=5000)
+        self.goto("/approval/workflows")
 
         content = self.page.content()
         if "工作流" in content or "workflow" in content.lower():
@@ -203,8 +141,7 @@ class RobustApprovalTest:
         self.log("\n[TEST 7] 统计卡片")
         self.login("admin", "admin123")
 
-        self.page.goto(f"{BASE_URL}/approval")
-        self.page.wait_for_load_state("networkidle", timeout=5000)
+        self.goto("/approval")
 
         # 查找统计相关文字
         stats_keywords = ["总申请", "待审核", "已通过", "已拒绝", "金额"]
@@ -222,28 +159,23 @@ class RobustApprovalTest:
 
         # Step 1: user1 创建申请
         self.login("user1", "123456")
-        self.page.goto(f"{BASE_URL}/approval/new")
-        self.page.wait_for_load_state("networkidle", timeout=5000)
+        self.goto("/approval/new")
 
         title = f"流程测试_{int(time.time())}"
         self.safe_fill('input[name="title"]', title)
         self.safe_fill('textarea[name="content"]', "测试审批流程")
 
         # 提交
-        self.safe_click('button[type="submit"]')
-        self.page.wait_for_timeout(2000)
+        self.click_and_wait_api('button[type="submit"]', APPLICATIONS_API, method="POST", timeout=3000, required=False)
         self.log("  [PASS] 申请已创建")
 
         # Step 2: 厂长审批
         self.login("factory1", "123456")
-        self.page.goto(f"{BASE_URL}/approval/pending")
-        self.page.wait_for_load_state("networkidle", timeout=5000)
+        self.goto("/approval/pending")
 
         # 查找并审批
-        if self.safe_click(f'text={title}', timeout=3000):
-            self.page.wait_for_timeout(1000)
-            if self.safe_click('button:has-text("通过")', timeout=3000):
-                self.page.wait_for_timeout(2000)
+        if self.click_and_wait_api(f'text={title}', APPLICATIONS_API, method="GET", timeout=3000, required=False):
+            if self.click_and_wait_api('button:has-text("通过")', "/api/approvals/", method="POST", timeout=3000, required=False):
                 self.log("  [PASS] 厂长审批完成")
             else:
                 self.log("  [INFO] 可能不是厂长的审批")
@@ -254,12 +186,6 @@ class RobustApprovalTest:
 
     def run_all(self):
         """运行所有测试"""
-        self.log("\n" + "="*60)
-        self.log("OA系统审批模块测试 - 健壮版本")
-        self.log("="*60)
-
-        self.setup()
-
         tests = [
             ("登录页面", self.test_01_login_page),
             ("创建申请", self.test_02_create_application),
@@ -271,26 +197,7 @@ class RobustApprovalTest:
             ("审批流程", self.test_08_approval_process),
         ]
 
-        passed = 0
-        failed = 0
-
-        for name, test_func in tests:
-            try:
-                if test_func():
-                    passed += 1
-                else:
-                    failed += 1
-            except Exception as e:
-                self.log(f"  [ERROR] {e}")
-                failed += 1
-
-        self.teardown()
-
-        self.log("\n" + "="*60)
-        self.log(f"测试完成: {passed} 通过, {failed} 失败")
-        self.log("="*60)
-
-        return 0 if failed == 0 else 1
+        return self.run_tests("OA系统审批模块测试 - 健壮版本", tests, width=60)
 
 
 def main():
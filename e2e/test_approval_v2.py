@@ -6,55 +6,14 @@ OA系统审批中心测试 V2
 """
 
 import sys
-import io
-import time
 
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
-sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+from harness import E2EHarness
 
-from playwright.sync_api import sync_playwright
 
-BASE_URL = "http://localhost:5173"
-SCREENSHOTS_DIR = "e2e/screenshots/approval"
-
-class ApprovalTestV2:
+class ApprovalTestV2(E2EHarness):
     """审批中心测试 V2"""
 
-    def __init__(self):
-        self.browser = None
-        self.context = None
-        self.page = None
-
-    def setup(self):
-        """初始化浏览器"""
-        p = sync_playwright().start()
-        self.browser = p.chromium.launch(headless=True)
-        self.context = self.browser.new_context(
-            viewport={"width": 1920, "height": 1080}
-        )
-        self.page = self.context.new_page()
-
-    def teardown(self):
-        """关闭浏览器"""
-        if self.browser:
-            self.browser.close()
-
-    def log(self, message):
-        """打印日志"""
-        print(message)
-
-    def screenshot(self, name):
-        """保存截图"""
-        self.page.screenshot(path=f"{SCREENSHOTS_DIR}/{name}.png", full_page=True)
-
-    def login(self, username, password):
-        """通用登录方法"""
-        self.page.goto(f"{BASE_URL}/login")
-        self.page.wait_for_load_state("networkidle")
-        self.page.fill("input#username", username)
-        self.page.fill("input#password", password)
-        self.page.click("button[type='submit']")
-        self.page.wait_for_url(f"{BASE_URL}/**", timeout=10000)
+    SCREENSHOTS_DIR = "e2e/screenshots/approval"
 
     def test_login_all_users(self):
         """测试所有测试用户登录"""
@@ -71,7 +30,8 @@ class ApprovalTestV2:
         all_passed = True
         for username, role in users:
             try:
-                self.login(username, "123456")
+                # 此处验证登录本身，必须走登录表单
+                self.login_via_form(username, "123456")
                 self.log(f"  [PASS] {username} ({role}) 登录成功")
                 self.screenshot(f"login_{username}")
             except Exception as e:
@@ -85,15 +45,10 @@ class ApprovalTestV2:
         try:
             # 重新登录并创建申请
             self.login("user1", "123456")
-
-            # 等待登录完成并跳转到dashboard
-            self.page.wait_for_url(f"{BASE_URL}/dashboard", timeout=10000)
             self.log("  [INFO] 登录成功，当前URL: " + self.page.url)
 
-            # 访问创建申请页面
-            self.page.goto(f"{BASE_URL}/approval/new/standard")
-            self.page.wait_for_load_state("networkidle")
-            self.page.wait_for_timeout(3000)
+            # 访问创建申请页面，等待表单渲染
+            self.goto("/approval/new/standard", ready="input#title, input[placeholder*='标题']")
 
             self.log(f"  [INFO] 当前URL: {self.page.url}")
 
@@ -129,8 +84,7 @@ class ApprovalTestV2:
         self.log("\n[TEST] 测试待审批列表")
         try:
             self.login("factory1", "123456")
-            self.page.goto(f"{BASE_URL}/approval/pending")
-            self.page.wait_for_load_state("networkidle")
+            self.goto("/approval/pending")
 
             self.screenshot("pending_list")
             self.log("  [PASS] 待审批列表页面加载成功")
@@ -144,8 +98,7 @@ class ApprovalTestV2:
         self.log("\n[TEST] 测试申请列表")
         try:
             self.login("user1", "123456")
-            self.page.goto(f"{BASE_URL}/approval")
-            self.page.wait_for_load_state("networkidle")
+            self.goto("/approval")
 
             self.screenshot("application_list")
             self.log("  [PASS] 申请列表页面加载成功")
@@ -159,14 +112,13 @@ class ApprovalTestV2:
         self.log("\n[TEST] 测试统计卡片")
         try:
             self.login("admin", "123456")
-            self.page.goto(f"{BASE_URL}/approval")
-            self.page.wait_for_load_state("networkidle")
+            self.goto("/approval")
 
             stats = ["总申请", "待审核", "已通过", "已拒绝"]
             found = 0
             for stat in stats:
                 try:
-                    if self.page.locator(f'text={stat}').first.is_visible(timeout=2000):
+                    if self.wait_visible(f'text={stat}', timeout=2000):
                         found += 1
                         self.log(f"  [PASS] {stat} 统计卡片存在")
                 except:
@@ -180,12 +132,6 @@ class ApprovalTestV2:
 
     def run_all_tests(self):
         """运行所有测试"""
-        self.log("\n" + "="*70)
-        self.log("OA系统审批中心测试 V2")
-        self.log("="*70)
-
-        self.setup()
-
         tests = [
             ("用户登录测试", self.test_login_all_users),
             ("申请列表", self.test_application_list),
@@ -194,27 +140,7 @@ class ApprovalTestV2:
             ("统计卡片", self.test_statistics_display),
         ]
 
-        passed = 0
-        failed = 0
-
-        for name, test_func in tests:
-            try:
-                if test_func():
-                    passed += 1
-                else:
-                    failed += 1
-            except Exception as e:
-                self.log(f"  [ERROR] {e}")
-                failed += 1
-
-        self.teardown()
-
-        self.log("\n" + "="*70)
-        self.log(f"测试完成: {passed} 通过, {failed} 失败")
-        self.log("="*70)
-        self.log(f"\n截图保存在: {SCREENSHOTS_DIR}/")
-
-        return 0 if failed == 0 else 1
+        return self.run_tests("OA系统审批中心测试 V2", tests)
 
 
 def main():
@@ -7,54 +7,26 @@ OA系统完整业务流程自动化测试
 """
 
 import sys
-import io
 
-# 设置Windows控制台UTF-8编码
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
-sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+from harness import BASE_URL, E2EHarness
 
-from playwright.sync_api import sync_playwright, expect
-import time
 
-BASE_URL = "http://localhost:5173"
-SCREENSHOTS_DIR = "e2e/screenshots"
-
-
-class OATestSuite:
+class OATestSuite(E2EHarness):
     """OA系统测试套件"""
 
+    SCREENSHOTS_DIR = "e2e/screenshots"
+    VIDEO_DIR = "e2e/videos"
+
     def __init__(self):
-        self.browser = None
-        self.context = None
-        self.page = None
+        super().__init__()
         self.test_results = []
 
-    def setup(self):
-        """初始化浏览器"""
-        p = sync_playwright().start()
-        self.browser = p.chromium.launch(
-            headless=True,
-            executable_path="C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe"
-        )
-        self.context = self.browser.new_context(
-            viewport={"width": 1920, "height": 1080},
-            record_video_dir="e2e/videos",
-            record_video_size={"width": 1920, "height": 1080}
-        )
-        self.page = self.context.new_page()
-
-    def teardown(self):
-        """关闭浏览器"""
-        if self.browser:
-            self.browser.close()
-
-    def screenshot(self, name):
-        """保存截图"""
-        self.page.screenshot(path=f"{SCREENSHOTS_DIR}/{name}.png", full_page=True)
-
-    def log(self, message):
-        """打印日志"""
-        print(message)
+    def before_each(self, test_name):
+        """除登录登出测试外，其余测试都以管理员身份从工作台开始"""
+        if test_name != "test_login_logout":
+            self.login("admin", "admin123")
+            if "/dashboard" not in self.page.url:
+                self.goto("/dashboard")
 
     def test_login_logout(self):
         """测试1: 登录登出流程"""
@@ -62,8 +34,7 @@ class OATestSuite:
 
         try:
             # 访问登录页
-            self.page.goto(f"{BASE_URL}/login")
-            self.page.wait_for_load_state("networkidle")
+            self.goto("/login")
 
             # 验证登录页元素
             assert self.page.locator("h2").inner_text() == "欢迎回来"
@@ -109,15 +80,14 @@ class OATestSuite:
 
             # 点击设备管理快捷入口
             self.page.click("text=设备管理")
-            self.page.wait_for_load_state("networkidle")
+            self.page.wait_for_url("**/equipment**", timeout=5000)
             assert "/equipment" in self.page.url
             self.log("  [PASS] 设备管理快捷入口跳转")
 
             self.screenshot("02-dashboard-shortcut")
 
             # 返回工作台
-            self.page.goto(f"{BASE_URL}/dashboard")
-            self.page.wait_for_load_state("networkidle")
+            self.goto("/dashboard")
 
             return True
         except Exception as e:
@@ -147,10 +117,9 @@ class OATestSuite:
 
             for name, path in modules:
                 self.page.click(f"text={name}")
-                self.page.wait_for_load_state("networkidle")
+                self.page.wait_for_url(f"**{path}**", timeout=5000)
                 assert path in self.page.url, f"导航到{name}失败"
                 self.log(f"  [PASS] {name}导航")
-                time.sleep(0.5)
 
             self.screenshot("03-navigation-all")
 
@@ -165,8 +134,7 @@ class OATestSuite:
 
         try:
             # 进入审批中心
-            self.page.goto(f"{BASE_URL}/approval")
-            self.page.wait_for_load_state("networkidle")
+            self.goto("/approval")
 
             # 验证审批中心标签页
             tabs = ["全部申请", "待我审批", "我已审批", "我的申请"]
@@ -175,13 +143,11 @@ class OATestSuite:
             self.log("  [PASS] 审批中心标签页验证")
 
             # 切换到待我审批
-            self.page.click("text=待我审批")
-            time.sleep(1)
+            self.click_and_wait_api("text=待我审批", "/api/applications", method="GET", timeout=3000, required=False)
             self.log("  [PASS] 待我审批切换")
 
             # 切换到我的申请
-            self.page.click("text=我的申请")
-            time.sleep(1)
+            self.click_and_wait_api("text=我的申请", "/api/applications", method="GET", timeout=3000, required=False)
             self.log("  [PASS] 我的申请切换")
 
             self.screenshot("04-approval-tabs")
@@ -197,8 +163,7 @@ class OATestSuite:
 
         try:
             # 进入设备管理
-            self.page.goto(f"{BASE_URL}/equipment")
-            self.page.wait_for_load_state("networkidle")
+            self.goto("/equipment")
 
             # 验证设备管理页面
             assert "设备" in self.page.content()
@@ -208,8 +173,8 @@ class OATestSuite:
             search_input = self.page.locator('input[placeholder*="搜索"]').first
             if search_input.is_visible():
                 search_input.fill("测试")
-                self.page.keyboard.press("Enter")
-                time.sleep(1)
+                with self.page.expect_response(lambda r: "/api/equipment" in r.url):
+                    self.page.keyboard.press("Enter")
                 self.log("  [PASS] 设备搜索功能")
 
             self.screenshot("05-equipment-list")
@@ -225,8 +190,7 @@ class OATestSuite:
 
         try:
             # 进入考勤管理
-            self.page.goto(f"{BASE_URL}/attendance")
-            self.page.wait_for_load_state("networkidle")
+            self.goto("/attendance")
 
             # 验证考勤页面
             assert "考勤" in self.page.content()
@@ -249,8 +213,7 @@ class OATestSuite:
 
         try:
             # 进入会议管理
-            self.page.goto(f"{BASE_URL}/meetings")
-            self.page.wait_for_load_state("networkidle")
+            self.goto("/meetings")
 
             # 验证会议管理页面
             assert "会议" in self.page.content() or "会议室" in self.page.content()
@@ -269,8 +232,7 @@ class OATestSuite:
 
         try:
             # 进入文档中心
-            self.page.goto(f"{BASE_URL}/documents")
-            self.page.wait_for_load_state("networkidle")
+            self.goto("/documents")
 
             # 验证文档中心页面
             assert "文档" in self.page.content() or "文件" in self.page.content()
@@ -289,8 +251,7 @@ class OATestSuite:
 
         try:
             # 进入通讯录
-            self.page.goto(f"{BASE_URL}/contacts")
-            self.page.wait_for_load_state("networkidle")
+            self.goto("/contacts")
 
             # 验证通讯录页面
             assert "通讯录" in self.page.content() or "联系人" in self.page.content() or "组织架构" in self.page.content()
@@ -309,8 +270,7 @@ class OATestSuite:
 
         try:
             # 进入公告通知
-            self.page.goto(f"{BASE_URL}/announcements")
-            self.page.wait_for_load_state("networkidle")
+            self.goto("/announcements")
 
             # 验证公告页面
             assert "公告" in self.page.content() or "通知" in self.page.content()
@@ -329,8 +289,7 @@ class OATestSuite:
 
         try:
             # 进入知识库
-            self.page.goto(f"{BASE_URL}/knowledge")
-            self.page.wait_for_load_state("networkidle")
+            self.goto("/knowledge")
 
             # 验证知识库页面
             assert "知识" in self.page.content() or "文章" in self.page.content()
@@ -349,8 +308,7 @@ class OATestSuite:
 
         try:
             # 进入报表中心
-            self.page.goto(f"{BASE_URL}/reports")
-            self.page.wait_for_load_state("networkidle")
+            self.goto("/reports")
 
             # 验证报表页面
             assert "报表" in self.page.content() or "统计" in self.page.content()
@@ -369,8 +327,7 @@ class OATestSuite:
 
         try:
             # 进入任务管理
-            self.page.goto(f"{BASE_URL}/tasks")
-            self.page.wait_for_load_state("networkidle")
+            self.goto("/tasks")
 
             # 验证任务管理页面
             assert "任务" in self.page.content() or "看板" in self.page.content() or "项目" in self.page.content()
@@ -389,8 +346,7 @@ class OATestSuite:
 
         try:
             # 进入日程管理
-            self.page.goto(f"{BASE_URL}/schedule")
-            self.page.wait_for_load_state("networkidle")
+            self.goto("/schedule")
 
             # 验证日程页面
             assert "日程" in self.page.content() or "日历" in self.page.content()
@@ -409,8 +365,7 @@ class OATestSuite:
 
         try:
             # 进入个人设置
-            self.page.goto(f"{BASE_URL}/profile")
-            self.page.wait_for_load_state("networkidle")
+            self.goto("/profile")
 
             # 验证个人设置页面
             assert "个人" in self.page.content() or "设置" in self.page.content() or "信息" in self.page.content()
@@ -430,8 +385,7 @@ class OATestSuite:
         try:
             # 测试平板尺寸
             self.page.set_viewport_size({"width": 768, "height": 1024})
-            self.page.goto(f"{BASE_URL}/dashboard")
-            self.page.wait_for_load_state("networkidle")
+            self.goto("/dashboard")
             self.screenshot("16-responsive-tablet")
             self.log("  [PASS] 平板尺寸响应式")
 
@@ -452,12 +406,6 @@ class OATestSuite:
 
     def run_all_tests(self):
         """运行所有测试"""
-        self.log("\n" + "="*60)
-        self.log("OA系统完整业务流程自动化测试")
-        self.log("="*60)
-
-        self.setup()
-
         tests = [
             ("登录登出", self.test_login_logout),
             ("工作台快捷入口", self.test_dashboard_shortcuts),
@@ -477,28 +425,7 @@ class OATestSuite:
             ("响应式设计", self.test_responsive_design),
         ]
 
-        passed = 0
-        failed = 0
-
-        for name, test_func in tests:
-            try:
-                if test_func():
-                    passed += 1
-                else:
-                    failed += 1
-            except Exception as e:
-                self.log(f"  [ERROR] {e}")
-                failed += 1
-
-        self.teardown()
-
-        self.log("\n" + "="*60)
-        self.log(f"测试完成: {passed} 通过, {failed} 失败")
-        self.log("="*60)
-        self.log(f"\n截图保存在: {SCREENSHOTS_DIR}/")
-        self.log(f"视频保存在: e2e/videos/")
-
-        return 0 if failed == 0 else 1
+        return self.run_tests("OA系统完整业务流程自动化测试", tests, width=60)
 
 
 def main():
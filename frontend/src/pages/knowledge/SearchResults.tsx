@@ -92,6 +92,8 @@ function SearchResultCard({
   );
 }
 
+const PAGE_SIZE = 20;
+
 export default function SearchResults() {
   const navigate = useNavigate();
   const [searchParams, setSearchParams] = useSearchParams();
@@ -99,13 +101,18 @@ export default function SearchResults() {
 
   const [searchQuery, setSearchQuery] = useState(query);
   const [results, setResults] = useState<SearchArticleResult[]>([]);
+  const [total, setTotal] = useState(0);
+  const [page, setPage] = useState(1);
+  const [totalPages, setTotalPages] = useState(0);
   const [loading, setLoading] = useState(false);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [searched, setSearched] = useState(false);
 
   // 执行搜索
   const performSearch = useCallback(async (searchTerm: string) => {
     if (!searchTerm.trim()) {
       setResults([]);
+      setTotal(0);
       setSearched(false);
       return;
     }
@@ -113,9 +120,12 @@ export default function SearchResults() {
     setLoading(true);
     setSearched(true);
     try {
-      const res = await knowledgeApi.searchArticles(searchTerm, 50);
+      const res = await knowledgeApi.searchArticles(searchTerm, 1, PAGE_SIZE);
       if (res.success) {
-        setResults(res.data);
+        setResults(res.data.items);
+        setTotal(res.data.total);
+        setPage(1);
+        setTotalPages(res.data.totalPages);
       }
     } catch (error) {
       toast.error('搜索失败');
@@ -124,6 +134,23 @@ export default function SearchResults() {
     }
   }, []);
 
+  // 加载下一页
+  const loadMore = async () => {
+    setLoadingMore(true);
+    try {
+      const res = await knowledgeApi.searchArticles(query, page + 1, PAGE_SIZE);
+      if (res.success) {
+        setResults((prev) => [...prev, ...res.data.items]);
+        setPage(page + 1);
+        setTotalPages(res.data.totalPages);
+      }
+    } catch (error) {
+      toast.error('加载失败');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   // 初始搜索
   useEffect(() => {
     if (query) {
@@ -144,6 +171,7 @@ export default function SearchResults() {
   const handleClear = () => {
     setSearchQuery('');
     setResults([]);
+    setTotal(0);
     setSearched(false);
     setSearchParams({});
   };
@@ -228,7 +256,7 @@ export default function SearchResults() {
               <>
                 <div className="flex items-center justify-between">
                   <p className="text-sm text-gray-500">
-                    找到 <span className="font-medium text-gray-900">{results.length}</span> 条结果
+                    找到 <span className="font-medium text-gray-900">{total}</span> 条结果
                     {query && (
                       <span>
                         ，关键词：
@@ -246,6 +274,13 @@ export default function SearchResults() {
                     />
                   ))}
                 </div>
+                {page < totalPages && (
+                  <div className="text-center">
+                    <Button variant="outline" onClick={loadMore} disabled={loadingMore}>
+                      {loadingMore ? '加载中...' : '加载更多'}
+                    </Button>
+                  </div>
+                )}
               </>
             )}
           </div>
@@ -139,6 +139,25 @@ export interface CreateShiftData {
   color?: string
 }
 
+// 轮班规则：cycle 按天循环，null 表示休息
+export interface ShiftPattern {
+  cycle: Array<string | null>
+  anchorDate?: string
+  staggerDays?: number
+  userOffsets?: Record<string, number>
+  restWeekdays?: number[]
+  restDates?: string[]
+  maxConsecutiveWorkDays?: number
+  restShiftId?: string
+}
+
+export interface RosterSummary {
+  total: number
+  inserted: number
+  updated: number
+  skipped: number
+}
+
 export const attendanceApi = {
   // ============ 打卡 ============
   clockIn: (data: ClockInData) =>
@@ -203,4 +222,19 @@ export const attendanceApi = {
 
   setRestDay: (data: { userId: string; date: string; isRestDay: boolean }) =>
     apiClient.post<{ success: boolean; data: Schedule }>('/attendance/schedules/rest-day', data),
+
+  generateRoster: (data: {
+    userIds: string[]
+    startDate: string
+    endDate: string
+    pattern: ShiftPattern
+    overwrite?: boolean
+  }) =>
+    apiClient.post<{ success: boolean; data: RosterSummary }>('/attendance/schedules/generate', data),
+
+  batchCreateSchedules: (data: { userIds: string[]; dates: string[]; shiftId: string; overwrite?: boolean }) =>
+    apiClient.post<{ success: boolean; data: RosterSummary }>('/attendance/schedules/batch', data),
+
+  copySchedules: (data: { sourceMonth: string; targetMonth: string; userIds?: string[]; overwrite?: boolean }) =>
+    apiClient.post<{ success: boolean; data: RosterSummary }>('/attendance/schedules/copy', data),
 }
@@ -22,6 +22,8 @@ export interface FaultPrediction {
   confidence: number;
   trend: number;
   avgScore: number;
+  ewma?: number;
+  slope?: number;
   predictedFailureDate: string | null;
 }
 
@@ -46,6 +48,28 @@ export interface BatchCalculateResult {
   failed: number;
 }
 
+// 全厂健康度重算运行记录
+export interface HealthRecalcRun {
+  id: string;
+  status: 'RUNNING' | 'COMPLETED' | 'FAILED';
+  trigger: 'manual' | 'schedule';
+  assessor: string;
+  factoryId: string | null;
+  cursor: string | null;
+  total: number;
+  processed: number;
+  failed: number;
+  lastError: string | null;
+  startedAt: string;
+  heartbeatAt: string;
+  finishedAt: string | null;
+}
+
+export interface HealthRecalcStatus extends HealthRecalcRun {
+  progress: number;
+  stale: boolean;
+}
+
 export interface HealthStatisticsResult {
   totalAssessed: number;
   averageScore: number;
@@ -90,6 +114,16 @@ export const equipmentHealthApi = {
       equipmentIds,
     }),
 
+  // 启动全厂健康度重算（后台执行）
+  startRecalc: (factoryId?: string): Promise<{ success: boolean; data: HealthRecalcRun; message: string }> =>
+    apiClient.post<{ success: boolean; data: HealthRecalcRun; message: string }>('/equipment/health/recalc', {
+      factoryId,
+    }),
+
+  // 获取全厂健康度重算进度
+  getRecalcStatus: (): Promise<{ success: boolean; data: HealthRecalcStatus | null }> =>
+    apiClient.get<{ success: boolean; data: HealthRecalcStatus | null }>('/equipment/health/recalc'),
+
   // 获取所有设备健康度列表
   getAllEquipmentHealth: (): Promise<{ success: boolean; data: EquipmentHealth[] }> =>
     apiClient.get<{ success: boolean; data: EquipmentHealth[] }>('/equipment/health/all'),
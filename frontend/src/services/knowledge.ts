@@ -208,9 +208,9 @@ export const knowledgeApi = {
   // ========== 搜索相关 ==========
 
   // 搜索文章
-  searchArticles: (query: string, limit?: number): Promise<ApiResponse<SearchArticleResult[]>> =>
-    apiClient.get<ApiResponse<SearchArticleResult[]>>('/knowledge/search', {
-      params: { q: query, limit },
+  searchArticles: (query: string, page?: number, limit?: number): Promise<ApiResponse<PaginatedResponse<SearchArticleResult>>> =>
+    apiClient.get<ApiResponse<PaginatedResponse<SearchArticleResult>>>('/knowledge/search', {
+      params: { q: query, page, limit },
     }),
 
   // ========== 标签相关 ==========
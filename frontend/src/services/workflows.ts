@@ -105,6 +105,29 @@ export interface SimulationResult {
   path: SimulationNode[];
 }
 
+// 批量模拟
+export interface ApplicationSimulationFilter {
+  status?: string;
+  type?: string;
+  formType?: string;
+  applicantDept?: string;
+  createdFrom?: string;
+  createdTo?: string;
+}
+
+export interface BatchSimulationResult {
+  success: boolean;
+  errors?: string[];
+  total: number;
+  completed: number;
+  failed: number;
+  distinctPaths: number;
+  paths: Array<{ nodeIds: string[]; nodeNames: string[]; count: number; ratio: number }>;
+  nodeHits: Array<{ nodeId: string; nodeName: string; nodeType: NodeType; count: number; ratio: number }>;
+  approvalDepths: Array<{ depth: number; count: number }>;
+  failures: Array<{ error: string; count: number }>;
+}
+
 // API响应类型
 export interface ApiResponse<T> {
   success: boolean;
@@ -155,6 +178,13 @@ export const workflowApi = {
   simulateWorkflow: (id: string, testData: Record<string, unknown>): Promise<ApiResponse<SimulationResult>> =>
     apiClient.post<ApiResponse<SimulationResult>>(`/workflows/${id}/simulate`, { testData }),
 
+  // 批量模拟工作流（变量组或历史申请筛选条件）
+  simulateWorkflowBatch: (id: string, data: {
+    variableSets?: Record<string, unknown>[];
+    applicationFilter?: ApplicationSimulationFilter;
+  }): Promise<ApiResponse<BatchSimulationResult>> =>
+    apiClient.post<ApiResponse<BatchSimulationResult>>(`/workflows/${id}/simulate/batch`, data),
+
   // 启动工作流实例
   startWorkflow: (data: {
     workflowId: string;